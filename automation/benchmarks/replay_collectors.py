@@ -0,0 +1,285 @@
+# benchmarks/replay_collectors.py
+"""
+Replay Collectors
+=================
+Test de charge hors ligne des collecteurs HTTP (Crunchbase, Google Search,
+Web Scraper): un ReplayServer local rejoue les fixtures enregistrées
+(HTTP_MODE=record) avec latence et erreurs injectées, et chaque collecteur
+exécute --runs collectes dont --concurrency en parallèle.
+
+--synthesize: les requêtes sans fixture reçoivent une réponse générée depuis
+le corpus synthétique (même graine = mêmes réponses), enregistrée dans le
+dossier des fixtures. Permet de tester sans avoir jamais enregistré.
+
+Mesures par collecteur: durée, startups et requêtes par seconde, erreurs
+injectées, latence HTTP (instrumentation). Rapport JSON dans benchmarks/results/.
+
+Usage:
+    HTTP_MODE=record python main_orchestrator.py              # enregistrement (une fois, réseau)
+    python benchmarks/replay_collectors.py --runs 20 --concurrency 5 --latency 80 --error-rate 0.05
+    python benchmarks/replay_collectors.py --synthesize --fixtures /tmp/fixtures
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+import zlib
+from datetime import datetime
+from html import escape
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+# Ajouter le parent directory au path (exécution standalone)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.run_benchmarks import DEFAULT_RESULTS_DIR, git_revision
+from benchmarks.synthetic_data import SyntheticCorpus
+from utils.http_client import FixtureStore
+from utils.http_replay import ReplayServer
+from utils.instrumentation import get_instrumentation
+
+logger = logging.getLogger(__name__)
+
+
+COLLECTORS = ('crunchbase', 'google_search', 'web_scraper')
+
+# Taille des réponses synthétiques (limites des collecteurs)
+CRUNCHBASE_PAGE_SIZE = 100
+SERPER_RESULTS = 10
+DIRECTORY_CARDS = 50
+NEWS_ARTICLES = 20
+
+EMPLOYEE_RANGES = {5: '1-10', 15: '11-50', 30: '11-50', 75: '51-100', 150: '101-250'}
+
+
+class SyntheticResponses:
+    """Réponses synthétiques par collecteur (fallback du ReplayServer)"""
+    
+    def __init__(self, seed: int = 42):
+        self.seed = seed
+    
+    def __call__(self, collector: str, method: str, url: str, request_json=None) -> Optional[tuple]:
+        # Graine propre à chaque requête: réponse stable quel que soit l'ordre des appels
+        request_seed = zlib.crc32(json.dumps([self.seed, method, url, request_json], sort_keys=True).encode())
+        corpus = SyntheticCorpus(request_seed)
+        
+        if collector == 'crunchbase':
+            return self._json(self._crunchbase(corpus))
+        if collector == 'google_search':
+            query = (request_json or {}).get('q', '')
+            if urlparse(url).path.rstrip('/').endswith('news'):
+                return self._json(self._serper_news(corpus, query))
+            return self._json(self._serper(corpus, query))
+        if collector == 'web_scraper':
+            # Pages de news: .../startups; annuaires: /directory, /list
+            if urlparse(url).path.rstrip('/').endswith('startups'):
+                html = self._news_page(corpus)
+            else:
+                html = self._directory_page(corpus)
+            return 200, 'text/html; charset=utf-8', html.encode('utf-8')
+        return None
+    
+    @staticmethod
+    def _json(data: Dict) -> tuple:
+        return 200, 'application/json', json.dumps(data, ensure_ascii=False).encode('utf-8')
+    
+    def _crunchbase(self, corpus: SyntheticCorpus) -> Dict:
+        entities = []
+        for index, startup in enumerate(corpus.unique_startups(CRUNCHBASE_PAGE_SIZE)):
+            entities.append({
+                'uuid': f"synthetic-{corpus.seed}-{index}",
+                'properties': {
+                    'name': startup['name'],
+                    'short_description': startup['description'],
+                    'website_url': startup['website'],
+                    'linkedin': {'value': startup.get('linkedin_url')},
+                    'contact_email': (startup.get('email') or '').strip() or None,
+                    'founded_on': f"{startup.get('founded_year') or startup.get('foundedYear') or 2020}-01-01",
+                    'location_identifiers': [{'location_type': 'city', 'value': startup['location'] or 'Casablanca'}],
+                    'categories': [{'value': 'FinTech' if startup['sector'] in ('fintech', 'FinTech') else 'Software'}],
+                    'funding_total': {'value': startup.get('funding_raised') or 50000, 'currency': 'USD'},
+                    'last_funding_type': startup.get('last_funding_type', 'seed'),
+                    'num_employees_enum': EMPLOYEE_RANGES.get(startup.get('employees'), '1-10'),
+                    'rank_org': index + 1,
+                },
+            })
+        return {'count': len(entities), 'entities': entities}
+    
+    def _serper(self, corpus: SyntheticCorpus, query: str) -> Dict:
+        organic = []
+        for position, startup in enumerate(corpus.unique_startups(SERPER_RESULTS), start=1):
+            organic.append({
+                'title': f"{startup['name'].replace(' ', '')} lève des fonds - startup marocaine",
+                'snippet': startup['description'],
+                'link': startup['website'],
+                'position': position,
+            })
+        return {'searchParameters': {'q': query}, 'organic': organic}
+    
+    def _serper_news(self, corpus: SyntheticCorpus, query: str) -> Dict:
+        # Nombre d'articles variable (0 à SERPER_RESULTS) selon la requête
+        name = query.strip('"')
+        count = corpus.seed % (SERPER_RESULTS + 1)
+        news = []
+        for position, description in enumerate(corpus.descriptions(count), start=1):
+            news.append({
+                'title': f"{name}: {description[:60]}",
+                'snippet': description,
+                'link': f"https://news.example.ma/{corpus.seed}/{position}",
+                'source': 'Médias24',
+                'date': f"il y a {position} jours",
+                'position': position,
+            })
+        return {'searchParameters': {'q': query}, 'news': news}
+    
+    def _directory_page(self, corpus: SyntheticCorpus) -> str:
+        cards = []
+        for startup in corpus.unique_startups(DIRECTORY_CARDS):
+            website = startup['website'] if startup['website'].startswith('http') else f"https://{startup['website']}"
+            cards.append(
+                f'<div class="startup-card"><h3>{escape(startup["name"])}</h3>'
+                f'<p class="description">{escape(startup["description"])}</p>'
+                f'<a href="{website}">Site</a> <span>{escape(startup["location"] or "")}</span>'
+                f'{escape((startup.get("email") or "").strip())}</div>'
+            )
+        return f"<html><body>{''.join(cards)}</body></html>"
+    
+    def _news_page(self, corpus: SyntheticCorpus) -> str:
+        articles = []
+        for index, startup in enumerate(corpus.unique_startups(NEWS_ARTICLES)):
+            name = startup['name'].split()[0]
+            articles.append(
+                f'<article class="post"><h2>La startup {escape(name)} lève des fonds</h2>'
+                f'<div class="excerpt">{escape(startup["description"])}</div>'
+                f'<a href="/article-{index}">Lire</a></article>'
+            )
+        return f"<html><body>{''.join(articles)}</body></html>"
+
+
+def create_collector(name: str):
+    if name == 'crunchbase':
+        from collectors.crunchbase_collector import CrunchbaseCollector
+        return CrunchbaseCollector()
+    if name == 'google_search':
+        from collectors.google_search_collector import GoogleSearchCollector
+        return GoogleSearchCollector()
+    if name == 'web_scraper':
+        from collectors.web_scraper import IntelligentWebScraper
+        return IntelligentWebScraper()
+    raise ValueError(f"Collecteur inconnu: {name} (attendu: {', '.join(COLLECTORS)})")
+
+
+async def run_collector(name: str, server: ReplayServer, runs: int, concurrency: int) -> Dict:
+    """runs collectes (concurrency en parallèle) d'un collecteur contre le serveur de rejeu"""
+    semaphore = asyncio.Semaphore(concurrency)
+    before = dict(server.stats)
+    
+    async def collect_once() -> int:
+        async with semaphore:
+            return len(await create_collector(name).collect())
+    
+    started = time.perf_counter()
+    counts = await asyncio.gather(*[collect_once() for _ in range(runs)])
+    seconds = time.perf_counter() - started
+    
+    delta = {key: server.stats[key] - before.get(key, 0) for key in server.stats}
+    startups = sum(counts)
+    return {
+        'runs': runs,
+        'concurrency': concurrency,
+        'seconds': round(seconds, 4),
+        'startups': startups,
+        'startups_per_second': round(startups / seconds, 1) if seconds else None,
+        'requests': delta['requests'],
+        'requests_per_second': round(delta['requests'] / seconds, 1) if seconds else None,
+        'injected_errors': delta['injected_errors'],
+        'missing_fixtures': delta['missing'],
+        'generated_fixtures': delta['generated'],
+    }
+
+
+async def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Test de charge des collecteurs sur fixtures HTTP rejouées")
+    parser.add_argument('--collectors', default=','.join(COLLECTORS))
+    parser.add_argument('--runs', type=int, default=10, help="Collectes par collecteur")
+    parser.add_argument('--concurrency', type=int, default=5, help="Collectes simultanées")
+    parser.add_argument('--fixtures', default=None, help="Dossier des fixtures (HTTP_FIXTURES_DIR)")
+    parser.add_argument('--latency', type=float, default=50, help="Latence moyenne simulée (ms)")
+    parser.add_argument('--jitter', type=float, default=20, help="Écart-type de la latence (ms)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Part de requêtes en erreur (0-1)")
+    parser.add_argument('--error-status', type=int, default=503, help="Statut des erreurs (429: rate limiting)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--synthesize', action='store_true',
+                        help="Générer les fixtures manquantes depuis le corpus synthétique")
+    parser.add_argument('--output', default=DEFAULT_RESULTS_DIR, help="Dossier du rapport JSON")
+    args = parser.parse_args(argv)
+    
+    collectors = [name.strip() for name in args.collectors.split(',') if name.strip()]
+    store = FixtureStore(args.fixtures)
+    server = ReplayServer(
+        store, args.latency, args.jitter, args.error_rate, args.error_status, args.seed,
+        fallback=SyntheticResponses(args.seed) if args.synthesize else None,
+    )
+    url = await server.start(port=0)
+    
+    # Les collecteurs lisent leur configuration à la construction
+    os.environ['HTTP_MODE'] = 'replay'
+    os.environ['HTTP_REPLAY_URL'] = url
+    for key in ('CRUNCHBASE_API_KEY', 'SERPER_API_KEY'):
+        # Clé factice: sans clé les collecteurs passent en mode démo (aucune requête)
+        if not os.getenv(key):
+            os.environ[key] = 'replay'
+    
+    instrumentation = get_instrumentation()
+    instrumentation.reset('replay_collectors')
+    results = {}
+    try:
+        for name in collectors:
+            results[name] = await run_collector(name, server, args.runs, args.concurrency)
+            result = results[name]
+            logger.info(f"⏱️  {name}: {result['startups']} startups, {result['requests']} requêtes "
+                        f"en {result['seconds']:.2f}s ({result['requests_per_second']} req/s, "
+                        f"{result['injected_errors']} erreurs injectées, {result['missing_fixtures']} fixtures absentes)")
+    finally:
+        await server.stop()
+    
+    http = instrumentation.report()['http']
+    for name, result in results.items():
+        result['http'] = http.get(name, {})
+    
+    report = {
+        **git_revision(),
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'seed': args.seed,
+        'server': {
+            'latency_ms': args.latency,
+            'jitter_ms': args.jitter,
+            'error_rate': args.error_rate,
+            'error_status': args.error_status,
+            'fixtures': store.count(),
+        },
+        'results': results,
+    }
+    
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, f"replay_{datetime.now():%Y%m%d_%H%M%S}_{report['commit'] or 'nogit'}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    logger.info(f"📝 Rapport: {path}")
+    
+    missing = sum(result['missing_fixtures'] for result in results.values())
+    if missing:
+        logger.warning(f"⚠️  {missing} requête(s) sans fixture: enregistrer avec HTTP_MODE=record ou utiliser --synthesize")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,335 @@
+# benchmarks/run_benchmarks.py
+"""
+Benchmarks
+==========
+Mesure les étapes coûteuses du pipeline sur un corpus synthétique reproductible
+(benchmarks/synthetic_data.py, graine fixe) à plusieurs tailles:
+
+- cleaner: DataCleaner.process (normalisation, validation, déduplication)
+- classifier: SectorClassifier.classify
+- extractor: EntityExtractor.extract
+- scoring: MLScoringEngine.predict_score
+- db_write: upsert_startups (insertion, puis réécriture à l'identique)
+
+Les résultats sont écrits en JSON (benchmarks/results/<date>_<commit>.json) avec
+le commit courant; --compare signale les régressions par rapport à un fichier
+de référence (code de sortie 1 si une mesure dépasse le seuil).
+
+Une taille dont la durée estimée (extrapolée des tailles précédentes) dépasse
+--budget secondes est ignorée et marquée comme telle dans le rapport.
+
+Usage:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --sizes 1000,10000 --benchmarks cleaner,scoring
+    python benchmarks/run_benchmarks.py --backend postgres --compare benchmarks/results/<référence>.json
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import math
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# Ajouter le parent directory au path (exécution standalone)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_data import SyntheticCorpus
+
+logger = logging.getLogger(__name__)
+
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_RESULTS_DIR = os.path.join(BASE_DIR, 'benchmarks', 'results')
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+
+class BenchmarkSuite:
+    """Exécute les benchmarks demandés sur chaque taille de corpus"""
+    
+    BENCHMARKS = ('cleaner', 'classifier', 'extractor', 'scoring', 'db_write')
+    
+    def __init__(self, seed: int = 42, backend: str = 'sqlite', budget: float = 600, repeat: int = 1):
+        self.corpus = SyntheticCorpus(seed)
+        self.seed = seed
+        self.backend = backend
+        self.budget = budget
+        self.repeat = max(1, repeat)
+    
+    async def run(self, benchmarks: List[str], sizes: List[int]) -> Dict:
+        results = {}
+        
+        for name in benchmarks:
+            method = getattr(self, f"bench_{name}", None)
+            if method is None:
+                raise ValueError(f"Benchmark inconnu: {name} (attendu: {', '.join(self.BENCHMARKS)})")
+            
+            results[name] = {}
+            measured = []
+            for size in sorted(sizes):
+                estimate = self._estimate(measured, size)
+                if estimate > self.budget:
+                    logger.info(f"⏭️  {name} @ {size}: ignoré (estimation {estimate:.0f}s > budget {self.budget:.0f}s)")
+                    results[name][str(size)] = {'skipped': f"estimation {estimate:.0f}s > budget {self.budget:.0f}s"}
+                    continue
+                
+                runs = [await method(size) for _ in range(self.repeat)]
+                result = min(runs, key=lambda run: run['seconds'])
+                result['rows_per_second'] = round(size / result['seconds'], 1) if result['seconds'] else None
+                results[name][str(size)] = result
+                measured.append((size, result['seconds']))
+                logger.info(f"⏱️  {name} @ {size}: {result['seconds']:.3f}s ({result['rows_per_second']} lignes/s)")
+        
+        return results
+    
+    @staticmethod
+    def _estimate(measured: List[tuple], size: int) -> float:
+        """Durée extrapolée (exposant de croissance observé entre les deux dernières tailles, 1 à 2)"""
+        if not measured:
+            return 0.0
+        last_size, last_seconds = measured[-1]
+        exponent = 1.0
+        if len(measured) >= 2:
+            previous_size, previous_seconds = measured[-2]
+            if previous_seconds > 0 and last_seconds > 0:
+                exponent = math.log(last_seconds / previous_seconds) / math.log(last_size / previous_size)
+                exponent = min(2.0, max(1.0, exponent))
+        return last_seconds * (size / last_size) ** exponent
+    
+    @staticmethod
+    async def _timed(coroutine_fn, *args) -> tuple:
+        gc.collect()
+        started = time.perf_counter()
+        result = await coroutine_fn(*args)
+        return time.perf_counter() - started, result
+    
+    # --- Benchmarks ---
+    
+    async def bench_cleaner(self, size: int) -> Dict:
+        from utils.data_cleaner import DataCleaner
+        
+        startups = self.corpus.startups(size)
+        seconds, cleaned = await self._timed(DataCleaner().process, startups)
+        return {'seconds': round(seconds, 4), 'output_rows': len(cleaned)}
+    
+    async def bench_classifier(self, size: int) -> Dict:
+        from ml.classification_pipeline import SectorClassifier
+        
+        # Sans registre: keywords par défaut, résultat indépendant des modèles installés
+        classifier = SectorClassifier(registry=None)
+        startups = self.corpus.startups(size, duplicate_rate=0.0)
+        
+        async def classify_all():
+            return [await classifier.classify(s['description'], s['name']) for s in startups]
+        
+        seconds, sectors = await self._timed(classify_all)
+        return {'seconds': round(seconds, 4), 'other_ratio': round(sectors.count('other') / size, 3)}
+    
+    async def bench_extractor(self, size: int) -> Dict:
+        from ml.classification_pipeline import EntityExtractor
+        
+        extractor = EntityExtractor()
+        descriptions = self.corpus.descriptions(size)
+        
+        async def extract_all():
+            return [await extractor.extract(text) for text in descriptions]
+        
+        seconds, entities = await self._timed(extract_all)
+        with_founders = sum(1 for entity in entities if entity['founders'])
+        return {'seconds': round(seconds, 4), 'with_founders': with_founders}
+    
+    async def bench_scoring(self, size: int) -> Dict:
+        from ml.scoring_engine import MLScoringEngine
+        from utils.startup_record import StartupRecord
+        
+        engine = MLScoringEngine()
+        records = [StartupRecord.from_dict(s) for s in self.corpus.startups(size, duplicate_rate=0.0)]
+        
+        async def score_all():
+            return [await engine.predict_score(record) for record in records]
+        
+        seconds, scores = await self._timed(score_all)
+        return {'seconds': round(seconds, 4), 'mean_score': round(sum(scores) / size, 2)}
+    
+    async def bench_db_write(self, size: int) -> Dict:
+        from utils.data_cleaner import DataCleaner
+        from utils.startup_record import StartupRecord
+        
+        # Lignes normalisées comme en sortie de DataCleaner (sans la déduplication)
+        cleaner = DataCleaner()
+        records = [
+            cleaner._normalize_startup(StartupRecord.from_dict(s))
+            for s in self.corpus.unique_startups(size)
+        ]
+        
+        database, cleanup = await self._bench_database()
+        try:
+            seconds, counts = await self._timed(database.upsert_startups, records)
+            # Deuxième passage: empreintes identiques, aucune écriture attendue
+            rewrite_seconds, rewrite_counts = await self._timed(database.upsert_startups, records)
+        finally:
+            await cleanup()
+        
+        return {
+            'seconds': round(seconds, 4),
+            'new': counts['new'],
+            'errors': counts['errors'],
+            'rewrite_seconds': round(rewrite_seconds, 4),
+            'rewrite_unchanged': rewrite_counts['unchanged'],
+            'backend': self.backend,
+        }
+    
+    async def _bench_database(self):
+        """Base vide dédiée au benchmark (fichier temporaire SQLite ou base BENCH_DB_NAME)"""
+        if self.backend == 'sqlite':
+            from database.sqlite_manager import SQLiteDatabaseManager
+            
+            directory = tempfile.mkdtemp(prefix='vcds_bench_')
+            database = SQLiteDatabaseManager(os.path.join(directory, 'bench.db'))
+            await database.connect()
+            
+            async def cleanup():
+                await database.disconnect()
+                shutil.rmtree(directory, ignore_errors=True)
+            
+            return database, cleanup
+        
+        import asyncpg
+        from database.db_manager import DatabaseManager
+        
+        database = DatabaseManager()
+        name = os.getenv('BENCH_DB_NAME', 'vc_deal_screener_bench')
+        if name == database.db_config['database']:
+            raise ValueError("BENCH_DB_NAME doit différer de DB_NAME (la base est vidée)")
+        
+        admin = await asyncpg.connect(**{**database.db_config, 'database': 'postgres'})
+        try:
+            if not await admin.fetchval("SELECT 1 FROM pg_database WHERE datname = $1", name):
+                await admin.execute(f'CREATE DATABASE "{name}"')
+        finally:
+            await admin.close()
+        
+        database.db_config['database'] = name
+        await database.connect()
+        async with database.pool.acquire() as conn:
+            await conn.execute("TRUNCATE startups, raw_payloads RESTART IDENTITY CASCADE")
+        
+        return database, database.disconnect
+
+
+def git_revision() -> Dict:
+    """Commit courant et présence de modifications non commitées"""
+    def git(*args) -> Optional[str]:
+        try:
+            return subprocess.run(
+                ['git', *args], cwd=BASE_DIR, capture_output=True, text=True, timeout=30
+            ).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return None
+    
+    commit = git('rev-parse', '--short', 'HEAD') or None
+    status = git('status', '--porcelain', '--untracked-files=no')
+    return {'commit': commit, 'dirty': bool(status) if status is not None else None}
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[Dict]:
+    """Mesures communes aux deux rapports; regression si durée > référence x (1 + threshold)"""
+    rows = []
+    for name, sizes in current['results'].items():
+        for size, result in sizes.items():
+            reference = baseline.get('results', {}).get(name, {}).get(size)
+            if not reference or 'seconds' not in reference or 'seconds' not in result:
+                continue
+            ratio = result['seconds'] / reference['seconds'] if reference['seconds'] else None
+            rows.append({
+                'benchmark': name,
+                'size': int(size),
+                'baseline_seconds': reference['seconds'],
+                'seconds': result['seconds'],
+                'ratio': round(ratio, 3) if ratio is not None else None,
+                'regression': ratio is not None and ratio > 1 + threshold,
+            })
+    return rows
+
+
+async def main(argv: List[str] = None) -> int:
+    """Point d'entrée CLI (code de sortie 1 si régression détectée)"""
+    parser = argparse.ArgumentParser(description="Benchmarks du pipeline sur corpus synthétique")
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help="Tailles de corpus (séparées par des virgules)")
+    parser.add_argument('--benchmarks', default=','.join(BenchmarkSuite.BENCHMARKS),
+                        help="Benchmarks à exécuter (séparés par des virgules)")
+    parser.add_argument('--seed', type=int, default=42, help="Graine du corpus synthétique")
+    parser.add_argument('--backend', default=os.getenv('BENCH_DB_BACKEND', 'sqlite'),
+                        help="Backend du benchmark db_write: sqlite ou postgres")
+    parser.add_argument('--budget', type=float, default=600,
+                        help="Durée estimée maximale par mesure (secondes)")
+    parser.add_argument('--repeat', type=int, default=1, help="Répétitions par mesure (meilleur temps)")
+    parser.add_argument('--output', default=DEFAULT_RESULTS_DIR, help="Dossier des résultats JSON")
+    parser.add_argument('--compare', default=None, help="Rapport JSON de référence")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="Ralentissement toléré avant régression (0.2 = +20%%)")
+    args = parser.parse_args(argv)
+    
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    benchmarks = [name.strip() for name in args.benchmarks.split(',') if name.strip()]
+    
+    suite = BenchmarkSuite(args.seed, args.backend, args.budget, args.repeat)
+    revision = git_revision()
+    logger.info(f"🏁 Benchmarks {', '.join(benchmarks)} @ {sizes} (commit {revision['commit']}, graine {args.seed})")
+    
+    report = {
+        **revision,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': args.seed,
+        'backend': args.backend,
+        'results': await suite.run(benchmarks, sizes),
+    }
+    
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, f"{datetime.now():%Y%m%d_%H%M%S}_{revision['commit'] or 'nogit'}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    logger.info(f"📝 Résultats: {path}")
+    
+    if not args.compare:
+        return 0
+    
+    with open(args.compare, encoding='utf-8') as f:
+        baseline = json.load(f)
+    
+    for key in ('seed', 'backend'):
+        if baseline.get(key) != report[key]:
+            logger.warning(f"⚠️  {key} différent de la référence ({baseline.get(key)} vs {report[key]}): mesures non comparables")
+    
+    rows = compare(report, baseline, args.threshold)
+    logger.info(f"📊 Comparaison avec {baseline.get('commit')} ({args.compare}):")
+    for row in rows:
+        flag = '❌' if row['regression'] else '✅'
+        logger.info(f"  {flag} {row['benchmark']} @ {row['size']}: "
+                    f"{row['baseline_seconds']:.3f}s -> {row['seconds']:.3f}s (x{row['ratio']})")
+    
+    regressions = [row for row in rows if row['regression']]
+    if regressions:
+        logger.warning(f"⚠️  {len(regressions)} régression(s) au-delà de +{args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,241 @@
+# benchmarks/synthetic_data.py
+"""
+Synthetic Data
+==============
+Générateur déterministe (graine) de startups marocaines réalistes pour les
+benchmarks: mêmes entrées d'un commit à l'autre, donc temps comparables.
+
+Le corpus reproduit ce que produisent les collecteurs:
+- noms avec fautes de frappe et doublons (même startup vue par plusieurs sources)
+- variantes de clés (fundingRaised, foundedYear, team_size...) et de valeurs
+  (secteurs "Fin Tech" / "financial technology", villes "casa" / "Casablanca, Morocco")
+- descriptions françaises et anglaises avec fondateurs, partenariats et levées
+- actualités (titre, contenu, url, date)
+"""
+
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+
+NAME_PREFIXES = [
+    'Pay', 'Atlas', 'Souk', 'Maroc', 'Argan', 'Sahara', 'Kasba', 'Medina', 'Dar', 'Data',
+    'Smart', 'Agri', 'Green', 'Edu', 'Med', 'Cash', 'Chari', 'Yo', 'Nomad', 'Oasis',
+    'Riad', 'Zellij', 'Toubkal', 'Tafi', 'Ifri', 'Baraka', 'Amane', 'Nour', 'Sanad', 'Tamwil',
+]
+NAME_SUFFIXES = [
+    'ly', 'ify', 'hub', 'pay', 'go', 'tech', 'lab', 'ia', 'box', 'ma',
+    'link', 'flow', 'kit', 'now', 'up', 'wise', 'net', 'cloud', 'market', 'care',
+]
+
+# Valeurs brutes telles que renvoyées par les sources (normalisées par DataCleaner)
+SECTOR_VARIANTS = {
+    'fintech': ['fintech', 'Fin Tech', 'financial technology', 'FinTech'],
+    'ai': ['ai', 'artificial intelligence', 'machine learning', 'AI'],
+    'healthtech': ['healthtech', 'health tech', 'healthcare'],
+    'edtech': ['edtech', 'ed tech', 'education technology'],
+    'ecommerce': ['ecommerce', 'e-commerce', 'ecom'],
+    'agritech': ['agritech', 'agri tech', 'agricultural technology'],
+    'cleantech': ['cleantech', 'clean tech', 'green tech'],
+    'logistics': ['logistics'],
+    'saas': ['saas', 'software as a service', 'SaaS'],
+    'proptech': ['proptech', 'prop tech', 'real estate'],
+}
+
+LOCATION_VARIANTS = [
+    'Casablanca', 'casa', 'Casablanca, Morocco', 'Rabat', 'Rabat, Morocco', 'Marrakech',
+    'marrakesh', 'Tanger', 'tangier', 'Fès', 'fez', 'Agadir', 'Kenitra', 'Oujda', '',
+]
+
+STAGES = ['Pre-Seed', 'Seed', 'Seed', 'Series A', 'Series A', 'Series B', None]
+
+SOURCES = [
+    'crunchbase', 'google_search', 'incubator_portfolio', 'startup_competition',
+    'media_coverage', 'government_database', 'news_mention',
+]
+
+FIRST_NAMES = ['Youssef', 'Salma', 'Omar', 'Imane', 'Mehdi', 'Khadija', 'Amine', 'Hajar', 'Karim', 'Nadia']
+LAST_NAMES = ['Alami', 'Benjelloun', 'Tazi', 'Berrada', 'Idrissi', 'Fassi', 'Chraibi', 'Lahlou', 'Bennani', 'Naciri']
+PARTNERS = ['Attijariwafa Bank', 'Orange Maroc', 'Maroc Telecom', 'OCP Group', 'Bank of Africa', 'Inwi', 'CDG Invest']
+
+# Fragments de description par secteur (vocabulaire du SectorClassifier)
+SECTOR_PHRASES = {
+    'fintech': ('une solution de paiement mobile et de wallet', 'a mobile money and banking platform'),
+    'ai': ('une plateforme d\'intelligence artificielle et de machine learning', 'an AI computer vision and nlp engine'),
+    'healthtech': ('un service de télémédecine pour les patients', 'a health diagnostic tool for clinics'),
+    'edtech': ('une plateforme e-learning pour la formation des étudiants', 'an edtech tutoring app for students'),
+    'ecommerce': ('une marketplace de vente en ligne', 'an e-commerce marketplace for retail brands'),
+    'agritech': ('une solution d\'irrigation intelligente pour l\'agriculture', 'a smart farming and irrigation service'),
+    'cleantech': ('des panneaux solaires et de l\'énergie renouvelable', 'a cleantech recycling and solar company'),
+    'logistics': ('un service de livraison et de logistique du dernier kilomètre', 'a delivery and supply chain network'),
+    'saas': ('un logiciel SaaS de gestion en cloud', 'a cloud software platform with an api'),
+    'proptech': ('une plateforme immobilier de location d\'appartements', 'a real estate and proptech marketplace'),
+}
+
+NEWS_TITLES = [
+    '{name} lève {amount} pour accélérer son expansion',
+    '{name} annonce un partenariat avec {partner}',
+    '{name} remporte le prix de l\'innovation',
+    '{name} raises {amount} to expand across Africa',
+    'Difficultés pour {name} après une année de pertes',
+]
+
+
+class SyntheticCorpus:
+    """Générateur de startups et d'actualités (résultat identique pour une graine donnée)"""
+    
+    def __init__(self, seed: int = 42, reference_date: datetime = None):
+        self.seed = seed
+        # Date fixe: collected_at et published_at ne dépendent pas du jour d'exécution
+        self.reference_date = reference_date or datetime(2025, 1, 1)
+    
+    def startups(self, count: int, duplicate_rate: float = 0.1, typo_rate: float = 0.05,
+                 news_per_startup: int = 0) -> List[Dict]:
+        """count dicts de collecteur, dont ~duplicate_rate doublons d'une startup déjà générée"""
+        rng = random.Random(f"{self.seed}-{count}-{duplicate_rate}-{typo_rate}-{news_per_startup}")
+        startups = []
+        
+        for index in range(count):
+            if startups and rng.random() < duplicate_rate:
+                startup = self._duplicate(rng, rng.choice(startups), typo_rate)
+            else:
+                startup = self._startup(rng, index)
+            if news_per_startup:
+                startup['news'] = self._news(rng, startup['name'], news_per_startup)
+            startups.append(startup)
+        
+        return startups
+    
+    def unique_startups(self, count: int) -> List[Dict]:
+        """count startups aux noms distincts (chemin d'écriture en base)"""
+        startups = self.startups(count, duplicate_rate=0.0, typo_rate=0.0)
+        seen = set()
+        for index, startup in enumerate(startups):
+            if startup['name'] in seen:
+                startup['name'] = f"{startup['name']} #{index}"
+            seen.add(startup['name'])
+        return startups
+    
+    def descriptions(self, count: int) -> List[str]:
+        rng = random.Random(f"{self.seed}-descriptions-{count}")
+        return [self._description(rng, rng.choice(list(SECTOR_PHRASES)), self._name(rng, index))
+                for index in range(count)]
+    
+    # --- Générateurs élémentaires ---
+    
+    def _name(self, rng: random.Random, index: int) -> str:
+        name = rng.choice(NAME_PREFIXES) + rng.choice(NAME_SUFFIXES)
+        # Suffixe numérique: noms distincts au-delà des combinaisons préfixe/suffixe
+        return f"{name} {index}" if rng.random() < 0.9 else name
+    
+    def _person(self, rng: random.Random) -> str:
+        return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    
+    def _amount(self, rng: random.Random) -> int:
+        return rng.choice([50, 100, 250, 500, 1000, 2000, 5000, 10000]) * 1000
+    
+    def _description(self, rng: random.Random, sector: str, name: str) -> str:
+        french, english = SECTOR_PHRASES[sector]
+        if rng.random() < 0.6:
+            text = f"{name} propose {french} au Maroc, fondée par {self._person(rng)}."
+            if rng.random() < 0.4:
+                text += f" La startup a levé {rng.randint(1, 20)} millions MAD en seed."
+            if rng.random() < 0.3:
+                text += f" Elle a signé un partenariat avec {rng.choice(PARTNERS)}."
+        else:
+            text = f"{name} builds {english} for Moroccan SMEs. CEO: {self._person(rng)}."
+            if rng.random() < 0.4:
+                text += f" The company closed a series a of {rng.randint(1, 10)} M USD."
+            if rng.random() < 0.3:
+                text += " Built with python, react and aws."
+        return text
+    
+    def _startup(self, rng: random.Random, index: int) -> Dict:
+        sector = rng.choice(list(SECTOR_VARIANTS))
+        name = self._name(rng, index)
+        slug = name.lower().replace(' ', '')
+        source = rng.choice(SOURCES)
+        
+        startup = {
+            'name': name,
+            'description': self._description(rng, sector, name),
+            # Secteur absent pour ~15% des lignes: classifié par le pipeline ML
+            'sector': rng.choice(SECTOR_VARIANTS[sector]) if rng.random() < 0.85 else None,
+            'stage': rng.choice(STAGES),
+            'location': rng.choice(LOCATION_VARIANTS),
+            'website': f"{slug}.ma" if rng.random() < 0.5 else f"https://www.{slug}.com/",
+            'source': source,
+            'collected_at': (self.reference_date - timedelta(minutes=index)).isoformat(),
+        }
+        
+        # Variantes de clés selon la source
+        amount = self._amount(rng)
+        if source == 'crunchbase':
+            startup['funding_raised'] = amount
+            startup['funding_currency'] = 'USD'
+            startup['employees'] = rng.choice([5, 15, 30, 75, 150])
+            startup['founded_year'] = rng.randint(2010, 2024)
+            startup['last_funding_type'] = rng.choice(['seed', 'series_a', 'pre_seed'])
+        elif rng.random() < 0.5:
+            startup['fundingRaised'] = f"{amount / 1_000_000:g}M MAD" if amount >= 1_000_000 else f"{amount // 1000}K MAD"
+            startup['foundedYear'] = rng.randint(2012, 2024)
+            startup['team_size'] = rng.randint(2, 60)
+        if rng.random() < 0.4:
+            startup['email'] = f"  Contact@{slug}.ma "
+        if rng.random() < 0.2:
+            startup['linkedin_url'] = f"https://linkedin.com/company/{slug}"
+        if rng.random() < 0.3:
+            startup['partnerships'] = rng.sample(PARTNERS, rng.randint(1, 2))
+        if rng.random() < 0.2:
+            startup['media_mentions'] = rng.randint(0, 30)
+        
+        return startup
+    
+    def _duplicate(self, rng: random.Random, original: Dict, typo_rate: float) -> Dict:
+        """Même startup vue par une autre source: nom éventuellement mal orthographié, champs partiels"""
+        name = original['name']
+        if rng.random() < typo_rate * 4:
+            name = self._typo(rng, name)
+        elif rng.random() < 0.3:
+            name = name.upper() if rng.random() < 0.5 else f"  {name.lower()} "
+        
+        duplicate = {
+            'name': name,
+            'description': original['description'] if rng.random() < 0.5 else original['description'][:60],
+            'source': rng.choice(SOURCES),
+            'collected_at': original['collected_at'],
+        }
+        for key in ('sector', 'location', 'website', 'stage', 'funding_raised', 'fundingRaised'):
+            if key in original and rng.random() < 0.6:
+                duplicate[key] = original[key]
+        return duplicate
+    
+    def _typo(self, rng: random.Random, name: str) -> str:
+        if len(name) < 4:
+            return name
+        position = rng.randrange(1, len(name) - 1)
+        kind = rng.random()
+        if kind < 0.4:
+            # Inversion de deux lettres
+            return name[:position] + name[position + 1] + name[position] + name[position + 2:]
+        if kind < 0.7:
+            # Lettre manquante
+            return name[:position] + name[position + 1:]
+        # Lettre doublée
+        return name[:position] + name[position] + name[position:]
+    
+    def _news(self, rng: random.Random, name: str, count: int) -> List[Dict]:
+        news = []
+        for index in range(count):
+            title = rng.choice(NEWS_TITLES).format(
+                name=name, amount=f"{rng.randint(1, 20)} M MAD", partner=rng.choice(PARTNERS)
+            )
+            slug = name.lower().replace(' ', '-')
+            news.append({
+                'title': title,
+                'content': f"{title}. {name} poursuit son développement au Maroc.",
+                'url': f"https://www.medias24.com/{slug}-{index}",
+                'source': rng.choice(['medias24', 'hespress', 'challenge', 'techcrunch']),
+                'published_at': self.reference_date - timedelta(days=rng.randint(0, 400)),
+            })
+        return news
@@ -5,12 +5,17 @@ Collecteur Crunchbase API
 Collecte les données depuis Crunchbase avec filtrage intelligent
 """
 
-import aiohttp
 import asyncio
 from typing import List, Dict, Optional
 import os
 from datetime import datetime
 import logging
+import sys
+
+# Ajouter le parent directory au path (exécution standalone)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.http_client import create_session
 
 logger = logging.getLogger(__name__)
 
@@ -64,6 +69,7 @@ class CrunchbaseCollector:
                     "revenue_range",
                     "funding_total",
                     "last_funding_type",
+                    "last_funding_at",
                     "contact_email",
                     "linkedin",
                     "website_url",
@@ -92,7 +98,7 @@ class CrunchbaseCollector:
                 "limit": 100
             }
             
-            async with aiohttp.ClientSession() as session:
+            async with create_session('crunchbase') as session:
                 async with session.post(
                     f'{self.base_url}/searches/organizations',
                     headers=headers,
@@ -130,6 +136,7 @@ class CrunchbaseCollector:
                 'funding_raised': props.get('funding_total', {}).get('value', 0),
                 'funding_currency': props.get('funding_total', {}).get('currency', 'USD'),
                 'last_funding_type': props.get('last_funding_type'),
+                'last_funding_at': props.get('last_funding_at'),
                 'employees': self._parse_employees(props.get('num_employees_enum')),
                 'revenue_range': props.get('revenue_range'),
                 'rank': props.get('rank_org'),
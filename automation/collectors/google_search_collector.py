@@ -5,12 +5,17 @@ Google Search Collector
 Utilise l'API Serper pour rechercher des startups marocaines
 """
 
-import aiohttp
 import asyncio
 from typing import List, Dict
 import os
 from datetime import datetime
 import logging
+import sys
+
+# Ajouter le parent directory au path (exécution standalone)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.http_client import create_session
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +26,7 @@ class GoogleSearchCollector:
     def __init__(self):
         self.api_key = os.getenv('SERPER_API_KEY', '')
         self.base_url = 'https://google.serper.dev/search'
+        self.news_url = 'https://google.serper.dev/news'
         
         # Requêtes de recherche ciblées
         self.search_queries = [
@@ -46,7 +52,7 @@ class GoogleSearchCollector:
         if not self.api_key:
             return await self._demo_mode()
         
-        async with aiohttp.ClientSession() as session:
+        async with create_session('google_search') as session:
             tasks = [
                 self._search_query(session, query)
                 for query in self.search_queries
@@ -88,11 +94,48 @@ class GoogleSearchCollector:
                 else:
                     logger.warning(f"Serper API error {response.status} for: {query}")
                     return []
-                    
+        
         except Exception as e:
             logger.error(f"Erreur search query '{query}': {e}")
             return []
     
+    async def search_news(self, session, name: str, num: int = 10) -> List[Dict]:
+        """
+        Actualités récentes (dernier mois) d'une startup: une requête Serper /news
+        
+        Utilisé par l'actualisation rapide (scheduler/recrawl.py); les erreurs
+        réseau et les réponses non-200 (quota 429, 5xx) remontent à l'appelant,
+        qui les compte en erreur: une réponse refusée n'est pas "aucune actualité".
+        """
+        headers = {
+            'X-API-KEY': self.api_key,
+            'Content-Type': 'application/json'
+        }
+        payload = {
+            'q': f'"{name}"',
+            'num': num,
+            'gl': 'ma',
+            'hl': 'fr',
+            'tbs': 'qdr:m'  # dernier mois
+        }
+        
+        async with session.post(self.news_url, headers=headers, json=payload, timeout=10) as response:
+            if response.status != 200:
+                logger.warning(f"Serper news error {response.status} for: {name}")
+                response.raise_for_status()
+            data = await response.json()
+        
+        return [
+            {
+                'title': item.get('title', ''),
+                'content': item.get('snippet', ''),
+                'url': item.get('link'),
+                'source': item.get('source') or 'google_news',
+                'published_at': None,  # dates relatives ("il y a 2 jours")
+            }
+            for item in data.get('news', [])
+        ]
+    
     def _extract_startups_from_results(self, data: Dict, query: str) -> List[Dict]:
         """Extrait les startups depuis les résultats Google"""
         startups = []
@@ -5,13 +5,21 @@ Web Scraper Intelligent
 Scrape les sites web marocains spécialisés dans les startups
 """
 
-import aiohttp
 from bs4 import BeautifulSoup
 import asyncio
 from typing import List, Dict
+from urllib.parse import urljoin
 import re
 from datetime import datetime
 import logging
+import os
+import sys
+
+# Ajouter le parent directory au path (exécution standalone)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.event_loop import offload
+from utils.http_client import create_session
 
 logger = logging.getLogger(__name__)
 
@@ -74,7 +82,7 @@ class IntelligentWebScraper:
             'https://moroccanstartups.ma/list',   # Fictif pour demo
         ]
         
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with create_session('web_scraper', headers=self.headers) as session:
             for url in directories:
                 try:
                     startup_list = await self._parse_directory_page(session, url)
@@ -92,29 +100,34 @@ class IntelligentWebScraper:
                     return []
                 
                 html = await response.text()
-                soup = BeautifulSoup(html, 'html.parser')
-                
-                startups = []
-                
-                # Pattern générique pour trouver les cartes de startups
-                # Chercher div/article avec classes communes
-                cards = soup.find_all(['div', 'article'], 
-                    class_=re.compile(r'startup|company|card|item', re.I))
-                
-                for card in cards:
-                    startup = self._extract_startup_from_card(card)
-                    if startup:
-                        startup['source'] = 'web_directory'
-                        startup['source_url'] = url
-                        startup['collected_at'] = datetime.now().isoformat()
-                        startups.append(startup)
-                
-                return startups
-                
+                # Parsing BeautifulSoup hors de la boucle pour les grandes pages (seuil 'scraper.parse')
+                return await offload('scraper.parse', len(html), self._extract_directory, html, url)
+        
         except Exception as e:
             logger.error(f"Erreur parsing {url}: {e}")
             return []
     
+    def _extract_directory(self, html: str, url: str) -> List[Dict]:
+        """Startups d'une page d'annuaire (parsing synchrone)"""
+        soup = BeautifulSoup(html, 'html.parser')
+        
+        startups = []
+        
+        # Pattern générique pour trouver les cartes de startups
+        # Chercher div/article avec classes communes
+        cards = soup.find_all(['div', 'article'], 
+            class_=re.compile(r'startup|company|card|item', re.I))
+        
+        for card in cards:
+            startup = self._extract_startup_from_card(card)
+            if startup:
+                startup['source'] = 'web_directory'
+                startup['source_url'] = url
+                startup['collected_at'] = datetime.now().isoformat()
+                startups.append(startup)
+        
+        return startups
+    
     def _extract_startup_from_card(self, card) -> Dict:
         """Extrait les infos d'une carte startup"""
         try:
@@ -155,7 +168,7 @@ class IntelligentWebScraper:
                     break
             
             return data if data.get('name') else None
-            
+        
         except Exception as e:
             logger.debug(f"Erreur extraction card: {e}")
             return None
@@ -193,7 +206,7 @@ class IntelligentWebScraper:
             'https://www.challenge.ma/tag/startups'
         ]
         
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with create_session('web_scraper', headers=self.headers) as session:
             for url in news_urls:
                 try:
                     articles = await self._parse_news_page(session, url)
@@ -202,7 +215,7 @@ class IntelligentWebScraper:
                     for article in articles:
                         mentioned_startups = self._extract_startups_from_article(article)
                         startups.extend(mentioned_startups)
-                        
+                
                 except Exception as e:
                     logger.warning(f"⚠️  Erreur news {url}: {e}")
         
@@ -216,30 +229,37 @@ class IntelligentWebScraper:
                     return []
                 
                 html = await response.text()
-                soup = BeautifulSoup(html, 'html.parser')
-                
-                articles = []
-                article_tags = soup.find_all(['article', 'div'], 
-                    class_=re.compile(r'article|post|news', re.I), limit=20)
-                
-                for tag in article_tags:
-                    title_tag = tag.find(['h2', 'h3', 'h1'])
-                    content_tag = tag.find(['p', 'div'], 
-                        class_=re.compile(r'content|excerpt|summary', re.I))
-                    
-                    if title_tag:
-                        articles.append({
-                            'title': title_tag.get_text(strip=True),
-                            'content': content_tag.get_text(strip=True) if content_tag else '',
-                            'url': url
-                        })
-                
-                return articles
-                
+                return await offload('scraper.parse', len(html), self._extract_news, html, url)
+        
         except Exception as e:
             logger.error(f"Erreur parsing news {url}: {e}")
             return []
     
+    def _extract_news(self, html: str, url: str) -> List[Dict]:
+        """Articles d'une page de news (parsing synchrone)"""
+        soup = BeautifulSoup(html, 'html.parser')
+        
+        articles = []
+        article_tags = soup.find_all(['article', 'div'], 
+            class_=re.compile(r'article|post|news', re.I), limit=20)
+        
+        for tag in article_tags:
+            title_tag = tag.find(['h2', 'h3', 'h1'])
+            content_tag = tag.find(['p', 'div'], 
+                class_=re.compile(r'content|excerpt|summary', re.I))
+            
+            link_tag = tag.find('a', href=True)
+            
+            if title_tag:
+                articles.append({
+                    'title': title_tag.get_text(strip=True),
+                    'content': content_tag.get_text(strip=True) if content_tag else '',
+                    'url': urljoin(url, link_tag['href']) if link_tag else url,
+                    'page_url': url
+                })
+        
+        return articles
+    
     def _extract_startups_from_article(self, article: Dict) -> List[Dict]:
         """Extrait les mentions de startups depuis un article"""
         startups = []
@@ -258,10 +278,16 @@ class IntelligentWebScraper:
                     startup = {
                         'name': match,
                         'source': 'news_mention',
-                        'source_url': article['url'],
+                        'source_url': article.get('page_url', article['url']),
                         'collected_at': datetime.now().isoformat(),
                         'sector': self._guess_sector_from_text(text),
-                        'news_mention': article['title']
+                        'news_mention': article['title'],
+                        'news': [{
+                            'title': article['title'],
+                            'content': article['content'],
+                            'url': article['url'],
+                            'source': 'news_mention'
+                        }]
                     }
                     startups.append(startup)
         
@@ -0,0 +1,38 @@
+# database/backends.py
+"""
+Storage Backends
+================
+Choix du backend de stockage (DB_BACKEND):
+
+- postgres (défaut): DatabaseManager, serveur PostgreSQL (asyncpg)
+- sqlite: SQLiteDatabaseManager, fichier local SQLITE_PATH (WAL), sans serveur
+
+Les deux exposent la même API (create/update/upsert_startups, iter_startups,
+get_all_startups, get_stats, actualités, rounds, logs de collecte).
+"""
+
+import os
+
+BACKENDS = ('postgres', 'sqlite')
+
+ALIASES = {
+    'postgresql': 'postgres',
+    'pg': 'postgres',
+    'sqlite3': 'sqlite',
+}
+
+
+def create_database_manager(backend: str = None):
+    """Instancie le manager du backend demandé (défaut: variable DB_BACKEND)"""
+    backend = (backend or os.getenv('DB_BACKEND') or 'postgres').lower()
+    backend = ALIASES.get(backend, backend)
+    
+    if backend == 'sqlite':
+        from database.sqlite_manager import SQLiteDatabaseManager
+        return SQLiteDatabaseManager()
+    
+    if backend == 'postgres':
+        from database.db_manager import DatabaseManager
+        return DatabaseManager()
+    
+    raise ValueError(f"DB_BACKEND inconnu: {backend} (attendu: {', '.join(BACKENDS)})")
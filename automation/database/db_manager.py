@@ -7,17 +7,65 @@ Gestion de la base de données PostgreSQL pour les startups
 
 import asyncpg
 import os
-from typing import Dict, List, Optional
-from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from datetime import date, datetime
+import hashlib
 import json
 import logging
+import sys
+import time
+
+import zlib
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Ajouter le parent directory au path (exécution standalone)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.partitions import PartitionManager
+from database.statements import PREPARED_STATEMENTS, STATEMENTS, filtered_statement
+from utils.funding_normalizer import FundingRoundNormalizer
+from utils.fx_rates import get_fx_table
+from utils.instrumentation import get_instrumentation
+from utils.startup_record import StartupRecord
 
 logger = logging.getLogger(__name__)
 
 
+def _json_dumps(value, sort_keys: bool = False) -> bytes:
+    """Encodeur JSON (orjson si disponible: datetime et numpy gérés nativement)"""
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(value, option=option, default=str)
+    return json.dumps(value, default=str, sort_keys=sort_keys).encode('utf-8')
+
+
+def _json_loads(data: bytes):
+    """Décodeur JSON"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _jsonb_encode(value) -> bytes:
+    # Format binaire JSONB: octet de version (1) suivi du texte JSON
+    return b'\x01' + _json_dumps(value)
+
+
+def _jsonb_decode(data: bytes):
+    return _json_loads(data[1:])
+
+
 class DatabaseManager:
     """Manager pour la base de données PostgreSQL"""
     
+    backend = 'postgres'
+    
     def __init__(self):
         self.pool = None
         self.db_config = {
@@ -27,16 +75,47 @@ class DatabaseManager:
             'user': os.getenv('DB_USER', 'postgres'),
             'password': os.getenv('DB_PASSWORD', 'postgres')
         }
+        
+        # Pool et cache de statements (asyncpg) configurables via .env
+        self.pool_min_size = int(os.getenv('DB_POOL_MIN_SIZE', 2))
+        self.pool_max_size = int(os.getenv('DB_POOL_MAX_SIZE', 10))
+        self.statement_cache_size = int(os.getenv('DB_STATEMENT_CACHE_SIZE', 100))
+        
+        self.trigram_enabled = False
+        
+        # Partitions mensuelles de startup_metrics et collection_logs
+        self.partitions = PartitionManager()
+        
+        # Payloads bruts: rétention des versions qui ne sont plus référencées
+        self.raw_payload_retention_days = int(os.getenv('RAW_PAYLOAD_RETENTION_DAYS', 180))
+        
+        # Cache du résumé global (get_stats)
+        self.stats_cache_ttl = float(os.getenv('STATS_CACHE_TTL', 30))
+        self._stats_cache = None
+        
+        # Allers-retours et attente du pool (METRICS_ENABLED)
+        self.instrumentation = get_instrumentation()
     
     async def connect(self):
         """Établit la connexion au pool"""
         try:
-            self.pool = await asyncpg.create_pool(**self.db_config, min_size=2, max_size=10)
+            pool = await asyncpg.create_pool(
+                **self.db_config,
+                min_size=self.pool_min_size,
+                max_size=self.pool_max_size,
+                statement_cache_size=self.statement_cache_size,
+                init=self._init_connection
+            )
+            self.pool = self.instrumentation.instrument_pool(pool)
             logger.info("✅ Connexion à PostgreSQL établie")
             
             # Créer les tables si elles n'existent pas
             await self._create_tables()
             
+            # Statements préparés avant les migrations (ou sur une base vide):
+            # les connexions sont rouvertes, et donc re-préparées, au prochain acquire
+            await self.pool.expire_connections()
+        
         except Exception as e:
             logger.error(f"❌ Erreur connexion PostgreSQL: {e}")
             raise
@@ -47,6 +126,42 @@ class DatabaseManager:
             await self.pool.close()
             logger.info("🔌 Connexion PostgreSQL fermée")
     
+    async def _init_connection(self, conn):
+        """
+        Hook init du pool, appelé à l'ouverture de chaque connexion: codecs
+        JSON/JSONB (plus de json.dumps par ligne), puis préparation des requêtes
+        fréquentes (PREPARED_STATEMENTS) dans le cache de statements de la
+        connexion. Instrumentation active: chaque aller-retour est compté
+        (query logger).
+        """
+        if self.instrumentation.enabled:
+            conn.add_query_logger(self.instrumentation.db_query_logger)
+        
+        # Codecs binaires: utilisés aussi par COPY (copy_records_to_table)
+        await conn.set_type_codec(
+            'json', encoder=_json_dumps, decoder=_json_loads,
+            schema='pg_catalog', format='binary'
+        )
+        await conn.set_type_codec(
+            'jsonb', encoder=_jsonb_encode, decoder=_jsonb_decode,
+            schema='pg_catalog', format='binary'
+        )
+        
+        if not self.statement_cache_size:
+            return
+        
+        # Même cache que fetch/execute (Connection.prepare() ne l'alimente pas):
+        # le premier appel de chaque requête n'a plus de PREPARE. Transaction
+        # explicite: le Parse d'asyncpg finit par Flush, sans Sync, et garderait
+        # les verrous des tables jusqu'à la requête suivante
+        try:
+            async with conn.transaction():
+                for sql in PREPARED_STATEMENTS:
+                    await conn._get_statement(sql, None)
+        except asyncpg.PostgresError:
+            # Schéma pas encore créé: connexion rouverte après _create_tables
+            pass
+    
     async def _create_tables(self):
         """Crée les tables nécessaires"""
         
@@ -64,6 +179,8 @@ class DatabaseManager:
             -- Informations financières
             funding_raised BIGINT DEFAULT 0,
             funding_currency VARCHAR(10) DEFAULT 'MAD',
+            funding_raised_usd BIGINT,
+            funding_fx_version VARCHAR(20),
             revenue BIGINT,
             
             -- Équipe
@@ -97,21 +214,6 @@ class DatabaseManager:
             active BOOLEAN DEFAULT TRUE
         );
         
-        -- Table des métriques sectorielles
-        CREATE TABLE IF NOT EXISTS startup_metrics (
-            id SERIAL PRIMARY KEY,
-            startup_id INTEGER REFERENCES startups(id) ON DELETE CASCADE,
-            sector VARCHAR(100),
-            
-            -- Métriques génériques
-            metrics JSONB,
-            
-            -- Timestamp
-            measured_at TIMESTAMP DEFAULT NOW(),
-            
-            UNIQUE(startup_id, measured_at)
-        );
-        
         -- Table des actualités/mentions
         CREATE TABLE IF NOT EXISTS startup_news (
             id SERIAL PRIMARY KEY,
@@ -120,6 +222,7 @@ class DatabaseManager:
             title TEXT,
             content TEXT,
             url TEXT,
+            url_hash CHAR(40),
             source VARCHAR(255),
             published_at TIMESTAMP,
             
@@ -128,6 +231,36 @@ class DatabaseManager:
             created_at TIMESTAMP DEFAULT NOW()
         );
         
+        -- Agrégats journaliers des actualités (base des fenêtres glissantes)
+        CREATE TABLE IF NOT EXISTS startup_news_daily (
+            startup_id INTEGER REFERENCES startups(id) ON DELETE CASCADE,
+            day DATE NOT NULL,
+            
+            mentions INTEGER DEFAULT 0,
+            sentiment_sum FLOAT DEFAULT 0,
+            sentiment_count INTEGER DEFAULT 0,
+            
+            PRIMARY KEY (startup_id, day)
+        );
+        
+        -- Agrégats matérialisés par startup (maintenus à l'insertion des actualités)
+        CREATE TABLE IF NOT EXISTS startup_news_stats (
+            startup_id INTEGER PRIMARY KEY REFERENCES startups(id) ON DELETE CASCADE,
+            
+            mentions_total INTEGER DEFAULT 0,
+            mentions_30d INTEGER DEFAULT 0,
+            mentions_90d INTEGER DEFAULT 0,
+            mentions_365d INTEGER DEFAULT 0,
+            
+            sentiment_sum FLOAT DEFAULT 0,
+            sentiment_count INTEGER DEFAULT 0,
+            avg_sentiment FLOAT,
+            
+            last_mention_at TIMESTAMP,
+            windows_as_of DATE,
+            updated_at TIMESTAMP DEFAULT NOW()
+        );
+        
         -- Table des rounds de financement
         CREATE TABLE IF NOT EXISTS funding_rounds (
             id SERIAL PRIMARY KEY,
@@ -145,21 +278,29 @@ class DatabaseManager:
             created_at TIMESTAMP DEFAULT NOW()
         );
         
-        -- Table des logs de collecte
-        CREATE TABLE IF NOT EXISTS collection_logs (
-            id SERIAL PRIMARY KEY,
-            
-            collector_name VARCHAR(100),
-            status VARCHAR(50),
-            startups_collected INTEGER DEFAULT 0,
-            errors INTEGER DEFAULT 0,
-            
-            started_at TIMESTAMP,
-            completed_at TIMESTAMP,
+        -- Taux de change versionnés (1 unité = rate_to_usd USD)
+        CREATE TABLE IF NOT EXISTS fx_rates (
+            version VARCHAR(20),
+            currency VARCHAR(10),
+            rate_to_usd NUMERIC(18, 8) NOT NULL,
+            loaded_at TIMESTAMP DEFAULT NOW(),
             
-            details JSONB
+            PRIMARY KEY (version, currency)
+        );
+        
+        -- Payloads bruts des collecteurs, adressés par contenu (sha256 du JSON
+        -- canonique) et compressés zlib: startups ne garde que raw_payload_hash
+        CREATE TABLE IF NOT EXISTS raw_payloads (
+            hash CHAR(64) PRIMARY KEY,
+            payload BYTEA NOT NULL,
+            raw_size INTEGER,
+            first_seen_at TIMESTAMP DEFAULT NOW(),
+            last_seen_at TIMESTAMP DEFAULT NOW()
         );
         
+        -- Déjà compressé côté Python: pas de seconde compression pglz
+        ALTER TABLE raw_payloads ALTER COLUMN payload SET STORAGE EXTERNAL;
+        
         -- Index pour performance
         CREATE INDEX IF NOT EXISTS idx_startups_sector ON startups(sector);
         CREATE INDEX IF NOT EXISTS idx_startups_location ON startups(location);
@@ -167,215 +308,1169 @@ class DatabaseManager:
         CREATE INDEX IF NOT EXISTS idx_startups_stage ON startups(stage);
         CREATE INDEX IF NOT EXISTS idx_startups_active ON startups(active);
         CREATE INDEX IF NOT EXISTS idx_startup_news_startup_id ON startup_news(startup_id);
+        CREATE INDEX IF NOT EXISTS idx_startup_news_stats_windows ON startup_news_stats(windows_as_of);
+        CREATE INDEX IF NOT EXISTS idx_funding_rounds_announced_date ON funding_rounds(announced_date DESC);
+        CREATE INDEX IF NOT EXISTS idx_funding_rounds_round_type ON funding_rounds(round_type, announced_date DESC);
+        CREATE INDEX IF NOT EXISTS idx_funding_rounds_startup_id ON funding_rounds(startup_id);
+        
+        -- Déduplication des rounds (date inconnue = une seule ligne par type)
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_funding_rounds_dedupe
+            ON funding_rounds(startup_id, round_type, (COALESCE(announced_date, 'infinity'::date)));
+        
+        -- Migrations (bases créées avec une version antérieure du schéma)
+        ALTER TABLE startup_news ADD COLUMN IF NOT EXISTS url_hash CHAR(40);
+        ALTER TABLE startups ADD COLUMN IF NOT EXISTS funding_raised_usd BIGINT;
+        ALTER TABLE startups ADD COLUMN IF NOT EXISTS funding_fx_version VARCHAR(20);
+        ALTER TABLE startups ADD COLUMN IF NOT EXISTS raw_payload_hash CHAR(64);
+        ALTER TABLE startups ADD COLUMN IF NOT EXISTS content_hash CHAR(40);
+        ALTER TABLE startups ADD COLUMN IF NOT EXISTS last_crawled_at TIMESTAMP;
+        CREATE INDEX IF NOT EXISTS idx_startups_raw_payload_hash ON startups(raw_payload_hash);
+        CREATE INDEX IF NOT EXISTS idx_startups_funding_usd ON startups(funding_raised_usd);
+        
+        -- Index partiels composites (WHERE active) pour le tri par score et les filtres
+        CREATE INDEX IF NOT EXISTS idx_startups_active_score
+            ON startups(score DESC, updated_at DESC) WHERE active;
+        CREATE INDEX IF NOT EXISTS idx_startups_active_sector_score
+            ON startups(sector, score DESC, updated_at DESC) WHERE active;
+        CREATE INDEX IF NOT EXISTS idx_startups_active_location_score
+            ON startups(location, score DESC, updated_at DESC) WHERE active;
+        CREATE INDEX IF NOT EXISTS idx_startups_active_stage_score
+            ON startups(stage, score DESC, updated_at DESC) WHERE active;
+        CREATE INDEX IF NOT EXISTS idx_startups_active_funding_usd
+            ON startups(funding_raised_usd) WHERE active;
+        CREATE INDEX IF NOT EXISTS idx_startups_active_founded_year
+            ON startups(founded_year) WHERE active;
+        CREATE INDEX IF NOT EXISTS idx_startups_active_name_prefix
+            ON startups(lower(name) text_pattern_ops) WHERE active;
+        
+        -- Recherche plein texte (nom, description FR/EN, fondateurs)
+        ALTER TABLE startups ADD COLUMN IF NOT EXISTS search_vector tsvector
+            GENERATED ALWAYS AS (
+                setweight(to_tsvector('simple', COALESCE(name, '')), 'A') ||
+                setweight(to_tsvector('french', COALESCE(description, '')), 'B') ||
+                setweight(to_tsvector('english', COALESCE(description, '')), 'B') ||
+                setweight(to_tsvector('simple', COALESCE(founders::text, '')), 'C')
+            ) STORED;
+        CREATE INDEX IF NOT EXISTS idx_startups_search_vector ON startups USING GIN (search_vector);
+        -- Une actualité par (startup, URL): un article qui cite deux startups compte pour chacune
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_startup_news_startup_url_hash ON startup_news(startup_id, url_hash);
+        DROP INDEX IF EXISTS idx_startup_news_url_hash;
+        
+        -- Rollups de statistiques (global, secteur, ville, stage) maintenus par trigger
+        CREATE TABLE IF NOT EXISTS startup_rollups (
+            dimension VARCHAR(20),
+            key VARCHAR(255),
+            
+            startups INTEGER DEFAULT 0,
+            score_sum BIGINT DEFAULT 0,
+            score_count INTEGER DEFAULT 0,
+            funding_usd_sum NUMERIC DEFAULT 0,
+            employees_sum BIGINT DEFAULT 0,
+            employees_count INTEGER DEFAULT 0,
+            
+            PRIMARY KEY (dimension, key)
+        );
+        
+        -- Triggers par instruction (tables de transition): un seul upsert par clé
+        -- et par instruction, même pour les insertions en masse
+        CREATE OR REPLACE FUNCTION startups_rollup_statement() RETURNS trigger AS $$
+        DECLARE
+            changed_sql TEXT;
+        BEGIN
+            -- Seules les tables de transition de l'événement courant existent
+            IF TG_OP = 'INSERT' THEN
+                changed_sql := 'SELECT 1 AS sign, * FROM new_rows WHERE active';
+            ELSIF TG_OP = 'DELETE' THEN
+                changed_sql := 'SELECT -1 AS sign, * FROM old_rows WHERE active';
+            ELSE
+                changed_sql := 'SELECT -1 AS sign, * FROM old_rows WHERE active
+                                UNION ALL
+                                SELECT 1 AS sign, * FROM new_rows WHERE active';
+            END IF;
+            
+            EXECUTE format($q$
+            WITH changed AS (%s),
+            deltas AS (
+                SELECT d.dimension, d.key,
+                       SUM(c.sign) AS startups,
+                       SUM(c.sign * COALESCE(c.score, 0)) AS score_sum,
+                       SUM(c.sign * (c.score IS NOT NULL)::int) AS score_count,
+                       SUM(c.sign * COALESCE(c.funding_raised_usd, 0)) AS funding_usd_sum,
+                       SUM(c.sign * COALESCE(c.employees, 0)) AS employees_sum,
+                       SUM(c.sign * (c.employees IS NOT NULL)::int) AS employees_count
+                FROM changed c
+                CROSS JOIN LATERAL (VALUES
+                    ('global', ''),
+                    ('sector', COALESCE(c.sector, '')),
+                    ('location', COALESCE(c.location, '')),
+                    ('stage', COALESCE(c.stage, ''))
+                ) AS d(dimension, key)
+                GROUP BY d.dimension, d.key
+            )
+            INSERT INTO startup_rollups AS ru (
+                dimension, key, startups, score_sum, score_count,
+                funding_usd_sum, employees_sum, employees_count
+            )
+            SELECT * FROM deltas
+            WHERE (startups, score_sum, score_count, funding_usd_sum, employees_sum, employees_count)
+                  IS DISTINCT FROM (0, 0, 0, 0, 0, 0)
+            ON CONFLICT (dimension, key) DO UPDATE SET
+                startups = ru.startups + EXCLUDED.startups,
+                score_sum = ru.score_sum + EXCLUDED.score_sum,
+                score_count = ru.score_count + EXCLUDED.score_count,
+                funding_usd_sum = ru.funding_usd_sum + EXCLUDED.funding_usd_sum,
+                employees_sum = ru.employees_sum + EXCLUDED.employees_sum,
+                employees_count = ru.employees_count + EXCLUDED.employees_count
+            $q$, changed_sql);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        
+        -- Créés une seule fois (CREATE TRIGGER n'a pas de IF NOT EXISTS)
+        DO $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_trigger
+                           WHERE tgrelid = 'startups'::regclass AND tgname = 'trg_startups_rollup_insert') THEN
+                CREATE TRIGGER trg_startups_rollup_insert
+                    AFTER INSERT ON startups
+                    REFERENCING NEW TABLE AS new_rows
+                    FOR EACH STATEMENT EXECUTE FUNCTION startups_rollup_statement();
+            END IF;
+            
+            IF NOT EXISTS (SELECT 1 FROM pg_trigger
+                           WHERE tgrelid = 'startups'::regclass AND tgname = 'trg_startups_rollup_update') THEN
+                CREATE TRIGGER trg_startups_rollup_update
+                    AFTER UPDATE ON startups
+                    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+                    FOR EACH STATEMENT EXECUTE FUNCTION startups_rollup_statement();
+            END IF;
+            
+            IF NOT EXISTS (SELECT 1 FROM pg_trigger
+                           WHERE tgrelid = 'startups'::regclass AND tgname = 'trg_startups_rollup_delete') THEN
+                CREATE TRIGGER trg_startups_rollup_delete
+                    AFTER DELETE ON startups
+                    REFERENCING OLD TABLE AS old_rows
+                    FOR EACH STATEMENT EXECUTE FUNCTION startups_rollup_statement();
+            END IF;
+        END;
+        $$;
         """
         
         async with self.pool.acquire() as conn:
             await conn.execute(create_tables_sql)
+            
+            # startup_metrics et collection_logs: tables partitionnées par mois
+            await self.partitions.setup(conn)
+            await self._sync_fx_rates(conn)
+            await self._setup_trigram_search(conn)
+            
+            # Initialiser les rollups d'une base existante
+            if not await conn.fetchval("SELECT EXISTS(SELECT 1 FROM startup_rollups)"):
+                await self._rebuild_rollups(conn)
         
         logger.info("✅ Tables créées/vérifiées")
     
+    async def _setup_trigram_search(self, conn):
+        """Active pg_trgm pour la recherche approximative par nom (si disponible)"""
+        try:
+            await conn.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            await conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_startups_name_trgm
+                ON startups USING GIN (lower(name) gin_trgm_ops)
+            """)
+            self.trigram_enabled = True
+        except asyncpg.PostgresError as e:
+            self.trigram_enabled = False
+            logger.warning(f"⚠️  pg_trgm indisponible, recherche floue désactivée: {e}")
+    
+    async def _rebuild_rollups(self, conn):
+        """Recalcule tous les rollups depuis la table startups (initialisation / réparation)"""
+        async with conn.transaction():
+            await conn.execute("LOCK TABLE startups IN SHARE MODE")
+            await conn.execute("TRUNCATE startup_rollups")
+            await conn.execute("""
+                INSERT INTO startup_rollups (
+                    dimension, key, startups, score_sum, score_count,
+                    funding_usd_sum, employees_sum, employees_count
+                )
+                SELECT
+                    CASE
+                        WHEN GROUPING(sector) = 0 THEN 'sector'
+                        WHEN GROUPING(location) = 0 THEN 'location'
+                        WHEN GROUPING(stage) = 0 THEN 'stage'
+                        ELSE 'global'
+                    END,
+                    COALESCE(
+                        CASE
+                            WHEN GROUPING(sector) = 0 THEN sector
+                            WHEN GROUPING(location) = 0 THEN location
+                            WHEN GROUPING(stage) = 0 THEN stage
+                        END, ''
+                    ),
+                    COUNT(*), COALESCE(SUM(score), 0), COUNT(score),
+                    COALESCE(SUM(funding_raised_usd), 0),
+                    COALESCE(SUM(employees), 0), COUNT(employees)
+                FROM startups
+                WHERE active = TRUE
+                GROUP BY GROUPING SETS ((sector), (location), (stage), ())
+            """)
+        self._stats_cache = None
+    
+    async def rebuild_rollups(self):
+        async with self.pool.acquire() as conn:
+            await self._rebuild_rollups(conn)
+        logger.info("✅ Rollups de statistiques reconstruits")
+    
+    async def _sync_fx_rates(self, conn):
+        """Enregistre la version courante de la table FX (idempotent)"""
+        fx = get_fx_table()
+        await conn.execute("""
+            INSERT INTO fx_rates (version, currency, rate_to_usd)
+            SELECT $1, currency, rate
+            FROM unnest($2::text[], $3::numeric[]) AS r(currency, rate)
+            ON CONFLICT (version, currency) DO NOTHING
+        """, fx.version, list(fx.rates), list(fx.rates.values()))
+    
+    async def normalize_funding_usd(self) -> int:
+        """
+        Recalcule funding_raised_usd en une seule requête pour les lignes
+        non converties ou converties avec une autre version de la table FX
+        """
+        fx = get_fx_table()
+        
+        async with self.pool.acquire() as conn:
+            result = await conn.execute("""
+                UPDATE startups s SET
+                    funding_raised_usd = ROUND(s.funding_raised * r.rate_to_usd)::bigint,
+                    funding_fx_version = r.version
+                FROM fx_rates r
+                WHERE r.version = $1
+                  AND r.currency = UPPER(COALESCE(s.funding_currency, 'MAD'))
+                  AND s.funding_fx_version IS DISTINCT FROM $1
+            """, fx.version)
+        
+        updated = int(result.split()[-1])
+        logger.info(f"💱 Funding converti en USD (FX v{fx.version}): {updated} startups")
+        return updated
+    
     async def startup_exists(self, name: str) -> bool:
         """Vérifie si une startup existe déjà"""
         async with self.pool.acquire() as conn:
-            result = await conn.fetchval(
-                "SELECT EXISTS(SELECT 1 FROM startups WHERE name = $1)",
-                name
-            )
-            return result
+            return await conn.fetchval(STATEMENTS['startup_exists'], name)
+    
+    async def get_startup_content(self, name: str) -> Optional[Dict]:
+        """Empreinte et champs d'empreinte stockés d'une startup (None si inconnue)"""
+        async with self.pool.acquire() as conn:
+            row = await conn.fetchrow(STATEMENTS['startup_content'], name)
+        return dict(row) if row else None
     
-    async def create_startup(self, data: Dict) -> int:
-        """Crée une nouvelle startup"""
+    async def create_startup(self, data: StartupRecord) -> int:
+        """Crée une nouvelle startup (StartupRecord ou dict)"""
+        data = StartupRecord.coerce(data)
         
         # Générer slug
-        slug = self._generate_slug(data['name'])
-        
-        # Préparer les données
-        sql = """
-        INSERT INTO startups (
-            name, slug, description, sector, stage, location,
-            funding_raised, funding_currency, revenue, employees, founded_year,
-            website, email, phone, linkedin_url,
-            score, predicted_score, source, source_url, collected_at,
-            founders, raw_data, verified
-        ) VALUES (
-            $1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15,
-            $16, $17, $18, $19, $20, $21, $22, $23
-        )
-        ON CONFLICT (name) DO NOTHING
-        RETURNING id
-        """
+        slug = self._generate_slug(data.name)
+        
+        # Conversion USD à l'écriture (table FX en mémoire)
+        fx = get_fx_table()
+        funding_currency = data.funding_currency or 'MAD'
+        funding_usd = fx.to_usd(data.funding_raised or 0, funding_currency)
+        
+        # Les collecteurs transmettent datetime.now().isoformat(): asyncpg attend un datetime
+        collected_at = data.collected_at or datetime.now()
+        if isinstance(collected_at, str):
+            collected_at = datetime.fromisoformat(collected_at)
         
         async with self.pool.acquire() as conn:
+            payload_hash = await self._store_raw_payload(conn, data)
             startup_id = await conn.fetchval(
-                sql,
-                data.get('name'),
+                STATEMENTS['create_startup'],
+                data.name,
                 slug,
-                data.get('description'),
-                data.get('sector'),
-                data.get('stage'),
-                data.get('location'),
-                data.get('funding_raised', 0),
-                data.get('funding_currency', 'MAD'),
-                data.get('revenue', 0),
-                data.get('employees', 0),
-                data.get('founded_year'),
-                data.get('website'),
-                data.get('email'),
-                data.get('phone'),
-                data.get('linkedin'),
-                data.get('score', 0),
-                data.get('predicted_score'),
-                data.get('source'),
-                data.get('source_url'),
-                data.get('collected_at', datetime.now()),
-                json.dumps(data.get('founders', [])),
-                json.dumps(data),
-                data.get('verified', False)
+                data.description,
+                data.sector,
+                data.stage,
+                data.location,
+                data.funding_raised or 0,
+                funding_currency,
+                data.revenue or 0,
+                data.employees or 0,
+                data.founded_year,
+                data.website,
+                data.email,
+                data.phone,
+                data.linkedin,
+                data.score or 0,
+                data.predicted_score,
+                data.source,
+                data.source_url,
+                collected_at,
+                data.founders or [],
+                payload_hash,
+                data.verified or False,
+                funding_usd,
+                fx.version if funding_usd is not None else None,
+                self.content_fingerprint(data, self.CONTENT_DEFAULTS)
             )
             
             # Insérer les métriques si présentes
-            if startup_id and data.get('metrics'):
+            if startup_id and data.metrics:
                 await self._insert_metrics(conn, startup_id, data)
             
             return startup_id
     
-    async def update_startup(self, data: Dict):
-        """Met à jour une startup existante"""
-        
-        sql = """
-        UPDATE startups SET
-            description = COALESCE($2, description),
-            sector = COALESCE($3, sector),
-            stage = COALESCE($4, stage),
-            location = COALESCE($5, location),
-            funding_raised = COALESCE($6, funding_raised),
-            revenue = COALESCE($7, revenue),
-            employees = COALESCE($8, employees),
-            website = COALESCE($9, website),
-            email = COALESCE($10, email),
-            linkedin_url = COALESCE($11, linkedin_url),
-            score = COALESCE($12, score),
-            predicted_score = COALESCE($13, predicted_score),
-            updated_at = NOW()
-        WHERE name = $1
-        RETURNING id
+    async def update_startup(self, data: StartupRecord, stored: Optional[Dict] = None) -> bool:
+        """
+        Met à jour une startup existante
+        
+        La ligne n'est réécrite (updated_at, métriques, payload brut) que si
+        l'empreinte de la ligne fusionnée (champs fournis, à défaut valeurs
+        stockées) a changé. stored: résultat de get_startup_content si déjà lu.
+        Retourne True si la startup a été modifiée.
         """
+        data = StartupRecord.coerce(data)
+        stored = stored or await self.get_startup_content(data.name)
+        if not stored:
+            return False
+        
+        # Empreinte identique: aucune écriture
+        fingerprint = self.content_fingerprint(data, stored)
+        if fingerprint == stored['content_hash']:
+            return False
+        
+        # Conversion USD si montant et devise sont fournis; sinon la devise existante
+        # est conservée et normalize_funding_usd() convertit la ligne en lot
+        fx = get_fx_table()
+        funding_currency = data.funding_currency
+        funding_usd = fx.to_usd(data.funding_raised, funding_currency) if funding_currency else None
+        
+        payload_hash, payload, raw_size = self._encode_raw_payload(data)
         
         async with self.pool.acquire() as conn:
-            startup_id = await conn.fetchval(
-                sql,
-                data.get('name'),
-                data.get('description'),
-                data.get('sector'),
-                data.get('stage'),
-                data.get('location'),
-                data.get('funding_raised'),
-                data.get('revenue'),
-                data.get('employees'),
-                data.get('website'),
-                data.get('email'),
-                data.get('linkedin'),
-                data.get('score'),
-                data.get('predicted_score')
-            )
-            
-            # Mettre à jour les métriques
-            if startup_id and data.get('metrics'):
-                await self._insert_metrics(conn, startup_id, data)
+            async with conn.transaction():
+                startup_id = await conn.fetchval(
+                    STATEMENTS['update_startup'],
+                    data.name,
+                    data.description,
+                    data.sector,
+                    data.stage,
+                    data.location,
+                    data.funding_raised,
+                    data.revenue,
+                    data.employees,
+                    data.website,
+                    data.email,
+                    data.linkedin,
+                    data.score,
+                    data.predicted_score,
+                    funding_currency,
+                    funding_usd,
+                    fx.version if funding_usd is not None else None,
+                    payload_hash,
+                    fingerprint
+                )
+                
+                # Réécrite entre-temps avec le même contenu
+                if not startup_id:
+                    return False
+                
+                await conn.execute(STATEMENTS['upsert_raw_payload'], payload_hash, payload, raw_size)
+                
+                # Mettre à jour les métriques
+                if data.metrics:
+                    await self._insert_metrics(conn, startup_id, data)
+        
+        return True
     
-    async def _insert_metrics(self, conn, startup_id: int, data: Dict):
-        """Insère les métriques sectorielles"""
+    async def upsert_startups(self, startups: List[StartupRecord]) -> Dict[str, int]:
+        """Crée ou met à jour un lot de startups (compteurs new/updated/unchanged/errors)"""
+        counts = {'new': 0, 'updated': 0, 'unchanged': 0, 'errors': 0}
         
-        sql = """
-        INSERT INTO startup_metrics (startup_id, sector, metrics)
-        VALUES ($1, $2, $3)
-        """
+        for startup in startups:
+            try:
+                startup = StartupRecord.coerce(startup)
+                stored = await self.get_startup_content(startup.name)
+                if stored:
+                    # Empreinte de contenu inchangée: aucune écriture
+                    if await self.update_startup(startup, stored):
+                        counts['updated'] += 1
+                    else:
+                        counts['unchanged'] += 1
+                else:
+                    await self.create_startup(startup)
+                    counts['new'] += 1
+            except Exception as e:
+                logger.error(f"❌ Erreur sauvegarde {startup.get('name')}: {e}")
+                counts['errors'] += 1
+        
+        return counts
+    
+    async def _insert_metrics(self, conn, startup_id: int, data: StartupRecord):
+        """Insère les métriques sectorielles"""
         
         await conn.execute(
-            sql,
+            STATEMENTS['insert_metrics'],
             startup_id,
-            data.get('sector'),
-            json.dumps(data.get('metrics'))
+            data.sector,
+            data.metrics
         )
     
-    async def get_all_startups(self, filters: Dict = None) -> List[Dict]:
-        """Récupère toutes les startups avec filtres optionnels"""
+    async def get_latest_metrics(self, startup_ids: List[int]) -> Dict[int, Dict]:
+        """Dernières métriques de chaque startup (index (startup_id, measured_at))"""
+        if not startup_ids:
+            return {}
+        
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(STATEMENTS['latest_metrics'], startup_ids)
+            return {row['startup_id']: dict(row) for row in rows}
+    
+    async def get_metrics_history(self, startup_id: int, since: datetime) -> List[Dict]:
+        """Historique des métriques depuis une date (seules les partitions concernées sont lues)"""
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(STATEMENTS['metrics_history'], startup_id, since)
+            return [dict(row) for row in rows]
+    
+    async def maintain_partitions(self) -> Dict:
+        """Crée les partitions des prochains mois et supprime celles hors rétention"""
+        async with self.pool.acquire() as conn:
+            return await self.partitions.maintain(conn)
+    
+    # Champs couverts par l'empreinte de contenu (ceux que update_startup écrit)
+    CONTENT_HASH_FIELDS = (
+        'description', 'sector', 'stage', 'location',
+        'funding_raised', 'funding_currency', 'revenue', 'employees',
+        'website', 'email', 'linkedin', 'score', 'predicted_score', 'metrics',
+    )
+    
+    # Valeurs écrites par create_startup pour les champs non renseignés
+    CONTENT_DEFAULTS = {'funding_raised': 0, 'funding_currency': 'MAD', 'revenue': 0, 'employees': 0, 'score': 0}
+    
+    @classmethod
+    def content_fingerprint(cls, data: StartupRecord, stored: Optional[Dict] = None) -> str:
+        """
+        Empreinte sha1 des champs normalisés (espaces, 12.0 -> 12, clés triées)
+        
+        stored: valeurs déjà en base; un champ absent de data garde la valeur
+        stockée (COALESCE(nouveau, ancien) de update_startup), l'empreinte est
+        donc celle de la ligne effectivement écrite
+        """
+        
+        def normalize(value):
+            if isinstance(value, str):
+                return ' '.join(value.split())
+            if isinstance(value, float) and value.is_integer():
+                return int(value)
+            if isinstance(value, dict):
+                return {str(k): normalize(v) for k, v in value.items()}
+            if isinstance(value, (list, tuple)):
+                return [normalize(v) for v in value]
+            return value
+        
+        data = StartupRecord.coerce(data)
+        stored = stored or {}
+        fields = {}
+        for field in cls.CONTENT_HASH_FIELDS:
+            value = getattr(data, field)
+            # Métriques vides non insérées: les dernières mesures restent valables
+            if value is None or (field == 'metrics' and not value):
+                value = stored.get(field)
+            fields[field] = normalize(value)
+        return hashlib.sha1(_json_dumps(fields, sort_keys=True)).hexdigest()
+    
+    # Champs exclus du payload brut: volatils (changent à chaque collecte sans que
+    # le contenu change) ou recalculés depuis la base
+    RAW_PAYLOAD_EXCLUDED_FIELDS = ('collected_at', 'news_stats')
+    
+    def _encode_raw_payload(self, data: Dict):
+        """JSON canonique (clés triées) -> (hash sha256, payload zlib, taille brute)
+        
+        data: dict ou StartupRecord (champs renseignés et extra)
+        """
+        payload = {
+            key: value for key, value in data.items()
+            if key not in self.RAW_PAYLOAD_EXCLUDED_FIELDS
+        }
+        raw = _json_dumps(payload, sort_keys=True)
+        return hashlib.sha256(raw).hexdigest(), zlib.compress(raw), len(raw)
+    
+    async def _store_raw_payload(self, conn, data: Dict) -> str:
+        """Enregistre le payload brut (dédupliqué par hash) et retourne son hash"""
+        payload_hash, payload, raw_size = self._encode_raw_payload(data)
+        await conn.execute(STATEMENTS['upsert_raw_payload'], payload_hash, payload, raw_size)
+        return payload_hash
+    
+    async def get_raw_payload(self, payload_hash: str) -> Optional[Dict]:
+        """Payload brut d'une startup (décompressé) à partir de raw_payload_hash"""
+        if not payload_hash:
+            return None
+        
+        async with self.pool.acquire() as conn:
+            payload = await conn.fetchval(STATEMENTS['raw_payload'], payload_hash)
         
-        where_clauses = ["active = TRUE"]
+        return _json_loads(zlib.decompress(payload)) if payload is not None else None
+    
+    async def migrate_raw_data(self, batch_size: int = 500) -> int:
+        """
+        Déplace l'ancienne colonne startups.raw_data vers raw_payloads
+        (par lots) puis la vide; un VACUUM FULL startups récupère l'espace
+        """
+        migrated = 0
+        
+        async with self.pool.acquire() as conn:
+            while True:
+                async with conn.transaction():
+                    rows = await conn.fetch("""
+                        SELECT id, raw_data FROM startups
+                        WHERE raw_data IS NOT NULL
+                        LIMIT $1
+                        FOR UPDATE SKIP LOCKED
+                    """, batch_size)
+                    if not rows:
+                        break
+                    
+                    payloads = {}
+                    updates = []
+                    for row in rows:
+                        raw_data = row['raw_data']
+                        if isinstance(raw_data, str):
+                            raw_data = _json_loads(raw_data)
+                        payload_hash, payload, raw_size = self._encode_raw_payload(raw_data)
+                        payloads[payload_hash] = (payload_hash, payload, raw_size)
+                        updates.append((row['id'], payload_hash))
+                    
+                    await conn.executemany(STATEMENTS['upsert_raw_payload'], list(payloads.values()))
+                    await conn.executemany("""
+                        UPDATE startups SET
+                            raw_payload_hash = COALESCE(raw_payload_hash, $2),
+                            raw_data = NULL
+                        WHERE id = $1
+                    """, updates)
+                    migrated += len(rows)
+        
+        logger.info(f"📦 raw_data migré vers raw_payloads: {migrated} startups")
+        return migrated
+    
+    async def purge_raw_payloads(self, retention_days: int = None) -> int:
+        """
+        Supprime les payloads qui ne sont plus référencés par aucune startup
+        et n'ont pas été revus depuis retention_days (RAW_PAYLOAD_RETENTION_DAYS)
+        """
+        if retention_days is None:
+            retention_days = self.raw_payload_retention_days
+        
+        async with self.pool.acquire() as conn:
+            result = await conn.execute("""
+                DELETE FROM raw_payloads p
+                WHERE p.last_seen_at < NOW() - make_interval(days => $1)
+                  AND NOT EXISTS (
+                      SELECT 1 FROM startups s WHERE s.raw_payload_hash = p.hash
+                  )
+            """, retention_days)
+        
+        purged = int(result.split()[-1])
+        logger.info(f"🗑️  Payloads bruts purgés: {purged} (rétention {retention_days}j)")
+        return purged
+    
+    # Filtres catégoriels: valeur unique ou liste (IN)
+    CATEGORICAL_FILTERS = ('sector', 'location', 'stage')
+    
+    # Filtres par intervalle, dans l'ordre de STARTUP_FILTER_PREDICATES
+    RANGE_FILTERS = (
+        'min_score', 'max_score',
+        'min_funding', 'max_funding',            # USD
+        'min_founded_year', 'max_founded_year',
+    )
+    
+    def _filter_params(self, filters: Dict = None) -> List:
+        """Valeur de chaque prédicat de STARTUP_FILTER_PREDICATES (None = filtre inactif)"""
+        filters = filters or {}
         params = []
-        param_count = 1
         
-        if filters:
-            if filters.get('sector'):
-                where_clauses.append(f"sector = ${param_count}")
-                params.append(filters['sector'])
-                param_count += 1
-            
-            if filters.get('location'):
-                where_clauses.append(f"location = ${param_count}")
-                params.append(filters['location'])
-                param_count += 1
+        for field in self.CATEGORICAL_FILTERS:
+            value = filters.get(field) or None
+            if isinstance(value, (list, tuple, set)):
+                values = list(value)
+                # Une seule valeur: égalité (l'index composite reste trié par score)
+                if len(values) == 1:
+                    params.extend([values[0], None])
+                else:
+                    params.extend([None, values])
+            else:
+                params.extend([value, None])
+        
+        for key in self.RANGE_FILTERS:
+            params.append(filters.get(key))
+        
+        prefix = None
+        if filters.get('name_prefix'):
+            prefix = filters['name_prefix'].lower()
+            prefix = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        params.append(prefix)
+        
+        return params
+    
+    def _filtered_query(self, name: str, filters: Dict = None, *extra) -> Tuple[str, List]:
+        """(texte fixe de la combinaison de filtres actifs, paramètres): voir filtered_statement"""
+        params = self._filter_params(filters)
+        active = tuple(index for index, value in enumerate(params) if value is not None)
+        return filtered_statement(name, active), [params[index] for index in active] + list(extra)
+    
+    async def get_all_startups(self, filters: Dict = None, limit: int = None,
+                               offset: int = 0) -> List[Dict]:
+        """
+        Récupère les startups actives avec filtres optionnels
+        
+        filters: sector/location/stage (valeur ou liste), min_score/max_score,
+        min_funding/max_funding (USD), min_founded_year/max_founded_year, name_prefix
+        """
+        
+        # LIMIT NULL = pas de limite
+        sql, params = self._filtered_query('list_startups', filters, limit, offset)
+        
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(sql, *params)
             
-            if filters.get('stage'):
-                where_clauses.append(f"stage = ${param_count}")
-                params.append(filters['stage'])
-                param_count += 1
+            return [dict(row) for row in rows]
+    
+    async def iter_startups(self, filters: Dict = None,
+                            batch_size: int = 1000) -> AsyncIterator[List[Dict]]:
+        """Lecture en flux des startups actives, par lots de batch_size"""
+        sql, params = self._filtered_query('iter_startups', filters)
+        async for batch in self._iter_query(sql, params, batch_size):
+            yield batch
+    
+    async def iter_metrics(self, since: datetime = None,
+                           batch_size: int = 1000) -> AsyncIterator[List[Dict]]:
+        """Lecture en flux de startup_metrics (depuis since: seules les partitions concernées)"""
+        async for batch in self._iter_query(STATEMENTS['iter_metrics'], [since], batch_size):
+            yield batch
+    
+    async def iter_funding_rounds(self, batch_size: int = 1000) -> AsyncIterator[List[Dict]]:
+        """Lecture en flux de funding_rounds"""
+        async for batch in self._iter_query(STATEMENTS['iter_funding_rounds'], [], batch_size):
+            yield batch
+    
+    async def _iter_query(self, sql: str, params: List, batch_size: int) -> AsyncIterator[List[Dict]]:
+        # Curseur serveur dans une transaction en lecture seule: instantané
+        # cohérent, mémoire bornée quelle que soit la taille de la table
+        async with self.pool.acquire() as conn:
+            async with conn.transaction(isolation='repeatable_read', readonly=True):
+                cursor = await conn.cursor(sql, *params)
+                while True:
+                    rows = await cursor.fetch(batch_size)
+                    if not rows:
+                        break
+                    yield [dict(row) for row in rows]
+    
+    async def get_facets(self, filters: Dict = None) -> Dict:
+        """
+        Compteurs par secteur, ville et stage pour les filtres courants,
+        calculés en une seule requête (GROUPING SETS)
+        """
+        
+        facets = {'sector': {}, 'location': {}, 'stage': {}, 'total': 0}
+        
+        sql, params = self._filtered_query('startup_facets', filters)
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(sql, *params)
+        
+        for row in rows:
+            if row['by_sector']:
+                facets['sector'][row['sector']] = row['count']
+            elif row['by_location']:
+                facets['location'][row['location']] = row['count']
+            elif row['by_stage']:
+                facets['stage'][row['stage']] = row['count']
+            else:
+                facets['total'] = row['count']
+        
+        return facets
+    
+    async def explain_startups_query(self, filters: Dict = None, limit: int = 50) -> Dict:
+        """Plan d'exécution (EXPLAIN JSON) de get_all_startups pour ces filtres"""
+        
+        sql, params = self._filtered_query('list_startups', filters, limit, 0)
+        
+        async with self.pool.acquire() as conn:
+            plan = await conn.fetchval("EXPLAIN (FORMAT JSON) " + sql, *params)
+        
+        return plan[0]['Plan']
+    
+    @staticmethod
+    def plan_index_names(plan: Dict) -> List[str]:
+        """Index utilisés dans un plan EXPLAIN (parcours récursif)"""
+        names = [plan['Index Name']] if plan.get('Index Name') else []
+        for child in plan.get('Plans', []):
+            names.extend(DatabaseManager.plan_index_names(child))
+        return names
+    
+    async def search_startups(self, query: str, limit: int = 20, offset: int = 0) -> List[Dict]:
+        """
+        Recherche plein texte classée sur nom, description et fondateurs
+        
+        Combine les configurations french/english/simple (tsvector + index GIN)
+        et, si pg_trgm est disponible, la similarité trigramme sur le nom
+        pour tolérer les fautes de frappe.
+        """
+        if not query or not query.strip():
+            return []
+        
+        name = 'search_startups_trigram' if self.trigram_enabled else 'search_startups'
+        
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(STATEMENTS[name], query.strip(), limit, offset)
+            return [dict(row) for row in rows]
+    
+    async def get_startup_ids(self, names: List[str]) -> Dict[str, int]:
+        """Résout les ids de plusieurs startups en une seule requête"""
+        if not names:
+            return {}
+        
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(STATEMENTS['startup_ids_by_names'], list(set(names)))
+            return {row['name']: row['id'] for row in rows}
+    
+    @staticmethod
+    def news_url_hash(url: Optional[str], startup_id: int = None, title: str = None) -> str:
+        """Hash de déduplication d'une actualité (URL, ou startup + titre sans URL)"""
+        key = (url or '').strip().rstrip('/')
+        if not key:
+            key = f"{startup_id}:{(title or '').strip().lower()}"
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+    
+    @staticmethod
+    def parse_published_at(value) -> Optional[datetime]:
+        """Date de publication: datetime, date ou chaîne ISO 8601 (None si illisible)"""
+        if isinstance(value, datetime):
+            parsed = value
+        elif isinstance(value, date):
+            parsed = datetime(value.year, value.month, value.day)
+        elif isinstance(value, str) and value.strip():
+            text = value.strip()
+            if text.endswith('Z'):
+                text = text[:-1] + '+00:00'
+            try:
+                parsed = datetime.fromisoformat(text)
+            except ValueError:
+                return None
+        else:
+            return None
+        
+        # Colonne TIMESTAMP sans fuseau: heure locale, comme NOW()
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone().replace(tzinfo=None)
+        return parsed
+    
+    async def insert_news_bulk(self, articles: List[Dict]) -> int:
+        """
+        Insère des actualités en masse via COPY dans une table temporaire,
+        puis INSERT ... ON CONFLICT (startup_id, url_hash) DO NOTHING pour dédupliquer
+        
+        Chaque article: startup_id, title, content, url, source, published_at
+        (datetime ou chaîne ISO 8601), sentiment_score (calculé une seule fois,
+        avant l'insertion)
+        """
+        if not articles:
+            return 0
+        
+        records = {}
+        for article in articles:
+            url_hash = article.get('url_hash') or self.news_url_hash(
+                article.get('url'), article['startup_id'], article.get('title')
+            )
             
-            if filters.get('min_score'):
-                where_clauses.append(f"score >= ${param_count}")
-                params.append(filters['min_score'])
-                param_count += 1
+            records.setdefault((article['startup_id'], url_hash), (
+                article['startup_id'],
+                article.get('title'),
+                article.get('content'),
+                article.get('url'),
+                url_hash,
+                article.get('source'),
+                self.parse_published_at(article.get('published_at')),
+                article.get('sentiment_score')
+            ))
+        
+        columns = ['startup_id', 'title', 'content', 'url', 'url_hash',
+                   'source', 'published_at', 'sentiment_score']
+        
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute("""
+                    CREATE TEMP TABLE tmp_startup_news (
+                        startup_id INTEGER,
+                        title TEXT,
+                        content TEXT,
+                        url TEXT,
+                        url_hash CHAR(40),
+                        source VARCHAR(255),
+                        published_at TIMESTAMP,
+                        sentiment_score FLOAT
+                    ) ON COMMIT DROP
+                """)
+                
+                await conn.copy_records_to_table(
+                    'tmp_startup_news', records=list(records.values()), columns=columns
+                )
+                
+                # Insertion + mise à jour incrémentale des agrégats dans la même requête
+                touched = await conn.fetch(f"""
+                    WITH inserted AS (
+                        INSERT INTO startup_news ({', '.join(columns)})
+                        SELECT {', '.join(columns)} FROM tmp_startup_news
+                        ON CONFLICT (startup_id, url_hash) DO NOTHING
+                        RETURNING startup_id, COALESCE(published_at, created_at) AS mentioned_at,
+                                  sentiment_score
+                    ),
+                    daily AS (
+                        INSERT INTO startup_news_daily AS d (
+                            startup_id, day, mentions, sentiment_sum, sentiment_count
+                        )
+                        SELECT startup_id, mentioned_at::date, COUNT(*),
+                               COALESCE(SUM(sentiment_score), 0), COUNT(sentiment_score)
+                        FROM inserted
+                        GROUP BY startup_id, mentioned_at::date
+                        ON CONFLICT (startup_id, day) DO UPDATE SET
+                            mentions = d.mentions + EXCLUDED.mentions,
+                            sentiment_sum = d.sentiment_sum + EXCLUDED.sentiment_sum,
+                            sentiment_count = d.sentiment_count + EXCLUDED.sentiment_count
+                    ),
+                    per_startup AS (
+                        SELECT startup_id, COUNT(*) AS mentions,
+                               COALESCE(SUM(sentiment_score), 0) AS sentiment_sum,
+                               COUNT(sentiment_score) AS sentiment_count,
+                               MAX(mentioned_at) AS last_mention_at
+                        FROM inserted
+                        GROUP BY startup_id
+                    ),
+                    stats AS (
+                        INSERT INTO startup_news_stats AS s (
+                            startup_id, mentions_total, sentiment_sum, sentiment_count,
+                            avg_sentiment, last_mention_at
+                        )
+                        SELECT startup_id, mentions, sentiment_sum, sentiment_count,
+                               sentiment_sum / NULLIF(sentiment_count, 0), last_mention_at
+                        FROM per_startup
+                        ON CONFLICT (startup_id) DO UPDATE SET
+                            mentions_total = s.mentions_total + EXCLUDED.mentions_total,
+                            sentiment_sum = s.sentiment_sum + EXCLUDED.sentiment_sum,
+                            sentiment_count = s.sentiment_count + EXCLUDED.sentiment_count,
+                            avg_sentiment = (s.sentiment_sum + EXCLUDED.sentiment_sum)
+                                / NULLIF(s.sentiment_count + EXCLUDED.sentiment_count, 0),
+                            last_mention_at = GREATEST(s.last_mention_at, EXCLUDED.last_mention_at),
+                            updated_at = NOW()
+                    )
+                    SELECT startup_id, mentions FROM per_startup
+                """)
+                
+                # Fenêtres 30/90/365j recalculées uniquement pour les startups touchées
+                await self._refresh_news_windows(conn, [row['startup_id'] for row in touched])
+        
+        inserted = sum(row['mentions'] for row in touched)
+        logger.info(f"📰 Actualités: {inserted} insérées, {len(articles) - inserted} doublons ignorés")
+        return inserted
+    
+    async def _refresh_news_windows(self, conn, startup_ids: List[int] = None):
+        """
+        Recalcule les compteurs 30/90/365 jours depuis les agrégats journaliers
+        (au plus 365 lignes par startup, jamais de scan de startup_news)
+        """
+        if startup_ids is not None and not startup_ids:
+            return
         
-        where_sql = " AND ".join(where_clauses)
+        if startup_ids is None:
+            # Fenêtres périmées (aucune actualité depuis le dernier recalcul)
+            target_sql = "SELECT startup_id FROM startup_news_stats WHERE windows_as_of IS DISTINCT FROM CURRENT_DATE"
+            params = []
+        else:
+            target_sql = "SELECT unnest($1::int[])"
+            params = [startup_ids]
         
-        sql = f"""
-        SELECT 
-            id, name, description, sector, stage, location,
-            funding_raised, funding_currency, revenue, employees, founded_year,
-            website, email, phone, linkedin_url,
-            score, predicted_score, founders,
-            created_at, updated_at
-        FROM startups
-        WHERE {where_sql}
-        ORDER BY score DESC, updated_at DESC
+        await conn.execute(f"""
+            UPDATE startup_news_stats s SET
+                mentions_30d = COALESCE(w.m30, 0),
+                mentions_90d = COALESCE(w.m90, 0),
+                mentions_365d = COALESCE(w.m365, 0),
+                windows_as_of = CURRENT_DATE
+            FROM ({target_sql}) AS t(startup_id)
+            LEFT JOIN (
+                SELECT startup_id,
+                       SUM(mentions) FILTER (WHERE day > CURRENT_DATE - 30) AS m30,
+                       SUM(mentions) FILTER (WHERE day > CURRENT_DATE - 90) AS m90,
+                       SUM(mentions) AS m365
+                FROM startup_news_daily
+                WHERE day > CURRENT_DATE - 365
+                GROUP BY startup_id
+            ) w ON w.startup_id = t.startup_id
+            WHERE s.startup_id = t.startup_id
+        """, *params)
+    
+    async def roll_news_windows(self) -> int:
         """
+        Fait glisser les fenêtres des startups sans nouvelle actualité aujourd'hui
+        et purge les agrégats journaliers de plus d'un an (les totaux restent)
+        """
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                stale = await conn.fetchval(
+                    "SELECT COUNT(*) FROM startup_news_stats WHERE windows_as_of IS DISTINCT FROM CURRENT_DATE"
+                )
+                await self._refresh_news_windows(conn)
+                await conn.execute(
+                    "DELETE FROM startup_news_daily WHERE day <= CURRENT_DATE - 365"
+                )
         
+        logger.info(f"📰 Fenêtres d'actualités recalculées pour {stale} startups")
+        return stale
+    
+    async def rebuild_news_stats(self):
+        """Reconstruit les agrégats depuis startup_news (migration / réparation)"""
         async with self.pool.acquire() as conn:
-            rows = await conn.fetch(sql, *params)
+            async with conn.transaction():
+                await conn.execute("TRUNCATE startup_news_daily, startup_news_stats")
+                await conn.execute("""
+                    INSERT INTO startup_news_daily (startup_id, day, mentions, sentiment_sum, sentiment_count)
+                    SELECT startup_id, COALESCE(published_at, created_at)::date, COUNT(*),
+                           COALESCE(SUM(sentiment_score), 0), COUNT(sentiment_score)
+                    FROM startup_news
+                    WHERE startup_id IS NOT NULL
+                    GROUP BY 1, 2
+                """)
+                await conn.execute("""
+                    INSERT INTO startup_news_stats (
+                        startup_id, mentions_total, sentiment_sum, sentiment_count,
+                        avg_sentiment, last_mention_at
+                    )
+                    SELECT startup_id, COUNT(*), COALESCE(SUM(sentiment_score), 0),
+                           COUNT(sentiment_score), AVG(sentiment_score),
+                           MAX(COALESCE(published_at, created_at))
+                    FROM startup_news
+                    WHERE startup_id IS NOT NULL
+                    GROUP BY startup_id
+                """)
+                await self._refresh_news_windows(conn)
+        
+        logger.info("✅ Agrégats d'actualités reconstruits")
+    
+    async def get_news_stats_by_names(self, names: List[str]) -> Dict[str, Dict]:
+        """Agrégats d'actualités (une ligne par startup) indexés par nom"""
+        if not names:
+            return {}
+        
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(STATEMENTS['news_stats_by_names'], list(set(names)))
+            return {row['name']: dict(row) for row in rows}
+    
+    async def get_recrawl_candidates(self, crawled_before: datetime, limit: int = 50,
+                                     staleness_hours: float = 168) -> List[Dict]:
+        """
+        Startups actives non vérifiées depuis crawled_before (last_crawled_at, sinon
+        updated_at), avec score, dynamique d'actualités et priorité de re-crawl:
+        les limit plus prioritaires, par priorité décroissante
+        """
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(STATEMENTS['recrawl_candidates'], crawled_before, limit, staleness_hours)
+            return [dict(row) for row in rows]
+    
+    async def mark_crawled(self, startup_ids: List[int]) -> int:
+        """Horodate la dernière vérification (même sans changement: updated_at reste inchangé)"""
+        if not startup_ids:
+            return 0
+        
+        async with self.pool.acquire() as conn:
+            result = await conn.execute(STATEMENTS['mark_crawled'], list(startup_ids))
+            return int(result.split()[-1])
+    
+    async def backfill_news_sentiment(self, analyzer, startup_ids: List[int] = None,
+                                      recompute: bool = False) -> int:
+        """
+        Calcule sentiment_score pour les actualités de plusieurs startups en un seul
+        appel au SentimentAnalyzer (score_batch), puis écrit les scores en lot
+        """
+        where_clauses = []
+        params = []
+        
+        if not recompute:
+            where_clauses.append("sentiment_score IS NULL")
+        if startup_ids:
+            params.append(startup_ids)
+            where_clauses.append(f"startup_id = ANY(${len(params)}::int[])")
+        
+        where_sql = f"WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
+        
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(
+                f"SELECT id, startup_id, title, content FROM startup_news {where_sql}",
+                *params
+            )
+            if not rows:
+                return 0
+            
+            texts = [f"{row['title'] or ''} {row['content'] or ''}" for row in rows]
+            scores = analyzer.score_batch(texts)
             
+            async with conn.transaction():
+                await conn.executemany(
+                    "UPDATE startup_news SET sentiment_score = $2 WHERE id = $1",
+                    [(row['id'], float(score)) for row, score in zip(rows, scores)]
+                )
+                
+                touched = list({row['startup_id'] for row in rows if row['startup_id']})
+                
+                # Resynchroniser les jours encore conservés (fenêtres glissantes), puis le total
+                await conn.execute("""
+                    UPDATE startup_news_daily d SET
+                        sentiment_sum = a.sentiment_sum,
+                        sentiment_count = a.sentiment_count
+                    FROM (
+                        SELECT startup_id, COALESCE(published_at, created_at)::date AS day,
+                               COALESCE(SUM(sentiment_score), 0) AS sentiment_sum,
+                               COUNT(sentiment_score) AS sentiment_count
+                        FROM startup_news
+                        WHERE startup_id = ANY($1::int[])
+                        GROUP BY 1, 2
+                    ) a
+                    WHERE d.startup_id = a.startup_id AND d.day = a.day
+                """, touched)
+                await conn.execute("""
+                    UPDATE startup_news_stats s SET
+                        sentiment_sum = a.sentiment_sum,
+                        sentiment_count = a.sentiment_count,
+                        avg_sentiment = a.avg_sentiment,
+                        updated_at = NOW()
+                    FROM (
+                        SELECT startup_id, COALESCE(SUM(sentiment_score), 0) AS sentiment_sum,
+                               COUNT(sentiment_score) AS sentiment_count,
+                               AVG(sentiment_score) AS avg_sentiment
+                        FROM startup_news
+                        WHERE startup_id = ANY($1::int[])
+                        GROUP BY startup_id
+                    ) a
+                    WHERE s.startup_id = a.startup_id
+                """, touched)
+        
+        logger.info(f"✅ Sentiment recalculé pour {len(rows)} actualités")
+        return len(rows)
+    
+    async def insert_funding_rounds(self, rounds: List[Dict]) -> int:
+        """
+        Insère des rounds normalisés en masse (COPY + ON CONFLICT DO NOTHING),
+        dédupliqués sur (startup_id, round_type, announced_date)
+        
+        Date manquante d'un côté: même round si (startup_id, round_type, amount,
+        currency) coïncident, et la version datée l'emporte (une ligne sans date
+        reçoit la date du round daté; un round sans date déjà connu daté est ignoré)
+        """
+        if not rounds:
+            return 0
+        
+        rounds = FundingRoundNormalizer().dedupe_rounds(rounds)
+        columns = ['startup_id', 'round_type', 'amount', 'currency',
+                   'announced_date', 'investors', 'valuation', 'source']
+        records = [
+            (
+                r['startup_id'],
+                r.get('round_type') or 'unknown',
+                r.get('amount'),
+                r.get('currency'),
+                r.get('announced_date'),
+                r.get('investors') or [],
+                r.get('valuation'),
+                r.get('source')
+            )
+            for r in rounds
+        ]
+        
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute("""
+                    CREATE TEMP TABLE tmp_funding_rounds (
+                        startup_id INTEGER,
+                        round_type VARCHAR(50),
+                        amount BIGINT,
+                        currency VARCHAR(10),
+                        announced_date DATE,
+                        investors JSONB,
+                        valuation BIGINT,
+                        source VARCHAR(255)
+                    ) ON COMMIT DROP
+                """)
+                
+                await conn.copy_records_to_table(
+                    'tmp_funding_rounds', records=records, columns=columns
+                )
+                
+                # Round daté déjà connu sans date (même montant): la ligne existante est datée
+                promoted = await conn.execute("""
+                    UPDATE funding_rounds f SET
+                        announced_date = t.announced_date,
+                        investors = CASE WHEN f.investors IS NULL OR f.investors = '[]'::jsonb
+                                         THEN t.investors ELSE f.investors END,
+                        valuation = COALESCE(f.valuation, t.valuation),
+                        source = COALESCE(f.source, t.source)
+                    FROM tmp_funding_rounds t
+                    WHERE f.startup_id = t.startup_id AND f.round_type = t.round_type
+                      AND f.announced_date IS NULL AND t.announced_date IS NOT NULL
+                      AND f.amount IS NOT DISTINCT FROM t.amount
+                      AND f.currency IS NOT DISTINCT FROM t.currency
+                      AND NOT EXISTS (
+                          SELECT 1 FROM funding_rounds d
+                          WHERE d.startup_id = t.startup_id AND d.round_type = t.round_type
+                            AND d.announced_date = t.announced_date
+                      )
+                """)
+                
+                # Les rounds datés promus ci-dessus tombent sur ON CONFLICT; un round
+                # sans date déjà connu daté n'est pas réinséré
+                result = await conn.execute(f"""
+                    INSERT INTO funding_rounds ({', '.join(columns)})
+                    SELECT {', '.join(columns)} FROM tmp_funding_rounds t
+                    WHERE t.announced_date IS NOT NULL OR NOT EXISTS (
+                        SELECT 1 FROM funding_rounds f
+                        WHERE f.startup_id = t.startup_id AND f.round_type = t.round_type
+                          AND f.announced_date IS NOT NULL
+                          AND f.amount IS NOT DISTINCT FROM t.amount
+                          AND f.currency IS NOT DISTINCT FROM t.currency
+                    )
+                    ON CONFLICT (startup_id, round_type, (COALESCE(announced_date, 'infinity'::date)))
+                    DO NOTHING
+                """)
+        
+        inserted = int(result.split()[-1])
+        promoted = int(promoted.split()[-1])
+        logger.info(f"💰 Rounds de financement: {inserted} insérés, {promoted} datés, "
+                    f"{len(rounds) - inserted - promoted} doublons ignorés")
+        return inserted
+    
+    async def get_recent_rounds(self, days: int = 90, sector: str = None,
+                                round_type: str = None, limit: int = 100) -> List[Dict]:
+        """Rounds annoncés dans les N derniers jours, filtrés par secteur (dashboard)"""
+        
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(
+                STATEMENTS['recent_rounds'], days, sector or None, round_type or None, limit
+            )
             return [dict(row) for row in rows]
     
     async def get_startup_by_name(self, name: str) -> Optional[Dict]:
         """Récupère une startup par nom"""
         
-        sql = """
-        SELECT * FROM startups WHERE name = $1
-        """
-        
         async with self.pool.acquire() as conn:
-            row = await conn.fetchrow(sql, name)
+            row = await conn.fetchrow(STATEMENTS['startup_by_name'], name)
             return dict(row) if row else None
     
     async def log_collection(self, collector_name: str, stats: Dict):
         """Log une session de collecte"""
         
-        sql = """
-        INSERT INTO collection_logs (
-            collector_name, status, startups_collected, errors,
-            started_at, completed_at, details
-        ) VALUES ($1, $2, $3, $4, $5, $6, $7)
-        """
-        
         async with self.pool.acquire() as conn:
             await conn.execute(
-                sql,
+                STATEMENTS['log_collection'],
                 collector_name,
                 stats.get('status', 'completed'),
                 stats.get('collected', 0),
                 stats.get('errors', 0),
                 stats.get('started_at'),
                 stats.get('completed_at'),
-                json.dumps(stats.get('details', {}))
+                stats.get('details', {})
             )
     
     def _generate_slug(self, name: str) -> str:
@@ -387,23 +1482,31 @@ class DatabaseManager:
         return slug.strip('-')
     
     async def get_stats(self) -> Dict:
-        """Récupère les statistiques globales"""
+        """
+        Récupère les statistiques globales
         
-        sql = """
-        SELECT 
-            COUNT(*) as total_startups,
-            COUNT(DISTINCT sector) as sectors_count,
-            COUNT(DISTINCT location) as cities_count,
-            AVG(score) as avg_score,
-            SUM(funding_raised) as total_funding,
-            AVG(employees) as avg_employees
-        FROM startups
-        WHERE active = TRUE
+        Lues depuis les rollups maintenus par trigger (coût constant quelle que
+        soit la taille de startups), puis mises en cache STATS_CACHE_TTL secondes.
         """
+        now = time.monotonic()
+        if self._stats_cache and self._stats_cache[0] > now:
+            return dict(self._stats_cache[1])
+        
+        async with self.pool.acquire() as conn:
+            row = await conn.fetchrow(STATEMENTS['stats_summary'])
+            stats = dict(row) if row else {}
+            stats['total_startups'] = stats.get('total_startups') or 0
+            stats['funding_currency'] = 'USD'
+        
+        self._stats_cache = (now + self.stats_cache_ttl, stats)
+        return dict(stats)
+    
+    async def get_rollups(self, dimension: str) -> List[Dict]:
+        """Compteurs et sommes par secteur, ville ou stage (dashboard)"""
         
         async with self.pool.acquire() as conn:
-            row = await conn.fetchrow(sql)
-            return dict(row) if row else {}
+            rows = await conn.fetch(STATEMENTS['rollups_by_dimension'], dimension)
+            return [dict(row) for row in rows]
 
 
 # Test
@@ -435,6 +1538,16 @@ if __name__ == "__main__":
         stats = await db.get_stats()
         print(f"Stats: {stats}")
         
+        # Facettes
+        facets = await db.get_facets({'sector': ['fintech', 'ai']})
+        print(f"Facettes: {facets}")
+        
+        # Les requêtes filtrées doivent être servies par les index partiels
+        for filters in ({}, {'sector': 'fintech'}, {'name_prefix': 'test'}):
+            plan = await db.explain_startups_query(filters)
+            indexes = db.plan_index_names(plan)
+            print(f"Plan {filters}: {indexes or plan['Node Type']}")
+        
         await db.disconnect()
     
     asyncio.run(test())
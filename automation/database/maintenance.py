@@ -0,0 +1,293 @@
+# database/maintenance.py
+"""
+Database Maintenance
+====================
+Maintenance périodique de PostgreSQL:
+
+- VACUUM (ANALYZE) des tables modifiées depuis le dernier passage
+  (tuples morts / lignes modifiées au-delà d'un seuil)
+- REINDEX CONCURRENTLY des index B-tree gonflés
+- rapport: bloat des tables et index, tuples morts, requêtes lentes
+  (pg_stat_statements si l'extension est installée), enregistré dans collection_logs
+
+VACUUM et REINDEX CONCURRENTLY ne peuvent pas s'exécuter dans un bloc de
+transaction: ils passent par une connexion dédiée, hors pool, en autocommit.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+from datetime import datetime
+from typing import Dict, List
+
+import asyncpg
+
+# Ajouter le parent directory au path (exécution standalone)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+logger = logging.getLogger(__name__)
+
+
+BLOCK_SIZE = 8192
+BTREE_FILLFACTOR = 0.9
+
+TABLE_STATS_SQL = """
+SELECT
+    relname AS table_name,
+    n_live_tup, n_dead_tup, n_mod_since_analyze,
+    pg_total_relation_size(relid) AS total_bytes,
+    pg_relation_size(relid) AS table_bytes,
+    last_vacuum, last_autovacuum, last_analyze, last_autoanalyze
+FROM pg_stat_user_tables
+WHERE schemaname = current_schema()
+ORDER BY n_dead_tup DESC
+"""
+
+# Estimation du bloat des index B-tree: taille attendue d'après le nombre de
+# tuples et la largeur moyenne des colonnes indexées (pg_stats), comparée à
+# la taille réelle. Les index d'expression sont estimés à 8 octets par clé.
+INDEX_STATS_SQL = """
+SELECT
+    ic.relname AS index_name,
+    t.relname AS table_name,
+    pg_relation_size(i.indexrelid) AS index_bytes,
+    GREATEST(ic.reltuples, 0) AS reltuples,
+    COALESCE(SUM(s.avg_width), 8) AS key_width,
+    COALESCE(st.idx_scan, 0) AS idx_scan
+FROM pg_index i
+JOIN pg_class ic ON ic.oid = i.indexrelid
+JOIN pg_class t ON t.oid = i.indrelid
+JOIN pg_namespace n ON n.oid = t.relnamespace
+JOIN pg_am am ON am.oid = ic.relam
+LEFT JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey) AND a.attnum > 0
+LEFT JOIN pg_stats s ON s.schemaname = n.nspname AND s.tablename = t.relname AND s.attname = a.attname
+LEFT JOIN pg_stat_user_indexes st ON st.indexrelid = i.indexrelid
+WHERE n.nspname = current_schema()
+  AND am.amname = 'btree'
+  AND ic.relkind = 'i'
+  AND i.indisvalid
+GROUP BY ic.relname, t.relname, i.indexrelid, ic.reltuples, st.idx_scan
+"""
+
+SLOW_QUERIES_SQL = """
+SELECT
+    left(regexp_replace(query, '\\s+', ' ', 'g'), 300) AS query,
+    calls,
+    round(total_exec_time::numeric, 1) AS total_ms,
+    round(mean_exec_time::numeric, 2) AS mean_ms,
+    rows
+FROM pg_stat_statements
+WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+ORDER BY mean_exec_time DESC
+LIMIT $1
+"""
+
+
+class DatabaseMaintenance:
+    """VACUUM/ANALYZE ciblés, réindexation des index gonflés et rapport de santé"""
+    
+    def __init__(self, database):
+        self.database = database
+        
+        # Seuils (même logique que l'autovacuum: base fixe + fraction de la table)
+        self.dead_tuple_ratio = float(os.getenv('VACUUM_DEAD_TUPLE_RATIO', 0.1))
+        self.analyze_ratio = float(os.getenv('ANALYZE_MODIFIED_RATIO', 0.05))
+        self.min_changed_rows = int(os.getenv('VACUUM_MIN_CHANGED_ROWS', 50))
+        
+        self.index_bloat_ratio = float(os.getenv('INDEX_BLOAT_RATIO', 0.3))
+        self.index_bloat_min_bytes = int(float(os.getenv('INDEX_BLOAT_MIN_MB', 10)) * 1024 * 1024)
+        
+        self.slow_query_limit = int(os.getenv('SLOW_QUERY_LIMIT', 10))
+    
+    async def _connect(self):
+        """Connexion dédiée hors pool (autocommit: aucune transaction ouverte)"""
+        conn = await asyncpg.connect(**self.database.db_config)
+        # Les opérations de maintenance peuvent être longues
+        await conn.execute("SET statement_timeout = 0")
+        await conn.execute(f"SET maintenance_work_mem = '{os.getenv('MAINTENANCE_WORK_MEM', '256MB')}'")
+        return conn
+    
+    async def table_report(self, conn) -> List[Dict]:
+        """Tuples vivants/morts, lignes modifiées depuis ANALYZE et tailles par table"""
+        rows = await conn.fetch(TABLE_STATS_SQL)
+        report = []
+        for row in rows:
+            table = dict(row)
+            total = table['n_live_tup'] + table['n_dead_tup']
+            table['dead_ratio'] = round(table['n_dead_tup'] / total, 4) if total else 0.0
+            table['needs_vacuum'] = (
+                table['n_dead_tup'] > self.min_changed_rows + self.dead_tuple_ratio * table['n_live_tup']
+            )
+            table['needs_analyze'] = (
+                table['n_mod_since_analyze'] > self.min_changed_rows + self.analyze_ratio * table['n_live_tup']
+            )
+            report.append(table)
+        return report
+    
+    async def index_report(self, conn) -> List[Dict]:
+        """Taille réelle vs taille attendue des index B-tree (ratio de bloat estimé)"""
+        rows = await conn.fetch(INDEX_STATS_SQL)
+        report = []
+        for row in rows:
+            index = dict(row)
+            # Tuple d'index: en-tête (8) + clé alignée sur 8 octets + pointeur de ligne (4)
+            tuple_bytes = 8 * ((8 + float(index['key_width']) + 7) // 8) + 4
+            usable_bytes = (BLOCK_SIZE - 24) * BTREE_FILLFACTOR
+            expected_bytes = max(1, -(-index['reltuples'] * tuple_bytes // usable_bytes)) * BLOCK_SIZE
+            # + page méta
+            expected_bytes += BLOCK_SIZE
+            
+            index['expected_bytes'] = int(expected_bytes)
+            index['bloat_ratio'] = round(max(0.0, 1 - expected_bytes / index['index_bytes']), 4) \
+                if index['index_bytes'] else 0.0
+            index['bloated'] = (
+                index['bloat_ratio'] >= self.index_bloat_ratio
+                and index['index_bytes'] >= self.index_bloat_min_bytes
+            )
+            report.append(index)
+        return sorted(report, key=lambda index: index['index_bytes'] * index['bloat_ratio'], reverse=True)
+    
+    async def slow_queries(self, conn) -> List[Dict]:
+        """Requêtes les plus lentes (temps moyen) si pg_stat_statements est installé"""
+        installed = await conn.fetchval(
+            "SELECT EXISTS(SELECT 1 FROM pg_extension WHERE extname = 'pg_stat_statements')"
+        )
+        if not installed:
+            return []
+        
+        try:
+            rows = await conn.fetch(SLOW_QUERIES_SQL, self.slow_query_limit)
+        except asyncpg.PostgresError as e:
+            # Extension créée mais non chargée (shared_preload_libraries)
+            logger.warning(f"⚠️  pg_stat_statements indisponible: {e}")
+            return []
+        return [dict(row) for row in rows]
+    
+    async def vacuum_analyze(self, conn, tables: List[Dict]) -> List[str]:
+        """VACUUM (ANALYZE) des tables à nettoyer, ANALYZE seul pour les autres modifiées"""
+        processed = []
+        for table in tables:
+            name = table['table_name']
+            if table['needs_vacuum']:
+                command = 'VACUUM (ANALYZE)'
+            elif table['needs_analyze']:
+                command = 'ANALYZE'
+            else:
+                continue
+            
+            started = datetime.now()
+            await conn.execute(f'{command} "{name}"')
+            duration = (datetime.now() - started).total_seconds()
+            logger.info(f"🧹 {command} {name} ({table['n_dead_tup']} tuples morts, {duration:.1f}s)")
+            processed.append(name)
+        return processed
+    
+    async def reindex_bloated(self, conn, indexes: List[Dict]) -> List[str]:
+        """REINDEX CONCURRENTLY des index gonflés (pas de verrou bloquant les écritures)"""
+        rebuilt = []
+        for index in indexes:
+            if not index['bloated']:
+                continue
+            try:
+                await conn.execute(f'REINDEX INDEX CONCURRENTLY "{index["index_name"]}"')
+                rebuilt.append(index['index_name'])
+                logger.info(
+                    f"🔧 Index {index['index_name']} reconstruit "
+                    f"(bloat estimé {index['bloat_ratio']:.0%}, {index['index_bytes'] // 1024} Ko)"
+                )
+            except asyncpg.PostgresError as e:
+                logger.error(f"❌ REINDEX {index['index_name']}: {e}")
+        
+        # Un REINDEX CONCURRENTLY interrompu laisse un index invalide *_ccnew
+        leftovers = await conn.fetch("""
+            SELECT c.relname FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE NOT i.indisvalid AND n.nspname = current_schema()
+              AND c.relname LIKE '%\\_ccnew%'
+        """)
+        for row in leftovers:
+            await conn.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{row["relname"]}"')
+        
+        return rebuilt
+    
+    async def run(self) -> Dict:
+        """Passe complète: rapport, VACUUM/ANALYZE, REINDEX, puis log dans collection_logs"""
+        started_at = datetime.now()
+        logger.info("🧹 Maintenance base de données...")
+        
+        conn = await self._connect()
+        try:
+            tables = await self.table_report(conn)
+            vacuumed = await self.vacuum_analyze(conn, tables)
+            
+            indexes = await self.index_report(conn)
+            reindexed = await self.reindex_bloated(conn, indexes)
+            
+            slow = await self.slow_queries(conn)
+            
+            # Tailles et tuples morts après nettoyage
+            tables_after = await self.table_report(conn)
+        finally:
+            await conn.close()
+        
+        report = {
+            'vacuumed': vacuumed,
+            'reindexed': reindexed,
+            'dead_tuples_before': sum(table['n_dead_tup'] for table in tables),
+            'dead_tuples_after': sum(table['n_dead_tup'] for table in tables_after),
+            'tables': [
+                {key: table[key] for key in (
+                    'table_name', 'n_live_tup', 'n_dead_tup', 'dead_ratio', 'total_bytes'
+                )}
+                for table in tables_after
+            ],
+            'indexes': [
+                {key: index[key] for key in (
+                    'index_name', 'table_name', 'index_bytes', 'expected_bytes', 'bloat_ratio', 'idx_scan'
+                )}
+                for index in indexes[:20]
+            ],
+            'unused_indexes': [index['index_name'] for index in indexes if index['idx_scan'] == 0],
+            'slow_queries': slow
+        }
+        
+        await self.database.log_collection('database_maintenance', {
+            'status': 'completed',
+            'collected': len(vacuumed) + len(reindexed),
+            'errors': 0,
+            'started_at': started_at,
+            'completed_at': datetime.now(),
+            'details': report
+        })
+        
+        logger.info(
+            f"✅ Maintenance terminée: {len(vacuumed)} tables nettoyées, "
+            f"{len(reindexed)} index reconstruits, "
+            f"tuples morts {report['dead_tuples_before']} → {report['dead_tuples_after']}"
+        )
+        return report
+
+
+# Test
+if __name__ == "__main__":
+    from database.db_manager import DatabaseManager
+    
+    logging.basicConfig(level=logging.INFO)
+    
+    async def test():
+        db = DatabaseManager()
+        await db.connect()
+        
+        maintenance = DatabaseMaintenance(db)
+        report = await maintenance.run()
+        
+        for table in report['tables'][:5]:
+            print(f"Table {table['table_name']}: {table['n_dead_tup']} morts, {table['total_bytes'] // 1024} Ko")
+        for index in report['indexes'][:5]:
+            print(f"Index {index['index_name']}: bloat {index['bloat_ratio']:.0%}")
+        
+        await db.disconnect()
+    
+    asyncio.run(test())
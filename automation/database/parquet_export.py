@@ -0,0 +1,262 @@
+# database/parquet_export.py
+"""
+Parquet Export
+==============
+Export colonnaire (Arrow/Parquet) des startups, métriques et rounds de
+financement pour l'analyse (notebooks, pandas, DuckDB...).
+
+- lecture en flux (iter_startups / iter_metrics / iter_funding_rounds):
+  un lot en mémoire à la fois, converti en RecordBatch Arrow puis écrit
+  comme row group Parquet
+- snapshots partitionnés par date: <sortie>/<table>/snapshot_dt=YYYY-MM-DD/part-00000.parquet
+- sector, location, stage, devise et type de round encodés en dictionnaire
+  (sector, location, stage: codes du registre utils.categories, sans hachage
+  des chaînes par pyarrow)
+- écriture dans un fichier temporaire puis renommage: un snapshot est complet ou absent
+
+Usage:
+    python database/parquet_export.py --output exports
+    python database/parquet_export.py --tables startups,funding_rounds --backend sqlite
+
+Chargement dans un notebook:
+    from database.parquet_export import load_snapshot
+    df = load_snapshot('startups', output_dir='exports').to_pandas()
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from datetime import date
+from typing import Dict, List
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# Ajouter le parent directory au path (exécution standalone)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.db_manager import _json_dumps
+from utils.categories import get_categories
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_EXPORT_DIR = os.getenv('EXPORT_DIR', 'exports')
+PARTITION_KEY = 'snapshot_dt'
+
+
+def _schemas() -> Dict:
+    """Schémas Arrow des tables exportées (colonnes JSON sérialisées en texte)"""
+    category = pa.dictionary(pa.int32(), pa.string())
+    timestamp = pa.timestamp('us')
+    
+    return {
+        'startups': pa.schema([
+            ('id', pa.int64()),
+            ('name', pa.string()),
+            ('description', pa.string()),
+            ('sector', category),
+            ('stage', category),
+            ('location', category),
+            ('funding_raised', pa.int64()),
+            ('funding_currency', category),
+            ('funding_raised_usd', pa.int64()),
+            ('revenue', pa.int64()),
+            ('employees', pa.int32()),
+            ('founded_year', pa.int32()),
+            ('website', pa.string()),
+            ('email', pa.string()),
+            ('phone', pa.string()),
+            ('linkedin_url', pa.string()),
+            ('score', pa.int32()),
+            ('predicted_score', pa.int32()),
+            ('founders', pa.string()),
+            ('created_at', timestamp),
+            ('updated_at', timestamp),
+        ]),
+        'startup_metrics': pa.schema([
+            ('startup_id', pa.int64()),
+            ('sector', category),
+            ('metrics', pa.string()),
+            ('measured_at', timestamp),
+        ]),
+        'funding_rounds': pa.schema([
+            ('id', pa.int64()),
+            ('startup_id', pa.int64()),
+            ('round_type', category),
+            ('amount', pa.int64()),
+            ('currency', category),
+            ('announced_date', pa.date32()),
+            ('investors', pa.string()),
+            ('valuation', pa.int64()),
+            ('source', pa.string()),
+            ('created_at', timestamp),
+        ]),
+    }
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("pyarrow requis pour l'export Parquet: pip install pyarrow")
+
+
+def to_record_batch(rows: List[Dict], schema) -> 'pa.RecordBatch':
+    """Lot de lignes (dicts) -> RecordBatch, colonne par colonne"""
+    categories = get_categories()
+    arrays = []
+    for field in schema:
+        values = [row.get(field.name) for row in rows]
+        if pa.types.is_dictionary(field.type) and field.name in categories:
+            # Indices = codes de catégorie, dictionnaire = vocabulaire du registre
+            dictionary = categories[field.name]
+            indices = pa.array(dictionary.encode_many(values), type=field.type.index_type)
+            arrays.append(pa.DictionaryArray.from_arrays(
+                indices, pa.array(dictionary.values, type=field.type.value_type)
+            ))
+            continue
+        if pa.types.is_string(field.type):
+            # JSON (dict/list) sérialisé en texte
+            values = [
+                _json_dumps(value).decode('utf-8') if isinstance(value, (dict, list)) else value
+                for value in values
+            ]
+        arrays.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+class ParquetExporter:
+    """Export en flux des tables vers des snapshots Parquet partitionnés par date"""
+    
+    TABLES = ('startups', 'startup_metrics', 'funding_rounds')
+    
+    def __init__(self, database, output_dir: str = None, batch_size: int = None):
+        _require_pyarrow()
+        self.database = database
+        self.output_dir = output_dir or DEFAULT_EXPORT_DIR
+        self.batch_size = batch_size or int(os.getenv('EXPORT_BATCH_SIZE', 10000))
+        self.compression = os.getenv('EXPORT_COMPRESSION', 'zstd')
+        self.schemas = _schemas()
+    
+    def _batches(self, table: str):
+        if table == 'startups':
+            return self.database.iter_startups(batch_size=self.batch_size)
+        if table == 'startup_metrics':
+            return self.database.iter_metrics(batch_size=self.batch_size)
+        if table == 'funding_rounds':
+            return self.database.iter_funding_rounds(batch_size=self.batch_size)
+        raise ValueError(f"Table non exportable: {table}")
+    
+    def snapshot_path(self, table: str, snapshot_dt: date) -> str:
+        return os.path.join(
+            self.output_dir, table, f"{PARTITION_KEY}={snapshot_dt.isoformat()}", 'part-00000.parquet'
+        )
+    
+    async def export_table(self, table: str, snapshot_dt: date = None) -> Dict:
+        """Exporte une table: un row group Parquet par lot lu en base"""
+        snapshot_dt = snapshot_dt or date.today()
+        schema = self.schemas[table]
+        path = self.snapshot_path(table, snapshot_dt)
+        # Fichier caché: ignoré par les lectures du dossier pendant l'écriture
+        tmp_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.tmp")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        
+        started = time.perf_counter()
+        rows = 0
+        
+        writer = pq.ParquetWriter(tmp_path, schema, compression=self.compression)
+        try:
+            async for batch in self._batches(table):
+                writer.write_batch(to_record_batch(batch, schema))
+                rows += len(batch)
+        except BaseException:
+            writer.close()
+            os.remove(tmp_path)
+            raise
+        writer.close()
+        os.replace(tmp_path, path)
+        
+        report = {
+            'rows': rows,
+            'path': path,
+            'bytes': os.path.getsize(path),
+            'seconds': round(time.perf_counter() - started, 3)
+        }
+        logger.info(f"📦 {table}: {rows} lignes -> {path} ({report['bytes'] // 1024} Ko, {report['seconds']}s)")
+        return report
+    
+    async def export(self, tables: List[str] = None, snapshot_dt: date = None) -> Dict[str, Dict]:
+        """Exporte les tables demandées (défaut: toutes) dans le snapshot du jour"""
+        snapshot_dt = snapshot_dt or date.today()
+        return {
+            table: await self.export_table(table, snapshot_dt)
+            for table in (tables or self.TABLES)
+        }
+
+
+def list_snapshots(table: str, output_dir: str = None) -> List[str]:
+    """Dates des snapshots disponibles pour une table (triées)"""
+    root = os.path.join(output_dir or DEFAULT_EXPORT_DIR, table)
+    if not os.path.isdir(root):
+        return []
+    return sorted(
+        name.split('=', 1)[1] for name in os.listdir(root)
+        if name.startswith(f"{PARTITION_KEY}=")
+    )
+
+
+def load_snapshot(table: str, snapshot_dt: str = None, output_dir: str = None,
+                  columns: List[str] = None) -> 'pa.Table':
+    """Charge un snapshot (défaut: le plus récent) en Table Arrow"""
+    _require_pyarrow()
+    
+    if snapshot_dt is None:
+        snapshots = list_snapshots(table, output_dir)
+        if not snapshots:
+            raise FileNotFoundError(f"Aucun snapshot pour {table} dans {output_dir or DEFAULT_EXPORT_DIR}")
+        snapshot_dt = snapshots[-1]
+    
+    path = os.path.join(output_dir or DEFAULT_EXPORT_DIR, table, f"{PARTITION_KEY}={snapshot_dt}")
+    return pq.read_table(path, columns=columns)
+
+
+async def main(argv: List[str] = None):
+    """Point d'entrée CLI"""
+    parser = argparse.ArgumentParser(description="Export Parquet des startups, métriques et rounds")
+    parser.add_argument('--output', default=DEFAULT_EXPORT_DIR, help="Dossier de sortie")
+    parser.add_argument('--tables', default=','.join(ParquetExporter.TABLES),
+                        help="Tables à exporter (séparées par des virgules)")
+    parser.add_argument('--batch-size', type=int, default=None, help="Lignes par lot / row group")
+    parser.add_argument('--snapshot-date', type=date.fromisoformat, default=None,
+                        help="Date du snapshot (YYYY-MM-DD, défaut: aujourd'hui)")
+    parser.add_argument('--backend', default=None, help="postgres ou sqlite (défaut: DB_BACKEND)")
+    args = parser.parse_args(argv)
+    
+    from database.backends import create_database_manager
+    
+    database = create_database_manager(args.backend)
+    await database.connect()
+    try:
+        exporter = ParquetExporter(database, args.output, args.batch_size)
+        tables = [table.strip() for table in args.tables.split(',') if table.strip()]
+        report = await exporter.export(tables, args.snapshot_date)
+    finally:
+        await database.disconnect()
+    
+    total = sum(item['rows'] for item in report.values())
+    logger.info(f"✅ Export terminé: {total} lignes, {len(report)} tables")
+    return report
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    asyncio.run(main())
@@ -0,0 +1,281 @@
+# database/partitions.py
+"""
+Partitions
+==========
+Partitionnement mensuel (RANGE) des tables en ajout seul: startup_metrics
+et collection_logs grossissent à chaque collecte (toutes les 6h).
+
+- une partition par mois (<table>_YYYY_MM), créée à l'avance
+- une partition DEFAULT qui reçoit les lignes hors plage
+- rétention: les partitions plus anciennes que N mois sont supprimées
+  (DROP TABLE, sans DELETE ni VACUUM)
+- migration des tables non partitionnées créées par une version antérieure
+
+Les requêtes filtrées sur la colonne de partition ne lisent que les mois
+concernés (partition pruning).
+"""
+
+import logging
+import os
+import re
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+PARTITIONED_TABLES = {
+    'startup_metrics': {
+        'column': 'measured_at',
+        # Lignes d'une table non partitionnée: clé de partition à utiliser. NOW() est
+        # constant dans la transaction de migration: décalé par id pour que les
+        # mesures sans date d'une même startup restent distinctes (UNIQUE)
+        'legacy_key': "COALESCE(measured_at, NOW() + id * INTERVAL '1 microsecond')",
+        'retention_env': 'METRICS_RETENTION_MONTHS',
+        'retention_default': 24,
+        'ddl': """
+            CREATE TABLE IF NOT EXISTS startup_metrics (
+                id SERIAL,
+                startup_id INTEGER REFERENCES startups(id) ON DELETE CASCADE,
+                sector VARCHAR(100),
+                
+                -- Métriques génériques
+                metrics JSONB,
+                
+                -- Timestamp (clé de partition)
+                measured_at TIMESTAMP NOT NULL DEFAULT NOW(),
+                
+                PRIMARY KEY (id, measured_at),
+                -- Sert aussi les lectures "dernières métriques d'une startup"
+                -- (parcours arrière de l'index, une sonde par partition)
+                UNIQUE (startup_id, measured_at)
+            ) PARTITION BY RANGE (measured_at)
+        """,
+    },
+    'collection_logs': {
+        'column': 'logged_at',
+        'legacy_key': 'COALESCE(started_at, completed_at, NOW())',
+        'retention_env': 'COLLECTION_LOGS_RETENTION_MONTHS',
+        'retention_default': 12,
+        'ddl': """
+            CREATE TABLE IF NOT EXISTS collection_logs (
+                id SERIAL,
+                
+                collector_name VARCHAR(100),
+                status VARCHAR(50),
+                startups_collected INTEGER DEFAULT 0,
+                errors INTEGER DEFAULT 0,
+                
+                started_at TIMESTAMP,
+                completed_at TIMESTAMP,
+                
+                details JSONB,
+                
+                -- Clé de partition
+                logged_at TIMESTAMP NOT NULL DEFAULT NOW(),
+                
+                PRIMARY KEY (id, logged_at)
+            ) PARTITION BY RANGE (logged_at)
+        """,
+    },
+}
+
+
+def month_start(value) -> date:
+    """Premier jour du mois"""
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.replace(day=1)
+
+
+def add_months(month: date, count: int) -> date:
+    """Décale un premier-du-mois de N mois"""
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class PartitionManager:
+    """Création, migration et rétention des partitions mensuelles"""
+    
+    def __init__(self, tables: Dict = None):
+        self.tables = tables or PARTITIONED_TABLES
+        self.months_ahead = int(os.getenv('PARTITION_MONTHS_AHEAD', 3))
+        self.retention_months = {
+            table: int(os.getenv(config['retention_env'], config['retention_default']))
+            for table, config in self.tables.items()
+        }
+    
+    @staticmethod
+    def partition_name(table: str, month: date) -> str:
+        return f"{table}_{month:%Y_%m}"
+    
+    async def setup(self, conn):
+        """Crée (ou migre) les tables partitionnées puis les partitions à venir"""
+        for table, config in self.tables.items():
+            relkind = await conn.fetchval(
+                "SELECT relkind::text FROM pg_class WHERE oid = to_regclass($1)", table
+            )
+            
+            if relkind == 'r':
+                await self._migrate_legacy(conn, table, config)
+            elif relkind is None:
+                await conn.execute(config['ddl'])
+            
+            await conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT"
+            )
+            await self.ensure_partitions(conn, table)
+    
+    async def _migrate_legacy(self, conn, table: str, config: Dict):
+        """
+        Table non partitionnée (ancien schéma): renommée, recréée en partitionnée,
+        données recopiées dans les partitions mensuelles puis ancienne table supprimée
+        """
+        legacy = f"{table}_legacy"
+        column = config['column']
+        
+        async with conn.transaction():
+            await conn.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+            await conn.execute(f"ALTER SEQUENCE IF EXISTS {table}_id_seq RENAME TO {legacy}_id_seq")
+            
+            # Libérer les noms des index (clé primaire, unicité) pour la nouvelle table
+            constraints = await conn.fetch("""
+                SELECT conname FROM pg_constraint
+                WHERE conrelid = $1::regclass AND contype IN ('p', 'u')
+            """, legacy)
+            for row in constraints:
+                await conn.execute(f'ALTER TABLE {legacy} DROP CONSTRAINT "{row["conname"]}"')
+            
+            await conn.execute(config['ddl'])
+            
+            bounds = await conn.fetchrow(
+                f"SELECT MIN({config['legacy_key']}) AS first, MAX({config['legacy_key']}) AS last FROM {legacy}"
+            )
+            if bounds['first'] is not None:
+                await self.ensure_partitions(conn, table, bounds['first'], bounds['last'])
+            
+            await conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT"
+            )
+            
+            legacy_columns = await conn.fetch("""
+                SELECT column_name FROM information_schema.columns
+                WHERE table_name = $1 AND table_schema = current_schema()
+                ORDER BY ordinal_position
+            """, legacy)
+            columns = [row['column_name'] for row in legacy_columns if row['column_name'] != column]
+            
+            copied = await conn.execute(f"""
+                INSERT INTO {table} ({', '.join(columns)}, {column})
+                SELECT {', '.join(columns)}, {config['legacy_key']} FROM {legacy}
+            """)
+            await conn.execute(
+                f"SELECT setval('{table}_id_seq', GREATEST((SELECT MAX(id) FROM {table}), 1))"
+            )
+            await conn.execute(f"DROP TABLE {legacy}")
+        
+        logger.info(f"🗂️  {table} migrée en table partitionnée ({copied.split()[-1]} lignes)")
+    
+    async def list_partitions(self, conn, table: str) -> Dict[date, str]:
+        """Partitions mensuelles existantes {premier jour du mois: nom}"""
+        rows = await conn.fetch("""
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = $1::regclass
+        """, table)
+        
+        pattern = re.compile(rf'^{table}_(\d{{4}})_(\d{{2}})$')
+        partitions = {}
+        for row in rows:
+            match = pattern.match(row['relname'])
+            if match:
+                partitions[date(int(match.group(1)), int(match.group(2)), 1)] = row['relname']
+        return partitions
+    
+    async def ensure_partitions(self, conn, table: str, start=None, end=None) -> List[str]:
+        """
+        Crée les partitions manquantes du mois de start (défaut: mois courant)
+        jusqu'à end + PARTITION_MONTHS_AHEAD mois
+        """
+        today = date.today()
+        if isinstance(end, datetime):
+            end = end.date()
+        first = month_start(start or today)
+        last = add_months(month_start(max(end or today, today)), self.months_ahead)
+        
+        existing = await self.list_partitions(conn, table)
+        created = []
+        
+        month = first
+        while month <= last:
+            if month not in existing:
+                await self._create_partition(conn, table, month)
+                created.append(self.partition_name(table, month))
+            month = add_months(month, 1)
+        
+        if created:
+            logger.info(f"🗂️  Partitions créées pour {table}: {', '.join(created)}")
+        return created
+    
+    async def _create_partition(self, conn, table: str, month: date):
+        """Crée la partition d'un mois; les lignes tombées dans DEFAULT y sont déplacées"""
+        name = self.partition_name(table, month)
+        column = self.tables[table]['column']
+        start, end = month, add_months(month, 1)
+        bounds = f"FROM ('{start}') TO ('{end}')"
+        
+        default = f"{table}_default"
+        has_default_rows = False
+        if await conn.fetchval("SELECT to_regclass($1) IS NOT NULL", default):
+            has_default_rows = await conn.fetchval(f"""
+                SELECT EXISTS(SELECT 1 FROM {default} WHERE {column} >= $1 AND {column} < $2)
+            """, start, end)
+        
+        if not has_default_rows:
+            await conn.execute(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES {bounds}")
+            return
+        
+        # ATTACH refuse une plage déjà présente dans DEFAULT: déplacer d'abord les lignes
+        async with conn.transaction():
+            await conn.execute(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS)")
+            await conn.execute(f"""
+                WITH moved AS (
+                    DELETE FROM {default}
+                    WHERE {column} >= $1 AND {column} < $2
+                    RETURNING *
+                )
+                INSERT INTO {name} SELECT * FROM moved
+            """, start, end)
+            await conn.execute(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES {bounds}")
+    
+    async def drop_expired(self, conn, table: str, retention_months: Optional[int] = None) -> List[str]:
+        """Supprime les partitions entièrement antérieures à la fenêtre de rétention"""
+        if retention_months is None:
+            retention_months = self.retention_months[table]
+        
+        cutoff = add_months(month_start(date.today()), -retention_months)
+        column = self.tables[table]['column']
+        
+        dropped = []
+        for month, name in sorted((await self.list_partitions(conn, table)).items()):
+            if add_months(month, 1) <= cutoff:
+                await conn.execute(f"DROP TABLE {name}")
+                dropped.append(name)
+        
+        # Lignes anciennes tombées dans DEFAULT
+        await conn.execute(f"DELETE FROM {table}_default WHERE {column} < $1", cutoff)
+        
+        if dropped:
+            logger.info(f"🗑️  Partitions expirées supprimées pour {table}: {', '.join(dropped)}")
+        return dropped
+    
+    async def maintain(self, conn) -> Dict[str, Dict[str, List[str]]]:
+        """Maintenance périodique: partitions à venir + rétention, pour chaque table"""
+        report = {}
+        for table in self.tables:
+            report[table] = {
+                'created': await self.ensure_partitions(conn, table),
+                'dropped': await self.drop_expired(conn, table)
+            }
+        return report
@@ -0,0 +1,1115 @@
+# database/sqlite_manager.py
+"""
+SQLite Database Manager
+=======================
+Backend embarqué (un seul fichier, sans serveur) avec la même API que
+DatabaseManager: exécution du pipeline complet en local, benchmarks et
+scans analytiques sans service PostgreSQL (DB_BACKEND=sqlite).
+
+- journal WAL: les lectures (iter_startups, exports) ne bloquent pas les écritures
+- une connexion d'écriture servie par un thread dédié: les appels sqlite3
+  (bloquants) ne bloquent pas la boucle asyncio et restent sérialisés
+- upsert_startups: tout un lot dans une seule transaction (un seul fsync)
+- statistiques, facettes et fenêtres d'actualités calculées à la lecture
+  (pas de triggers ni de tables d'agrégats)
+"""
+
+import asyncio
+import logging
+import math
+import os
+import sqlite3
+import sys
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import AsyncIterator, Dict, List, Optional
+
+# Ajouter le parent directory au path (exécution standalone)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.db_manager import DatabaseManager, _json_dumps, _json_loads
+from database.partitions import PartitionManager, add_months, month_start
+from utils.funding_normalizer import FundingRoundNormalizer
+from utils.fx_rates import get_fx_table
+from utils.instrumentation import get_instrumentation
+from utils.startup_record import StartupRecord
+
+logger = logging.getLogger(__name__)
+
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SQLITE_PATH = os.path.join(BASE_DIR, 'data', 'vc_deal_screener.db')
+
+# Conversions Python <-> SQLite (types déclarés des colonnes, ou "col [TYPE]")
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(' '))
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+sqlite3.register_converter('TIMESTAMP', lambda raw: datetime.fromisoformat(raw.decode()))
+sqlite3.register_converter('DATE', lambda raw: date.fromisoformat(raw.decode()))
+sqlite3.register_converter('BOOLEAN', lambda raw: raw not in (b'0', b''))
+sqlite3.register_converter('JSON', _json_loads)
+
+
+def _json_param(value) -> Optional[str]:
+    return _json_dumps(value).decode('utf-8') if value is not None else None
+
+
+# Colonnes ajoutées depuis la première version du schéma (ALTER TABLE ... ADD COLUMN)
+ADDED_COLUMNS = {
+    'startups': {'last_crawled_at': 'TIMESTAMP'},
+}
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS startups (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    slug TEXT UNIQUE,
+    description TEXT,
+    sector TEXT,
+    stage TEXT,
+    location TEXT,
+    
+    funding_raised INTEGER DEFAULT 0,
+    funding_currency TEXT DEFAULT 'MAD',
+    funding_raised_usd INTEGER,
+    funding_fx_version TEXT,
+    revenue INTEGER,
+    
+    employees INTEGER,
+    founded_year INTEGER,
+    founders JSON,
+    
+    website TEXT,
+    email TEXT,
+    phone TEXT,
+    linkedin_url TEXT,
+    
+    score INTEGER DEFAULT 0,
+    predicted_score INTEGER,
+    
+    source TEXT,
+    source_url TEXT,
+    collected_at TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    created_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    
+    raw_payload_hash TEXT,
+    content_hash TEXT,
+    last_crawled_at TIMESTAMP,
+    
+    verified BOOLEAN DEFAULT 0,
+    featured BOOLEAN DEFAULT 0,
+    active BOOLEAN DEFAULT 1
+);
+
+CREATE TABLE IF NOT EXISTS startup_metrics (
+    id INTEGER PRIMARY KEY,
+    startup_id INTEGER REFERENCES startups(id) ON DELETE CASCADE,
+    sector TEXT,
+    metrics JSON,
+    measured_at TIMESTAMP NOT NULL DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TABLE IF NOT EXISTS startup_news (
+    id INTEGER PRIMARY KEY,
+    startup_id INTEGER REFERENCES startups(id) ON DELETE CASCADE,
+    title TEXT,
+    content TEXT,
+    url TEXT,
+    url_hash TEXT,
+    source TEXT,
+    published_at TIMESTAMP,
+    sentiment_score REAL,
+    created_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TABLE IF NOT EXISTS funding_rounds (
+    id INTEGER PRIMARY KEY,
+    startup_id INTEGER REFERENCES startups(id) ON DELETE CASCADE,
+    round_type TEXT,
+    amount INTEGER,
+    currency TEXT,
+    announced_date DATE,
+    investors JSON,
+    valuation INTEGER,
+    source TEXT,
+    created_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TABLE IF NOT EXISTS raw_payloads (
+    hash TEXT PRIMARY KEY,
+    payload BLOB NOT NULL,
+    raw_size INTEGER,
+    first_seen_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    last_seen_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS collection_logs (
+    id INTEGER PRIMARY KEY,
+    collector_name TEXT,
+    status TEXT,
+    startups_collected INTEGER DEFAULT 0,
+    errors INTEGER DEFAULT 0,
+    started_at TIMESTAMP,
+    completed_at TIMESTAMP,
+    details JSON,
+    logged_at TIMESTAMP NOT NULL DEFAULT (datetime('now', 'localtime'))
+);
+
+-- Index partiels (WHERE active) pour le tri par score et les filtres
+CREATE INDEX IF NOT EXISTS idx_startups_active_score ON startups(score DESC, updated_at DESC) WHERE active;
+CREATE INDEX IF NOT EXISTS idx_startups_active_sector_score ON startups(sector, score DESC) WHERE active;
+CREATE INDEX IF NOT EXISTS idx_startups_active_location_score ON startups(location, score DESC) WHERE active;
+CREATE INDEX IF NOT EXISTS idx_startups_active_stage_score ON startups(stage, score DESC) WHERE active;
+CREATE INDEX IF NOT EXISTS idx_startups_raw_payload_hash ON startups(raw_payload_hash);
+CREATE INDEX IF NOT EXISTS idx_startup_metrics_startup ON startup_metrics(startup_id, measured_at);
+CREATE INDEX IF NOT EXISTS idx_startup_metrics_measured_at ON startup_metrics(measured_at);
+CREATE INDEX IF NOT EXISTS idx_startup_news_startup_id ON startup_news(startup_id);
+CREATE INDEX IF NOT EXISTS idx_startup_news_startup_mentioned
+    ON startup_news(startup_id, COALESCE(published_at, created_at));
+CREATE UNIQUE INDEX IF NOT EXISTS idx_startup_news_startup_url_hash ON startup_news(startup_id, url_hash);
+CREATE INDEX IF NOT EXISTS idx_funding_rounds_announced_date ON funding_rounds(announced_date DESC);
+CREATE INDEX IF NOT EXISTS idx_collection_logs_logged_at ON collection_logs(logged_at);
+
+-- Déduplication des rounds (date inconnue = une seule ligne par type)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_funding_rounds_dedupe
+    ON funding_rounds(startup_id, round_type, COALESCE(announced_date, '9999-12-31'));
+"""
+
+STARTUP_LIST_COLUMNS = """
+    id, name, description, sector, stage, location,
+    funding_raised, funding_currency, funding_raised_usd, revenue, employees, founded_year,
+    website, email, phone, linkedin_url,
+    score, predicted_score, founders,
+    created_at, updated_at
+"""
+
+CREATE_STARTUP_SQL = """
+    INSERT INTO startups (
+        name, slug, description, sector, stage, location,
+        funding_raised, funding_currency, revenue, employees, founded_year,
+        website, email, phone, linkedin_url,
+        score, predicted_score, source, source_url, collected_at,
+        founders, raw_payload_hash, verified, funding_raised_usd, funding_fx_version,
+        content_hash, created_at, updated_at
+    ) VALUES (
+        :name, :slug, :description, :sector, :stage, :location,
+        :funding_raised, :funding_currency, :revenue, :employees, :founded_year,
+        :website, :email, :phone, :linkedin,
+        :score, :predicted_score, :source, :source_url, :collected_at,
+        :founders, :raw_payload_hash, :verified, :funding_usd, :fx_version,
+        :content_hash, :now, :now
+    )
+    ON CONFLICT (name) DO NOTHING
+    RETURNING id
+"""
+
+UPDATE_STARTUP_SQL = """
+    UPDATE startups SET
+        description = COALESCE(:description, description),
+        sector = COALESCE(:sector, sector),
+        stage = COALESCE(:stage, stage),
+        location = COALESCE(:location, location),
+        funding_raised = COALESCE(:funding_raised, funding_raised),
+        revenue = COALESCE(:revenue, revenue),
+        employees = COALESCE(:employees, employees),
+        website = COALESCE(:website, website),
+        email = COALESCE(:email, email),
+        linkedin_url = COALESCE(:linkedin, linkedin_url),
+        score = COALESCE(:score, score),
+        predicted_score = COALESCE(:predicted_score, predicted_score),
+        funding_currency = COALESCE(:funding_currency, funding_currency),
+        funding_raised_usd = CASE WHEN :funding_raised IS NULL THEN funding_raised_usd ELSE :funding_usd END,
+        funding_fx_version = CASE WHEN :funding_raised IS NULL THEN funding_fx_version ELSE :fx_version END,
+        raw_payload_hash = COALESCE(:raw_payload_hash, raw_payload_hash),
+        content_hash = :content_hash,
+        updated_at = :now
+    WHERE name = :name AND content_hash IS NOT :content_hash
+    RETURNING id
+"""
+
+# Champs de l'empreinte de contenu tels que stockés (dernières métriques comprises)
+STARTUP_CONTENT_SQL = """
+    SELECT s.content_hash, s.description, s.sector, s.stage, s.location,
+           s.funding_raised, s.funding_currency, s.revenue, s.employees,
+           s.website, s.email, s.linkedin_url AS linkedin, s.score, s.predicted_score,
+           (SELECT metrics FROM startup_metrics
+            WHERE startup_id = s.id
+            ORDER BY measured_at DESC
+            LIMIT 1) AS "metrics [JSON]"
+    FROM startups s
+    WHERE s.name = ?
+"""
+
+UPSERT_RAW_PAYLOAD_SQL = """
+    INSERT INTO raw_payloads (hash, payload, raw_size, first_seen_at, last_seen_at)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (hash) DO UPDATE SET last_seen_at = excluded.last_seen_at
+    WHERE raw_payloads.last_seen_at < date('now', 'localtime')
+"""
+
+# Filtres par intervalle (mêmes clés que DatabaseManager.RANGE_FILTERS)
+RANGE_FILTER_SQL = {
+    'min_score': 'score >= ?',
+    'max_score': 'score <= ?',
+    'min_funding': 'funding_raised_usd >= ?',
+    'max_funding': 'funding_raised_usd <= ?',
+    'min_founded_year': 'founded_year >= ?',
+    'max_founded_year': 'founded_year <= ?',
+}
+
+
+class SQLiteDatabaseManager:
+    """Manager pour une base SQLite locale (WAL), même API que DatabaseManager"""
+    
+    backend = 'sqlite'
+    
+    # Partagés avec le backend PostgreSQL (mêmes empreintes et payloads)
+    CATEGORICAL_FILTERS = DatabaseManager.CATEGORICAL_FILTERS
+    RANGE_FILTERS = DatabaseManager.RANGE_FILTERS
+    CONTENT_HASH_FIELDS = DatabaseManager.CONTENT_HASH_FIELDS
+    RAW_PAYLOAD_EXCLUDED_FIELDS = DatabaseManager.RAW_PAYLOAD_EXCLUDED_FIELDS
+    
+    CONTENT_DEFAULTS = DatabaseManager.CONTENT_DEFAULTS
+    
+    content_fingerprint = DatabaseManager.content_fingerprint
+    news_url_hash = staticmethod(DatabaseManager.news_url_hash)
+    parse_published_at = staticmethod(DatabaseManager.parse_published_at)
+    _encode_raw_payload = DatabaseManager._encode_raw_payload
+    _generate_slug = DatabaseManager._generate_slug
+    
+    def __init__(self, path: str = None):
+        self.path = path or os.getenv('SQLITE_PATH') or DEFAULT_SQLITE_PATH
+        # Chemin relatif: par rapport au dossier automation (comme DEFAULT_SQLITE_PATH)
+        if self.path != ':memory:' and not os.path.isabs(self.path):
+            self.path = os.path.join(BASE_DIR, self.path)
+        self.conn = None
+        self._executor = None
+        
+        self.trigram_enabled = False
+        
+        # Rétention (mêmes variables que les partitions PostgreSQL)
+        self.partitions = PartitionManager()
+        self.raw_payload_retention_days = int(os.getenv('RAW_PAYLOAD_RETENTION_DAYS', 180))
+        
+        self.stats_cache_ttl = float(os.getenv('STATS_CACHE_TTL', 30))
+        self._stats_cache = None
+        
+        self.instrumentation = get_instrumentation()
+    
+    async def _run(self, fn, *args):
+        """Exécute un appel sqlite3 (bloquant) dans le thread de la connexion"""
+        loop = asyncio.get_running_loop()
+        if not self.instrumentation.enabled:
+            return await loop.run_in_executor(self._executor, fn, *args)
+        
+        # Attente dans la file du thread (équivalent de l'attente du pool) et durée de l'appel
+        submitted = time.perf_counter()
+        
+        def timed():
+            started = time.perf_counter()
+            self.instrumentation.observe_pool_wait(started - submitted)
+            try:
+                return fn(*args)
+            finally:
+                self.instrumentation.observe_db_query(time.perf_counter() - started)
+        
+        return await loop.run_in_executor(self._executor, timed)
+    
+    def _open(self, readonly: bool = False) -> sqlite3.Connection:
+        if readonly:
+            conn = sqlite3.connect(
+                f"file:{self.path}?mode=ro", uri=True, check_same_thread=False,
+                detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES
+            )
+        else:
+            # isolation_level=None: transactions explicites (_transaction)
+            conn = sqlite3.connect(
+                self.path, isolation_level=None, check_same_thread=False,
+                detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES
+            )
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+        conn.row_factory = sqlite3.Row
+        # ln() n'est disponible qu'avec SQLITE_ENABLE_MATH_FUNCTIONS (priorité de re-crawl)
+        conn.create_function('log1p', 1, math.log1p, deterministic=True)
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute(f"PRAGMA busy_timeout = {int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))}")
+        return conn
+    
+    async def connect(self):
+        """Ouvre la base (créée si absente) et le schéma"""
+        try:
+            if self.path != ':memory:':
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sqlite')
+            self.conn = await self._run(self._open)
+            await self._run(self.conn.executescript, SCHEMA_SQL)
+            await self._run(self._add_missing_columns)
+            await self._run(self._migrate_news_dedupe)
+            logger.info(f"✅ Base SQLite ouverte: {self.path}")
+        
+        except Exception as e:
+            logger.error(f"❌ Erreur ouverture SQLite: {e}")
+            raise
+    
+    def _add_missing_columns(self):
+        """Migrations: colonnes ajoutées au schéma après la création du fichier"""
+        for table, columns in ADDED_COLUMNS.items():
+            existing = {row['name'] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+            for column, declaration in columns.items():
+                if column not in existing:
+                    self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+    
+    def _migrate_news_dedupe(self):
+        """
+        Migration: url_hash n'est plus unique seul mais par (startup_id, url_hash);
+        SQLite ne supprime pas une contrainte UNIQUE de colonne: table reconstruite
+        """
+        row = self.conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'startup_news'"
+        ).fetchone()
+        if row is None or 'url_hash TEXT UNIQUE' not in row['sql']:
+            return
+        
+        columns = [info['name'] for info in self.conn.execute("PRAGMA table_info(startup_news)")]
+        definition = row['sql'].replace('url_hash TEXT UNIQUE', 'url_hash TEXT')
+        with self._transaction():
+            self.conn.execute("ALTER TABLE startup_news RENAME TO startup_news_legacy")
+            self.conn.execute(definition)
+            self.conn.execute(
+                f"INSERT INTO startup_news ({', '.join(columns)}) "
+                f"SELECT {', '.join(columns)} FROM startup_news_legacy"
+            )
+            self.conn.execute("DROP TABLE startup_news_legacy")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_startup_news_startup_id ON startup_news(startup_id)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_startup_news_startup_mentioned "
+                              "ON startup_news(startup_id, COALESCE(published_at, created_at))")
+            self.conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_startup_news_startup_url_hash "
+                              "ON startup_news(startup_id, url_hash)")
+        logger.info("🔧 startup_news: déduplication par (startup_id, url_hash)")
+    
+    async def disconnect(self):
+        """Ferme la connexion"""
+        if self.conn:
+            await self._run(self.conn.close)
+            self.conn = None
+            self._executor.shutdown(wait=True)
+            logger.info("🔌 Base SQLite fermée")
+    
+    @contextmanager
+    def _transaction(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.conn
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+    
+    def _fetch(self, sql: str, params=()) -> List[Dict]:
+        return [dict(row) for row in self.conn.execute(sql, params).fetchall()]
+    
+    # --- Écritures ---
+    
+    async def startup_exists(self, name: str) -> bool:
+        """Vérifie si une startup existe déjà"""
+        rows = await self._run(self._fetch, "SELECT 1 FROM startups WHERE name = ?", (name,))
+        return bool(rows)
+    
+    def _store_raw_payload(self, data: Dict) -> str:
+        payload_hash, payload, raw_size = self._encode_raw_payload(data)
+        now = datetime.now()
+        self.conn.execute(UPSERT_RAW_PAYLOAD_SQL, (payload_hash, payload, raw_size, now, now))
+        return payload_hash
+    
+    def _insert_metrics(self, startup_id: int, data: StartupRecord):
+        self.conn.execute(
+            "INSERT INTO startup_metrics (startup_id, sector, metrics, measured_at) VALUES (?, ?, ?, ?)",
+            (startup_id, data.sector, _json_param(data.metrics), datetime.now())
+        )
+    
+    def _create_startup(self, data: StartupRecord) -> Optional[int]:
+        data = StartupRecord.coerce(data)
+        fx = get_fx_table()
+        funding_currency = data.funding_currency or 'MAD'
+        funding_usd = fx.to_usd(data.funding_raised or 0, funding_currency)
+        
+        row = self.conn.execute(CREATE_STARTUP_SQL, {
+            'name': data.name,
+            'slug': self._generate_slug(data.name),
+            'description': data.description,
+            'sector': data.sector,
+            'stage': data.stage,
+            'location': data.location,
+            'funding_raised': data.funding_raised or 0,
+            'funding_currency': funding_currency,
+            'revenue': data.revenue or 0,
+            'employees': data.employees or 0,
+            'founded_year': data.founded_year,
+            'website': data.website,
+            'email': data.email,
+            'phone': data.phone,
+            'linkedin': data.linkedin,
+            'score': data.score or 0,
+            'predicted_score': data.predicted_score,
+            'source': data.source,
+            'source_url': data.source_url,
+            'collected_at': data.collected_at or datetime.now(),
+            'founders': _json_param(data.founders or []),
+            'raw_payload_hash': self._store_raw_payload(data),
+            'verified': data.verified or False,
+            'funding_usd': funding_usd,
+            'fx_version': fx.version if funding_usd is not None else None,
+            'content_hash': self.content_fingerprint(data, self.CONTENT_DEFAULTS),
+            'now': datetime.now()
+        }).fetchone()
+        
+        startup_id = row['id'] if row else None
+        if startup_id and data.metrics:
+            self._insert_metrics(startup_id, data)
+        return startup_id
+    
+    def _startup_content(self, name: str) -> Optional[Dict]:
+        row = self.conn.execute(STARTUP_CONTENT_SQL, (name,)).fetchone()
+        return dict(row) if row else None
+    
+    def _update_startup(self, data: StartupRecord, stored: Optional[Dict] = None) -> bool:
+        data = StartupRecord.coerce(data)
+        stored = stored or self._startup_content(data.name)
+        if not stored:
+            return False
+        
+        # Empreinte de la ligne fusionnée identique: aucune écriture
+        fingerprint = self.content_fingerprint(data, stored)
+        if fingerprint == stored['content_hash']:
+            return False
+        
+        fx = get_fx_table()
+        funding_currency = data.funding_currency
+        funding_usd = fx.to_usd(data.funding_raised, funding_currency) if funding_currency else None
+        payload_hash, payload, raw_size = self._encode_raw_payload(data)
+        now = datetime.now()
+        
+        row = self.conn.execute(UPDATE_STARTUP_SQL, {
+            'name': data.name,
+            'description': data.description,
+            'sector': data.sector,
+            'stage': data.stage,
+            'location': data.location,
+            'funding_raised': data.funding_raised,
+            'revenue': data.revenue,
+            'employees': data.employees,
+            'website': data.website,
+            'email': data.email,
+            'linkedin': data.linkedin,
+            'score': data.score,
+            'predicted_score': data.predicted_score,
+            'funding_currency': funding_currency,
+            'funding_usd': funding_usd,
+            'fx_version': fx.version if funding_usd is not None else None,
+            'raw_payload_hash': payload_hash,
+            'content_hash': fingerprint,
+            'now': now
+        }).fetchone()
+        
+        if not row:
+            return False
+        
+        self.conn.execute(UPSERT_RAW_PAYLOAD_SQL, (payload_hash, payload, raw_size, now, now))
+        if data.metrics:
+            self._insert_metrics(row['id'], data)
+        return True
+    
+    def _create_startup_tx(self, data: Dict) -> Optional[int]:
+        with self._transaction():
+            return self._create_startup(data)
+    
+    def _update_startup_tx(self, data: Dict) -> bool:
+        with self._transaction():
+            return self._update_startup(data)
+    
+    async def create_startup(self, data: Dict) -> int:
+        """Crée une nouvelle startup"""
+        return await self._run(self._create_startup_tx, data)
+    
+    async def update_startup(self, data: Dict) -> bool:
+        """Met à jour une startup existante (True si son empreinte de contenu a changé)"""
+        return await self._run(self._update_startup_tx, data)
+    
+    def _upsert_startups(self, startups: List[StartupRecord]) -> Dict[str, int]:
+        counts = {'new': 0, 'updated': 0, 'unchanged': 0, 'errors': 0}
+        
+        with self._transaction():
+            for startup in startups:
+                # Un point de sauvegarde par startup: une erreur n'annule pas le lot
+                self.conn.execute("SAVEPOINT upsert_startup")
+                try:
+                    startup = StartupRecord.coerce(startup)
+                    stored = self._startup_content(startup.name)
+                    if stored:
+                        counts['updated' if self._update_startup(startup, stored) else 'unchanged'] += 1
+                    else:
+                        self._create_startup(startup)
+                        counts['new'] += 1
+                except Exception as e:
+                    self.conn.execute("ROLLBACK TO upsert_startup")
+                    logger.error(f"❌ Erreur sauvegarde {startup.get('name')}: {e}")
+                    counts['errors'] += 1
+                self.conn.execute("RELEASE upsert_startup")
+        
+        return counts
+    
+    async def upsert_startups(self, startups: List[StartupRecord]) -> Dict[str, int]:
+        """Crée ou met à jour un lot de startups en une seule transaction (compteurs par statut)"""
+        if not startups:
+            return {'new': 0, 'updated': 0, 'unchanged': 0, 'errors': 0}
+        return await self._run(self._upsert_startups, startups)
+    
+    def _normalize_funding_usd(self) -> int:
+        fx = get_fx_table()
+        rows = self.conn.execute("""
+            SELECT id, funding_raised, funding_currency FROM startups
+            WHERE funding_fx_version IS NOT ?
+        """, (fx.version,)).fetchall()
+        
+        updates = [
+            (fx.to_usd(row['funding_raised'], row['funding_currency']), fx.version, row['id'])
+            for row in rows if fx.rate(row['funding_currency']) is not None
+        ]
+        with self._transaction():
+            self.conn.executemany(
+                "UPDATE startups SET funding_raised_usd = ?, funding_fx_version = ? WHERE id = ?",
+                updates
+            )
+        return len(updates)
+    
+    async def normalize_funding_usd(self) -> int:
+        """Recalcule funding_raised_usd des lignes non converties (ou autre version FX)"""
+        updated = await self._run(self._normalize_funding_usd)
+        logger.info(f"💱 Funding converti en USD (FX v{get_fx_table().version}): {updated} startups")
+        return updated
+    
+    # --- Lectures ---
+    
+    def _filter_sql(self, filters: Dict = None):
+        """
+        Clause WHERE et paramètres pour les filtres de get_all_startups; les
+        listes passent par json_each (un seul texte SQL quel que soit leur nombre
+        de valeurs, réutilisé par le cache de statements de sqlite3)
+        """
+        filters = filters or {}
+        clauses = ['active']
+        params = []
+        
+        for field in self.CATEGORICAL_FILTERS:
+            value = filters.get(field) or None
+            if value is None:
+                continue
+            if isinstance(value, (list, tuple, set)):
+                clauses.append(f"{field} IN (SELECT value FROM json_each(?))")
+                params.append(_json_param(list(value)))
+            else:
+                clauses.append(f"{field} = ?")
+                params.append(value)
+        
+        for key in self.RANGE_FILTERS:
+            if filters.get(key) is not None:
+                clauses.append(RANGE_FILTER_SQL[key])
+                params.append(filters[key])
+        
+        if filters.get('name_prefix'):
+            prefix = filters['name_prefix'].lower()
+            prefix = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            clauses.append("lower(name) LIKE ? ESCAPE '\\'")
+            params.append(prefix)
+        
+        return ' AND '.join(clauses), params
+    
+    async def get_all_startups(self, filters: Dict = None, limit: int = None,
+                               offset: int = 0) -> List[Dict]:
+        """Récupère les startups actives avec filtres optionnels (mêmes filtres que PostgreSQL)"""
+        where_sql, params = self._filter_sql(filters)
+        
+        # LIMIT -1 = pas de limite
+        return await self._run(self._fetch, f"""
+            SELECT {STARTUP_LIST_COLUMNS}
+            FROM startups
+            WHERE {where_sql}
+            ORDER BY score DESC, updated_at DESC
+            LIMIT ? OFFSET ?
+        """, params + [limit if limit is not None else -1, offset])
+    
+    async def iter_startups(self, filters: Dict = None,
+                            batch_size: int = 1000) -> AsyncIterator[List[Dict]]:
+        """Lecture en flux des startups actives, par lots de batch_size"""
+        where_sql, params = self._filter_sql(filters)
+        
+        async for batch in self._iter_query(f"""
+            SELECT {STARTUP_LIST_COLUMNS}
+            FROM startups
+            WHERE {where_sql}
+            ORDER BY id
+        """, params, batch_size):
+            yield batch
+    
+    async def iter_metrics(self, since: datetime = None,
+                           batch_size: int = 1000) -> AsyncIterator[List[Dict]]:
+        """Lecture en flux de startup_metrics (depuis since si fourni)"""
+        async for batch in self._iter_query("""
+            SELECT startup_id, sector, metrics, measured_at
+            FROM startup_metrics
+            WHERE :since IS NULL OR measured_at >= :since
+        """, {'since': since}, batch_size):
+            yield batch
+    
+    async def iter_funding_rounds(self, batch_size: int = 1000) -> AsyncIterator[List[Dict]]:
+        """Lecture en flux de funding_rounds"""
+        async for batch in self._iter_query("""
+            SELECT id, startup_id, round_type, amount, currency, announced_date,
+                   investors, valuation, source, created_at
+            FROM funding_rounds
+            ORDER BY id
+        """, (), batch_size):
+            yield batch
+    
+    async def _iter_query(self, sql: str, params, batch_size: int) -> AsyncIterator[List[Dict]]:
+        # Connexion en lecture seule dédiée: grâce au WAL, l'instantané reste
+        # cohérent pendant tout le parcours sans bloquer les écritures
+        reader = await self._run(self._open, True)
+        
+        try:
+            cursor = await self._run(reader.execute, sql, params)
+            while True:
+                rows = await self._run(cursor.fetchmany, batch_size)
+                if not rows:
+                    break
+                yield [dict(row) for row in rows]
+        finally:
+            await self._run(reader.close)
+    
+    async def get_facets(self, filters: Dict = None) -> Dict:
+        """Compteurs par secteur, ville et stage pour les filtres courants (une requête)"""
+        where_sql, params = self._filter_sql(filters)
+        
+        rows = await self._run(self._fetch, f"""
+            WITH f AS (SELECT sector, location, stage FROM startups WHERE {where_sql})
+            SELECT 'sector' AS dimension, sector AS value, COUNT(*) AS count FROM f GROUP BY sector
+            UNION ALL SELECT 'location', location, COUNT(*) FROM f GROUP BY location
+            UNION ALL SELECT 'stage', stage, COUNT(*) FROM f GROUP BY stage
+            UNION ALL SELECT 'total', NULL, COUNT(*) FROM f
+        """, params)
+        
+        facets = {'sector': {}, 'location': {}, 'stage': {}, 'total': 0}
+        for row in rows:
+            if row['dimension'] == 'total':
+                facets['total'] = row['count']
+            else:
+                facets[row['dimension']][row['value']] = row['count']
+        return facets
+    
+    async def search_startups(self, query: str, limit: int = 20, offset: int = 0) -> List[Dict]:
+        """Recherche simple (sous-chaîne) sur nom et description, nom prioritaire"""
+        if not query or not query.strip():
+            return []
+        
+        pattern = '%' + query.strip().lower().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        return await self._run(self._fetch, """
+            SELECT id, name, description, sector, stage, location, score, founders,
+                   CASE WHEN lower(name) LIKE :pattern ESCAPE '\\' THEN 1.0 ELSE 0.5 END AS rank
+            FROM startups
+            WHERE active AND (
+                lower(name) LIKE :pattern ESCAPE '\\'
+                OR lower(description) LIKE :pattern ESCAPE '\\'
+            )
+            ORDER BY rank DESC, score DESC
+            LIMIT :limit OFFSET :offset
+        """, {'pattern': pattern, 'limit': limit, 'offset': offset})
+    
+    async def get_startup_ids(self, names: List[str]) -> Dict[str, int]:
+        """Résout les ids de plusieurs startups en une seule requête"""
+        if not names:
+            return {}
+        
+        rows = await self._run(self._fetch, """
+            SELECT id, name FROM startups WHERE name IN (SELECT value FROM json_each(?))
+        """, (_json_param(list(set(names))),))
+        return {row['name']: row['id'] for row in rows}
+    
+    async def get_startup_by_name(self, name: str) -> Optional[Dict]:
+        """Récupère une startup par nom"""
+        rows = await self._run(self._fetch, "SELECT * FROM startups WHERE name = ?", (name,))
+        return rows[0] if rows else None
+    
+    async def get_latest_metrics(self, startup_ids: List[int]) -> Dict[int, Dict]:
+        """Dernières métriques de chaque startup (index (startup_id, measured_at))"""
+        if not startup_ids:
+            return {}
+        
+        rows = await self._run(self._fetch, """
+            SELECT m.startup_id, m.sector, m.metrics, m.measured_at
+            FROM startup_metrics m
+            WHERE m.startup_id IN (SELECT value FROM json_each(?))
+              AND m.measured_at = (
+                  SELECT MAX(measured_at) FROM startup_metrics WHERE startup_id = m.startup_id
+              )
+        """, (_json_param(list(startup_ids)),))
+        return {row['startup_id']: row for row in rows}
+    
+    async def get_metrics_history(self, startup_id: int, since: datetime) -> List[Dict]:
+        """Historique des métriques depuis une date"""
+        return await self._run(self._fetch, """
+            SELECT sector, metrics, measured_at
+            FROM startup_metrics
+            WHERE startup_id = ? AND measured_at >= ?
+            ORDER BY measured_at
+        """, (startup_id, since))
+    
+    # --- Actualités et rounds ---
+    
+    def _execute_many(self, sql: str, records: List[tuple]) -> int:
+        with self._transaction():
+            before = self.conn.total_changes
+            self.conn.executemany(sql, records)
+            return self.conn.total_changes - before
+    
+    async def insert_news_bulk(self, articles: List[Dict]) -> int:
+        """Insère des actualités en masse (INSERT OR IGNORE sur (startup_id, url_hash))"""
+        if not articles:
+            return 0
+        
+        records = {}
+        for article in articles:
+            url_hash = article.get('url_hash') or self.news_url_hash(
+                article.get('url'), article['startup_id'], article.get('title')
+            )
+            
+            records.setdefault((article['startup_id'], url_hash), (
+                article['startup_id'],
+                article.get('title'),
+                article.get('content'),
+                article.get('url'),
+                url_hash,
+                article.get('source'),
+                self.parse_published_at(article.get('published_at')),
+                article.get('sentiment_score'),
+                datetime.now()
+            ))
+        
+        inserted = await self._run(self._execute_many, """
+            INSERT OR IGNORE INTO startup_news (
+                startup_id, title, content, url, url_hash,
+                source, published_at, sentiment_score, created_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, list(records.values()))
+        
+        logger.info(f"📰 Actualités: {inserted} insérées, {len(articles) - inserted} doublons ignorés")
+        return inserted
+    
+    async def roll_news_windows(self) -> int:
+        """Fenêtres 30/90/365j calculées à la lecture: rien à faire glisser"""
+        return 0
+    
+    async def get_news_stats_by_names(self, names: List[str]) -> Dict[str, Dict]:
+        """Agrégats d'actualités (une ligne par startup) indexés par nom"""
+        if not names:
+            return {}
+        
+        today = date.today()
+        rows = await self._run(self._fetch, """
+            SELECT st.name,
+                   COUNT(*) AS mentions_total,
+                   SUM(date(COALESCE(n.published_at, n.created_at)) > :d30) AS mentions_30d,
+                   SUM(date(COALESCE(n.published_at, n.created_at)) > :d90) AS mentions_90d,
+                   SUM(date(COALESCE(n.published_at, n.created_at)) > :d365) AS mentions_365d,
+                   AVG(n.sentiment_score) AS avg_sentiment,
+                   MAX(COALESCE(n.published_at, n.created_at)) AS "last_mention_at [TIMESTAMP]"
+            FROM startups st
+            JOIN startup_news n ON n.startup_id = st.id
+            WHERE st.name IN (SELECT value FROM json_each(:names))
+            GROUP BY st.name
+        """, {
+            'names': _json_param(list(set(names))),
+            'd30': today - timedelta(days=30),
+            'd90': today - timedelta(days=90),
+            'd365': today - timedelta(days=365)
+        })
+        return {row['name']: row for row in rows}
+    
+    async def get_recrawl_candidates(self, crawled_before: datetime, limit: int = 50,
+                                     staleness_hours: float = 168) -> List[Dict]:
+        """
+        Startups actives non vérifiées depuis crawled_before, mentions calculées à
+        la lecture sur 90 jours (index idx_startup_news_startup_mentioned): les
+        limit plus prioritaires, même priorité que PostgreSQL
+        """
+        today = date.today()
+        return await self._run(self._fetch, """
+            SELECT c.*,
+                   (0.2 + MIN(MAX(COALESCE(c.score, 0), COALESCE(c.predicted_score, 0)), 100) / 100.0)
+                   * MIN((julianday(:now) - julianday(COALESCE(c.last_crawled_at, c.updated_at))) * 24
+                         / :staleness_hours, 2)
+                   * (1 + log1p(c.mentions_30d)
+                        + MIN(MAX(0, c.mentions_30d - c.mentions_90d / 3.0) / MAX(1, c.mentions_90d / 3.0), 2))
+                   AS priority
+            FROM (
+                SELECT st.id, st.name, st.website, st.score, st.predicted_score,
+                       st.updated_at, st.last_crawled_at,
+                       COALESCE(SUM(COALESCE(n.published_at, n.created_at) >= :since30), 0) AS mentions_30d,
+                       COUNT(n.id) AS mentions_90d
+                FROM startups st
+                LEFT JOIN startup_news n
+                       ON n.startup_id = st.id AND COALESCE(n.published_at, n.created_at) >= :since90
+                WHERE st.active AND COALESCE(st.last_crawled_at, st.updated_at) < :crawled_before
+                GROUP BY st.id
+            ) c
+            ORDER BY priority DESC, c.id
+            LIMIT :limit
+        """, {
+            'crawled_before': crawled_before,
+            'limit': limit,
+            'now': datetime.now(),
+            'staleness_hours': staleness_hours,
+            # Mêmes fenêtres que PostgreSQL (jour de publication > aujourd'hui - 30/90)
+            'since30': today - timedelta(days=29),
+            'since90': today - timedelta(days=89)
+        })
+    
+    async def mark_crawled(self, startup_ids: List[int]) -> int:
+        """Horodate la dernière vérification"""
+        if not startup_ids:
+            return 0
+        
+        def mark():
+            with self._transaction():
+                return self.conn.execute(
+                    "UPDATE startups SET last_crawled_at = ? WHERE id IN (SELECT value FROM json_each(?))",
+                    (datetime.now(), _json_param(list(startup_ids)))
+                ).rowcount
+        
+        return await self._run(mark)
+    
+    async def insert_funding_rounds(self, rounds: List[Dict]) -> int:
+        """
+        Insère des rounds normalisés en masse, dédupliqués sur (startup_id, round_type, announced_date)
+        
+        Date manquante d'un côté: même règle que le backend PostgreSQL (la version
+        datée d'un round de même montant l'emporte)
+        """
+        if not rounds:
+            return 0
+        
+        rounds = FundingRoundNormalizer().dedupe_rounds(rounds)
+        records = [
+            (
+                r['startup_id'],
+                r.get('round_type') or 'unknown',
+                r.get('amount'),
+                r.get('currency'),
+                r.get('announced_date'),
+                _json_param(r.get('investors') or []),
+                r.get('valuation'),
+                r.get('source'),
+                datetime.now()
+            )
+            for r in rounds
+        ]
+        
+        def insert():
+            with self._transaction():
+                promoted = 0
+                for startup_id, round_type, amount, currency, announced_date, investors, valuation, source, _ \
+                        in records:
+                    if announced_date is None:
+                        continue
+                    promoted += self.conn.execute("""
+                        UPDATE funding_rounds SET
+                            announced_date = :announced_date,
+                            investors = CASE WHEN investors IS NULL OR investors = '[]'
+                                             THEN :investors ELSE investors END,
+                            valuation = COALESCE(valuation, :valuation),
+                            source = COALESCE(source, :source)
+                        WHERE startup_id = :startup_id AND round_type = :round_type
+                          AND announced_date IS NULL AND amount IS :amount AND currency IS :currency
+                          AND NOT EXISTS (
+                              SELECT 1 FROM funding_rounds d
+                              WHERE d.startup_id = :startup_id AND d.round_type = :round_type
+                                AND d.announced_date = :announced_date
+                          )
+                    """, {
+                        'startup_id': startup_id, 'round_type': round_type, 'amount': amount,
+                        'currency': currency, 'announced_date': announced_date,
+                        'investors': investors, 'valuation': valuation, 'source': source
+                    }).rowcount
+                
+                before = self.conn.total_changes
+                self.conn.executemany("""
+                    INSERT OR IGNORE INTO funding_rounds (
+                        startup_id, round_type, amount, currency,
+                        announced_date, investors, valuation, source, created_at
+                    )
+                    SELECT ?1, ?2, ?3, ?4, ?5, ?6, ?7, ?8, ?9
+                    WHERE ?5 IS NOT NULL OR NOT EXISTS (
+                        SELECT 1 FROM funding_rounds f
+                        WHERE f.startup_id = ?1 AND f.round_type = ?2 AND f.announced_date IS NOT NULL
+                          AND f.amount IS ?3 AND f.currency IS ?4
+                    )
+                """, records)
+                return self.conn.total_changes - before, promoted
+        
+        inserted, promoted = await self._run(insert)
+        
+        logger.info(f"💰 Rounds de financement: {inserted} insérés, {promoted} datés, "
+                    f"{len(rounds) - inserted - promoted} doublons ignorés")
+        return inserted
+    
+    async def get_recent_rounds(self, days: int = 90, sector: str = None,
+                                round_type: str = None, limit: int = 100) -> List[Dict]:
+        """Rounds annoncés dans les N derniers jours, filtrés par secteur (dashboard)"""
+        return await self._run(self._fetch, """
+            SELECT
+                fr.id, fr.startup_id, s.name, s.sector, s.location,
+                fr.round_type, fr.amount, fr.currency, fr.announced_date,
+                fr.investors, fr.source
+            FROM funding_rounds fr
+            JOIN startups s ON s.id = fr.startup_id
+            WHERE fr.announced_date >= :since
+              AND (:sector IS NULL OR s.sector = :sector)
+              AND (:round_type IS NULL OR fr.round_type = :round_type)
+            ORDER BY fr.announced_date DESC
+            LIMIT :limit
+        """, {
+            'since': date.today() - timedelta(days=days),
+            'sector': sector or None,
+            'round_type': round_type or None,
+            'limit': limit
+        })
+    
+    # --- Payloads bruts, logs, rétention ---
+    
+    async def get_raw_payload(self, payload_hash: str) -> Optional[Dict]:
+        """Payload brut d'une startup (décompressé) à partir de raw_payload_hash"""
+        if not payload_hash:
+            return None
+        
+        rows = await self._run(self._fetch, "SELECT payload FROM raw_payloads WHERE hash = ?", (payload_hash,))
+        return _json_loads(zlib.decompress(rows[0]['payload'])) if rows else None
+    
+    async def log_collection(self, collector_name: str, stats: Dict):
+        """Log une session de collecte"""
+        await self._run(self._execute_many, """
+            INSERT INTO collection_logs (
+                collector_name, status, startups_collected, errors,
+                started_at, completed_at, details, logged_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, [(
+            collector_name,
+            stats.get('status', 'completed'),
+            stats.get('collected', 0),
+            stats.get('errors', 0),
+            stats.get('started_at'),
+            stats.get('completed_at'),
+            _json_param(stats.get('details', {})),
+            datetime.now()
+        )])
+    
+    async def purge_raw_payloads(self, retention_days: int = None) -> int:
+        """Supprime les payloads non référencés et non revus depuis retention_days"""
+        if retention_days is None:
+            retention_days = self.raw_payload_retention_days
+        
+        purged = await self._run(self._execute_many, """
+            DELETE FROM raw_payloads
+            WHERE last_seen_at < ?
+              AND NOT EXISTS (SELECT 1 FROM startups s WHERE s.raw_payload_hash = raw_payloads.hash)
+        """, [(datetime.now() - timedelta(days=retention_days),)])
+        
+        logger.info(f"🗑️  Payloads bruts purgés: {purged} (rétention {retention_days}j)")
+        return purged
+    
+    async def maintain_partitions(self) -> Dict:
+        """Pas de partitions en SQLite: rétention par DELETE (mêmes durées que PostgreSQL)"""
+        report = {}
+        for table, config in self.partitions.tables.items():
+            cutoff = add_months(month_start(date.today()), -self.partitions.retention_months[table])
+            deleted = await self._run(
+                self._execute_many, f"DELETE FROM {table} WHERE {config['column']} < ?", [(cutoff,)]
+            )
+            report[table] = {'created': [], 'dropped': [], 'deleted': deleted}
+        return report
+    
+    async def optimize(self):
+        """Maintenance périodique: statistiques du planificateur et checkpoint du WAL"""
+        await self._run(self.conn.execute, "PRAGMA optimize")
+        await self._run(self.conn.execute, "PRAGMA wal_checkpoint(TRUNCATE)")
+        logger.info("🧹 SQLite optimisé (ANALYZE ciblé, WAL tronqué)")
+    
+    # --- Statistiques ---
+    
+    async def get_stats(self) -> Dict:
+        """Statistiques globales (agrégat direct, mis en cache STATS_CACHE_TTL secondes)"""
+        now = time.monotonic()
+        if self._stats_cache and self._stats_cache[0] > now:
+            return dict(self._stats_cache[1])
+        
+        rows = await self._run(self._fetch, """
+            SELECT
+                COUNT(*) AS total_startups,
+                COUNT(DISTINCT NULLIF(sector, '')) AS sectors_count,
+                COUNT(DISTINCT NULLIF(location, '')) AS cities_count,
+                AVG(score) AS avg_score,
+                COALESCE(SUM(funding_raised_usd), 0) AS total_funding,
+                AVG(employees) AS avg_employees
+            FROM startups
+            WHERE active
+        """)
+        stats = rows[0]
+        stats['funding_currency'] = 'USD'
+        
+        self._stats_cache = (now + self.stats_cache_ttl, stats)
+        return dict(stats)
+    
+    async def get_rollups(self, dimension: str) -> List[Dict]:
+        """Compteurs et sommes par secteur, ville ou stage (dashboard)"""
+        if dimension not in self.CATEGORICAL_FILTERS:
+            raise ValueError(f"Dimension inconnue: {dimension}")
+        
+        return await self._run(self._fetch, f"""
+            SELECT COALESCE({dimension}, '') AS key, COUNT(*) AS startups,
+                   AVG(score) AS avg_score,
+                   COALESCE(SUM(funding_raised_usd), 0) AS total_funding,
+                   AVG(employees) AS avg_employees
+            FROM startups
+            WHERE active AND COALESCE({dimension}, '') <> ''
+            GROUP BY 1
+            ORDER BY startups DESC
+        """)
+
+
+# Test
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    
+    async def test():
+        db = SQLiteDatabaseManager(os.getenv('SQLITE_PATH', '/tmp/vc_deal_screener_test.db'))
+        await db.connect()
+        
+        counts = await db.upsert_startups([
+            {'name': 'TestStartup Inc', 'sector': 'fintech', 'location': 'Casablanca',
+             'funding_raised': 500000, 'employees': 10, 'metrics': {'mrr': 1000}},
+            {'name': 'AgriTest', 'sector': 'agritech', 'location': 'Rabat', 'score': 70},
+        ])
+        print(f"Upsert: {counts}")
+        
+        print(f"Stats: {await db.get_stats()}")
+        print(f"Facettes: {await db.get_facets({'sector': ['fintech', 'agritech']})}")
+        
+        async for batch in db.iter_startups(batch_size=1):
+            print(f"Lot: {[s['name'] for s in batch]}")
+        
+        await db.disconnect()
+    
+    asyncio.run(test())
@@ -0,0 +1,324 @@
+# database/statements.py
+"""
+SQL Statements
+==============
+Requêtes du DatabaseManager déclarées une seule fois, avec un texte fixe:
+le cache de statements d'asyncpg (DB_STATEMENT_CACHE_SIZE) les prépare une
+seule fois par connexion du pool, au lieu de les reconstruire et de les
+re-parser à chaque appel.
+
+Les filtres optionnels ne sont pas des "$n IS NULL OR colonne = $n": un
+plan générique (plan_cache_mode=auto, après 5 exécutions d'un statement
+préparé) ne prouverait ni "sector = $1" ni les prédicats des index partiels.
+Chaque combinaison de filtres actifs a donc son propre texte fixe
+(filtered_statement, mémorisé), qui ne contient que ses prédicats: le plan
+générique reste bon et le cache de plans de PostgreSQL est conservé.
+
+Les requêtes les plus fréquentes (PREPARED_STATEMENTS) sont préparées à
+l'ouverture de chaque connexion du pool (DatabaseManager._init_connection).
+"""
+
+from functools import lru_cache
+from typing import Tuple
+
+# Colonnes renvoyées par les listes de startups
+STARTUP_LIST_COLUMNS = """
+    id, name, description, sector, stage, location,
+    funding_raised, funding_currency, funding_raised_usd, revenue, employees, founded_year,
+    website, email, phone, linkedin_url,
+    score, predicted_score, founders,
+    created_at, updated_at
+"""
+
+# Filtres de get_all_startups / get_facets, dans l'ordre de DatabaseManager._filter_params
+STARTUP_FILTER_PREDICATES = (
+    'sector = {}', 'sector = ANY({})',
+    'location = {}', 'location = ANY({})',
+    'stage = {}', 'stage = ANY({})',
+    'score >= {}', 'score <= {}',
+    'funding_raised_usd >= {}', 'funding_raised_usd <= {}',
+    'founded_year >= {}', 'founded_year <= {}',
+    'lower(name) LIKE {}',
+)
+
+# Requêtes filtrées: {where} = prédicats actifs, puis paramètres propres à la requête
+FILTERED_STATEMENTS = {
+    'list_startups': f"""
+        SELECT {STARTUP_LIST_COLUMNS}
+        FROM startups
+        WHERE {{where}}
+        ORDER BY score DESC, updated_at DESC
+        LIMIT {{p1}} OFFSET {{p2}}
+    """,
+    
+    'iter_startups': f"""
+        SELECT {STARTUP_LIST_COLUMNS}
+        FROM startups
+        WHERE {{where}}
+        ORDER BY id
+    """,
+    
+    'startup_facets': """
+        SELECT
+            GROUPING(sector) = 0 AS by_sector,
+            GROUPING(location) = 0 AS by_location,
+            GROUPING(stage) = 0 AS by_stage,
+            sector, location, stage, COUNT(*) AS count
+        FROM startups
+        WHERE {where}
+        GROUP BY GROUPING SETS ((sector), (location), (stage), ())
+    """,
+}
+
+
+@lru_cache(maxsize=None)
+def filtered_statement(name: str, active: Tuple[int, ...] = ()) -> str:
+    """
+    Texte fixe de FILTERED_STATEMENTS[name] pour une combinaison de filtres
+    actifs (index dans STARTUP_FILTER_PREDICATES): $1..$n dans cet ordre,
+    puis $n+1, $n+2 pour les paramètres de la requête (LIMIT, OFFSET)
+    """
+    predicates = ['active = TRUE'] + [
+        STARTUP_FILTER_PREDICATES[index].format(f"${position}")
+        for position, index in enumerate(active, 1)
+    ]
+    return FILTERED_STATEMENTS[name].format(
+        where='\n          AND '.join(predicates),
+        p1=f"${len(active) + 1}", p2=f"${len(active) + 2}"
+    )
+
+
+SEARCH_SQL = """
+WITH q AS (
+    SELECT websearch_to_tsquery('french', $1)
+        || websearch_to_tsquery('english', $1)
+        || websearch_to_tsquery('simple', $1) AS tsq
+)
+SELECT
+    s.id, s.name, s.description, s.sector, s.stage, s.location,
+    s.score, s.founders, {rank_sql} AS rank
+FROM startups s, q
+WHERE s.active = TRUE AND {match_sql}
+ORDER BY rank DESC, s.score DESC
+LIMIT $2 OFFSET $3
+"""
+
+
+STATEMENTS = {
+    'startup_exists': """
+        SELECT EXISTS(SELECT 1 FROM startups WHERE name = $1)
+    """,
+    
+    # Champs de l'empreinte de contenu tels que stockés (dernières métriques comprises)
+    'startup_content': """
+        SELECT s.content_hash, s.description, s.sector, s.stage, s.location,
+               s.funding_raised, s.funding_currency, s.revenue, s.employees,
+               s.website, s.email, s.linkedin_url AS linkedin, s.score, s.predicted_score,
+               m.metrics
+        FROM startups s
+        LEFT JOIN LATERAL (
+            SELECT metrics FROM startup_metrics
+            WHERE startup_id = s.id
+            ORDER BY measured_at DESC
+            LIMIT 1
+        ) m ON TRUE
+        WHERE s.name = $1
+    """,
+    
+    'create_startup': """
+        INSERT INTO startups (
+            name, slug, description, sector, stage, location,
+            funding_raised, funding_currency, revenue, employees, founded_year,
+            website, email, phone, linkedin_url,
+            score, predicted_score, source, source_url, collected_at,
+            founders, raw_payload_hash, verified, funding_raised_usd, funding_fx_version,
+            content_hash
+        ) VALUES (
+            $1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15,
+            $16, $17, $18, $19, $20, $21, $22, $23, $24, $25, $26
+        )
+        ON CONFLICT (name) DO NOTHING
+        RETURNING id
+    """,
+    
+    'update_startup': """
+        UPDATE startups SET
+            description = COALESCE($2, description),
+            sector = COALESCE($3, sector),
+            stage = COALESCE($4, stage),
+            location = COALESCE($5, location),
+            funding_raised = COALESCE($6, funding_raised),
+            revenue = COALESCE($7, revenue),
+            employees = COALESCE($8, employees),
+            website = COALESCE($9, website),
+            email = COALESCE($10, email),
+            linkedin_url = COALESCE($11, linkedin_url),
+            score = COALESCE($12, score),
+            predicted_score = COALESCE($13, predicted_score),
+            funding_currency = COALESCE($14, funding_currency),
+            funding_raised_usd = CASE WHEN $6::bigint IS NULL THEN funding_raised_usd ELSE $15 END,
+            funding_fx_version = CASE WHEN $6::bigint IS NULL THEN funding_fx_version ELSE $16 END,
+            raw_payload_hash = COALESCE($17, raw_payload_hash),
+            content_hash = $18,
+            updated_at = NOW()
+        WHERE name = $1 AND content_hash IS DISTINCT FROM $18
+        RETURNING id
+    """,
+    
+    # Un payload déjà connu n'est pas réécrit (last_seen_at rafraîchi une fois par jour)
+    'upsert_raw_payload': """
+        INSERT INTO raw_payloads AS p (hash, payload, raw_size)
+        VALUES ($1, $2, $3)
+        ON CONFLICT (hash) DO UPDATE SET last_seen_at = NOW()
+        WHERE p.last_seen_at < CURRENT_DATE
+    """,
+    
+    'raw_payload': """
+        SELECT payload FROM raw_payloads WHERE hash = $1
+    """,
+    
+    'insert_metrics': """
+        INSERT INTO startup_metrics (startup_id, sector, metrics)
+        VALUES ($1, $2, $3)
+    """,
+    
+    # Une sonde d'index par startup (LATERAL + LIMIT 1)
+    'latest_metrics': """
+        SELECT ids.startup_id, m.sector, m.metrics, m.measured_at
+        FROM unnest($1::int[]) AS ids(startup_id)
+        CROSS JOIN LATERAL (
+            SELECT sector, metrics, measured_at
+            FROM startup_metrics
+            WHERE startup_id = ids.startup_id
+            ORDER BY measured_at DESC
+            LIMIT 1
+        ) m
+    """,
+    
+    'metrics_history': """
+        SELECT sector, metrics, measured_at
+        FROM startup_metrics
+        WHERE startup_id = $1 AND measured_at >= $2
+        ORDER BY measured_at
+    """,
+    
+    'iter_metrics': """
+        SELECT startup_id, sector, metrics, measured_at
+        FROM startup_metrics
+        WHERE ($1::timestamp IS NULL OR measured_at >= $1)
+    """,
+    
+    'iter_funding_rounds': """
+        SELECT id, startup_id, round_type, amount, currency, announced_date,
+               investors, valuation, source, created_at
+        FROM funding_rounds
+        ORDER BY id
+    """,
+    
+    'search_startups': SEARCH_SQL.format(
+        match_sql="s.search_vector @@ q.tsq",
+        rank_sql="ts_rank_cd(s.search_vector, q.tsq)"
+    ),
+    
+    'search_startups_trigram': SEARCH_SQL.format(
+        match_sql="(s.search_vector @@ q.tsq OR lower(s.name) % lower($1))",
+        rank_sql="GREATEST(ts_rank_cd(s.search_vector, q.tsq), similarity(lower(s.name), lower($1)))"
+    ),
+    
+    'startup_ids_by_names': """
+        SELECT id, name FROM startups WHERE name = ANY($1::text[])
+    """,
+    
+    'startup_by_name': """
+        SELECT * FROM startups WHERE name = $1
+    """,
+    
+    # Candidats au re-crawl (actualisation rapide), les plus prioritaires
+    # d'abord: valeur x ancienneté x vélocité ($3 = RECRAWL_STALENESS_HOURS),
+    # voir scheduler/recrawl.py. Seul endroit où la priorité est calculée
+    # (avec sa traduction SQLite): LIMIT garde directement la sélection
+    'recrawl_candidates': """
+        SELECT st.id, st.name, st.website, st.score, st.predicted_score,
+               st.updated_at, st.last_crawled_at,
+               COALESCE(ns.mentions_30d, 0) AS mentions_30d,
+               COALESCE(ns.mentions_90d, 0) AS mentions_90d,
+               (0.2 + LEAST(GREATEST(COALESCE(st.score, 0), COALESCE(st.predicted_score, 0)), 100) / 100.0)
+               * LEAST(EXTRACT(EPOCH FROM LOCALTIMESTAMP - COALESCE(st.last_crawled_at, st.updated_at))::float8
+                       / 3600 / $3::float8, 2)
+               * (1 + LN(1 + COALESCE(ns.mentions_30d, 0)::float8)
+                    + LEAST(GREATEST(0, COALESCE(ns.mentions_30d, 0) - COALESCE(ns.mentions_90d, 0) / 3.0)
+                            / GREATEST(1, COALESCE(ns.mentions_90d, 0) / 3.0), 2)) AS priority
+        FROM startups st
+        LEFT JOIN startup_news_stats ns ON ns.startup_id = st.id
+        WHERE st.active AND COALESCE(st.last_crawled_at, st.updated_at) < $1
+        ORDER BY priority DESC, st.id
+        LIMIT $2
+    """,
+    
+    'mark_crawled': """
+        UPDATE startups SET last_crawled_at = NOW() WHERE id = ANY($1::int[])
+    """,
+    
+    'news_stats_by_names': """
+        SELECT st.name, ns.mentions_total, ns.mentions_30d, ns.mentions_90d,
+               ns.mentions_365d, ns.avg_sentiment, ns.last_mention_at
+        FROM startups st
+        JOIN startup_news_stats ns ON ns.startup_id = st.id
+        WHERE st.name = ANY($1::text[])
+    """,
+    
+    'recent_rounds': """
+        SELECT
+            fr.id, fr.startup_id, s.name, s.sector, s.location,
+            fr.round_type, fr.amount, fr.currency, fr.announced_date,
+            fr.investors, fr.source
+        FROM funding_rounds fr
+        JOIN startups s ON s.id = fr.startup_id
+        WHERE fr.announced_date >= CURRENT_DATE - $1::int
+          AND ($2::text IS NULL OR s.sector = $2)
+          AND ($3::text IS NULL OR fr.round_type = $3)
+        ORDER BY fr.announced_date DESC
+        LIMIT $4
+    """,
+    
+    'log_collection': """
+        INSERT INTO collection_logs (
+            collector_name, status, startups_collected, errors,
+            started_at, completed_at, details
+        ) VALUES ($1, $2, $3, $4, $5, $6, $7)
+    """,
+    
+    'stats_summary': """
+        SELECT
+            g.startups as total_startups,
+            (SELECT COUNT(*) FROM startup_rollups
+             WHERE dimension = 'sector' AND key <> '' AND startups > 0) as sectors_count,
+            (SELECT COUNT(*) FROM startup_rollups
+             WHERE dimension = 'location' AND key <> '' AND startups > 0) as cities_count,
+            g.score_sum::numeric / NULLIF(g.score_count, 0) as avg_score,
+            g.funding_usd_sum as total_funding,
+            g.employees_sum::numeric / NULLIF(g.employees_count, 0) as avg_employees
+        FROM (SELECT 1) AS one
+        LEFT JOIN startup_rollups g ON g.dimension = 'global' AND g.key = ''
+    """,
+    
+    'rollups_by_dimension': """
+        SELECT key, startups,
+               score_sum::numeric / NULLIF(score_count, 0) as avg_score,
+               funding_usd_sum as total_funding,
+               employees_sum::numeric / NULLIF(employees_count, 0) as avg_employees
+        FROM startup_rollups
+        WHERE dimension = $1 AND startups > 0
+        ORDER BY startups DESC
+    """,
+}
+
+
+# Préparées à l'ouverture de chaque connexion du pool: chemin d'upsert des
+# collecteurs et lectures du dashboard (liste et facettes sans filtre)
+PREPARED_STATEMENTS = [
+    STATEMENTS[name] for name in (
+        'startup_content', 'create_startup', 'update_startup', 'upsert_raw_payload',
+        'insert_metrics', 'startup_ids_by_names', 'latest_metrics', 'stats_summary',
+    )
+] + [filtered_statement('list_startups'), filtered_statement('startup_facets')]
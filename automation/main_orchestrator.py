@@ -26,6 +26,11 @@ from typing import List, Dict, Optional
 import os
 from pathlib import Path
 
+from utils.event_loop import offload, start_loop_monitor
+from utils.instrumentation import get_instrumentation
+from utils.profiler import Profiler, profiling_requested
+from utils.startup_record import StartupRecord
+
 # Configuration
 BASE_DIR = Path(__file__).parent
 LOG_DIR = BASE_DIR / 'logs'
@@ -53,10 +58,12 @@ class DataCollectionOrchestrator:
         self.collectors = []
         self.ml_pipeline = None
         self.database = None
+        self.instrumentation = get_instrumentation()
         self.stats = {
             'total_collected': 0,
             'new_startups': 0,
             'updated_startups': 0,
+            'unchanged_startups': 0,
             'failed': 0,
             'start_time': None,
             'end_time': None
@@ -78,10 +85,10 @@ class DataCollectionOrchestrator:
         from ml.scoring_engine import MLScoringEngine
         
         # Import de la base de données
-        from database.db_manager import DatabaseManager
+        from database.backends import create_database_manager
         
-        # Initialiser la base de données
-        self.database = DatabaseManager()
+        # Initialiser la base de données (PostgreSQL ou SQLite selon DB_BACKEND)
+        self.database = create_database_manager()
         await self.database.connect()
         logger.info("✅ Base de données connectée")
         
@@ -104,6 +111,8 @@ class DataCollectionOrchestrator:
     async def run_full_collection(self):
         """Lance une collecte complète"""
         self.stats['start_time'] = datetime.now()
+        self.instrumentation.reset('full_collection')
+        span = self.instrumentation.span
         logger.info("=" * 80)
         logger.info("🎯 DÉMARRAGE COLLECTE AUTOMATIQUE COMPLÈTE")
         logger.info("=" * 80)
@@ -114,7 +123,9 @@ class DataCollectionOrchestrator:
         for collector in self.collectors:
             try:
                 logger.info(f"📊 Collecte depuis {collector.__class__.__name__}...")
-                startups = await collector.collect()
+                with span(f"collect.{collector.__class__.__name__}") as collect_span:
+                    startups = await collector.collect()
+                    collect_span.records = len(startups)
                 logger.info(f"✅ {len(startups)} startups collectées depuis {collector.__class__.__name__}")
                 all_startups.extend(startups)
             except Exception as e:
@@ -125,87 +136,197 @@ class DataCollectionOrchestrator:
         
         # Nettoyage et déduplication
         logger.info("🧹 Nettoyage et déduplication...")
-        cleaned_startups = await self._clean_and_deduplicate(all_startups)
+        with span('clean', len(all_startups)):
+            cleaned_startups = await self._clean_and_deduplicate(all_startups)
         logger.info(f"✅ Après nettoyage: {len(cleaned_startups)} startups uniques")
         
         # Enrichissement ML
         logger.info("🤖 Enrichissement avec ML...")
-        enriched_startups = await self._ml_enrichment(cleaned_startups)
+        with span('ml_enrichment', len(cleaned_startups)):
+            enriched_startups = await self._ml_enrichment(cleaned_startups)
         
         # Sauvegarde en base de données
         logger.info("💾 Sauvegarde en base de données...")
-        saved = await self._save_to_database(enriched_startups)
+        with span('save', len(enriched_startups)):
+            saved = await self._save_to_database(enriched_startups)
+        
+        # Ingestion des actualités (sentiment calculé une fois à l'insertion)
+        logger.info("📰 Ingestion des actualités...")
+        with span('ingest_news') as news_span:
+            news_span.records = await self._ingest_news(enriched_startups)
+        
+        # Normalisation des rounds de financement
+        logger.info("💰 Ingestion des rounds de financement...")
+        with span('ingest_funding_rounds') as rounds_span:
+            rounds_span.records = await self._ingest_funding_rounds(enriched_startups)
         
         self.stats['total_collected'] = len(enriched_startups)
         self.stats['new_startups'] = saved['new']
         self.stats['updated_startups'] = saved['updated']
+        self.stats['unchanged_startups'] = saved['unchanged']
         self.stats['end_time'] = datetime.now()
         
         # Rapport final
         self._print_final_report()
+        await self._save_run_report()
     
-    async def _clean_and_deduplicate(self, startups: List[Dict]) -> List[Dict]:
+    async def _clean_and_deduplicate(self, startups: List[Dict]) -> List[StartupRecord]:
         """Nettoie et déduplique les données"""
         from utils.data_cleaner import DataCleaner
         
         cleaner = DataCleaner()
         return await cleaner.process(startups)
     
-    async def _ml_enrichment(self, startups: List[Dict]) -> List[Dict]:
+    async def _ml_enrichment(self, startups: List[StartupRecord]) -> List[StartupRecord]:
         """Enrichit les données avec ML"""
+        # Agrégats d'actualités précalculés (une ligne par startup déjà connue)
+        news_stats = await self.database.get_news_stats_by_names(
+            [s.name for s in startups if s.name]
+        )
+        
+        # Classification, scoring et extraction sont du CPU pur: lot déporté au-delà du seuil 'ml.enrich'
+        return await offload('ml.enrich', len(startups), self._enrich_batch, startups, news_stats)
+    
+    def _enrich_batch(self, startups: List[StartupRecord], news_stats: Dict) -> List[StartupRecord]:
         enriched = []
         
         for startup in startups:
             try:
+                if startup.name in news_stats:
+                    startup.news_stats = news_stats[startup.name]
+                
                 # Classification sectorielle automatique
-                if not startup.get('sector'):
-                    startup['sector'] = await self.ml_pipeline.classify_sector(
-                        startup.get('description', ''),
-                        startup.get('name', '')
+                if not startup.sector:
+                    startup.sector = self.ml_pipeline.classify_sector_sync(
+                        startup.description or '',
+                        startup.name or ''
                     )
                 
                 # Scoring prédictif
-                startup['predicted_score'] = await self.ml_scoring.predict_score(startup)
+                startup.predicted_score = self.ml_scoring.predict_score_sync(startup)
                 
                 # Extraction d'entités (founders, technologies, etc.)
-                startup['extracted_entities'] = await self.ml_pipeline.extract_entities(
-                    startup.get('description', '')
+                startup.extracted_entities = self.ml_pipeline.extract_entities_sync(
+                    startup.description or ''
                 )
                 
-                # Sentiment analysis sur les news
-                if startup.get('news'):
-                    startup['sentiment_score'] = await self.ml_pipeline.analyze_sentiment(
-                        startup['news']
-                    )
-                
                 enriched.append(startup)
-                
+            
             except Exception as e:
-                logger.warning(f"⚠️  Erreur enrichissement {startup.get('name')}: {e}")
+                logger.warning(f"⚠️  Erreur enrichissement {startup.name}: {e}")
                 enriched.append(startup)
         
         return enriched
     
-    async def _save_to_database(self, startups: List[Dict]) -> Dict:
+    async def _save_to_database(self, startups: List[StartupRecord]) -> Dict:
         """Sauvegarde les startups en base de données"""
-        new_count = 0
-        updated_count = 0
+        counts = await self.database.upsert_startups(startups)
         
-        for startup in startups:
-            try:
-                exists = await self.database.startup_exists(startup['name'])
-                
-                if exists:
-                    await self.database.update_startup(startup)
-                    updated_count += 1
-                else:
-                    await self.database.create_startup(startup)
-                    new_count += 1
-                    
-            except Exception as e:
-                logger.error(f"❌ Erreur sauvegarde {startup.get('name')}: {e}")
+        # Rattrapage des lignes sans conversion USD (nouvelle version FX, anciennes lignes)
+        await self.database.normalize_funding_usd()
+        
+        return {'new': counts['new'], 'updated': counts['updated'], 'unchanged': counts['unchanged']}
+    
+    async def _ingest_news(self, startups: List[StartupRecord]) -> int:
+        """Persiste les actualités dans startup_news avec leur sentiment précalculé"""
+        with_news = [s for s in startups if s.news or s.news_mention]
+        if not with_news:
+            return 0
+        
+        ids = await self.database.get_startup_ids([s.name for s in with_news])
+        
+        articles = []
+        for startup in with_news:
+            startup_id = ids.get(startup.name)
+            if startup_id:
+                articles.extend(self._news_items(startup, startup_id))
         
-        return {'new': new_count, 'updated': updated_count}
+        if not articles:
+            return 0
+        
+        # Un seul appel vectorisé pour tout le lot
+        texts = [f"{a['title'] or ''} {a['content'] or ''}" for a in articles]
+        scores = await offload('ml.sentiment', len(texts), self.ml_pipeline.analyze_sentiment_batch, texts)
+        for article, score in zip(articles, scores):
+            article['sentiment_score'] = float(score)
+        
+        return await self.database.insert_news_bulk(articles)
+    
+    async def _ingest_funding_rounds(self, startups: List[StartupRecord]) -> int:
+        """Normalise et insère les rounds de financement en un seul lot"""
+        from utils.funding_normalizer import FundingRoundNormalizer
+        
+        normalizer = FundingRoundNormalizer()
+        per_startup = {s.name: normalizer.normalize(s) for s in startups}
+        per_startup = {name: rounds for name, rounds in per_startup.items() if rounds}
+        if not per_startup:
+            return 0
+        
+        ids = await self.database.get_startup_ids(list(per_startup))
+        
+        rounds = []
+        for name, startup_rounds in per_startup.items():
+            if name in ids:
+                for round_data in startup_rounds:
+                    rounds.append({**round_data, 'startup_id': ids[name]})
+        
+        return await self.database.insert_funding_rounds(rounds)
+    
+    def _news_items(self, startup: StartupRecord, startup_id: int) -> List[Dict]:
+        """Normalise les actualités d'une startup (liste 'news' et mention d'article)"""
+        items = []
+        
+        for news in startup.news or []:
+            if isinstance(news, str):
+                news = {'title': news}
+            items.append({
+                'startup_id': startup_id,
+                'title': news.get('title'),
+                'content': news.get('content', ''),
+                'url': news.get('url'),
+                'source': news.get('source', startup.source),
+                'published_at': news.get('published_at')
+            })
+        
+        if not items and startup.news_mention:
+            items.append({
+                'startup_id': startup_id,
+                'title': startup.news_mention,
+                'content': '',
+                'url': startup.source_url,
+                'source': startup.source,
+                'published_at': None
+            })
+        
+        return items
+    
+    async def _save_run_report(self):
+        """Rapport d'instrumentation: fichier JSON dans logs/ et résumé dans collection_logs"""
+        if not self.instrumentation.enabled:
+            return
+        
+        report = self.instrumentation.report()
+        path = self.instrumentation.write_report(str(LOG_DIR))
+        
+        slowest = sorted(report['stages'].items(), key=lambda item: item[1]['seconds_total'], reverse=True)[:3]
+        logger.info("⏱️  Étapes les plus longues: " + ", ".join(
+            f"{name} {stage['seconds_total']:.2f}s" for name, stage in slowest
+        ))
+        logger.info(f"🗄️  Base: {report['db']['round_trips']} allers-retours, "
+                    f"attente pool {report['db']['pool_wait_seconds_total']:.2f}s")
+        logger.info(f"📝 Rapport d'exécution: {path}")
+        
+        try:
+            await self.database.log_collection('full_collection', {
+                'status': 'completed',
+                'collected': self.stats['total_collected'],
+                'errors': self.stats['failed'],
+                'started_at': self.stats['start_time'],
+                'completed_at': self.stats['end_time'],
+                'details': report
+            })
+        except Exception as e:
+            logger.warning(f"⚠️  Rapport non enregistré dans collection_logs: {e}")
     
     def _print_final_report(self):
         """Affiche le rapport final"""
@@ -218,20 +339,25 @@ class DataCollectionOrchestrator:
         logger.info(f"📈 Total collecté: {self.stats['total_collected']}")
         logger.info(f"🆕 Nouvelles startups: {self.stats['new_startups']}")
         logger.info(f"🔄 Startups mises à jour: {self.stats['updated_startups']}")
+        logger.info(f"⏸️  Startups inchangées: {self.stats['unchanged_startups']}")
         logger.info(f"❌ Échecs: {self.stats['failed']}")
         logger.info(f"✅ Taux de succès: {((self.stats['total_collected'] - self.stats['failed']) / max(self.stats['total_collected'], 1) * 100):.1f}%")
         logger.info("=" * 80)
 
 
 async def main():
-    """Point d'entrée principal"""
+    """Point d'entrée principal (--profile: profil d'exécution écrit dans logs/)"""
     orchestrator = DataCollectionOrchestrator()
+    profiler = Profiler(str(LOG_DIR)) if profiling_requested() else None
+    loop_monitor = start_loop_monitor()
     
     try:
+        if profiler:
+            await profiler.start()
         await orchestrator.initialize()
         await orchestrator.run_full_collection()
         logger.info("✅ Collecte terminée avec succès!")
-        
+    
     except KeyboardInterrupt:
         logger.info("⚠️  Collecte interrompue par l'utilisateur")
     except Exception as e:
@@ -239,6 +365,10 @@ async def main():
     finally:
         if orchestrator.database:
             await orchestrator.database.disconnect()
+        if loop_monitor:
+            loop_monitor.stop()
+        if profiler:
+            profiler.stop()
 
 
 if __name__ == "__main__":
@@ -9,49 +9,81 @@ import asyncio
 from typing import Dict, List, Optional
 import re
 import logging
+import os
+import sys
 from collections import Counter
 
+import numpy as np
+
+# Ajouter le parent directory au path (exécution standalone)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml.model_registry import ModelRegistry, get_registry
+from utils.event_loop import offload
+
 logger = logging.getLogger(__name__)
 
 
 class MLClassificationPipeline:
     """Pipeline ML pour classification et extraction"""
     
-    def __init__(self):
-        self.sector_classifier = SectorClassifier()
+    def __init__(self, registry: Optional[ModelRegistry] = None):
+        self.registry = registry or get_registry()
+        self.sector_classifier = SectorClassifier(self.registry)
         self.entity_extractor = EntityExtractor()
         self.sentiment_analyzer = SentimentAnalyzer()
         self.models_loaded = False
     
     async def load_models(self):
-        """Charge les modèles ML"""
-        logger.info("🤖 Chargement des modèles ML...")
+        """
+        Prépare les modèles ML
+        
+        Les poids ne sont pas désérialisés ici: seuls les manifests du registre
+        sont lus, les tableaux sont mappés en mémoire au premier usage.
+        """
+        logger.info("🤖 Préparation des modèles ML (chargement paresseux)...")
         
-        # Dans une implémentation complète, charger des modèles pré-entraînés
-        # from transformers import pipeline
-        # self.classifier = pipeline("text-classification")
+        self.registry.warm_start([SectorClassifier.MODEL_NAME])
         
         self.models_loaded = True
-        logger.info("✅ Modèles ML chargés")
+        logger.info("✅ Modèles ML prêts")
     
     async def classify_sector(self, description: str, name: str) -> str:
         """Classifie le secteur d'une startup"""
         return await self.sector_classifier.classify(description, name)
     
+    def classify_sector_sync(self, description: str, name: str) -> str:
+        """Variante synchrone (boucles par lot exécutées hors de la boucle asyncio)"""
+        return self.sector_classifier.classify_sync(description, name)
+    
     async def extract_entities(self, text: str) -> Dict:
         """Extrait les entités (founders, tech stack, etc.)"""
         return await self.entity_extractor.extract(text)
     
+    def extract_entities_sync(self, text: str) -> Dict:
+        return self.entity_extractor.extract_sync(text)
+    
     async def analyze_sentiment(self, news_texts: List[str]) -> float:
         """Analyse le sentiment des actualités"""
         return await self.sentiment_analyzer.analyze(news_texts)
+    
+    def analyze_sentiment_batch(self, texts: List[str]) -> np.ndarray:
+        """Score de sentiment par texte pour un lot d'actualités"""
+        return self.sentiment_analyzer.score_batch(texts)
 
 
 class SectorClassifier:
     """Classificateur de secteur basé sur keywords et ML"""
     
-    def __init__(self):
-        # Keywords par secteur (peut être remplacé par un modèle ML entraîné)
+    MODEL_NAME = 'sector_keywords'
+    TIER_WEIGHTS = {'primary': 3, 'secondary': 1}
+    
+    def __init__(self, registry: Optional[ModelRegistry] = None):
+        self.registry = registry
+        self._registry_checked = False
+        self.tier_weights = dict(self.TIER_WEIGHTS)
+        
+        # Keywords par défaut (table exportée vers le registre)
         self.sector_keywords = {
             'fintech': {
                 'primary': ['fintech', 'paiement', 'banking', 'finance', 'monétique',
@@ -105,36 +137,107 @@ class SectorClassifier:
                 'secondary': ['propriété', 'bail', 'locataire', 'agence', 'maison']
             }
         }
+        
+        # Table de scoring: tableaux parallèles (keyword, index du label, poids),
+        # remplacés par les tableaux mappés du registre s'il contient le modèle
+        self._label_names, self._keywords, self._labels, self._weights = \
+            self._compile(self.sector_keywords, self.tier_weights)
+        self._matcher = self._keyword_matcher(self._keywords)
+    
+    # Tokens distincts mémorisés (vidé au-delà: vocabulaire non borné)
+    TOKEN_CACHE_SIZE = 100_000
+    
+    @staticmethod
+    def _keyword_matcher(keywords):
+        """
+        Table de keywords compilée une fois: (keywords sans espace, keywords avec
+        espaces, cache token -> index). Un keyword sans espace n'apparaît qu'à
+        l'intérieur d'un token du texte: chaque token distinct n'est comparé à la
+        table qu'une fois; seuls les keywords de plusieurs mots sont cherchés
+        dans le texte entier.
+        """
+        single, multi = [], []
+        for index, keyword in enumerate(map(str, keywords)):
+            (single if keyword.split() == [keyword] else multi).append((index, keyword))
+        return tuple(single), tuple(multi), {}
+    
+    def _hits(self, text: str) -> set:
+        """Index des keywords présents (sous-chaînes du texte), une fois chacun"""
+        single, multi, cache = self._matcher
+        hits = {index for index, keyword in multi if keyword in text}
+        for token in set(text.split()):
+            token_hits = cache.get(token)
+            if token_hits is None:
+                token_hits = tuple(index for index, keyword in single if keyword in token)
+                if len(cache) >= self.TOKEN_CACHE_SIZE:
+                    cache.clear()
+                cache[token] = token_hits
+            hits.update(token_hits)
+        return hits
+    
+    @staticmethod
+    def _compile(keywords_by_label: Dict[str, Dict[str, List[str]]], tier_weights: Dict[str, float]):
+        """Même disposition que ModelRegistry.save_keyword_table, en mémoire"""
+        label_names = list(keywords_by_label)
+        keywords, labels, weights = [], [], []
+        for index, label in enumerate(label_names):
+            for tier, words in keywords_by_label[label].items():
+                keywords.extend(words)
+                labels.extend([index] * len(words))
+                weights.extend([tier_weights.get(tier, 1.0)] * len(words))
+        return (label_names, np.array(keywords, dtype=str),
+                np.array(labels, dtype=np.int16), np.array(weights, dtype=np.float32))
+    
+    def _load_from_registry(self):
+        """
+        Remplace la table par défaut par celle du registre (une seule fois)
+        
+        Les tableaux restent ceux de np.load(mmap_mode='r'): le scoring les indexe
+        directement, sans copie par processus; les pages restent partagées entre
+        workers via le page cache.
+        """
+        self._registry_checked = True
+        if self.registry is None:
+            return
+        
+        model = self.registry.get(self.MODEL_NAME)
+        if model is None:
+            return
+        
+        self._label_names = list(model.metadata.get('label_names', []))
+        self.tier_weights = dict(model.metadata.get('tier_weights', self.TIER_WEIGHTS))
+        self._keywords = model.array('keywords')
+        self._labels = model.array('labels')
+        self._weights = model.array('weights')
+        self._matcher = self._keyword_matcher(self._keywords)
+        logger.info(f"📦 Keywords sectoriels mappés depuis le registre (v{model.version})")
+    
+    def export_to_registry(self, version: str = '1'):
+        """Sauvegarde la table de keywords par défaut dans le registre"""
+        registry = self.registry or get_registry()
+        registry.save_keyword_table(self.MODEL_NAME, self.sector_keywords, self.tier_weights, version)
     
     async def classify(self, description: str, name: str = '') -> str:
         """Classifie le secteur"""
+        return self.classify_sync(description, name)
+    
+    def classify_sync(self, description: str, name: str = '') -> str:
+        """Classifie le secteur (somme des poids des keywords présents, par secteur)"""
+        if not self._registry_checked:
+            self._load_from_registry()
+        
         text = f"{name} {description}".lower()
         
-        # Calcul du score par secteur
-        scores = {}
-        
-        for sector, keywords in self.sector_keywords.items():
-            score = 0
-            
-            # Primary keywords (poids 3)
-            for keyword in keywords['primary']:
-                if keyword in text:
-                    score += 3
-            
-            # Secondary keywords (poids 1)
-            for keyword in keywords['secondary']:
-                if keyword in text:
-                    score += 1
-            
-            scores[sector] = score
-        
-        # Retourner le secteur avec le score le plus élevé
-        if scores:
-            best_sector = max(scores.items(), key=lambda x: x[1])
-            if best_sector[1] > 0:
-                return best_sector[0]
-        
-        return 'other'
+        hits = self._hits(text)
+        if not hits:
+            return 'other'
+        
+        hits = np.fromiter(hits, dtype=np.intp, count=len(hits))
+        scores = np.bincount(self._labels[hits], weights=self._weights[hits],
+                             minlength=len(self._label_names))
+        # argmax: premier secteur en cas d'égalité (ordre de la table)
+        best = int(scores.argmax())
+        return self._label_names[best] if scores[best] > 0 else 'other'
     
     def classify_with_ml(self, description: str):
         """
@@ -154,6 +257,9 @@ class EntityExtractor:
     
     async def extract(self, text: str) -> Dict:
         """Extrait les entités depuis le texte"""
+        return self.extract_sync(text)
+    
+    def extract_sync(self, text: str) -> Dict:
         entities = {
             'founders': self._extract_founders(text),
             'technologies': self._extract_technologies(text),
@@ -244,6 +350,9 @@ class EntityExtractor:
 class SentimentAnalyzer:
     """Analyseur de sentiment pour les actualités"""
     
+    # Tokens distincts mémorisés (vidé au-delà: vocabulaire non borné)
+    TOKEN_CACHE_SIZE = 100_000
+    
     def __init__(self):
         # Dictionnaire de mots positifs/négatifs en français
         self.positive_words = [
@@ -255,35 +364,95 @@ class SentimentAnalyzer:
             'échec', 'problème', 'difficulté', 'crise', 'faillite',
             'licenciement', 'perte', 'baisse', 'retard', 'risque'
         ]
+        
+        # Lexiques figés une fois; correspondances mémorisées par token
+        self._positive = frozenset(self.positive_words)
+        self._negative = frozenset(self.negative_words)
+        self._token_matches: Dict[str, tuple] = {}
+    
+    def _matches(self, token: str) -> tuple:
+        """(positifs, négatifs): mots du lexique contenus dans le token, calculés une fois par token"""
+        matches = self._token_matches.get(token)
+        if matches is None:
+            matches = (
+                frozenset(word for word in self._positive if word in token),
+                frozenset(word for word in self._negative if word in token),
+            )
+            if len(self._token_matches) >= self.TOKEN_CACHE_SIZE:
+                self._token_matches.clear()
+            self._token_matches[token] = matches
+        return matches
+    
+    def score_batch(self, texts: List[str]) -> np.ndarray:
+        """Score de sentiment par texte, entre -1 et 1"""
+        return np.clip(self._raw_scores(texts), -1, 1)
+    
+    def _raw_scores(self, texts: List[str]) -> np.ndarray:
+        """
+        Scores non bornés ((positifs - négatifs) / mots * 10)
+        
+        Même règle que le score historique: un mot du lexique compte (une fois)
+        dès qu'il apparaît comme sous-chaîne du texte, formes fléchies et mots
+        composés inclus ("croissances", "sous-performant"); mots = split().
+        Les mots du lexique n'ont pas d'espace: une sous-chaîne tient dans un
+        seul token. Chaque texte est donc découpé une fois, et chaque token
+        distinct n'est comparé au lexique qu'une fois (cache de frozensets).
+        """
+        n = len(texts)
+        positive = np.zeros(n, dtype=np.float64)
+        negative = np.zeros(n, dtype=np.float64)
+        words = np.ones(n, dtype=np.float64)
+        
+        cache, matches = self._token_matches, self._matches
+        
+        for i, text in enumerate(texts):
+            if not text:
+                continue
+            tokens = text.lower().split()
+            found_positive, found_negative = set(), set()
+            for token in set(tokens):
+                token_positive, token_negative = cache.get(token) or matches(token)
+                if token_positive:
+                    found_positive |= token_positive
+                if token_negative:
+                    found_negative |= token_negative
+            positive[i] = len(found_positive)
+            negative[i] = len(found_negative)
+            words[i] = max(len(tokens), 1)
+        
+        return (positive - negative) / words * 10
+    
+    def score_grouped(self, group_ids: List[int], texts: List[str]) -> Dict[int, float]:
+        """
+        Sentiment moyen par groupe (ex: startup_id) en un seul passage,
+        pour scorer les actualités de nombreuses startups d'un coup (backfills)
+        """
+        if not texts:
+            return {}
+        
+        scores = self._raw_scores(texts)
+        unique_ids, inverse = np.unique(np.asarray(group_ids), return_inverse=True)
+        sums = np.bincount(inverse, weights=scores)
+        counts = np.bincount(inverse)
+        means = np.clip(sums / counts, -1, 1)
+        
+        return {int(gid): float(mean) for gid, mean in zip(unique_ids, means)}
     
     async def analyze(self, texts: List[str]) -> float:
         """
         Analyse le sentiment
         Retourne un score entre -1 (très négatif) et 1 (très positif)
+        
+        Les gros lots sont tokenisés hors de la boucle asyncio (seuil 'ml.sentiment')
         """
+        return await offload('ml.sentiment', len(texts or []), self.analyze_sync, texts)
+    
+    def analyze_sync(self, texts: List[str]) -> float:
         if not texts:
             return 0.0
         
-        total_score = 0
-        total_words = 0
-        
-        for text in texts:
-            text_lower = text.lower()
-            
-            # Compter mots positifs et négatifs
-            positive_count = sum(1 for word in self.positive_words if word in text_lower)
-            negative_count = sum(1 for word in self.negative_words if word in text_lower)
-            
-            # Score pour ce texte
-            score = (positive_count - negative_count) / max(len(text.split()), 1)
-            total_score += score
-            total_words += 1
-        
         # Score moyen normalisé
-        avg_score = total_score / max(total_words, 1)
-        
-        # Normaliser entre -1 et 1
-        return max(-1, min(1, avg_score * 10))
+        return float(np.clip(self._raw_scores(texts).mean(), -1, 1))
 
 
 # Test
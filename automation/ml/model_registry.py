@@ -0,0 +1,177 @@
+# ml/model_registry.py
+"""
+Model Registry
+==============
+Stockage des modèles ML (poids et tables de keywords) dans un format
+mappable en mémoire, avec chargement paresseux au premier usage.
+
+Format sur disque (un répertoire par modèle):
+    <MODEL_DIR>/<name>/manifest.json   # version, métadonnées, liste des tableaux
+    <MODEL_DIR>/<name>/<array>.npy     # tableaux numpy (chargés avec mmap_mode='r')
+
+Les tableaux sont ouverts en lecture seule via mmap: les processus workers
+partagent les mêmes pages du page cache au lieu de garder chacun une copie.
+"""
+
+import json
+import logging
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_DIR = Path(__file__).parent.parent / 'data' / 'models'
+MANIFEST_FILE = 'manifest.json'
+
+
+class StoredModel:
+    """Modèle enregistré: manifest lu immédiatement, tableaux mappés à la demande"""
+    
+    def __init__(self, path: Path, manifest: Dict):
+        self.path = path
+        self.name = manifest['name']
+        self.version = manifest.get('version', '0')
+        self.metadata = manifest.get('metadata', {})
+        self._array_files = manifest.get('arrays', {})
+        self._arrays = {}
+    
+    def array(self, key: str) -> np.ndarray:
+        """Retourne un tableau en lecture seule (mmap, pas de copie)"""
+        if key not in self._arrays:
+            if key not in self._array_files:
+                raise KeyError(f"Tableau '{key}' absent du modèle {self.name}")
+            self._arrays[key] = np.load(self.path / self._array_files[key], mmap_mode='r')
+        return self._arrays[key]
+    
+    def array_names(self) -> List[str]:
+        return list(self._array_files)
+
+
+class ModelRegistry:
+    """Registre de modèles mappés en mémoire, partagé par tout le processus"""
+    
+    def __init__(self, model_dir: Optional[str] = None):
+        self.model_dir = Path(model_dir or os.getenv('MODEL_DIR', DEFAULT_MODEL_DIR))
+        self._models: Dict[str, StoredModel] = {}
+        self._lock = threading.Lock()
+    
+    def has_model(self, name: str) -> bool:
+        return (self.model_dir / name / MANIFEST_FILE).exists()
+    
+    def get(self, name: str) -> Optional[StoredModel]:
+        """Charge le manifest au premier appel; None si le modèle n'existe pas"""
+        model = self._models.get(name)
+        if model is not None:
+            return model
+        
+        with self._lock:
+            if name in self._models:
+                return self._models[name]
+            
+            manifest_path = self.model_dir / name / MANIFEST_FILE
+            if not manifest_path.exists():
+                return None
+            
+            with open(manifest_path, encoding='utf-8') as f:
+                manifest = json.load(f)
+            
+            model = StoredModel(manifest_path.parent, manifest)
+            self._models[name] = model
+            logger.info(f"📦 Modèle '{name}' v{model.version} enregistré (chargement paresseux)")
+            return model
+    
+    def save(self, name: str, arrays: Dict[str, np.ndarray],
+             metadata: Optional[Dict] = None, version: str = '1') -> Path:
+        """
+        Enregistre un modèle de manière atomique (répertoire temporaire puis rename)
+        pour qu'un worker ne lise jamais un modèle à moitié écrit
+        """
+        target = self.model_dir / name
+        tmp = self.model_dir / f'.{name}.tmp'
+        if tmp.exists():
+            shutil.rmtree(tmp)
+        tmp.mkdir(parents=True)
+        
+        array_files = {}
+        for key, value in arrays.items():
+            filename = f'{key}.npy'
+            np.save(tmp / filename, np.ascontiguousarray(value), allow_pickle=False)
+            array_files[key] = filename
+        
+        manifest = {
+            'name': name,
+            'version': version,
+            'arrays': array_files,
+            'metadata': metadata or {}
+        }
+        with open(tmp / MANIFEST_FILE, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        
+        if target.exists():
+            shutil.rmtree(target)
+        os.replace(tmp, target)
+        
+        with self._lock:
+            self._models.pop(name, None)
+        
+        logger.info(f"💾 Modèle '{name}' v{version} sauvegardé dans {target}")
+        return target
+    
+    def save_keyword_table(self, name: str, keywords_by_label: Dict[str, Dict[str, List[str]]],
+                           tier_weights: Dict[str, float], version: str = '1') -> Path:
+        """
+        Sérialise une table de keywords {label: {tier: [keywords]}} en tableaux
+        parallèles (keyword, label, poids) mappables en mémoire
+        """
+        labels = list(keywords_by_label)
+        keywords, label_idx, weights = [], [], []
+        
+        for i, label in enumerate(labels):
+            for tier, words in keywords_by_label[label].items():
+                for word in words:
+                    keywords.append(word)
+                    label_idx.append(i)
+                    weights.append(tier_weights.get(tier, 1.0))
+        
+        return self.save(
+            name,
+            {
+                'keywords': np.array(keywords, dtype=str),
+                'labels': np.array(label_idx, dtype=np.int16),
+                'weights': np.array(weights, dtype=np.float32)
+            },
+            metadata={'kind': 'keyword_table', 'label_names': labels, 'tier_weights': tier_weights},
+            version=version
+        )
+    
+    def warm_start(self, names: List[str]):
+        """Lit les manifests (sans toucher aux poids) pour éviter la latence au premier appel"""
+        for name in names:
+            self.get(name)
+
+
+_registry: Optional[ModelRegistry] = None
+
+
+def get_registry() -> ModelRegistry:
+    """Registre par défaut du processus (créé au premier appel)"""
+    global _registry
+    if _registry is None:
+        _registry = ModelRegistry()
+    return _registry
+
+
+def init_worker(model_dir: Optional[str] = None, warm: Optional[List[str]] = None):
+    """
+    Initializer pour ProcessPoolExecutor: chaque worker ouvre les mêmes fichiers
+    en mmap, donc les poids restent partagés via le page cache de l'OS
+    """
+    global _registry
+    _registry = ModelRegistry(model_dir)
+    if warm:
+        _registry.warm_start(warm)
@@ -8,6 +8,15 @@ Scoring prédictif basé sur ML pour évaluer le potentiel des startups
 import numpy as np
 from typing import Dict, List
 import logging
+import os
+import sys
+
+# Ajouter le parent directory au path (exécution standalone)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.categories import get_categories
+from utils.fx_rates import get_fx_table
+from utils.startup_record import StartupRecord
 
 logger = logging.getLogger(__name__)
 
@@ -41,8 +50,37 @@ class MLScoringEngine:
             'proptech': 70,
             'other': 50
         }
+        
+        # Indicateur de revenus par stage (startups sans revenue déclaré)
+        self.stage_revenue_scores = {
+            'Series A': 60,
+            'Seed': 40
+        }
+        
+        # Tables indexées par code de catégorie, reconstruites si le vocabulaire grandit
+        self.categories = get_categories()
+        self._sector_hotness = []
+        self._stage_revenue = []
+    
+    def _sector_hotness_of(self, sector: str) -> int:
+        code = self.categories['sector'].encode(sector or 'other')
+        if code >= len(self._sector_hotness):
+            self._sector_hotness = self.categories['sector'].lookup(self.sector_scores, 50)
+        return self._sector_hotness[code]
+    
+    def _stage_revenue_of(self, stage: str) -> int:
+        code = self.categories['stage'].encode(stage)
+        if code is None:
+            return 20
+        if code >= len(self._stage_revenue):
+            self._stage_revenue = self.categories['stage'].lookup(self.stage_revenue_scores, 20)
+        return self._stage_revenue[code]
+    
+    async def predict_score(self, startup: StartupRecord) -> int:
+        """Prédit le score d'une startup (0-100), voir predict_score_sync"""
+        return self.predict_score_sync(startup)
     
-    async def predict_score(self, startup: Dict) -> int:
+    def predict_score_sync(self, startup: StartupRecord) -> int:
         """
         Prédit le score d'une startup (0-100)
         
@@ -60,14 +98,18 @@ class MLScoringEngine:
         
         return int(normalized_score)
     
-    def _extract_features(self, startup: Dict) -> Dict:
-        """Extrait les features pour le scoring"""
+    def _extract_features(self, startup: StartupRecord) -> Dict:
+        """Extrait les features pour le scoring (alias déjà résolus par StartupRecord)"""
+        startup = StartupRecord.coerce(startup)
         features = {}
         
-        # Feature 1: Funding amount (normalisé)
-        funding = startup.get('funding_raised', startup.get('fundingRaised', 0))
-        if isinstance(funding, str):
-            funding = self._parse_amount(funding)
+        # Feature 1: Funding amount (normalisé, en USD)
+        funding = startup.funding_raised_usd
+        if funding is None:
+            funding = startup.funding_raised or 0
+            if isinstance(funding, str):
+                funding = self._parse_amount(funding)
+            funding = get_fx_table().to_usd(funding, startup.funding_currency) or 0
         
         # Normaliser funding (log scale)
         if funding > 0:
@@ -76,38 +118,42 @@ class MLScoringEngine:
             features['funding_amount'] = 0
         
         # Feature 2: Team size
-        employees = startup.get('employees', startup.get('team_size', 5))
+        employees = startup.employees if startup.employees is not None else 5
         features['team_size'] = min(100, (employees / 100) * 100)
         
         # Feature 3: Company age
-        founded = startup.get('founded_year', startup.get('foundedYear', 2023))
+        founded = startup.founded_year if startup.founded_year is not None else 2023
         age = 2025 - founded
         features['founded_years'] = min(100, (age / 10) * 100)
         
         # Feature 4: Sector hotness
-        sector = startup.get('sector', 'other')
-        features['sector_hotness'] = self.sector_scores.get(sector, 50)
+        features['sector_hotness'] = self._sector_hotness_of(startup.sector)
         
         # Feature 5: Media mentions
-        mentions = startup.get('media_mentions', 0)
-        signals = startup.get('signals', {})
-        if signals.get('recent_news'):
+        mentions = startup.media_mentions or 0
+        news_stats = startup.news_stats
+        signals = startup.signals or {}
+        if news_stats:
+            # Agrégats matérialisés de startup_news (fenêtre 90 jours)
+            mentions = max(mentions, news_stats.get('mentions_90d') or 0)
+        elif signals.get('recent_news'):
             mentions += 5
         features['media_mentions'] = min(100, (mentions / 20) * 100)
         
         # Feature 6: Partnerships
-        partnerships = startup.get('partnerships', [])
-        extracted = startup.get('extracted_entities', {})
+        # Copie: la liste du record ne doit pas grossir à chaque scoring
+        partnerships = list(startup.partnerships or [])
+        extracted = startup.extracted_entities
         if extracted:
             partnerships.extend(extracted.get('partnerships', []))
         features['partnerships'] = min(100, (len(partnerships) / 5) * 100)
         
         # Feature 7: Government support
-        gov_support = startup.get('government_support') or startup.get('officially_registered')
+        gov_support = startup.government_support or startup.officially_registered
         features['government_support'] = 80 if gov_support else 30
         
         # Feature 8: Revenue indicators
-        revenue = startup.get('revenue', 0)
+        revenue = startup.revenue or 0
         if isinstance(revenue, str):
             revenue = self._parse_amount(revenue)
         
@@ -115,12 +161,7 @@ class MLScoringEngine:
             features['revenue_indicators'] = min(100, (np.log10(revenue + 1) / np.log10(5000000)) * 100)
         else:
             # Pas de revenue, regarder d'autres signaux
-            if startup.get('stage') == 'Series A':
-                features['revenue_indicators'] = 60
-            elif startup.get('stage') == 'Seed':
-                features['revenue_indicators'] = 40
-            else:
-                features['revenue_indicators'] = 20
+            features['revenue_indicators'] = self._stage_revenue_of(startup.stage)
         
         return features
     
@@ -63,27 +63,28 @@ async def quick_start():
         print("   📝 Installer avec: pip install -r requirements.txt")
         sys.exit(1)
     
-    # Étape 3: Tester connexion PostgreSQL
-    print("\n🔌 Étape 3/5: Test connexion PostgreSQL...")
+    # Étape 3: Tester la base de données (PostgreSQL ou SQLite selon DB_BACKEND)
+    print("\n🔌 Étape 3/5: Test base de données...")
     
     try:
-        from database.db_manager import DatabaseManager
+        from database.backends import create_database_manager
         
-        db = DatabaseManager()
+        db = create_database_manager()
         await db.connect()
         
         # Tester requête simple
         stats = await db.get_stats()
         
-        print(f"   ✅ Connexion PostgreSQL OK")
+        print(f"   ✅ Connexion base OK (backend {db.backend})")
         print(f"   📊 Startups en base: {stats.get('total_startups', 0)}")
         
         await db.disconnect()
         
     except Exception as e:
-        print(f"   ⚠️  Connexion PostgreSQL échouée: {e}")
+        print(f"   ⚠️  Connexion base de données échouée: {e}")
         print("   📝 Vérifier que PostgreSQL est lancé et .env configuré")
         print("   💡 Ou utiliser Docker: docker-compose up -d postgres")
+        print("   💡 Ou sans serveur: DB_BACKEND=sqlite (fichier local SQLITE_PATH)")
     
     # Étape 4: Test collecteur (mode démo)
     print("\n🎯 Étape 4/5: Test collecteur...")
@@ -16,7 +16,13 @@ import os
 # Ajouter le parent directory au path
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from main_orchestrator import DataCollectionOrchestrator
+from main_orchestrator import DataCollectionOrchestrator, LOG_DIR
+from database.maintenance import DatabaseMaintenance
+from scheduler.job_coordinator import JobCoordinator
+from scheduler.recrawl import QuickUpdater
+from utils.event_loop import start_loop_monitor
+from utils.instrumentation import start_metrics_server
+from utils.profiler import Profiler, profiling_requested
 
 logging.basicConfig(
     level=logging.INFO,
@@ -32,19 +38,32 @@ class AutoCollectionScheduler:
     Schedules configurés:
     - Collecte complète: Dimanche à 3h du matin (hebdomadaire)
     - Collecte incrémentale: Tous les jours à 2h du matin
-    - Actualisation rapide: Toutes les 6 heures (news, updates)
+    - Actualisation rapide: Toutes les 6 heures (re-crawl des startups prioritaires)
+    
+    Chaque job passe par le JobCoordinator (verrou par famille, priorité):
+    les jobs lourds ne se chevauchent pas, y compris entre réplicas.
     """
     
     def __init__(self):
-        self.scheduler = AsyncIOScheduler()
+        # Déclenchements manqués regroupés en un seul, jamais deux instances d'un même job
+        self.scheduler = AsyncIOScheduler(job_defaults={'coalesce': True, 'max_instances': 1})
         self.orchestrator = None
+        self.coordinator = None
         self.is_running = False
+        self.metrics_port = int(os.getenv('METRICS_PORT', 0))
+        self.metrics_runner = None
     
     async def initialize(self):
         """Initialize l'orchestrateur"""
         logger.info("🚀 Initialisation du scheduler automatique...")
         self.orchestrator = DataCollectionOrchestrator()
         await self.orchestrator.initialize()
+        self.coordinator = JobCoordinator(self.orchestrator.database)
+        
+        # Endpoint Prometheus (/metrics) du dernier run
+        if self.metrics_port and self.orchestrator.instrumentation.enabled:
+            self.metrics_runner = await start_metrics_server(self.metrics_port)
+        
         logger.info("✅ Scheduler initialisé")
     
     def setup_schedules(self):
@@ -52,41 +71,45 @@ class AutoCollectionScheduler:
         
         # Collecte complète hebdomadaire (Dimanche 3h)
         self.scheduler.add_job(
-            self.run_full_collection,
+            self.coordinator.wrap('full_collection_weekly', self.run_full_collection),
             trigger=CronTrigger(day_of_week='sun', hour=3, minute=0),
             id='full_collection_weekly',
             name='Collecte Complète Hebdomadaire',
-            replace_existing=True
+            replace_existing=True,
+            **self.coordinator.job_options('full_collection_weekly')
         )
         logger.info("📅 Collecte complète programmée: Dimanche 3h00")
         
         # Collecte incrémentale quotidienne (2h)
         self.scheduler.add_job(
-            self.run_incremental_collection,
+            self.coordinator.wrap('incremental_daily', self.run_incremental_collection),
             trigger=CronTrigger(hour=2, minute=0),
             id='incremental_daily',
             name='Collecte Incrémentale Quotidienne',
-            replace_existing=True
+            replace_existing=True,
+            **self.coordinator.job_options('incremental_daily')
         )
         logger.info("📅 Collecte incrémentale programmée: Tous les jours 2h00")
         
         # Actualisation rapide (toutes les 6h)
         self.scheduler.add_job(
-            self.run_quick_update,
+            self.coordinator.wrap('quick_update', self.run_quick_update),
             trigger=CronTrigger(hour='*/6'),
             id='quick_update',
             name='Actualisation Rapide',
-            replace_existing=True
+            replace_existing=True,
+            **self.coordinator.job_options('quick_update')
         )
         logger.info("📅 Actualisation rapide programmée: Toutes les 6h")
         
         # Nettoyage base de données (Samedi 1h)
         self.scheduler.add_job(
-            self.run_database_cleanup,
+            self.coordinator.wrap('db_cleanup_weekly', self.run_database_cleanup),
             trigger=CronTrigger(day_of_week='sat', hour=1, minute=0),
             id='db_cleanup_weekly',
             name='Nettoyage Base de Données',
-            replace_existing=True
+            replace_existing=True,
+            **self.coordinator.job_options('db_cleanup_weekly')
         )
         logger.info("📅 Nettoyage DB programmé: Samedi 1h00")
     
@@ -130,27 +153,28 @@ class AutoCollectionScheduler:
             cleaner = DataCleaner()
             cleaned = await cleaner.process(all_startups)
             
-            # Sauvegarder
-            for startup in cleaned:
-                exists = await self.orchestrator.database.startup_exists(startup['name'])
-                if exists:
-                    await self.orchestrator.database.update_startup(startup)
-                else:
-                    await self.orchestrator.database.create_startup(startup)
+            # Sauvegarder (les startups à l'empreinte inchangée ne sont pas réécrites)
+            counts = await self.orchestrator.database.upsert_startups(cleaned)
+            changed = counts['new'] + counts['updated']
             
-            logger.info(f"✅ Collecte incrémentale: {len(cleaned)} startups traitées")
+            # Faire glisser les fenêtres 30/90/365j des agrégats d'actualités
+            await self.orchestrator.database.roll_news_windows()
             
+            logger.info(f"✅ Collecte incrémentale: {len(cleaned)} startups traitées, {changed} nouvelles ou modifiées")
+        
         except Exception as e:
             logger.error(f"❌ Erreur collecte incrémentale: {e}", exc_info=True)
     
     async def run_quick_update(self):
-        """Actualisation rapide (news, updates)"""
+        """Actualisation rapide: actualités des startups prioritaires (scheduler/recrawl.py)"""
         logger.info("⚡ Actualisation rapide...")
         
         try:
-            # Collecter uniquement les news/updates
-            # Implementation simplifiée
-            logger.info("✅ Actualisation rapide terminée")
+            updater = QuickUpdater(self.orchestrator.database, self.orchestrator.ml_pipeline)
+            stats = await updater.run()
+            details = stats['details']
+            logger.info(f"✅ Actualisation rapide terminée: {details['refreshed']}/{details['selected']} "
+                        f"startups vérifiées, {stats['collected']} actualités")
         except Exception as e:
             logger.error(f"❌ Erreur actualisation: {e}")
     
@@ -159,17 +183,20 @@ class AutoCollectionScheduler:
         logger.info("🧹 Nettoyage base de données...")
         
         try:
-            async with self.orchestrator.database.pool.acquire() as conn:
-                # Supprimer les doublons
-                await conn.execute("""
-                    DELETE FROM startups a USING startups b
-                    WHERE a.id > b.id AND a.name = b.name
-                """)
-                
-                # Vacuum (PostgreSQL optimization)
-                # Note: Nécessite connexion autocommit
-                
-                logger.info("✅ Nettoyage terminé")
+            # Payloads bruts qui ne sont plus référencés (rétention)
+            await self.orchestrator.database.purge_raw_payloads()
+            
+            # Partitions mensuelles: mois à venir et rétention
+            await self.orchestrator.database.maintain_partitions()
+            
+            # VACUUM/ANALYZE des tables modifiées, index gonflés, rapport dans collection_logs
+            # (name est UNIQUE: plus de doublons à supprimer)
+            if self.orchestrator.database.backend == 'sqlite':
+                await self.orchestrator.database.optimize()
+            else:
+                await DatabaseMaintenance(self.orchestrator.database).run()
+            
+            logger.info("✅ Nettoyage terminé")
         except Exception as e:
             logger.error(f"❌ Erreur nettoyage: {e}")
     
@@ -184,7 +211,7 @@ class AutoCollectionScheduler:
         
         # Afficher les jobs programmés
         jobs = self.scheduler.get_jobs()
-        logger.info(f"📋 {len(jobs)} tâches programmées:")
+        logger.info(f"📋 {len(jobs)} tâches programmées (réplica {self.coordinator.replica}):")
         for job in jobs:
             logger.info(f"  - {job.name}: {job.next_run_time}")
         
@@ -205,7 +232,16 @@ async def main():
     """Point d'entrée principal"""
     scheduler = AutoCollectionScheduler()
     
+    # Profil de toute la durée de vie du scheduler, écrit à l'arrêt
+    profiler = Profiler(str(LOG_DIR)) if profiling_requested() else None
+    
+    # Retard de la boucle et blocages (jobs APScheduler, requêtes HTTP concurrentes)
+    loop_monitor = start_loop_monitor()
+    
     try:
+        if profiler:
+            await profiler.start()
+        
         # Initialiser
         await scheduler.initialize()
         
@@ -219,7 +255,7 @@ async def main():
         import sys
         if '--run-now' in sys.argv:
             logger.info("🚀 Exécution immédiate d'une collecte complète...")
-            await scheduler.run_full_collection()
+            await scheduler.coordinator.run('full_collection_weekly', scheduler.run_full_collection)
         
         # Garder le programme en vie
         try:
@@ -233,8 +269,14 @@ async def main():
     
     finally:
         scheduler.stop()
+        if scheduler.metrics_runner:
+            await scheduler.metrics_runner.cleanup()
         if scheduler.orchestrator and scheduler.orchestrator.database:
             await scheduler.orchestrator.database.disconnect()
+        if loop_monitor:
+            loop_monitor.stop()
+        if profiler:
+            profiler.stop()
 
 
 if __name__ == "__main__":
@@ -242,5 +284,6 @@ if __name__ == "__main__":
     Usage:
         python scheduler/auto_collector.py              # Mode scheduler
         python scheduler/auto_collector.py --run-now    # + collecte immédiate
+        python scheduler/auto_collector.py --profile    # + profil (logs/profile_*) à l'arrêt
     """
     asyncio.run(main())
@@ -0,0 +1,317 @@
+# scheduler/job_coordinator.py
+"""
+Job Coordinator
+===============
+Coordination des jobs du scheduler (un ou plusieurs réplicas):
+
+- familles de jobs: les jobs lourds (collecte complète, incrémentale,
+  nettoyage DB) partagent la famille 'database' et ne tournent jamais en
+  même temps; l'actualisation rapide a sa propre famille
+- verrou par famille: advisory lock PostgreSQL (une session dédiée hors pool
+  par tentative, réutilisée pendant l'attente et la détention),
+  libéré automatiquement par le serveur si le réplica meurt; backend SQLite:
+  verrou de fichier (fcntl) à côté de la base
+- priorité: un job occupé attend le verrou au plus max_wait secondes, et
+  passe après les jobs de priorité supérieure en attente dans le processus;
+  max_wait = 0: le job est abandonné si la famille est occupée (ex.
+  incrémentale pendant la collecte complète, qui la couvre)
+- réplicas: le détenteur du verrou est identifié (application_name de la
+  session, contenu du fichier de verrou); si un autre réplica exécute déjà le
+  même job, l'occurrence locale est abandonnée au lieu d'être rejouée après lui
+- APScheduler: coalesce (une seule exécution pour des déclenchements
+  manqués), max_instances=1 et misfire_grace_time par job
+
+La priorité n'est appliquée qu'entre jobs d'un même processus: entre
+réplicas, le premier qui obtient le verrou passe.
+"""
+
+import asyncio
+import itertools
+import logging
+import os
+import socket
+import sys
+import time
+import zlib
+from typing import Awaitable, Callable, Dict, Optional
+
+import asyncpg
+
+try:
+    import fcntl
+except ImportError:  # Windows: verrou limité au processus
+    fcntl = None
+
+# Ajouter le parent directory au path (exécution standalone)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+logger = logging.getLogger(__name__)
+
+
+# family: verrou partagé; priority: ordre de passage; max_wait: attente du verrou (s);
+# misfire_grace_time: retard de déclenchement toléré par APScheduler (s)
+JOB_POLICIES = {
+    'full_collection_weekly': {'family': 'database', 'priority': 30, 'max_wait': 3 * 3600, 'misfire_grace_time': 6 * 3600},
+    'db_cleanup_weekly': {'family': 'database', 'priority': 20, 'max_wait': 2 * 3600, 'misfire_grace_time': 4 * 3600},
+    'incremental_daily': {'family': 'database', 'priority': 10, 'max_wait': 0, 'misfire_grace_time': 3600},
+    'quick_update': {'family': 'quick', 'priority': 0, 'max_wait': 0, 'misfire_grace_time': 1800},
+}
+
+DEFAULT_POLICY = {'family': 'default', 'priority': 0, 'max_wait': 0, 'misfire_grace_time': 600}
+
+# Espace de clés des advisory locks de l'application (32 bits hauts de la clé bigint)
+ADVISORY_LOCK_NAMESPACE = 0x5643
+
+APPLICATION_NAME_PREFIX = 'vcds-job'
+
+
+def advisory_key(family: str) -> int:
+    """Clé bigint stable d'une famille (indépendante de PYTHONHASHSEED)"""
+    return (ADVISORY_LOCK_NAMESPACE << 32) | zlib.crc32(family.encode('utf-8'))
+
+
+def policy_of(job_id: str) -> Dict:
+    return JOB_POLICIES.get(job_id, DEFAULT_POLICY)
+
+
+class PostgresJobLock:
+    """
+    Advisory lock de session par famille, sur une connexion dédiée par tentative
+    
+    Une tentative (un run du coordinateur) ouvre une seule connexion, utilisée
+    pour chaque essai du verrou et chaque lecture du détenteur pendant
+    l'attente, puis pour détenir le verrou jusqu'à release(). Une connexion par
+    tentative et non par famille ni par job: l'advisory lock est réentrant dans
+    une même session, deux tentatives (deux jobs de la même famille, ou deux
+    occurrences du même job) ne peuvent pas la partager.
+    """
+    
+    def __init__(self, db_config: Dict, replica: str):
+        self.db_config = db_config
+        self.replica = replica
+        # Tentative (numéro attribué par JobCoordinator.run) -> connexion
+        self._connections: Dict[int, asyncpg.Connection] = {}
+    
+    async def _connection(self, job_id: str, attempt: int) -> asyncpg.Connection:
+        conn = self._connections.get(attempt)
+        if conn is None or conn.is_closed():
+            # application_name identifie le job détenteur pour les autres réplicas (holder)
+            conn = await asyncpg.connect(
+                **self.db_config,
+                server_settings={'application_name': f"{APPLICATION_NAME_PREFIX}:{job_id}:{self.replica}"[:63]}
+            )
+            self._connections[attempt] = conn
+        return conn
+    
+    async def try_acquire(self, family: str, job_id: str, attempt: int) -> bool:
+        conn = await self._connection(job_id, attempt)
+        return await conn.fetchval("SELECT pg_try_advisory_lock($1::bigint)", advisory_key(family))
+    
+    async def holder(self, family: str, job_id: str, attempt: int) -> Optional[Dict]:
+        """{'job_id', 'replica'} de la session qui détient le verrou (None si libre ou inconnu)"""
+        key = advisory_key(family)
+        conn = await self._connection(job_id, attempt)
+        name = await conn.fetchval("""
+            SELECT a.application_name
+            FROM pg_locks l
+            JOIN pg_stat_activity a ON a.pid = l.pid
+            WHERE l.locktype = 'advisory' AND l.granted
+              AND l.database = (SELECT oid FROM pg_database WHERE datname = current_database())
+              AND l.classid = $1 AND l.objid = $2 AND l.objsubid = 1
+        """, key >> 32, key & 0xFFFFFFFF)
+        return _parse_holder(name)
+    
+    async def close(self, attempt: int):
+        """Fin d'une tentative sans verrou: ferme sa connexion"""
+        conn = self._connections.pop(attempt, None)
+        if conn is not None:
+            await conn.close()
+    
+    async def release(self, family: str, attempt: int):
+        conn = self._connections.pop(attempt, None)
+        if conn is None:
+            return
+        try:
+            if not await conn.fetchval("SELECT pg_advisory_unlock($1::bigint)", advisory_key(family)):
+                logger.warning(f"⚠️  Verrou {family} déjà perdu (connexion interrompue pendant le job?)")
+        except Exception as e:
+            logger.warning(f"⚠️  Libération du verrou {family}: {e} (libéré à la fermeture de la session)")
+        finally:
+            await conn.close()
+
+
+class FileJobLock:
+    """Verrou de fichier par famille (backend SQLite: réplicas sur la même machine)"""
+    
+    def __init__(self, directory: str, replica: str):
+        self.directory = directory
+        self.replica = replica
+        self._files = {}
+        self._local = set()
+    
+    def _path(self, family: str) -> str:
+        return os.path.join(self.directory, f".job_lock_{family}")
+    
+    async def try_acquire(self, family: str, job_id: str, attempt: int) -> bool:
+        if family in self._local:
+            return False
+        if fcntl is None:
+            self._local.add(family)
+            return True
+        
+        os.makedirs(self.directory, exist_ok=True)
+        handle = open(self._path(family), 'a+')
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+        handle.seek(0)
+        handle.truncate()
+        handle.write(f"{APPLICATION_NAME_PREFIX}:{job_id}:{self.replica}")
+        handle.flush()
+        self._files[family] = handle
+        self._local.add(family)
+        return True
+    
+    async def holder(self, family: str, job_id: str, attempt: int) -> Optional[Dict]:
+        try:
+            with open(self._path(family), encoding='utf-8') as f:
+                return _parse_holder(f.read().strip())
+        except FileNotFoundError:
+            return None
+    
+    async def close(self, attempt: int):
+        """Rien à fermer: le fichier n'est ouvert qu'une fois le verrou obtenu"""
+    
+    async def release(self, family: str, attempt: int):
+        self._local.discard(family)
+        handle = self._files.pop(family, None)
+        if handle is not None:
+            handle.seek(0)
+            handle.truncate()
+            fcntl.flock(handle, fcntl.LOCK_UN)
+            handle.close()
+
+
+def _parse_holder(name: Optional[str]) -> Optional[Dict]:
+    if not name or not name.startswith(f"{APPLICATION_NAME_PREFIX}:"):
+        return None
+    _, job_id, replica = name.split(':', 2)
+    return {'job_id': job_id, 'replica': replica}
+
+
+class JobCoordinator:
+    """Exécution des jobs du scheduler sous verrou de famille, par priorité"""
+    
+    def __init__(self, database, replica: str = None, poll_interval: float = None):
+        self.replica = replica or os.getenv('SCHEDULER_REPLICA_ID') or f"{socket.gethostname()}-{os.getpid()}"
+        self.poll_interval = poll_interval or float(os.getenv('JOB_LOCK_POLL_SECONDS', 5))
+        
+        if database.backend == 'postgres':
+            self.lock = PostgresJobLock(database.db_config, self.replica)
+        else:
+            directory = os.path.dirname(os.path.abspath(database.path)) if database.path != ':memory:' \
+                else os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+            self.lock = FileJobLock(directory, self.replica)
+        
+        # Tentatives en attente de verrou dans ce processus: famille -> {tentative: priorité}.
+        # Une tentative par run(): deux occurrences du même job (--run-now et
+        # déclenchement planifié) ne partagent ni leur place ni leur connexion
+        self._attempts = itertools.count(1)
+        self._waiting: Dict[str, Dict[int, int]] = {}
+    
+    def job_options(self, job_id: str) -> Dict:
+        """Options add_job d'APScheduler (coalesce, max_instances, misfire_grace_time)"""
+        return {
+            'coalesce': True,
+            'max_instances': 1,
+            'misfire_grace_time': policy_of(job_id)['misfire_grace_time'],
+        }
+    
+    def wrap(self, job_id: str, func: Callable[[], Awaitable]) -> Callable[[], Awaitable]:
+        """Coroutine à planifier à la place de func"""
+        async def coordinated():
+            return await self.run(job_id, func)
+        coordinated.__name__ = coordinated.__qualname__ = f"coordinated_{job_id}"
+        return coordinated
+    
+    def _outranked(self, family: str, attempt: int, priority: int) -> bool:
+        return any(
+            other_priority > priority
+            for other, other_priority in self._waiting.get(family, {}).items() if other != attempt
+        )
+    
+    async def run(self, job_id: str, func: Callable[[], Awaitable]) -> bool:
+        """Exécute func sous le verrou de la famille du job; False si l'occurrence est abandonnée"""
+        policy = policy_of(job_id)
+        family, priority = policy['family'], policy['priority']
+        deadline = time.monotonic() + policy['max_wait']
+        attempt = next(self._attempts)
+        waiting = self._waiting.setdefault(family, {})
+        waiting[attempt] = priority
+        announced = False
+        acquired = False
+        
+        try:
+            while True:
+                if not self._outranked(family, attempt, priority) and \
+                        await self.lock.try_acquire(family, job_id, attempt):
+                    acquired = True
+                    break
+                
+                holder = await self.lock.holder(family, job_id, attempt)
+                if holder and holder['job_id'] == job_id:
+                    logger.info(f"⏭️  {job_id}: déjà en cours sur {holder['replica']}, occurrence ignorée")
+                    return False
+                
+                if time.monotonic() >= deadline:
+                    running = f"{holder['job_id']} ({holder['replica']})" if holder else 'job prioritaire'
+                    logger.warning(f"⏭️  {job_id}: famille '{family}' occupée par {running}, occurrence abandonnée")
+                    return False
+                
+                if not announced:
+                    logger.info(f"⏳ {job_id}: attente du verrou '{family}' (max {policy['max_wait']:.0f}s)")
+                    announced = True
+                await asyncio.sleep(self.poll_interval)
+        finally:
+            waiting.pop(attempt, None)
+            if not acquired:
+                await self.lock.close(attempt)
+        
+        started = time.perf_counter()
+        logger.info(f"🔒 {job_id}: verrou '{family}' obtenu ({self.replica})")
+        try:
+            await func()
+        finally:
+            await self.lock.release(family, attempt)
+            logger.info(f"🔓 {job_id}: verrou '{family}' libéré après {time.perf_counter() - started:.1f}s")
+        return True
+
+
+# Test
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    
+    async def test():
+        from database.db_manager import DatabaseManager
+        
+        # Deux "réplicas" dans le même processus: un coordinateur chacun
+        database = DatabaseManager()
+        replica_a = JobCoordinator(database, replica='replica-a', poll_interval=0.2)
+        replica_b = JobCoordinator(database, replica='replica-b', poll_interval=0.2)
+        
+        async def job(name: str, seconds: float):
+            logger.info(f"▶️  {name} ({seconds}s)")
+            await asyncio.sleep(seconds)
+        
+        results = await asyncio.gather(
+            replica_a.run('full_collection_weekly', lambda: job('full', 1.0)),
+            replica_b.run('full_collection_weekly', lambda: job('full', 1.0)),   # même job: ignoré
+            replica_b.run('incremental_daily', lambda: job('incremental', 0.1)),  # famille occupée: abandonné
+            replica_b.run('db_cleanup_weekly', lambda: job('cleanup', 0.2)),      # attend la fin de 'full'
+            replica_a.run('quick_update', lambda: job('quick', 0.1)),             # autre famille
+        )
+        print(f"Exécutés: {results}")
+    
+    asyncio.run(test())
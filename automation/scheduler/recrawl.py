@@ -0,0 +1,157 @@
+# scheduler/recrawl.py
+"""
+Re-crawl Queue
+==============
+Actualisation rapide (job quick_update): au lieu de tout recollecter, on ne
+rafraîchit que les startups les plus utiles à revérifier, dans un budget fixe
+de temps et de requêtes.
+
+- candidats: startups actives non vérifiées depuis RECRAWL_MIN_AGE_HOURS
+  (last_crawled_at, à défaut updated_at)
+- priorité, calculée et triée en SQL (get_recrawl_candidates, une
+  traduction par backend): valeur x ancienneté x vélocité
+    valeur     = 0.2 + max(score, predicted_score) / 100
+    ancienneté = âge / RECRAWL_STALENESS_HOURS, plafonnée à 2
+    vélocité   = 1 + log(1 + mentions 30j) + accélération (30j vs moyenne
+                 mensuelle sur 90j, plafonnée à 2)
+- budget: au plus min(RECRAWL_TOP_K, RECRAWL_MAX_REQUESTS) startups, une
+  requête Serper /news chacune, RECRAWL_CONCURRENCY en parallèle, arrêt à
+  RECRAWL_TIME_BUDGET_SECONDS (les requêtes en cours sont annulées)
+- résultat: actualités insérées (sentiment précalculé, dédupliquées par URL)
+  et last_crawled_at horodaté pour les startups effectivement vérifiées; les
+  autres restent en tête de file au prochain passage
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+# Ajouter le parent directory au path (exécution standalone)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from collectors.google_search_collector import GoogleSearchCollector
+from utils.event_loop import offload
+from utils.http_client import create_session
+from utils.instrumentation import get_instrumentation
+
+logger = logging.getLogger(__name__)
+
+
+class QuickUpdater:
+    """Actualisation rapide budgétée des startups prioritaires"""
+    
+    def __init__(self, database, ml_pipeline):
+        self.database = database
+        self.ml_pipeline = ml_pipeline
+        self.collector = GoogleSearchCollector()
+        self.instrumentation = get_instrumentation()
+        
+        self.top_k = int(os.getenv('RECRAWL_TOP_K', 50))
+        self.max_requests = int(os.getenv('RECRAWL_MAX_REQUESTS', 50))
+        self.time_budget = float(os.getenv('RECRAWL_TIME_BUDGET_SECONDS', 900))
+        self.concurrency = int(os.getenv('RECRAWL_CONCURRENCY', 5))
+        self.min_age_hours = float(os.getenv('RECRAWL_MIN_AGE_HOURS', 24))
+        self.staleness_hours = float(os.getenv('RECRAWL_STALENESS_HOURS', 168))
+    
+    async def run(self) -> Dict:
+        """Sélectionne, rafraîchit et horodate les startups prioritaires; retourne les stats"""
+        stats = {
+            'status': 'completed',
+            'collected': 0,
+            'errors': 0,
+            'started_at': datetime.now(),
+            'details': {'selected': 0, 'refreshed': 0, 'requests': 0, 'deferred': 0},
+        }
+        
+        if not self.collector.api_key:
+            logger.warning("⚠️  Actualisation rapide ignorée: SERPER_API_KEY non configurée")
+            stats['status'] = 'skipped'
+            stats['completed_at'] = datetime.now()
+            return stats
+        
+        with self.instrumentation.span('recrawl') as span:
+            # Déjà triés par priorité décroissante
+            selected = await self.database.get_recrawl_candidates(
+                datetime.now() - timedelta(hours=self.min_age_hours),
+                min(self.top_k, self.max_requests), self.staleness_hours
+            )
+            stats['details']['selected'] = len(selected)
+            span.records = len(selected)
+            
+            if selected:
+                logger.info(f"⚡ Re-crawl: {len(selected)} startups "
+                            f"(priorité {selected[0]['priority']:.2f} → {selected[-1]['priority']:.2f}, "
+                            f"budget {self.time_budget:.0f}s)")
+                await self._refresh(selected, stats)
+        
+        stats['completed_at'] = datetime.now()
+        await self.database.log_collection('quick_update', stats)
+        return stats
+    
+    async def _refresh(self, selected: List[Dict], stats: Dict):
+        details = stats['details']
+        semaphore = asyncio.Semaphore(self.concurrency)
+        deadline = time.monotonic() + self.time_budget
+        results: Dict[int, List[Dict]] = {}
+        
+        async def fetch(session, candidate: Dict):
+            async with semaphore:
+                if time.monotonic() >= deadline:
+                    return
+                details['requests'] += 1
+                try:
+                    results[candidate['id']] = await self.collector.search_news(session, candidate['name'])
+                except Exception as e:
+                    stats['errors'] += 1
+                    logger.debug(f"Re-crawl {candidate['name']}: {e}")
+        
+        async with create_session('google_search') as session:
+            tasks = [asyncio.create_task(fetch(session, candidate)) for candidate in selected]
+            _, pending = await asyncio.wait(tasks, timeout=max(0.0, deadline - time.monotonic()))
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        
+        # Ni vérifiées ni en erreur: budget de temps épuisé avant ou pendant la requête
+        details['deferred'] = len(selected) - len(results) - stats['errors']
+        if details['deferred']:
+            logger.warning(f"⏱️  Budget de temps atteint: {details['deferred']} startups reportées")
+        
+        articles = [
+            {**item, 'startup_id': startup_id}
+            for startup_id, items in results.items() for item in items
+        ]
+        if articles:
+            texts = [f"{a['title'] or ''} {a['content'] or ''}" for a in articles]
+            scores = await offload('ml.sentiment', len(texts), self.ml_pipeline.analyze_sentiment_batch, texts)
+            for article, score in zip(articles, scores):
+                article['sentiment_score'] = float(score)
+            stats['collected'] = await self.database.insert_news_bulk(articles)
+        
+        details['refreshed'] = await self.database.mark_crawled(list(results))
+        logger.info(f"✅ Re-crawl: {details['refreshed']} startups vérifiées, "
+                    f"{stats['collected']} nouvelles actualités, {stats['errors']} erreurs")
+
+
+# Test
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    
+    async def test():
+        from database.backends import create_database_manager
+        from ml.classification_pipeline import MLClassificationPipeline
+        
+        database = create_database_manager()
+        await database.connect()
+        try:
+            stats = await QuickUpdater(database, MLClassificationPipeline()).run()
+            print(f"Stats: {stats['details']} (nouvelles actualités: {stats['collected']})")
+        finally:
+            await database.disconnect()
+    
+    asyncio.run(test())
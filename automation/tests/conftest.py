@@ -0,0 +1,78 @@
+# tests/conftest.py
+"""
+Fixtures communes des tests (pytest, lancé depuis automation/)
+
+Les tests PostgreSQL utilisent une base dédiée (TEST_DB_NAME, créée au besoin
+sur le serveur DB_HOST/DB_PORT) et sont ignorés si aucun serveur n'est joignable.
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+# Ajouter le parent directory au path (modules du projet importables)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncpg
+
+TEST_DB_NAME = os.getenv('TEST_DB_NAME', 'vc_deal_screener_test')
+
+# Tables vidées avant chaque test PostgreSQL. TRUNCATE ne déclenche pas les triggers
+# de rollup: startup_rollups est vidé avec startups (rollups d'une table vide)
+TRUNCATED_TABLES = 'startups, startup_rollups, startup_news, funding_rounds, raw_payloads'
+
+
+def _server_config() -> dict:
+    return {
+        'host': os.getenv('DB_HOST', 'localhost'),
+        'port': int(os.getenv('DB_PORT', 5432)),
+        'user': os.getenv('DB_USER', 'postgres'),
+        'password': os.getenv('DB_PASSWORD', 'postgres'),
+    }
+
+
+async def _ensure_test_database():
+    conn = await asyncpg.connect(**_server_config(), database='postgres', timeout=3)
+    try:
+        exists = await conn.fetchval("SELECT 1 FROM pg_database WHERE datname = $1", TEST_DB_NAME)
+        if not exists:
+            await conn.execute(f'CREATE DATABASE "{TEST_DB_NAME}"')
+    finally:
+        await conn.close()
+
+
+@pytest.fixture(scope='session')
+def postgres_available():
+    try:
+        asyncio.run(_ensure_test_database())
+    except (OSError, asyncio.TimeoutError, asyncpg.PostgresError) as e:
+        pytest.skip(f"PostgreSQL non disponible: {e}")
+    return True
+
+
+@pytest.fixture
+def pg_run(postgres_available, monkeypatch):
+    """
+    pg_run(scenario): exécute scenario(db) dans une boucle asyncio, avec un
+    DatabaseManager connecté à la base de test vidée
+    """
+    monkeypatch.setenv('DB_NAME', TEST_DB_NAME)
+    
+    def run(scenario):
+        from database.db_manager import DatabaseManager
+        
+        async def main():
+            db = DatabaseManager()
+            await db.connect()
+            try:
+                async with db.pool.acquire() as conn:
+                    await conn.execute(f"TRUNCATE {TRUNCATED_TABLES} RESTART IDENTITY CASCADE")
+                return await scenario(db)
+            finally:
+                await db.disconnect()
+        
+        return asyncio.run(main())
+    
+    return run
@@ -0,0 +1,79 @@
+# tests/test_benchmarks.py
+"""Benchmarks: corpus synthétique reproductible, extrapolation du budget, comparaison"""
+
+import asyncio
+
+from benchmarks.run_benchmarks import BenchmarkSuite, compare
+from benchmarks.synthetic_data import SyntheticCorpus
+
+
+def test_same_seed_gives_the_same_corpus():
+    first = SyntheticCorpus(seed=7).startups(200, news_per_startup=2)
+    second = SyntheticCorpus(seed=7).startups(200, news_per_startup=2)
+    other = SyntheticCorpus(seed=8).startups(200, news_per_startup=2)
+    
+    assert first == second
+    assert first != other
+    # Dates dérivées de la date de référence, pas du jour d'exécution
+    assert first[0]['collected_at'] == '2025-01-01T00:00:00'
+    assert SyntheticCorpus(seed=7).descriptions(50) == SyntheticCorpus(seed=7).descriptions(50)
+
+
+def test_corpus_reproduces_collector_duplicates_and_key_variants():
+    startups = SyntheticCorpus(seed=42).startups(1000, duplicate_rate=0.2)
+    names = [startup['name'].strip().lower() for startup in startups]
+    keys = set().union(*startups)
+    
+    assert len(startups) == 1000
+    assert len(set(names)) < len(names)
+    assert {'funding_raised', 'fundingRaised', 'foundedYear', 'team_size'} <= keys
+
+
+def test_unique_startups_have_distinct_names():
+    startups = SyntheticCorpus(seed=42).unique_startups(2000)
+    
+    assert len({startup['name'] for startup in startups}) == 2000
+
+
+def test_estimate_extrapolates_with_bounded_growth_exponent():
+    estimate = BenchmarkSuite._estimate
+    
+    assert estimate([], 1000) == 0.0
+    # Une seule mesure: croissance linéaire
+    assert estimate([(1000, 2.0)], 10000) == 20.0
+    # Croissance quadratique observée
+    assert round(estimate([(1000, 1.0), (2000, 4.0)], 4000), 6) == 16.0
+    # Exposant borné à [1, 2]
+    assert estimate([(1000, 1.0), (2000, 1.0)], 4000) == 2.0
+    assert round(estimate([(1000, 1.0), (2000, 100.0)], 4000), 6) == 400.0
+
+
+def test_run_skips_sizes_over_budget():
+    suite = BenchmarkSuite(seed=1, budget=50)
+    calls = []
+    
+    async def bench_fake(size):
+        calls.append(size)
+        return {'seconds': size / 100}
+    
+    suite.bench_fake = bench_fake
+    results = asyncio.run(suite.run(['fake'], [10000, 1000]))
+    
+    assert calls == [1000]
+    assert results['fake']['1000'] == {'seconds': 10.0, 'rows_per_second': 100.0}
+    assert 'skipped' in results['fake']['10000']
+
+
+def test_compare_flags_regressions_above_threshold():
+    baseline = {'results': {'cleaner': {'1000': {'seconds': 1.0}, '10000': {'seconds': 10.0}}}}
+    current = {'results': {
+        'cleaner': {'1000': {'seconds': 1.1}, '10000': {'seconds': 13.0}, '100000': {'seconds': 120.0}},
+        'scoring': {'1000': {'skipped': 'budget'}},
+    }}
+    
+    rows = compare(current, baseline, threshold=0.2)
+    
+    assert [(row['size'], row['ratio'], row['regression']) for row in rows] == [
+        (1000, 1.1, False),
+        (10000, 1.3, True),
+    ]
@@ -0,0 +1,71 @@
+# tests/test_categories.py
+"""Dictionnaires de catégories: codes stables, ajouts à la volée, tables indexées par code"""
+
+import threading
+
+from ml.scoring_engine import MLScoringEngine
+from utils.categories import DEFAULT_CATEGORIES, CategoryDictionary, CategoryRegistry
+
+
+def test_default_vocabulary_has_stable_codes():
+    first, second = CategoryRegistry(), CategoryRegistry()
+    
+    for dimension, values in DEFAULT_CATEGORIES.items():
+        assert first[dimension].values == values
+        assert [first[dimension].encode(value) for value in values] == list(range(len(values)))
+        assert first[dimension].codes == second[dimension].codes
+
+
+def test_unknown_values_are_appended_and_never_recoded():
+    sectors = CategoryDictionary('sector', ['fintech', 'ai'])
+    
+    assert sectors.encode('spacetech') == 2
+    assert sectors.encode('fintech') == 0
+    assert sectors.encode('spacetech') == 2
+    assert sectors.decode(2) == 'spacetech'
+    assert sectors.encode(None) is None and sectors.decode(None) is None
+    assert sectors.encode_many(['ai', None, 'biotech']) == [1, None, 3]
+
+
+def test_interned_values_are_shared():
+    locations = CategoryDictionary('location')
+    city = ''.join(['Casa', 'blanca'])
+    
+    assert locations.intern(city) is locations.intern('Casablanca')
+    assert locations.intern(None) is None
+
+
+def test_lookup_table_is_indexed_by_code():
+    stages = CategoryDictionary('stage', ['Seed', 'Series A', 'Growth'])
+    
+    assert stages.lookup({'Series A': 60, 'Seed': 40}, 20) == [40, 60, 20]
+
+
+def test_concurrent_additions_get_distinct_codes():
+    sources = CategoryDictionary('source')
+    barrier = threading.Barrier(8)
+    
+    def add(worker: int):
+        barrier.wait()
+        for i in range(200):
+            sources.encode(f"source-{i % 50}-{worker % 2}")
+    
+    threads = [threading.Thread(target=add, args=(worker,)) for worker in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert len(sources) == 100
+    assert sorted(sources.codes.values()) == list(range(100))
+    assert all(sources.values[code] == value for value, code in sources.codes.items())
+
+
+def test_scoring_tables_grow_with_the_vocabulary():
+    engine = MLScoringEngine()
+    
+    assert engine._sector_hotness_of('fintech') == engine.sector_scores['fintech']
+    # Secteur inconnu ajouté après la construction de la table: valeur par défaut
+    assert engine._sector_hotness_of('sector-added-by-test') == 50
+    assert engine._stage_revenue_of('Series A') == 60
+    assert engine._stage_revenue_of(None) == 20
@@ -0,0 +1,128 @@
+# tests/test_classification_pipeline.py
+"""Classification sectorielle (registre mappé en mémoire) et sentiment"""
+
+import numpy as np
+import pytest
+
+from ml.classification_pipeline import SectorClassifier, SentimentAnalyzer
+from ml.model_registry import ModelRegistry
+
+
+SAMPLES = [
+    ("Plateforme de paiement mobile pour PME", "PayTech"),
+    ("Télémédecine et diagnostic à distance", "Tbib"),
+    ("Livraison du dernier kilomètre à Casablanca", "Kool"),
+    ("Une entreprise sans mot-clé", "Xyz"),
+]
+
+
+def test_registry_table_matches_default_and_stays_memory_mapped(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    SectorClassifier(registry).export_to_registry()
+    
+    default = SectorClassifier()
+    mapped = SectorClassifier(registry)
+    
+    for description, name in SAMPLES:
+        assert mapped.classify_sync(description, name) == default.classify_sync(description, name)
+    
+    # Tableaux du registre indexés tels quels: aucune copie par processus
+    assert isinstance(mapped._keywords, np.memmap)
+    assert isinstance(mapped._weights, np.memmap)
+
+
+def test_tier_weights_come_from_the_manifest(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    table = {
+        'fintech': {'primary': ['paiement'], 'secondary': []},
+        'saas': {'primary': [], 'secondary': ['plateforme', 'mobile']},
+    }
+    # Secondaire plus lourd que primaire: 2 keywords saas (2 x 5) battent 1 fintech (1)
+    registry.save_keyword_table(SectorClassifier.MODEL_NAME, table, {'primary': 1, 'secondary': 5})
+    
+    classifier = SectorClassifier(registry)
+    assert classifier.classify_sync("Plateforme de paiement mobile") == 'saas'
+    assert classifier.tier_weights == {'primary': 1, 'secondary': 5}
+
+
+def _legacy_score(texts):
+    """Score historique de SentimentAnalyzer.analyze (sous-chaînes, mots = split())"""
+    analyzer = SentimentAnalyzer()
+    total = 0.0
+    for text in texts:
+        lower = text.lower()
+        positive = sum(1 for word in analyzer.positive_words if word in lower)
+        negative = sum(1 for word in analyzer.negative_words if word in lower)
+        total += (positive - negative) / max(len(text.split()), 1)
+    return max(-1, min(1, total / max(len(texts), 1) * 10))
+
+
+SENTIMENT_TEXTS = [
+    "Les croissances de la startup dépassent les attentes du marché marocain cette année encore",
+    "Une équipe sous-performante, des retards et une crise de trésorerie pour la jeune pousse locale",
+    "Levée de fonds record: succès, expansion et innovation pour ce leader du paiement mobile",
+    "",
+]
+
+
+def test_sentiment_keeps_substring_semantics():
+    analyzer = SentimentAnalyzer()
+    
+    # Formes fléchies et composés comptent: "croissances" -> croissance, "sous-performante" -> performant
+    assert analyzer.analyze_sync(SENTIMENT_TEXTS[:1]) == pytest.approx(10 / 14)
+    assert analyzer.score_batch(SENTIMENT_TEXTS).tolist() == pytest.approx([10 / 14, 10 * (1 - 2) / 15, 1.0, 0.0])
+    
+    for text in SENTIMENT_TEXTS:
+        assert analyzer.analyze_sync([text]) == pytest.approx(_legacy_score([text]))
+    assert analyzer.analyze_sync(SENTIMENT_TEXTS) == pytest.approx(_legacy_score(SENTIMENT_TEXTS))
+
+
+def test_lexicon_matches_substrings_once_per_word():
+    analyzer = SentimentAnalyzer()
+    analyzer._positive = frozenset(['perte', 'pert', 'erte'])
+    analyzer._negative = frozenset(['crise'])
+    
+    # Sous-chaînes qui se chevauchent ou commencent au même endroit: toutes comptent
+    assert analyzer._raw_scores(["une perte sèche"]).tolist() == pytest.approx([3 / 3 * 10])
+    # Répétitions et formes fléchies: une fois par mot du lexique
+    assert analyzer._raw_scores(["crise, crises et pertes"]).tolist() == pytest.approx([(3 - 1) / 4 * 10])
+    assert analyzer._raw_scores(["aucun mot"]).tolist() == [0.0]
+    
+    analyzer = SentimentAnalyzer()
+    # "croissance" deux fois et "Croissances": un seul positif sur 20 mots
+    text = "croissance " * 2 + "Croissances " + "mot " * 17
+    assert analyzer.score_batch([text]).tolist() == pytest.approx([1 / 20 * 10])
+
+
+def _legacy_sector(classifier, description, name=''):
+    """Règle historique: poids de chaque keyword présent comme sous-chaîne, une fois"""
+    text = f"{name} {description}".lower()
+    scores = {}
+    for label, tiers in classifier.sector_keywords.items():
+        for tier, words in tiers.items():
+            for word in words:
+                if word in text:
+                    scores[label] = scores.get(label, 0) + classifier.tier_weights[tier]
+    return max(scores, key=scores.get) if scores else 'other'
+
+
+SECTOR_TEXTS = [
+    ("Solution de mobile money et wallet pour commerçants", "Chaabi Pay"),
+    ("Plateforme sociale financiarisée: social social social", "Soci"),  # "ia" dans deux tokens
+    ("Vente  en ligne et vente en ligne de produits", "Souk"),          # keyword de plusieurs mots
+    ("Supply chain et livraison du dernier kilomètre", "Kool"),
+    ("Une entreprise sans mot-clé", "Xyz"),
+    ("", ""),
+]
+
+
+def test_sector_matching_keeps_substring_rule():
+    classifier = SectorClassifier()
+    for description, name in SECTOR_TEXTS:
+        assert classifier.classify_sync(description, name) == _legacy_sector(classifier, description, name)
+    
+    # Un keyword présent dans plusieurs tokens compte une seule fois
+    hits = classifier._hits("social financial ia")
+    keywords = [str(classifier._keywords[i]) for i in hits]
+    assert keywords.count('ia') == 1
+    assert 'mobile money' in [str(classifier._keywords[i]) for i in classifier._hits("le mobile money")]
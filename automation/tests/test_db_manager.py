@@ -0,0 +1,489 @@
+# tests/test_db_manager.py
+"""DatabaseManager (PostgreSQL): ignorés si aucun serveur n'est joignable"""
+
+import asyncio
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from database.db_manager import DatabaseManager
+from database.statements import PREPARED_STATEMENTS, filtered_statement
+from utils.startup_record import StartupRecord
+
+
+async def _create(db, *startups):
+    await db.upsert_startups([StartupRecord.coerce(s) for s in startups])
+    return await db.get_startup_ids([s['name'] for s in startups])
+
+
+SECTORS = ['fintech', 'ai', 'healthtech', 'edtech', 'ecommerce',
+           'agritech', 'cleantech', 'logistics', 'saas', 'proptech']
+CITIES = ['Casablanca', 'Rabat', 'Marrakech', 'Tanger', 'Fès',
+          'Agadir', 'Oujda', 'Kenitra', 'Tetouan', 'Meknès']
+STAGES = ['idea', 'pre_seed', 'seed', 'series_a', 'series_b', 'series_c', 'growth', 'mature']
+
+
+async def _seed_listing(db, count: int = 20000):
+    """Table startups réaliste (10 secteurs, 10 villes, 8 stages, 10% inactives) puis ANALYZE"""
+    rng = random.Random(7)
+    records = [
+        (f"Startup {i}", rng.choice(SECTORS), rng.choice(CITIES), rng.choice(STAGES),
+         rng.randint(0, 100), rng.randint(2005, 2024), rng.randint(0, 10 ** 7), i % 10 != 0)
+        for i in range(count)
+    ]
+    async with db.pool.acquire() as conn:
+        await conn.copy_records_to_table(
+            'startups', records=records,
+            columns=['name', 'sector', 'location', 'stage', 'score',
+                     'founded_year', 'funding_raised_usd', 'active']
+        )
+        await conn.execute("ANALYZE startups")
+
+
+LISTING_PLANS = [
+    ({}, 'idx_startups_active_score'),
+    ({'sector': 'fintech'}, 'idx_startups_active_sector_score'),
+    ({'sector': ['fintech']}, 'idx_startups_active_sector_score'),
+    ({'location': 'Rabat'}, 'idx_startups_active_location_score'),
+    ({'stage': 'seed'}, 'idx_startups_active_stage_score'),
+    ({'name_prefix': 'startup 123'}, 'idx_startups_active_name_prefix'),
+    ({'min_funding': 9990000}, 'idx_startups_active_funding_usd'),
+]
+
+
+def test_listing_filters_use_partial_composite_indexes(pg_run):
+    async def scenario(db):
+        await _seed_listing(db)
+        plans = {}
+        for filters, _ in LISTING_PLANS:
+            plan = await db.explain_startups_query(filters)
+            plans[repr(filters)] = db.plan_index_names(plan)
+        return plans
+    
+    plans = pg_run(scenario)
+    
+    for filters, index in LISTING_PLANS:
+        assert plans[repr(filters)] == [index], filters
+
+
+def _literal(value) -> str:
+    if value is None:
+        return 'NULL'
+    if isinstance(value, int):
+        return str(value)
+    return "'" + value.replace("'", "''") + "'"
+
+
+def test_prepared_listing_keeps_index_with_generic_plan(pg_run):
+    async def scenario(db):
+        await _seed_listing(db)
+        sql, params = db._filtered_query('list_startups', {'sector': 'fintech'}, 50, 0)
+        
+        async with db.pool.acquire() as conn:
+            mode = await conn.fetchval("SHOW plan_cache_mode")
+            # Pire cas du mode auto: plan générique, calculé sans les valeurs des paramètres
+            await conn.execute("SET plan_cache_mode = force_generic_plan")
+            try:
+                await conn.fetch(sql, *params)
+                statement = await conn.fetchrow(
+                    "SELECT name, generic_plans FROM pg_prepared_statements WHERE statement = $1", sql
+                )
+                plan = await conn.fetchval(
+                    f"EXPLAIN (FORMAT JSON) EXECUTE {statement['name']}({', '.join(map(_literal, params))})"
+                )
+            finally:
+                await conn.execute("RESET plan_cache_mode")
+        return db.plan_index_names(plan[0]['Plan']), statement['generic_plans'], mode
+    
+    indexes, generic_plans, mode = pg_run(scenario)
+    
+    # "sector = $1" figure dans le texte: l'index partiel reste utilisable sans les valeurs
+    assert mode == 'auto'
+    assert generic_plans >= 1
+    assert indexes == ['idx_startups_active_sector_score']
+
+
+def test_filtered_statement_has_one_text_per_filter_combination():
+    sql = filtered_statement('list_startups', (0, 6, 12))
+    
+    assert 'sector = $1' in sql
+    assert 'score >= $2' in sql
+    assert 'lower(name) LIKE $3' in sql
+    assert 'LIMIT $4 OFFSET $5' in sql
+    assert 'IS NULL' not in sql
+    assert filtered_statement('list_startups', (0, 6, 12)) is sql
+
+
+def test_pool_connections_prepare_hot_statements(pg_run):
+    async def scenario(db):
+        async with db.pool.acquire() as conn:
+            rows = await conn.fetch("SELECT statement FROM pg_prepared_statements")
+        return {row['statement'] for row in rows}
+    
+    prepared = pg_run(scenario)
+    
+    assert set(PREPARED_STATEMENTS) <= prepared
+
+
+def test_parse_published_at():
+    parse = DatabaseManager.parse_published_at
+    assert parse('2024-05-01') == datetime(2024, 5, 1)
+    assert parse('2024-05-01T10:30:00') == datetime(2024, 5, 1, 10, 30)
+    assert parse('2024-05-01T10:30:00Z').tzinfo is None
+    assert parse('il y a 2 jours') is None
+    assert parse(None) is None
+
+
+def test_news_shared_by_two_startups_counts_for_each(pg_run):
+    async def scenario(db):
+        ids = await _create(
+            db,
+            {'name': 'Chari', 'description': 'e-commerce B2B'},
+            {'name': 'YoLa Fresh', 'description': 'agritech'},
+        )
+        article = {
+            'title': 'Chari et YoLa Fresh lèvent des fonds',
+            'content': 'Deux startups marocaines',
+            'url': 'https://news.example.ma/chari-yola',
+            'source': 'Médias24',
+            'published_at': '2024-05-01T10:30:00',
+            'sentiment_score': 0.5,
+        }
+        inserted = await db.insert_news_bulk([
+            {**article, 'startup_id': ids['Chari']},
+            {**article, 'startup_id': ids['YoLa Fresh']},
+            {**article, 'startup_id': ids['Chari']},  # doublon exact
+        ])
+        # Même lot rejoué: rien de nouveau
+        replayed = await db.insert_news_bulk([{**article, 'startup_id': ids['Chari']}])
+        
+        stats = await db.get_news_stats_by_names(['Chari', 'YoLa Fresh'])
+        async with db.pool.acquire() as conn:
+            published = await conn.fetch("SELECT published_at FROM startup_news")
+        return inserted, replayed, stats, published
+    
+    inserted, replayed, stats, published = pg_run(scenario)
+    
+    assert (inserted, replayed) == (2, 0)
+    assert stats['Chari']['mentions_total'] == 1
+    assert stats['YoLa Fresh']['mentions_total'] == 1
+    assert [row['published_at'] for row in published] == [datetime(2024, 5, 1, 10, 30)] * 2
+
+
+class StubAnalyzer:
+    """score_batch: 0.8 si le texte parle de levée, -0.4 sinon"""
+    
+    def score_batch(self, texts):
+        return [0.8 if 'lève' in text else -0.4 for text in texts]
+
+
+def test_sentiment_backfill_resyncs_daily_rows_and_totals(pg_run):
+    async def scenario(db):
+        ids = await _create(db, {'name': 'Chari', 'description': 'e-commerce B2B'})
+        day = datetime.now().replace(microsecond=0) - timedelta(days=1)
+        await db.insert_news_bulk([
+            {'startup_id': ids['Chari'], 'title': 'Chari lève 12M$', 'url': 'https://a.ma/1', 'published_at': day},
+            {'startup_id': ids['Chari'], 'title': 'Chari ferme une ville', 'url': 'https://a.ma/2', 'published_at': day},
+        ])
+        
+        backfilled = await db.backfill_news_sentiment(StubAnalyzer())
+        async with db.pool.acquire() as conn:
+            daily = await conn.fetchrow("SELECT sentiment_sum, sentiment_count FROM startup_news_daily")
+        stats = await db.get_news_stats_by_names(['Chari'])
+        return backfilled, daily, stats['Chari']
+    
+    backfilled, daily, stats = pg_run(scenario)
+    
+    assert backfilled == 2
+    assert daily['sentiment_count'] == 2
+    assert daily['sentiment_sum'] == pytest.approx(0.4)
+    assert stats['avg_sentiment'] == pytest.approx(0.2)
+
+
+SEED_ROUND = {'round_type': 'seed', 'amount': 1500000, 'currency': 'MAD', 'source': 'description'}
+
+
+def test_undated_and_dated_versions_of_a_round_are_stored_once(pg_run):
+    async def scenario(db):
+        ids = await _create(
+            db,
+            {'name': 'Chari', 'description': 'e-commerce B2B'},
+            {'name': 'YoLa Fresh', 'description': 'agritech'},
+        )
+        chari, yola = ids['Chari'], ids['YoLa Fresh']
+        dated = {'announced_date': date(2024, 3, 12), 'investors': ['Azur Innovation'], 'source': 'crunchbase'}
+        
+        # Chari: sans date d'abord, puis daté (la ligne existante reçoit la date)
+        await db.insert_funding_rounds([{**SEED_ROUND, 'startup_id': chari}])
+        await db.insert_funding_rounds([{**SEED_ROUND, **dated, 'startup_id': chari}])
+        # YoLa Fresh: daté d'abord, puis sans date (ignoré), puis autre montant (nouveau round)
+        await db.insert_funding_rounds([{**SEED_ROUND, **dated, 'startup_id': yola}])
+        await db.insert_funding_rounds([{**SEED_ROUND, 'startup_id': yola}])
+        await db.insert_funding_rounds([{**SEED_ROUND, 'amount': 3000000, 'startup_id': yola}])
+        
+        async with db.pool.acquire() as conn:
+            rows = await conn.fetch("""
+                SELECT startup_id, amount, announced_date, investors, source
+                FROM funding_rounds ORDER BY startup_id, amount
+            """)
+        return chari, yola, [dict(row) for row in rows]
+    
+    chari, yola, rows = pg_run(scenario)
+    
+    assert [(r['startup_id'], r['amount'], r['announced_date']) for r in rows] == [
+        (chari, 1500000, date(2024, 3, 12)),
+        (yola, 1500000, date(2024, 3, 12)),
+        (yola, 3000000, None),
+    ]
+    assert rows[0]['investors'] == ['Azur Innovation']
+    assert rows[0]['source'] == 'description'
+
+
+FULL_RECORD = {
+    'name': 'Chari', 'description': 'e-commerce B2B', 'sector': 'ecommerce', 'stage': 'series_a',
+    'location': 'Casablanca', 'funding_raised': 12000000, 'funding_currency': 'USD',
+    'employees': 120, 'email': 'contact@chari.ma', 'score': 78, 'predicted_score': 81,
+    'metrics': {'gmv_growth': 2.5},
+}
+# Source partielle: ni scores, ni email, ni métriques
+PARTIAL_RECORD = {'name': 'Chari', 'description': 'e-commerce  B2B', 'location': 'Casablanca'}
+
+
+def test_partial_record_leaves_unchanged_startup_untouched(pg_run):
+    async def scenario(db):
+        created = await db.upsert_startups([StartupRecord.coerce(FULL_RECORD)])
+        async with db.pool.acquire() as conn:
+            before = await conn.fetchval("SELECT updated_at FROM startups WHERE name = 'Chari'")
+        
+        partial = await db.upsert_startups([StartupRecord.coerce(PARTIAL_RECORD)])
+        full = await db.upsert_startups([StartupRecord.coerce(FULL_RECORD)])
+        changed = await db.upsert_startups([StartupRecord.coerce({**PARTIAL_RECORD, 'score': 80})])
+        
+        async with db.pool.acquire() as conn:
+            row = await conn.fetchrow("SELECT updated_at, score, email FROM startups WHERE name = 'Chari'")
+            metrics = await conn.fetchval("SELECT COUNT(*) FROM startup_metrics")
+        return created, partial, full, changed, before, row, metrics
+    
+    created, partial, full, changed, before, row, metrics = pg_run(scenario)
+    
+    assert created['new'] == 1
+    assert partial['unchanged'] == 1
+    assert full['unchanged'] == 1
+    assert changed['updated'] == 1
+    assert row['updated_at'] > before
+    assert (row['score'], row['email']) == (80, 'contact@chari.ma')
+    assert metrics == 1
+
+
+def _recent_news(startup_id: int, count: int):
+    today = date.today()
+    return [
+        {'startup_id': startup_id, 'title': f"Actualité {i}", 'url': f"https://news.example.ma/{startup_id}/{i}",
+         'published_at': (today - timedelta(days=i + 1)).isoformat()}
+        for i in range(count)
+    ]
+
+
+def test_recrawl_candidates_keep_the_highest_priority(pg_run):
+    async def scenario(db):
+        ids = await _create(
+            db,
+            {'name': 'Ancienne', 'score': 10},
+            {'name': 'Chari', 'score': 90},
+            {'name': 'Fraîche', 'score': 90},
+        )
+        now = datetime.now()
+        async with db.pool.acquire() as conn:
+            await conn.executemany("UPDATE startups SET last_crawled_at = $2 WHERE id = $1", [
+                (ids['Ancienne'], now - timedelta(days=30)),
+                (ids['Chari'], now - timedelta(days=2)),
+                (ids['Fraîche'], now - timedelta(hours=1)),
+            ])
+        await db.insert_news_bulk(_recent_news(ids['Chari'], 10))
+        
+        checked_before = now - timedelta(hours=24)
+        top = await db.get_recrawl_candidates(checked_before, 1)
+        everything = await db.get_recrawl_candidates(checked_before, 10)
+        return top, everything
+    
+    top, everything = pg_run(scenario)
+    
+    # Vérifiée plus récemment mais plus utile que la plus ancienne
+    assert [c['name'] for c in top] == ['Chari']
+    assert [c['name'] for c in everything] == ['Chari', 'Ancienne']
+    assert everything[0]['priority'] > everything[1]['priority']
+
+
+async def _seed_recrawl(db, now: datetime):
+    """Mêmes candidats sur les deux backends: scores, âges et actualités variés"""
+    rng = random.Random(11)
+    names = [f"Startup {i}" for i in range(30)]
+    ids = await _create(db, *({'name': name, 'score': rng.randint(0, 100)} for name in names))
+    checks = [(now - timedelta(hours=rng.randint(25, 24 * 30)), ids[name]) for name in names]
+    if db.backend == 'postgres':
+        async with db.pool.acquire() as conn:
+            await conn.executemany("UPDATE startups SET last_crawled_at = $1 WHERE id = $2", checks)
+    else:
+        db.conn.executemany("UPDATE startups SET last_crawled_at = ? WHERE id = ?", checks)
+    for name in names[::3]:
+        await db.insert_news_bulk(_recent_news(ids[name], rng.randint(1, 12)))
+    return await db.get_recrawl_candidates(now - timedelta(hours=24), 10)
+
+
+def test_recrawl_priority_is_the_same_on_both_backends(pg_run, tmp_path):
+    from database.sqlite_manager import SQLiteDatabaseManager
+    
+    now = datetime.now()
+    
+    async def sqlite_scenario():
+        db = SQLiteDatabaseManager(str(tmp_path / 'recrawl.db'))
+        await db.connect()
+        try:
+            return await _seed_recrawl(db, now)
+        finally:
+            await db.disconnect()
+    
+    postgres = pg_run(lambda db: _seed_recrawl(db, now))
+    sqlite = asyncio.run(sqlite_scenario())
+    
+    assert [c['name'] for c in postgres] == [c['name'] for c in sqlite]
+    assert [c['priority'] for c in postgres] == pytest.approx([c['priority'] for c in sqlite], rel=1e-3)
+    assert [c['mentions_30d'] for c in postgres] == [c['mentions_30d'] for c in sqlite]
+
+
+def test_rollups_follow_bulk_writes(pg_run):
+    async def scenario(db):
+        await _seed_listing(db, count=2000)
+        async with db.pool.acquire() as conn:
+            await conn.execute("UPDATE startups SET sector = 'fintech', score = score + 1 WHERE id % 7 = 0")
+            await conn.execute("UPDATE startups SET active = NOT active WHERE id % 11 = 0")
+            await conn.execute("DELETE FROM startups WHERE id % 13 = 0")
+            maintained = await conn.fetch("SELECT * FROM startup_rollups WHERE startups <> 0 ORDER BY dimension, key")
+            await db._rebuild_rollups(conn)
+            rebuilt = await conn.fetch("SELECT * FROM startup_rollups ORDER BY dimension, key")
+        return [dict(r) for r in maintained], [dict(r) for r in rebuilt], await db.get_stats()
+    
+    maintained, rebuilt, stats = pg_run(scenario)
+    
+    # Triggers par instruction == recalcul complet (GROUPING SETS)
+    assert maintained == rebuilt
+    assert stats['total_startups'] == next(r['startups'] for r in rebuilt if r['dimension'] == 'global')
+
+
+def test_search_ranks_name_matches_and_stems_descriptions(pg_run):
+    async def scenario(db):
+        ids = await _create(
+            db,
+            {'name': 'PayTech', 'description': 'Solutions de paiement pour commerçants', 'score': 40},
+            {'name': 'Chari', 'description': 'Paiements mobiles et e-commerce B2B', 'score': 90},
+            {'name': 'YoLa Fresh', 'description': 'Agritech, circuits courts', 'founders': ['Youssef Chaqor']},
+            {'name': 'Marché Vert', 'description': 'Fresh produce delivery', 'score': 100},
+            {'name': 'Dormante', 'description': 'Paiement en ligne', 'score': 100},
+        )
+        async with db.pool.acquire() as conn:
+            await conn.execute("UPDATE startups SET active = FALSE WHERE id = $1", ids['Dormante'])
+        
+        return {
+            query: [row['name'] for row in await db.search_startups(query)]
+            for query in ('paiement', 'fresh', 'chaqor', 'payments', '  ')
+        }
+    
+    results = pg_run(scenario)
+    
+    # "paiements" (français) trouvé par "paiement"; startup inactive exclue
+    assert sorted(results['paiement']) == ['Chari', 'PayTech']
+    # Nom (poids A) avant description (poids B), malgré un score plus faible
+    assert results['fresh'] == ['YoLa Fresh', 'Marché Vert']
+    assert results['chaqor'] == ['YoLa Fresh']
+    assert results['payments'] == []
+    assert results['  '] == []
+
+
+def test_raw_payloads_are_content_addressed_and_purged_when_orphaned(pg_run):
+    async def scenario(db):
+        ids = await _create(
+            db,
+            {'name': 'Chari', 'description': 'e-commerce B2B', 'collected_at': '2024-05-01T10:00:00'},
+            {'name': 'YoLa Fresh', 'description': 'agritech'},
+            {'name': 'Dormante', 'description': 'archive'},
+        )
+        async with db.pool.acquire() as conn:
+            stored = await conn.fetchval("SELECT raw_payload_hash FROM startups WHERE id = $1", ids['Chari'])
+            # Ancien schéma: même raw_data pour deux startups, un seul payload après migration
+            await conn.execute("""
+                UPDATE startups SET raw_payload_hash = NULL, raw_data = '{"source": "legacy", "employees": 12}'
+                WHERE id = ANY($1::int[])
+            """, [ids['YoLa Fresh'], ids['Dormante']])
+        payload = await db.get_raw_payload(stored)
+        migrated = await db.migrate_raw_data(batch_size=1)
+        
+        async with db.pool.acquire() as conn:
+            legacy = await conn.fetch(
+                "SELECT raw_payload_hash, raw_data FROM startups WHERE id = ANY($1::int[])",
+                [ids['YoLa Fresh'], ids['Dormante']]
+            )
+            await conn.execute("DELETE FROM startups WHERE id = $1", ids['Chari'])
+            await conn.execute("UPDATE raw_payloads SET last_seen_at = NOW() - INTERVAL '400 days'")
+        purged = await db.purge_raw_payloads(retention_days=180)
+        async with db.pool.acquire() as conn:
+            remaining = await conn.fetchval("SELECT COUNT(*) FROM raw_payloads")
+        return stored, payload, migrated, legacy, purged, remaining
+    
+    stored, payload, migrated, legacy, purged, remaining = pg_run(scenario)
+    
+    assert len(stored) == 64
+    assert (payload['name'], payload['description']) == ('Chari', 'e-commerce B2B')
+    assert 'collected_at' not in payload
+    assert migrated == 2
+    assert len({row['raw_payload_hash'] for row in legacy}) == 1
+    assert all(row['raw_data'] is None for row in legacy)
+    # Orphelins anciens: payloads d'origine de YoLa Fresh et Dormante, celui de Chari (supprimée)
+    assert (purged, remaining) == (3, 1)
+
+
+PARITY_STARTUPS = [
+    {'name': 'Chari', 'sector': 'fintech', 'location': 'Casablanca', 'stage': 'seed', 'score': 80,
+     'funding_raised': 1000000, 'funding_currency': 'MAD', 'founded_year': 2020},
+    {'name': 'YoLa Fresh', 'sector': 'agritech', 'location': 'Rabat', 'stage': 'pre_seed', 'score': 60,
+     'founded_year': 2021},
+    {'name': 'PayTech', 'sector': 'fintech', 'location': 'Rabat', 'stage': 'series_a', 'score': 70,
+     'funding_raised': 5000000, 'funding_currency': 'USD', 'founded_year': 2018},
+]
+
+
+async def _parity_reads(db) -> dict:
+    """Lectures de l'API commune après le même lot d'écritures"""
+    counts = await db.upsert_startups([StartupRecord.coerce(s) for s in PARITY_STARTUPS])
+    replayed = await db.upsert_startups([StartupRecord.coerce(s) for s in PARITY_STARTUPS])
+    stats = await db.get_stats()
+    return {
+        'counts': (counts['new'], replayed['unchanged']),
+        'fintech': [row['name'] for row in await db.get_all_startups({'sector': 'fintech'})],
+        'prefix': [row['name'] for row in await db.get_all_startups({'name_prefix': 'ch', 'min_score': 50})],
+        # 1 000 000 MAD < 100 000 USD: seule PayTech passe le filtre en USD
+        'funded': [row['name'] async for batch in db.iter_startups({'min_funding': 100000}) for row in batch],
+        'facets': await db.get_facets({'location': 'Rabat'}),
+        'stats': {key: float(value) if key.startswith(('avg_', 'total_funding')) else value
+                  for key, value in stats.items()},
+        'ids': sorted(await db.get_startup_ids(['Chari', 'PayTech', 'Inconnue'])),
+    }
+
+
+def test_sqlite_backend_matches_postgres(pg_run, tmp_path):
+    from database.sqlite_manager import SQLiteDatabaseManager
+    
+    async def sqlite_scenario():
+        db = SQLiteDatabaseManager(str(tmp_path / 'parity.db'))
+        await db.connect()
+        try:
+            return await _parity_reads(db)
+        finally:
+            await db.disconnect()
+    
+    postgres = pg_run(_parity_reads)
+    sqlite = asyncio.run(sqlite_scenario())
+    
+    assert postgres == sqlite
+    assert postgres['counts'] == (3, 3)
+    assert postgres['funded'] == ['PayTech']
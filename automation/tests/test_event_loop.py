@@ -0,0 +1,98 @@
+# tests/test_event_loop.py
+"""Garde-fous de la boucle asyncio: seuils de déport, exécution hors boucle, blocages attribués"""
+
+import asyncio
+import threading
+import time
+
+from utils.event_loop import DEFAULT_OFFLOAD_THRESHOLDS, LoopLagMonitor, OffloadPolicy
+from utils.instrumentation import get_instrumentation
+
+
+def _busy(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+    return threading.current_thread().name
+
+
+def test_default_thresholds_apply_per_stage(monkeypatch):
+    monkeypatch.delenv('OFFLOAD_THRESHOLDS', raising=False)
+    policy = OffloadPolicy(enabled=True)
+    
+    assert policy.thresholds == DEFAULT_OFFLOAD_THRESHOLDS
+    assert not policy.should_offload('ml.sentiment', 499)
+    assert policy.should_offload('ml.sentiment', 500)
+    assert not policy.should_offload('ml.enrich', 199)
+    assert policy.should_offload('ml.enrich', 200)
+    assert policy.should_offload('scraper.parse', 100000)
+    # Étape sans seuil: toujours en ligne
+    assert not policy.should_offload('unknown.stage', 10 ** 9)
+
+
+def test_thresholds_are_overridden_from_the_environment(monkeypatch):
+    monkeypatch.setenv('OFFLOAD_THRESHOLDS', 'clean=50, ml.sentiment=1000,ml.enrich=abc,=3')
+    policy = OffloadPolicy(enabled=True)
+    
+    assert policy.thresholds['clean'] == 50
+    assert policy.thresholds['ml.sentiment'] == 1000
+    # Valeur invalide ignorée: seuil par défaut conservé
+    assert policy.thresholds['ml.enrich'] == DEFAULT_OFFLOAD_THRESHOLDS['ml.enrich']
+    assert '' not in policy.thresholds
+
+
+def test_disabled_policy_never_offloads(monkeypatch):
+    monkeypatch.setenv('OFFLOAD_ENABLED', 'false')
+    
+    assert not OffloadPolicy().should_offload('clean', 10 ** 6)
+
+
+def test_run_offloads_only_batches_over_the_threshold():
+    instrumentation = get_instrumentation()
+    instrumentation.reset('offload')
+    policy = OffloadPolicy(enabled=True, workers=1, thresholds={'test.busy': 10})
+    
+    async def scenario():
+        inline = await policy.run('test.busy', 9, _busy, 0)
+        offloaded = await policy.run('test.busy', 10, _busy, 0)
+        return inline, offloaded
+    
+    try:
+        inline, offloaded = asyncio.run(scenario())
+    finally:
+        policy.shutdown()
+    
+    assert inline == threading.current_thread().name
+    assert offloaded.startswith('offload')
+    assert instrumentation.offloads == {'test.busy': 1}
+
+
+def test_inline_work_stalls_the_loop_and_offloaded_work_does_not():
+    instrumentation = get_instrumentation()
+    instrumentation.reset('stalls')
+    policy = OffloadPolicy(enabled=True, workers=1, thresholds={'test.busy': 10})
+    
+    async def scenario():
+        monitor = LoopLagMonitor(interval=0.02, threshold=0.1)
+        monitor.start()
+        try:
+            await asyncio.sleep(0.05)
+            await policy.run('test.busy', 1, _busy, 0.4)
+            await asyncio.sleep(0.05)
+            inline_stalls = monitor.stalls
+            await policy.run('test.busy', 100, _busy, 0.4)
+            await asyncio.sleep(0.05)
+            return inline_stalls, monitor.stalls - inline_stalls
+        finally:
+            monitor.stop()
+    
+    try:
+        inline_stalls, offloaded_stalls = asyncio.run(scenario())
+    finally:
+        policy.shutdown()
+    
+    assert inline_stalls >= 1
+    assert offloaded_stalls == 0
+    # Blocage attribué au code du projet qui tournait sur la boucle
+    sites = list(instrumentation.loop_stalls)
+    assert any(site.startswith('tests/test_event_loop.py:') and site.endswith('(_busy)') for site in sites)
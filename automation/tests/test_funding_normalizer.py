@@ -0,0 +1,17 @@
+# tests/test_funding_normalizer.py
+"""Normalisation et dédoublonnage des rounds de financement"""
+
+from datetime import date
+
+from utils.funding_normalizer import FundingRoundNormalizer
+
+
+def test_dated_round_wins_over_undated_duplicate():
+    normalizer = FundingRoundNormalizer()
+    undated = {'startup_id': 1, 'round_type': 'seed', 'amount': 1500000, 'currency': 'MAD', 'announced_date': None}
+    dated = {**undated, 'announced_date': date(2024, 3, 12)}
+    other_amount = {**undated, 'amount': 3000000}
+    
+    kept = normalizer.dedupe_rounds([undated, dated, dict(undated), other_amount])
+    
+    assert kept == [dated, other_amount]
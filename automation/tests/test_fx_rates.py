@@ -0,0 +1,50 @@
+# tests/test_fx_rates.py
+"""Table FX: conversion en USD, fichier de taux versionné, chargement unique"""
+
+import json
+
+from utils.fx_rates import DEFAULT_FX_RATES, DEFAULT_FX_VERSION, FXRateTable, get_fx_table
+
+
+def test_amounts_are_converted_to_rounded_usd():
+    table = FXRateTable('test', {'usd': 1, 'MAD': 0.1, 'eur': 1.05})
+    
+    assert table.to_usd(1500000, 'MAD') == 150000
+    assert table.to_usd(1000, 'EUR') == 1050
+    assert table.to_usd('2500', 'usd') == 2500
+    # Devise absente: MAD (montants des sources marocaines)
+    assert table.to_usd(10, None) == 1
+
+
+def test_unknown_amount_or_currency_gives_none():
+    table = FXRateTable('test', {'USD': 1})
+    
+    assert table.to_usd(None, 'USD') is None
+    assert table.to_usd(100, 'JPY') is None
+
+
+def test_table_is_loaded_once_from_the_rates_file(tmp_path, monkeypatch):
+    path = tmp_path / 'fx.json'
+    path.write_text(json.dumps({'version': '2026-01', 'rates': {'USD': 1, 'MAD': 0.11}}), encoding='utf-8')
+    monkeypatch.setenv('FX_RATES_FILE', str(path))
+    get_fx_table.cache_clear()
+    try:
+        table = get_fx_table()
+        path.write_text(json.dumps({'version': '2026-02', 'rates': {'USD': 1}}), encoding='utf-8')
+        
+        assert (table.version, table.rate('mad')) == ('2026-01', 0.11)
+        assert get_fx_table() is table
+    finally:
+        get_fx_table.cache_clear()
+
+
+def test_default_rates_without_file(monkeypatch):
+    monkeypatch.delenv('FX_RATES_FILE', raising=False)
+    get_fx_table.cache_clear()
+    try:
+        table = get_fx_table()
+    finally:
+        get_fx_table.cache_clear()
+    
+    assert table.version == DEFAULT_FX_VERSION
+    assert table.rates == DEFAULT_FX_RATES
@@ -0,0 +1,163 @@
+# tests/test_http_replay.py
+"""Enregistrement / rejeu HTTP: clés de fixtures, aller-retour record -> replay, erreurs injectées"""
+
+import asyncio
+
+import aiohttp
+from aiohttp import web
+
+from utils.http_client import FixtureSession, FixtureStore, create_session, fixture_key, http_mode
+from utils.http_replay import ReplayServer
+
+
+async def _start_origin():
+    """Serveur « réel » local: JSON, HTML et binaire"""
+    async def organizations(request):
+        body = await request.json()
+        return web.json_response({'query': body, 'entities': [{'name': 'Chari'}]})
+    
+    async def page(request):
+        return web.Response(text='<h1>Startups du Maroc</h1>', content_type='text/html')
+    
+    async def logo(request):
+        return web.Response(body=b'\x89PNG\xff\x00', content_type='image/png')
+    
+    app = web.Application()
+    app.router.add_post('/organizations', organizations)
+    app.router.add_get('/page', page)
+    app.router.add_get('/logo.png', logo)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', 0).start()
+    return runner, f"http://127.0.0.1:{runner.addresses[0][1]}"
+
+
+def test_fixture_key_ignores_headers_but_not_request_content():
+    url = 'https://api.crunchbase.com/v4/searches/organizations'
+    
+    assert fixture_key('post', url, json_body={'limit': 10}) == fixture_key('POST', url, json_body={'limit': 10})
+    assert fixture_key('POST', url, json_body={'limit': 10}) != fixture_key('POST', url, json_body={'limit': 20})
+    assert fixture_key('GET', url, params={'q': 'maroc'}) != fixture_key('GET', url)
+    assert fixture_key('POST', url, data=b'a=1') == fixture_key('POST', url, data='a=1')
+
+
+def test_recorded_responses_are_replayed_without_the_origin(tmp_path):
+    store = FixtureStore(str(tmp_path))
+    
+    async def scenario():
+        origin, origin_url = await _start_origin()
+        try:
+            async with FixtureSession('crunchbase', 'record', store) as session:
+                async with session.post(f"{origin_url}/organizations", json={'limit': 2},
+                                        headers={'X-cb-user-key': 'secret'}) as response:
+                    recorded_json = await response.json()
+                async with session.get(f"{origin_url}/page") as response:
+                    recorded_html = await response.text()
+                async with session.get(f"{origin_url}/logo.png") as response:
+                    recorded_logo = await response.read()
+        finally:
+            await origin.cleanup()
+        
+        # Origine arrêtée: seules les fixtures répondent
+        server = ReplayServer(store)
+        replay_url = await server.start(port=0)
+        try:
+            async with FixtureSession('crunchbase', 'replay', store, replay_url) as session:
+                async with session.post(f"{origin_url}/organizations", json={'limit': 2}) as response:
+                    replayed_json = await response.json()
+                async with session.get(f"{origin_url}/page") as response:
+                    replayed_html = await response.text()
+                async with session.get(f"{origin_url}/logo.png") as response:
+                    replayed_logo = await response.read()
+                async with session.get(f"{origin_url}/unknown") as response:
+                    missing_status = response.status
+        finally:
+            await server.stop()
+        
+        return (recorded_json, recorded_html, recorded_logo), (replayed_json, replayed_html, replayed_logo), \
+            missing_status, server.stats
+    
+    recorded, replayed, missing_status, stats = asyncio.run(scenario())
+    
+    assert replayed == recorded
+    assert recorded[0]['query'] == {'limit': 2}
+    assert missing_status == 404
+    assert stats['served'] == 3 and stats['missing'] == 1
+    assert store.count() == {'crunchbase': 3}
+    # Les en-têtes (clés API) ne sont jamais enregistrés
+    for path in (tmp_path / 'crunchbase').iterdir():
+        assert 'secret' not in path.read_text(encoding='utf-8')
+
+
+def test_injected_errors_are_reproducible_for_a_seed(tmp_path):
+    store = FixtureStore(str(tmp_path))
+    url = 'https://example.ma/startups'
+    store.save('web_scraper', fixture_key('GET', url), 'GET', url, 200, 'text/html', b'<p>ok</p>')
+    
+    async def statuses(seed):
+        server = ReplayServer(store, error_rate=0.3, error_status=429, seed=seed)
+        replay_url = await server.start(port=0)
+        try:
+            async with FixtureSession('web_scraper', 'replay', store, replay_url) as session:
+                result = []
+                for _ in range(30):
+                    async with session.get(url) as response:
+                        result.append(response.status)
+                        if response.status == 429:
+                            assert response.headers['Retry-After'] == '1'
+                return result
+        finally:
+            await server.stop()
+    
+    first = asyncio.run(statuses(7))
+    second = asyncio.run(statuses(7))
+    
+    assert first == second
+    assert set(first) == {200, 429}
+
+
+def test_fallback_generates_and_records_missing_fixtures(tmp_path):
+    store = FixtureStore(str(tmp_path))
+    calls = []
+    
+    def fallback(collector, method, url, request_json):
+        calls.append((collector, method, url, request_json))
+        return 200, 'application/json', b'{"generated": true}'
+    
+    async def scenario():
+        server = ReplayServer(store, fallback=fallback)
+        replay_url = await server.start(port=0)
+        try:
+            async with FixtureSession('google_search', 'replay', store, replay_url) as session:
+                bodies = []
+                for _ in range(2):
+                    async with session.post('https://google.serper.dev/search', json={'q': 'fintech maroc'}) as response:
+                        bodies.append(await response.json())
+                return bodies, server.stats
+        finally:
+            await server.stop()
+    
+    bodies, stats = asyncio.run(scenario())
+    
+    assert bodies == [{'generated': True}] * 2
+    assert calls == [('google_search', 'POST', 'https://google.serper.dev/search', {'q': 'fintech maroc'})]
+    assert stats['generated'] == 1
+    assert store.count() == {'google_search': 1}
+
+
+def test_http_mode_selects_the_session(monkeypatch, tmp_path):
+    monkeypatch.setenv('HTTP_FIXTURES_DIR', str(tmp_path))
+    
+    async def session_type():
+        session = create_session('crunchbase')
+        try:
+            return type(session), getattr(session, 'mode', None)
+        finally:
+            await session.close()
+    
+    monkeypatch.setenv('HTTP_MODE', 'bogus')
+    assert http_mode() == 'live'
+    assert asyncio.run(session_type()) == (aiohttp.ClientSession, None)
+    
+    monkeypatch.setenv('HTTP_MODE', 'Replay')
+    assert asyncio.run(session_type()) == (FixtureSession, 'replay')
@@ -0,0 +1,164 @@
+# tests/test_instrumentation.py
+"""Instrumentation: histogrammes, spans, pool mesuré, rapport JSON et export Prometheus"""
+
+import asyncio
+import json
+
+import aiohttp
+
+from utils.instrumentation import (
+    LATENCY_BUCKETS, Histogram, Instrumentation, InstrumentedPool,
+    get_instrumentation, start_metrics_server,
+)
+
+
+class FakePool:
+    """Pool simulé: acquire() attend delay secondes, release() est enregistré"""
+    
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.released = []
+        self.size = 4
+    
+    async def acquire(self, timeout=None):
+        await asyncio.sleep(self.delay)
+        return object()
+    
+    async def release(self, conn):
+        self.released.append(conn)
+
+
+def test_histogram_buckets_and_quantiles():
+    histogram = Histogram()
+    for value in (0.001, 0.002, 0.02, 0.3, 7.0):
+        histogram.observe(value)
+    
+    assert histogram.count == 5
+    assert histogram.max == 7.0
+    assert sum(histogram.buckets) == 5
+    assert len(histogram.buckets) == len(LATENCY_BUCKETS) + 1
+    # Quantile = borne supérieure du bucket, jamais au-delà du maximum observé
+    assert histogram.quantile(0.5) == 0.025
+    assert histogram.quantile(1.0) == 7.0
+    assert Histogram().quantile(0.95) is None
+
+
+def test_span_measures_stage_and_throughput():
+    instrumentation = Instrumentation(enabled=True)
+    events = []
+    instrumentation.stage_hooks.append(lambda event, stage: events.append((event, stage)))
+    
+    with instrumentation.span('clean', records=10):
+        pass
+    with instrumentation.span('clean') as span:
+        span.records = 30
+    
+    stage = instrumentation.report()['stages']['clean']
+    assert stage['count'] == 2
+    assert stage['records'] == 40
+    assert stage['records_per_second'] > 0
+    assert events == [('start', 'clean'), ('end', 'clean')] * 2
+
+
+def test_disabled_instrumentation_is_a_no_op():
+    instrumentation = Instrumentation(enabled=False)
+    pool = FakePool()
+    
+    first = instrumentation.span('clean', records=5)
+    second = instrumentation.span('ml')
+    with first as span:
+        span.records = 12
+    
+    assert first is second
+    assert instrumentation.stages == {}
+    assert instrumentation.http_trace_configs('crunchbase') == []
+    assert instrumentation.instrument_pool(pool) is pool
+
+
+def test_instrumented_pool_measures_wait_and_delegates():
+    instrumentation = Instrumentation(enabled=True)
+    pool = FakePool(delay=0.02)
+    wrapped = instrumentation.instrument_pool(pool)
+    
+    async def scenario():
+        async with wrapped.acquire() as conn:
+            assert conn is not None
+        conn = await wrapped.acquire(timeout=1)
+        await wrapped.release(conn)
+    
+    asyncio.run(scenario())
+    
+    assert isinstance(wrapped, InstrumentedPool)
+    assert wrapped.size == 4
+    assert len(pool.released) == 2
+    db = instrumentation.report()['db']
+    assert db['pool_acquisitions'] == 2
+    assert db['pool_wait_seconds_max'] >= 0.02
+
+
+def test_report_is_written_as_json_and_reset_drops_previous_run(tmp_path):
+    instrumentation = Instrumentation(enabled=True)
+    instrumentation.reset('daily')
+    instrumentation.observe_http('crunchbase', 0.2, 200)
+    instrumentation.observe_http('crunchbase', 0.4, 429)
+    instrumentation.count_http_error('magnitt')
+    instrumentation.record_loop_stall('ml.sentiment', 0.3)
+    instrumentation.count_offload('ml.sentiment')
+    
+    path = instrumentation.write_report(str(tmp_path))
+    with open(path, encoding='utf-8') as f:
+        report = json.load(f)
+    
+    assert report['run'] == 'daily'
+    assert report['http']['crunchbase']['count'] == 2
+    assert report['http']['crunchbase']['status'] == {'200': 1, '429': 1}
+    assert report['http']['magnitt'] == {'count': 0, 'errors': 1}
+    assert report['event_loop']['stalls']['ml.sentiment']['count'] == 1
+    assert report['event_loop']['offloaded'] == {'ml.sentiment': 1}
+    
+    instrumentation.reset('next')
+    assert instrumentation.report()['http'] == {}
+
+
+def test_prometheus_text_has_cumulative_buckets():
+    instrumentation = Instrumentation(enabled=True)
+    instrumentation.record_stage('dedupe', 0.003, records=8)
+    instrumentation.record_stage('dedupe', 0.2)
+    instrumentation.observe_db_query(0.004)
+    
+    text = instrumentation.prometheus_text()
+    
+    assert '# TYPE vcds_stage_duration_seconds histogram' in text
+    assert 'vcds_stage_duration_seconds_bucket{stage="dedupe",le="0.005"} 1' in text
+    assert 'vcds_stage_duration_seconds_bucket{stage="dedupe",le="0.25"} 2' in text
+    assert 'vcds_stage_duration_seconds_bucket{stage="dedupe",le="+Inf"} 2' in text
+    assert 'vcds_stage_duration_seconds_count{stage="dedupe"} 2' in text
+    assert 'vcds_stage_records_total{stage="dedupe"} 8' in text
+    # Séries sans label: pas d'accolades vides
+    assert 'vcds_db_query_duration_seconds_count 1' in text
+    assert text.endswith('\n')
+
+
+def test_metrics_server_serves_prometheus_and_report():
+    instrumentation = get_instrumentation()
+    instrumentation.reset('served')
+    instrumentation.record_stage('save', 0.01, records=3)
+    
+    async def scenario():
+        runner = await start_metrics_server(0, host='127.0.0.1')
+        try:
+            port = runner.addresses[0][1]
+            async with aiohttp.ClientSession() as session:
+                async with session.get(f'http://127.0.0.1:{port}/metrics') as response:
+                    metrics = await response.text()
+                async with session.get(f'http://127.0.0.1:{port}/report') as response:
+                    report = await response.json()
+        finally:
+            await runner.cleanup()
+        return metrics, report
+    
+    metrics, report = asyncio.run(scenario())
+    
+    assert 'vcds_stage_records_total{stage="save"} 3' in metrics
+    assert report['run'] == 'served'
+    assert report['stages']['save']['records'] == 3
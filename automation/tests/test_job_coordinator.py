@@ -0,0 +1,95 @@
+# tests/test_job_coordinator.py
+"""Coordination des jobs: advisory locks PostgreSQL (ignorés sans serveur)"""
+
+import asyncio
+
+import asyncpg
+
+from scheduler.job_coordinator import APPLICATION_NAME_PREFIX, JobCoordinator
+
+
+def test_waiting_job_reuses_one_connection(postgres_available, monkeypatch):
+    from conftest import TEST_DB_NAME
+    from database.db_manager import DatabaseManager
+    
+    monkeypatch.setenv('DB_NAME', TEST_DB_NAME)
+    database = DatabaseManager()
+    
+    connects = []
+    connect = asyncpg.connect
+    
+    async def counting_connect(*args, **kwargs):
+        connects.append(kwargs.get('server_settings', {}).get('application_name'))
+        return await connect(*args, **kwargs)
+    
+    monkeypatch.setattr(asyncpg, 'connect', counting_connect)
+    
+    async def scenario():
+        replica_a = JobCoordinator(database, replica='replica-a', poll_interval=0.05)
+        replica_b = JobCoordinator(database, replica='replica-b', poll_interval=0.05)
+        ran = []
+        
+        async def job(name: str, seconds: float):
+            ran.append(name)
+            await asyncio.sleep(seconds)
+        
+        async def later(coordinator, job_id: str, name: str):
+            # Démarre une fois 'full' en cours: ~10 essais du verrou pendant l'attente
+            await asyncio.sleep(0.1)
+            return await coordinator.run(job_id, lambda: job(name, 0))
+        
+        results = await asyncio.gather(
+            replica_a.run('full_collection_weekly', lambda: job('full', 0.6)),
+            later(replica_b, 'db_cleanup_weekly', 'cleanup'),
+            later(replica_b, 'incremental_daily', 'incremental'),  # max_wait = 0: abandonné
+        )
+        return results, ran, replica_a.lock._connections, replica_b.lock._connections
+    
+    results, ran, open_a, open_b = asyncio.run(scenario())
+    
+    assert results == [True, True, False]
+    assert ran == ['full', 'cleanup']
+    # Une connexion par tentative, toutes fermées à la fin
+    assert sorted(connects) == sorted(
+        f"{APPLICATION_NAME_PREFIX}:{job_id}:{replica}" for job_id, replica in [
+            ('full_collection_weekly', 'replica-a'),
+            ('db_cleanup_weekly', 'replica-b'),
+            ('incremental_daily', 'replica-b'),
+        ]
+    )
+    assert open_a == open_b == {}
+
+
+def test_same_job_twice_in_one_process_runs_once(postgres_available, monkeypatch):
+    from conftest import TEST_DB_NAME
+    from database.db_manager import DatabaseManager
+    
+    monkeypatch.setenv('DB_NAME', TEST_DB_NAME)
+    database = DatabaseManager()
+    
+    async def scenario():
+        coordinator = JobCoordinator(database, replica='replica-a', poll_interval=0.05)
+        other_replica = JobCoordinator(database, replica='replica-b', poll_interval=0.05)
+        ran = []
+        
+        async def job(seconds: float):
+            ran.append('full')
+            await asyncio.sleep(seconds)
+        
+        async def later(runner, delay: float):
+            await asyncio.sleep(delay)
+            return await runner.run('full_collection_weekly', lambda: job(0))
+        
+        results = await asyncio.gather(
+            coordinator.run('full_collection_weekly', lambda: job(0.4)),
+            later(coordinator, 0.1),      # --run-now pendant l'exécution planifiée: ignoré
+            later(other_replica, 0.2),    # le verrou est toujours détenu par la première tentative
+        )
+        return results, ran, coordinator.lock._connections, coordinator._waiting
+    
+    results, ran, connections, waiting = asyncio.run(scenario())
+    
+    assert results == [True, False, False]
+    assert ran == ['full']
+    assert connections == {}
+    assert waiting == {'database': {}}
@@ -0,0 +1,95 @@
+# tests/test_maintenance.py
+"""Maintenance PostgreSQL: seuils de VACUUM/ANALYZE, réindexation, passe complète"""
+
+import asyncio
+
+from database.maintenance import DatabaseMaintenance
+
+
+class RecordingConnection:
+    """Connexion simulée: enregistre les commandes, aucun index invalide restant"""
+    
+    def __init__(self):
+        self.commands = []
+    
+    async def execute(self, sql, *args):
+        self.commands.append(sql)
+    
+    async def fetch(self, sql, *args):
+        return []
+
+
+def _table(name, live, dead, modified):
+    return {'table_name': name, 'n_live_tup': live, 'n_dead_tup': dead, 'n_mod_since_analyze': modified}
+
+
+def test_vacuum_and_analyze_follow_autovacuum_style_thresholds(monkeypatch):
+    monkeypatch.setenv('VACUUM_DEAD_TUPLE_RATIO', '0.1')
+    monkeypatch.setenv('ANALYZE_MODIFIED_RATIO', '0.05')
+    monkeypatch.setenv('VACUUM_MIN_CHANGED_ROWS', '50')
+    maintenance = DatabaseMaintenance(database=None)
+    
+    class Rows(RecordingConnection):
+        async def fetch(self, sql, *args):
+            return [
+                _table('startups', 1000, 151, 0),          # > 50 + 10%: VACUUM
+                _table('startup_news', 1000, 150, 101),    # seuil non dépassé: ANALYZE seul
+                _table('funding_rounds', 1000, 10, 100),   # rien
+                _table('raw_payloads', 0, 0, 0),
+            ]
+    
+    conn = Rows()
+    
+    async def scenario():
+        tables = await maintenance.table_report(conn)
+        return tables, await maintenance.vacuum_analyze(conn, tables)
+    
+    tables, processed = asyncio.run(scenario())
+    
+    assert processed == ['startups', 'startup_news']
+    assert conn.commands == ['VACUUM (ANALYZE) "startups"', 'ANALYZE "startup_news"']
+    assert tables[0]['dead_ratio'] == round(151 / 1151, 4)
+    assert tables[3]['dead_ratio'] == 0.0
+
+
+def test_only_bloated_indexes_are_rebuilt_concurrently():
+    maintenance = DatabaseMaintenance(database=None)
+    conn = RecordingConnection()
+    indexes = [
+        {'index_name': 'idx_big', 'bloated': True, 'bloat_ratio': 0.6, 'index_bytes': 64 * 1024 * 1024},
+        {'index_name': 'idx_small', 'bloated': False, 'bloat_ratio': 0.6, 'index_bytes': 8192},
+    ]
+    
+    rebuilt = asyncio.run(maintenance.reindex_bloated(conn, indexes))
+    
+    assert rebuilt == ['idx_big']
+    assert conn.commands == ['REINDEX INDEX CONCURRENTLY "idx_big"']
+
+
+def test_full_pass_vacuums_churned_table_and_logs_report(pg_run):
+    async def scenario(db):
+        async with db.pool.acquire() as conn:
+            await conn.execute("""
+                INSERT INTO startups (name, slug) SELECT 'Startup ' || i, 'startup-' || i FROM generate_series(1, 2000) i
+            """)
+            await conn.execute("UPDATE startups SET score = 1")
+            # Statistiques cumulées publiées avant la lecture par la connexion de maintenance
+            await conn.execute("SELECT pg_stat_force_next_flush()")
+            await conn.execute("SELECT 1")
+        
+        report = await DatabaseMaintenance(db).run()
+        async with db.pool.acquire() as conn:
+            logged = await conn.fetchrow("""
+                SELECT status, details FROM collection_logs
+                WHERE collector_name = 'database_maintenance'
+                ORDER BY id DESC LIMIT 1
+            """)
+        return report, logged
+    
+    report, logged = pg_run(scenario)
+    
+    assert 'startups' in report['vacuumed']
+    assert report['dead_tuples_after'] < report['dead_tuples_before']
+    assert any(index['index_name'] == 'startups_pkey' for index in report['indexes'])
+    assert logged['status'] == 'completed'
+    assert logged['details']['vacuumed'] == report['vacuumed']
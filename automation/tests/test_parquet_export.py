@@ -0,0 +1,86 @@
+# tests/test_parquet_export.py
+"""Export Parquet: aller-retour depuis le backend SQLite (ignorés sans pyarrow)"""
+
+import asyncio
+import json
+import os
+from datetime import date
+
+import pytest
+
+pq = pytest.importorskip('pyarrow.parquet')
+
+from database.parquet_export import ParquetExporter, list_snapshots, load_snapshot
+from database.sqlite_manager import SQLiteDatabaseManager
+from utils.startup_record import StartupRecord
+
+STARTUPS = [
+    {'name': 'Chari', 'sector': 'fintech', 'location': 'Casablanca', 'stage': 'Seed', 'score': 80,
+     'funding_raised': 1000000, 'funding_currency': 'MAD', 'founders': ['Ismael Belkhayat'],
+     'metrics': {'employees': 120}},
+    {'name': 'YoLa Fresh', 'sector': 'agritech', 'location': 'Rabat', 'stage': 'Pre-Seed', 'score': 60},
+    # Ville hors vocabulaire par défaut: ajoutée au dictionnaire à la volée
+    {'name': 'Atlas Robotics', 'sector': 'ai', 'location': 'Ouarzazate', 'score': 70,
+     'funding_raised': 250000, 'funding_currency': 'USD'},
+]
+
+
+def _export(tmp_path, snapshot_dt: date):
+    async def main():
+        db = SQLiteDatabaseManager(str(tmp_path / 'export.db'))
+        await db.connect()
+        try:
+            await db.upsert_startups([StartupRecord.coerce(s) for s in STARTUPS])
+            ids = await db.get_startup_ids(['Chari'])
+            await db.insert_funding_rounds([{
+                'startup_id': ids['Chari'], 'round_type': 'seed', 'amount': 1500000, 'currency': 'MAD',
+                'announced_date': date(2024, 3, 12), 'investors': ['Azur Innovation'], 'source': 'crunchbase',
+            }])
+            # Lots de 2 lignes: plusieurs row groups pour startups
+            exporter = ParquetExporter(db, output_dir=str(tmp_path / 'exports'), batch_size=2)
+            return await exporter.export(snapshot_dt=snapshot_dt)
+        finally:
+            await db.disconnect()
+    
+    return asyncio.run(main())
+
+
+def test_snapshot_round_trip(tmp_path):
+    output_dir = str(tmp_path / 'exports')
+    report = _export(tmp_path, date(2024, 6, 1))
+    
+    startups = load_snapshot('startups', output_dir=output_dir).to_pylist()
+    rounds = load_snapshot('funding_rounds', output_dir=output_dir).to_pylist()
+    metrics = load_snapshot('startup_metrics', output_dir=output_dir).to_pylist()
+    
+    assert {table: item['rows'] for table, item in report.items()} == {
+        'startups': 3, 'startup_metrics': 1, 'funding_rounds': 1,
+    }
+    assert pq.ParquetFile(report['startups']['path']).num_row_groups == 2
+    
+    by_name = {row['name']: row for row in startups}
+    assert (by_name['Chari']['sector'], by_name['Chari']['location'], by_name['Chari']['stage']) == \
+        ('fintech', 'Casablanca', 'Seed')
+    assert by_name['Atlas Robotics']['location'] == 'Ouarzazate'
+    assert by_name['Chari']['funding_raised_usd'] == 99500
+    assert by_name['Chari']['founders'] == '["Ismael Belkhayat"]'
+    assert rounds[0]['announced_date'] == date(2024, 3, 12)
+    assert rounds[0]['currency'] == 'MAD'
+    assert json.loads(metrics[0]['metrics']) == {'employees': 120}
+    assert metrics[0]['sector'] == 'fintech'
+
+
+def test_latest_snapshot_is_loaded_and_no_temporary_file_is_left(tmp_path):
+    output_dir = str(tmp_path / 'exports')
+    _export(tmp_path, date(2024, 6, 1))
+    _export(tmp_path, date(2024, 6, 2))
+    
+    assert list_snapshots('startups', output_dir) == ['2024-06-01', '2024-06-02']
+    # Startups déjà connues au second passage: même nombre de lignes, snapshot le plus récent
+    assert load_snapshot('startups', output_dir=output_dir, columns=['name']).num_rows == 3
+    leftovers = [
+        name for _, _, files in os.walk(output_dir) for name in files if name.endswith('.tmp')
+    ]
+    assert leftovers == []
+    with pytest.raises(FileNotFoundError):
+        load_snapshot('startups', output_dir=str(tmp_path / 'empty'))
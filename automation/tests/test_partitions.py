@@ -0,0 +1,102 @@
+# tests/test_partitions.py
+"""Partitions mensuelles (PostgreSQL): ignorés si aucun serveur n'est joignable"""
+
+from datetime import date, datetime, timedelta
+
+from database.partitions import PARTITIONED_TABLES, PartitionManager, add_months, month_start
+
+# Table de test calquée sur startup_metrics, pour ne pas toucher au schéma de l'application
+TABLE = 'test_partitioned_metrics'
+CONFIG = {
+    **PARTITIONED_TABLES['startup_metrics'],
+    'ddl': PARTITIONED_TABLES['startup_metrics']['ddl'].replace('startup_metrics', TABLE),
+}
+
+LEGACY_DDL = f"""
+    CREATE TABLE {TABLE} (
+        id SERIAL PRIMARY KEY,
+        startup_id INTEGER REFERENCES startups(id) ON DELETE CASCADE,
+        sector VARCHAR(100),
+        metrics JSONB,
+        measured_at TIMESTAMP DEFAULT NOW(),
+        UNIQUE (startup_id, measured_at)
+    )
+"""
+
+
+def test_month_arithmetic():
+    assert month_start(datetime(2024, 5, 17, 10)) == date(2024, 5, 1)
+    assert add_months(date(2024, 11, 1), 3) == date(2025, 2, 1)
+    assert add_months(date(2024, 1, 1), -1) == date(2023, 12, 1)
+
+
+def test_legacy_table_with_undated_rows_is_migrated(pg_run):
+    async def scenario(db):
+        manager = PartitionManager({TABLE: CONFIG})
+        two_months_ago = datetime.now().replace(microsecond=0) - timedelta(days=60)
+        
+        async with db.pool.acquire() as conn:
+            await conn.execute(f"DROP TABLE IF EXISTS {TABLE} CASCADE")
+            await conn.execute(LEGACY_DDL)
+            startup_id = await conn.fetchval("INSERT INTO startups (name) VALUES ('Chari') RETURNING id")
+            # Mesures sans date d'une même startup: autorisées par l'ancien UNIQUE (NULL distincts)
+            await conn.executemany(
+                f"INSERT INTO {TABLE} (startup_id, measured_at) VALUES ($1, $2)",
+                [(startup_id, None), (startup_id, None), (startup_id, None), (startup_id, two_months_ago)]
+            )
+            try:
+                await manager.setup(conn)
+                relkind = await conn.fetchval("SELECT relkind::text FROM pg_class WHERE oid = $1::regclass", TABLE)
+                rows = await conn.fetch(f"SELECT id, measured_at FROM {TABLE} ORDER BY id")
+                partitions = await manager.list_partitions(conn, TABLE)
+                next_id = await conn.fetchval(f"INSERT INTO {TABLE} (startup_id) VALUES ($1) RETURNING id", startup_id)
+            finally:
+                await conn.execute(f"DROP TABLE IF EXISTS {TABLE} CASCADE")
+        return relkind, rows, partitions, next_id, two_months_ago
+    
+    relkind, rows, partitions, next_id, two_months_ago = pg_run(scenario)
+    
+    assert relkind == 'p'
+    assert [row['id'] for row in rows] == [1, 2, 3, 4]
+    assert len({row['measured_at'] for row in rows}) == 4
+    assert rows[3]['measured_at'] == two_months_ago
+    # Du mois de la plus ancienne mesure jusqu'à PARTITION_MONTHS_AHEAD mois
+    assert month_start(two_months_ago) in partitions
+    assert add_months(month_start(date.today()), 3) in partitions
+    assert next_id == 5
+
+
+def test_maintenance_moves_default_rows_and_drops_expired_months(pg_run):
+    async def scenario(db):
+        manager = PartitionManager({TABLE: CONFIG})
+        this_month = month_start(date.today())
+        old = datetime.combine(add_months(this_month, -30), datetime.min.time())
+        later = datetime.combine(add_months(this_month, 8), datetime.min.time())
+        
+        async with db.pool.acquire() as conn:
+            await conn.execute(f"DROP TABLE IF EXISTS {TABLE} CASCADE")
+            try:
+                await manager.setup(conn)
+                await manager.ensure_partitions(conn, TABLE, old, old)
+                # Au-delà des partitions créées: ligne reçue par DEFAULT
+                await conn.execute(f"INSERT INTO {TABLE} (measured_at) VALUES ($1), ($2)", later, old)
+                created = await manager.ensure_partitions(conn, TABLE, later, later)
+                in_default = await conn.fetchval(f"SELECT COUNT(*) FROM {TABLE}_default")
+                in_month = await conn.fetchval(
+                    f"SELECT COUNT(*) FROM {manager.partition_name(TABLE, add_months(this_month, 8))}"
+                )
+                dropped = await manager.drop_expired(conn, TABLE, retention_months=24)
+                remaining = await conn.fetchval(f"SELECT COUNT(*) FROM {TABLE}")
+            finally:
+                await conn.execute(f"DROP TABLE IF EXISTS {TABLE} CASCADE")
+        return created, in_default, in_month, dropped, remaining
+    
+    created, in_default, in_month, dropped, remaining = pg_run(scenario)
+    
+    this_month = month_start(date.today())
+    assert PartitionManager.partition_name(TABLE, add_months(this_month, 8)) in created
+    assert (in_default, in_month) == (0, 1)
+    # Mois entièrement antérieurs aux 24 derniers: supprimés avec leurs lignes
+    assert PartitionManager.partition_name(TABLE, add_months(this_month, -30)) in dropped
+    assert PartitionManager.partition_name(TABLE, add_months(this_month, -24)) not in dropped
+    assert remaining == 1
@@ -0,0 +1,77 @@
+# tests/test_profiler.py
+"""Mode --profile: piles échantillonnées, callbacks lents localisés, allocations par étape"""
+
+import asyncio
+import json
+import time
+
+from utils.instrumentation import get_instrumentation
+from utils.profiler import Profiler, StackSampler, profiling_requested
+
+
+def _busy(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+async def _blocking_step():
+    await asyncio.sleep(0.01)
+    _busy(0.15)  # bloque la boucle
+    await asyncio.sleep(0.01)
+
+
+def test_profiling_is_requested_by_flag():
+    assert profiling_requested(['main_orchestrator.py', '--profile'])
+    assert not profiling_requested(['main_orchestrator.py', '--daily'])
+
+
+def test_stack_sampler_folds_stacks_of_the_sampled_thread(tmp_path):
+    sampler = StackSampler(interval=0.002)
+    sampler.start()
+    _busy(0.1)
+    sampler.stop()
+    
+    path = tmp_path / 'profile.folded'
+    sampler.write_folded(str(path))
+    lines = path.read_text(encoding='utf-8').splitlines()
+    
+    assert sampler.samples > 0
+    assert sum(int(line.rsplit(' ', 1)[1]) for line in lines) == sampler.samples
+    assert any('_busy (tests/test_profiler.py' in line for line in lines)
+    assert sampler.top_functions(1)[0]['function'].startswith('_busy')
+
+
+def test_profile_run_writes_files_and_locates_blocking_code(monkeypatch, tmp_path):
+    monkeypatch.setenv('PROFILE_TRACEMALLOC', 'true')
+    original_run = asyncio.events.Handle._run
+    instrumentation = get_instrumentation()
+    
+    async def scenario():
+        profiler = Profiler(str(tmp_path), interval_ms=2, slow_callback_ms=100)
+        async with profiler:
+            with instrumentation.span('test.allocate'):
+                data = [str(i) * 10 for i in range(20000)]
+            await _blocking_step()
+        return profiler, data
+    
+    profiler, data = asyncio.run(scenario())
+    
+    files = sorted(path.name for path in tmp_path.iterdir())
+    assert any(name.endswith('.folded') for name in files)
+    assert any(name.endswith('_allocations.txt') for name in files)
+    summary_path = next(path for path in tmp_path.iterdir() if path.suffix == '.json')
+    summary = json.loads(summary_path.read_text(encoding='utf-8'))
+    
+    # Le callback lent est attribué au segment de _blocking_step entre deux suspensions
+    segments = summary['event_loop']['by_segment']
+    assert summary['event_loop']['slow_callbacks'] >= 1
+    assert segments[0]['segment'].startswith('tests/test_profiler.py:')
+    assert segments[0]['seconds_max'] >= 0.1
+    assert [stage['stage'] for stage in summary['stages_memory']] == ['test.allocate']
+    assert summary['stages_memory'][0]['net_kb'] > 0
+    
+    # Boucle et hooks d'instrumentation restaurés en fin de profilage
+    assert asyncio.events.Handle._run is original_run
+    assert profiler.allocations.on_stage not in instrumentation.stage_hooks
+    del data
@@ -0,0 +1,97 @@
+# tests/test_recrawl.py
+"""Actualisation rapide: session Serper et base simulées"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+import aiohttp
+
+import scheduler.recrawl as recrawl
+from scheduler.recrawl import QuickUpdater
+
+
+class StubResponse:
+    def __init__(self, status: int, data: dict):
+        self.status = status
+        self._data = data
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc):
+        return False
+    
+    async def json(self):
+        return self._data
+    
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise aiohttp.ClientResponseError(None, (), status=self.status)
+
+
+class StubSession:
+    """Serper /news: 429 (quota) pour les startups de rate_limited"""
+    
+    def __init__(self, rate_limited):
+        self.rate_limited = set(rate_limited)
+    
+    def post(self, url, headers=None, json=None, timeout=None):
+        name = json['q'].strip('"')
+        if name in self.rate_limited:
+            return StubResponse(429, {'message': 'Too Many Requests'})
+        return StubResponse(200, {'news': [
+            {'title': f"{name} lève des fonds", 'snippet': 'Série A', 'link': f"https://news.example.ma/{name}"},
+        ]})
+
+
+class StubDatabase:
+    def __init__(self, candidates):
+        self.candidates = candidates
+        self.news = []
+        self.crawled = []
+    
+    async def get_recrawl_candidates(self, checked_before, limit, staleness_hours):
+        # Candidats déjà triés par priorité, comme en SQL
+        return [dict(candidate) for candidate in self.candidates[:limit]]
+    
+    async def insert_news_bulk(self, articles):
+        self.news.extend(articles)
+        return len(articles)
+    
+    async def mark_crawled(self, startup_ids):
+        self.crawled.extend(startup_ids)
+        return len(startup_ids)
+    
+    async def log_collection(self, source, stats):
+        pass
+
+
+class StubPipeline:
+    def analyze_sentiment_batch(self, texts):
+        return [0.5] * len(texts)
+
+
+def test_rate_limited_startup_is_an_error_and_stays_due(monkeypatch):
+    old = datetime.now() - timedelta(days=10)
+    database = StubDatabase([
+        {'id': 1, 'name': 'Chari', 'score': 80, 'last_crawled_at': old, 'priority': 1.5},
+        {'id': 2, 'name': 'YoLa Fresh', 'score': 60, 'last_crawled_at': old, 'priority': 1.2},
+    ])
+    
+    @asynccontextmanager
+    async def create_session(name):
+        yield StubSession(rate_limited=['YoLa Fresh'])
+    
+    monkeypatch.setattr(recrawl, 'create_session', create_session)
+    
+    updater = QuickUpdater(database, StubPipeline())
+    updater.collector.api_key = 'test'
+    stats = asyncio.run(updater.run())
+    
+    assert stats['errors'] == 1
+    assert stats['details']['requests'] == 2
+    assert stats['details']['deferred'] == 0
+    # Seule la startup réellement vérifiée est horodatée; l'autre reste en tête de file
+    assert database.crawled == [1]
+    assert [article['startup_id'] for article in database.news] == [1]
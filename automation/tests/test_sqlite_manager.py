@@ -0,0 +1,188 @@
+# tests/test_sqlite_manager.py
+"""Backend SQLite (fichier temporaire par test)"""
+
+import asyncio
+import sqlite3
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from database.backends import create_database_manager
+from database.db_manager import DatabaseManager
+from database.sqlite_manager import SCHEMA_SQL, SQLiteDatabaseManager
+from utils.startup_record import StartupRecord
+
+
+def run_sqlite(path, scenario):
+    async def main():
+        db = SQLiteDatabaseManager(str(path))
+        await db.connect()
+        try:
+            return await scenario(db)
+        finally:
+            await db.disconnect()
+    
+    return asyncio.run(main())
+
+
+async def _create(db, *startups):
+    await db.upsert_startups([StartupRecord.coerce(s) for s in startups])
+    return await db.get_startup_ids([s['name'] for s in startups])
+
+
+ARTICLE = {
+    'title': 'Chari et YoLa Fresh lèvent des fonds',
+    'content': 'Deux startups marocaines',
+    'url': 'https://news.example.ma/chari-yola',
+    'source': 'Médias24',
+    'published_at': '2024-05-01T10:30:00',
+    'sentiment_score': 0.5,
+}
+
+
+def test_news_shared_by_two_startups_counts_for_each(tmp_path):
+    async def scenario(db):
+        ids = await _create(
+            db,
+            {'name': 'Chari', 'description': 'e-commerce B2B'},
+            {'name': 'YoLa Fresh', 'description': 'agritech'},
+        )
+        inserted = await db.insert_news_bulk([
+            {**ARTICLE, 'startup_id': ids['Chari']},
+            {**ARTICLE, 'startup_id': ids['YoLa Fresh']},
+            {**ARTICLE, 'startup_id': ids['Chari']},
+        ])
+        published = [row['published_at'] for row in db.conn.execute("SELECT published_at FROM startup_news")]
+        return inserted, published
+    
+    inserted, published = run_sqlite(tmp_path / 'news.db', scenario)
+    
+    assert inserted == 2
+    assert published == [datetime(2024, 5, 1, 10, 30)] * 2
+
+
+def test_legacy_news_table_is_rebuilt(tmp_path):
+    path = tmp_path / 'legacy.db'
+    legacy = sqlite3.connect(path)
+    legacy.executescript(
+        SCHEMA_SQL.replace('    url_hash TEXT,\n', '    url_hash TEXT UNIQUE,\n')
+                  .replace('CREATE UNIQUE INDEX IF NOT EXISTS idx_startup_news_startup_url_hash '
+                           'ON startup_news(startup_id, url_hash);\n', '')
+    )
+    legacy.execute("INSERT INTO startups (id, name) VALUES (1, 'Chari'), (2, 'YoLa Fresh')")
+    legacy.execute("INSERT INTO startup_news (startup_id, title, url_hash) VALUES (1, 'ancienne', 'h1')")
+    legacy.commit()
+    legacy.close()
+    
+    async def scenario(db):
+        inserted = await db.insert_news_bulk([{'startup_id': 2, 'title': 'ancienne', 'url_hash': 'h1'}])
+        rows = db.conn.execute("SELECT startup_id, title FROM startup_news ORDER BY startup_id").fetchall()
+        return inserted, [tuple(row) for row in rows]
+    
+    inserted, rows = run_sqlite(path, scenario)
+    
+    assert inserted == 1
+    assert rows == [(1, 'ancienne'), (2, 'ancienne')]
+
+
+SEED_ROUND = {'round_type': 'seed', 'amount': 1500000, 'currency': 'MAD', 'source': 'description'}
+
+
+def test_undated_and_dated_versions_of_a_round_are_stored_once(tmp_path):
+    async def scenario(db):
+        ids = await _create(
+            db,
+            {'name': 'Chari', 'description': 'e-commerce B2B'},
+            {'name': 'YoLa Fresh', 'description': 'agritech'},
+        )
+        chari, yola = ids['Chari'], ids['YoLa Fresh']
+        dated = {'announced_date': date(2024, 3, 12), 'investors': ['Azur Innovation'], 'source': 'crunchbase'}
+        
+        await db.insert_funding_rounds([{**SEED_ROUND, 'startup_id': chari}])
+        await db.insert_funding_rounds([{**SEED_ROUND, **dated, 'startup_id': chari}])
+        await db.insert_funding_rounds([{**SEED_ROUND, **dated, 'startup_id': yola}])
+        await db.insert_funding_rounds([{**SEED_ROUND, 'startup_id': yola}])
+        await db.insert_funding_rounds([{**SEED_ROUND, 'amount': 3000000, 'startup_id': yola}])
+        
+        rows = db.conn.execute("""
+            SELECT startup_id, amount, announced_date, investors
+            FROM funding_rounds ORDER BY startup_id, amount
+        """).fetchall()
+        return chari, yola, [dict(row) for row in rows]
+    
+    chari, yola, rows = run_sqlite(tmp_path / 'rounds.db', scenario)
+    
+    assert [(r['startup_id'], r['amount'], r['announced_date']) for r in rows] == [
+        (chari, 1500000, date(2024, 3, 12)),
+        (yola, 1500000, date(2024, 3, 12)),
+        (yola, 3000000, None),
+    ]
+    assert rows[0]['investors'] == ['Azur Innovation']
+
+
+FULL_RECORD = {
+    'name': 'Chari', 'description': 'e-commerce B2B', 'sector': 'ecommerce', 'stage': 'series_a',
+    'location': 'Casablanca', 'funding_raised': 12000000, 'funding_currency': 'USD',
+    'employees': 120, 'email': 'contact@chari.ma', 'score': 78, 'predicted_score': 81,
+    'metrics': {'gmv_growth': 2.5},
+}
+PARTIAL_RECORD = {'name': 'Chari', 'description': 'e-commerce  B2B', 'location': 'Casablanca'}
+
+
+def test_partial_record_leaves_unchanged_startup_untouched(tmp_path):
+    async def scenario(db):
+        counts = [await db.upsert_startups([StartupRecord.coerce(FULL_RECORD)])]
+        before = db.conn.execute("SELECT updated_at FROM startups").fetchone()['updated_at']
+        for record in (PARTIAL_RECORD, FULL_RECORD, {**PARTIAL_RECORD, 'score': 80}):
+            counts.append(await db.upsert_startups([StartupRecord.coerce(record)]))
+        row = db.conn.execute("SELECT updated_at, score, email FROM startups").fetchone()
+        metrics = db.conn.execute("SELECT COUNT(*) FROM startup_metrics").fetchone()[0]
+        return counts, before, row, metrics
+    
+    counts, before, row, metrics = run_sqlite(tmp_path / 'partial.db', scenario)
+    
+    assert [max(c, key=c.get) for c in counts] == ['new', 'unchanged', 'unchanged', 'updated']
+    assert row['updated_at'] > before
+    assert (row['score'], row['email']) == (80, 'contact@chari.ma')
+    assert metrics == 1
+
+
+def test_recrawl_candidates_keep_the_highest_priority(tmp_path):
+    async def scenario(db):
+        ids = await _create(
+            db,
+            {'name': 'Ancienne', 'score': 10},
+            {'name': 'Chari', 'score': 90},
+            {'name': 'Fraîche', 'score': 90},
+        )
+        now = datetime.now()
+        db.conn.executemany("UPDATE startups SET last_crawled_at = ? WHERE id = ?", [
+            (now - timedelta(days=30), ids['Ancienne']),
+            (now - timedelta(days=2), ids['Chari']),
+            (now - timedelta(hours=1), ids['Fraîche']),
+        ])
+        today = date.today()
+        await db.insert_news_bulk([
+            {'startup_id': ids['Chari'], 'title': f"Actualité {i}", 'url': f"https://news.example.ma/{i}",
+             'published_at': (today - timedelta(days=i + 1)).isoformat()}
+            for i in range(10)
+        ])
+        
+        checked_before = now - timedelta(hours=24)
+        top = await db.get_recrawl_candidates(checked_before, 1)
+        everything = await db.get_recrawl_candidates(checked_before, 10)
+        return top, everything
+    
+    top, everything = run_sqlite(tmp_path / 'recrawl.db', scenario)
+    
+    assert [c['name'] for c in top] == ['Chari']
+    assert [c['name'] for c in everything] == ['Chari', 'Ancienne']
+    assert everything[0]['priority'] > everything[1]['priority']
+
+
+def test_backend_is_chosen_from_db_backend(monkeypatch):
+    monkeypatch.setenv('DB_BACKEND', 'sqlite3')
+    assert isinstance(create_database_manager(), SQLiteDatabaseManager)
+    assert isinstance(create_database_manager('PostgreSQL'), DatabaseManager)
+    with pytest.raises(ValueError):
+        create_database_manager('mysql')
@@ -0,0 +1,70 @@
+# tests/test_startup_record.py
+"""StartupRecord: alias résolus à l'ingestion, champs rares et accès par clé"""
+
+import pytest
+
+from utils.startup_record import StartupRecord
+
+
+def test_from_dict_resolves_source_specific_aliases():
+    record = StartupRecord.from_dict({
+        'name': 'Chari',
+        'fundingRaised': 1000000,
+        'fundingCurrency': 'MAD',
+        'foundedYear': 2020,
+        'linkedin_url': 'https://linkedin.com/company/chari',
+        'teamSize': 120,
+        'sourceUrl': 'https://www.crunchbase.com/organization/chari',
+        'predictedScore': 82,
+    })
+    
+    assert record.funding_raised == 1000000
+    assert record.funding_currency == 'MAD'
+    assert record.founded_year == 2020
+    assert record.linkedin == 'https://linkedin.com/company/chari'
+    assert record.employees == 120
+    assert record.source_url == 'https://www.crunchbase.com/organization/chari'
+    assert record.predicted_score == 82
+    # Aucun alias ne survit dans extra
+    assert record.extra is None
+
+
+def test_canonical_key_wins_over_alias_in_the_same_dict():
+    for data in ({'funding_raised': 500, 'fundingRaised': 900}, {'fundingRaised': 900, 'funding_raised': 500}):
+        assert StartupRecord.from_dict(data).funding_raised == 500
+
+
+def test_rare_and_collector_fields_live_in_extra():
+    record = StartupRecord.from_dict({'name': 'YoLa Fresh', 'phone': '+212 5 22 00 00 00', 'rank': 3})
+    
+    assert record.phone == '+212 5 22 00 00 00'
+    assert record['rank'] == 3
+    assert record.extra == {'phone': '+212 5 22 00 00 00', 'rank': 3}
+    
+    record.phone = None
+    assert record.extra == {'rank': 3}
+    assert 'phone' not in record
+
+
+def test_dict_style_access_uses_the_same_aliases():
+    record = StartupRecord(name='Chari', employees=120)
+    
+    assert record['team_size'] == 120
+    assert record.get('num_employees') == 120
+    assert record.get('website', 'n/a') == 'n/a'
+    with pytest.raises(KeyError):
+        record['website']
+    
+    record['foundedYear'] = 2020
+    assert record.founded_year == 2020
+    assert record.to_dict() == {'name': 'Chari', 'employees': 120, 'founded_year': 2020}
+
+
+def test_categorical_values_are_interned_and_records_are_coerced_once():
+    sector = ''.join(['fin', 'tech'])
+    first = StartupRecord.from_dict({'name': 'A', 'sector': sector})
+    second = StartupRecord.from_dict({'name': 'B', 'sector': 'fin' + 'tech'})
+    
+    assert first.sector is second.sector
+    assert StartupRecord.coerce(first) is first
+    assert not hasattr(first, '__dict__')
@@ -0,0 +1,121 @@
+# utils/categories.py
+"""
+Categories
+==========
+Dictionnaires de catégories (sector, stage, location, source): chaque valeur
+distincte est stockée une seule fois (chaîne internée) et reçoit un code
+entier dense, attribué dans l'ordre d'apparition.
+
+- les vocabulaires par défaut sont déclarés en premier: leurs codes sont
+  identiques d'un processus à l'autre
+- les valeurs inconnues (nouvelle ville, nouvelle source) sont ajoutées à la
+  volée; les codes ne sont jamais réattribués pendant la vie du processus
+- lookup(): table indexée par code (ex. hotness sectorielle du scoring)
+  à la place d'un dict consulté par chaîne pour chaque startup
+
+Les codes sont locaux au processus: la base garde les valeurs texte.
+"""
+
+import sys
+import logging
+import threading
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# Vocabulaires connus (valeurs normalisées par DataCleaner)
+DEFAULT_CATEGORIES = {
+    'sector': [
+        'fintech', 'ai', 'healthtech', 'cleantech', 'edtech', 'saas',
+        'ecommerce', 'agritech', 'logistics', 'proptech', 'other',
+    ],
+    'stage': [
+        'Pre-Seed', 'Seed', 'Series A', 'Series B', 'Series C', 'Growth',
+    ],
+    'location': [
+        'Morocco', 'Casablanca', 'Rabat', 'Marrakech', 'Tanger', 'Fès', 'Agadir',
+    ],
+    'source': [
+        'crunchbase', 'google_search', 'google_knowledge_graph', 'incubator_portfolio',
+        'startup_competition', 'media_coverage', 'government_database', 'news_mention',
+    ],
+}
+
+
+class CategoryDictionary:
+    """Vocabulaire d'une dimension: valeur <-> code entier"""
+    
+    def __init__(self, dimension: str, values: Iterable[str] = ()):
+        self.dimension = dimension
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+        # Ajouts protégés: le nettoyage peut tourner dans le pool de threads (utils/event_loop.py)
+        self._lock = threading.Lock()
+        for value in values:
+            self.encode(value)
+    
+    def __len__(self) -> int:
+        return len(self.values)
+    
+    def encode(self, value: Optional[str]) -> Optional[int]:
+        """Code de la valeur (ajoutée au vocabulaire si inconnue); None reste None"""
+        if value is None:
+            return None
+        code = self.codes.get(value)
+        if code is None:
+            with self._lock:
+                code = self.codes.get(value)
+                if code is None:
+                    code = len(self.values)
+                    if isinstance(value, str):
+                        value = sys.intern(value)
+                    self.values.append(value)
+                    self.codes[value] = code
+        return code
+    
+    def decode(self, code: Optional[int]) -> Optional[str]:
+        return None if code is None else self.values[code]
+    
+    def intern(self, value: Optional[str]) -> Optional[str]:
+        """Instance partagée de la valeur (une seule chaîne en mémoire par catégorie)"""
+        code = self.encode(value)
+        return None if code is None else self.values[code]
+    
+    def encode_many(self, values: Iterable[Optional[str]]) -> List[Optional[int]]:
+        return [self.encode(value) for value in values]
+    
+    def lookup(self, mapping: Dict[str, object], default=None) -> List:
+        """Table indexée par code: lookup(mapping)[code] == mapping.get(valeur, default)"""
+        return [mapping.get(value, default) for value in self.values]
+
+
+class CategoryRegistry:
+    """Dictionnaires de toutes les dimensions catégorielles"""
+    
+    DIMENSIONS = ('sector', 'stage', 'location', 'source')
+    
+    def __init__(self, defaults: Dict[str, List[str]] = None):
+        defaults = defaults or DEFAULT_CATEGORIES
+        self.dimensions = {
+            dimension: CategoryDictionary(dimension, defaults.get(dimension, ()))
+            for dimension in self.DIMENSIONS
+        }
+    
+    def __getitem__(self, dimension: str) -> CategoryDictionary:
+        return self.dimensions[dimension]
+    
+    def __contains__(self, dimension: str) -> bool:
+        return dimension in self.dimensions
+    
+    def sizes(self) -> Dict[str, int]:
+        return {dimension: len(dictionary) for dimension, dictionary in self.dimensions.items()}
+
+
+@lru_cache(maxsize=1)
+def get_categories() -> CategoryRegistry:
+    """Registre de catégories du processus"""
+    registry = CategoryRegistry()
+    logger.debug(f"🏷️  Catégories chargées: {registry.sizes()}")
+    return registry
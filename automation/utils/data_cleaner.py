@@ -10,6 +10,16 @@ from typing import List, Dict
 import re
 from difflib import SequenceMatcher
 import logging
+import os
+import sys
+
+# Ajouter le parent directory au path (exécution standalone)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.categories import get_categories
+from utils.event_loop import offload
+from utils.instrumentation import get_instrumentation
+from utils.startup_record import StartupRecord
 
 logger = logging.getLogger(__name__)
 
@@ -19,11 +29,17 @@ class DataCleaner:
     
     def __init__(self):
         self.similarity_threshold = 0.85  # 85% de similarité pour considérer comme doublon
+        self.categories = get_categories()
+        self.instrumentation = get_instrumentation()
+    
+    async def process(self, startups: List[Dict]) -> List[StartupRecord]:
+        """Nettoyage complet (process_sync), hors de la boucle asyncio au-delà du seuil 'clean'"""
+        return await offload('clean', len(startups), self.process_sync, startups)
     
-    async def process(self, startups: List[Dict]) -> List[Dict]:
+    def process_sync(self, startups: List[Dict]) -> List[StartupRecord]:
         """
-        Processus complet de nettoyage:
-        1. Normalisation
+        Processus complet de nettoyage (CPU pur, sans attente):
+        1. Normalisation (conversion en StartupRecord, alias résolus une seule fois)
         2. Validation
         3. Déduplication
         4. Enrichissement
@@ -32,52 +48,61 @@ class DataCleaner:
         logger.info(f"🧹 Nettoyage de {len(startups)} startups...")
         
         # Étape 1: Normalisation
-        normalized = [self._normalize_startup(s) for s in startups]
+        with self.instrumentation.span('clean.normalize', len(startups)):
+            normalized = [self._normalize_startup(StartupRecord.coerce(s)) for s in startups]
         
         # Étape 2: Validation (filtrer les données invalides)
-        valid = [s for s in normalized if self._is_valid(s)]
+        with self.instrumentation.span('clean.validate', len(normalized)):
+            valid = [s for s in normalized if self._is_valid(s)]
         logger.info(f"✅ Validation: {len(valid)}/{len(normalized)} startups valides")
         
         # Étape 3: Déduplication
-        deduplicated = await self._deduplicate(valid)
+        with self.instrumentation.span('clean.deduplicate', len(valid)):
+            deduplicated = self._deduplicate(valid)
         logger.info(f"✅ Déduplication: {len(deduplicated)} startups uniques")
         
         # Étape 4: Enrichissement (fusion des données)
-        enriched = await self._enrich_merged_data(deduplicated)
+        with self.instrumentation.span('clean.enrich', len(deduplicated)):
+            enriched = self._enrich_merged_data(deduplicated)
         
         return enriched
     
-    def _normalize_startup(self, startup: Dict) -> Dict:
-        """Normalise les données d'une startup"""
-        
-        normalized = startup.copy()
+    def _normalize_startup(self, startup: StartupRecord) -> StartupRecord:
+        """Normalise les données d'une startup (sur place: le record est propre au pipeline)"""
         
         # Normaliser le nom
-        if 'name' in normalized:
-            normalized['name'] = self._normalize_name(normalized['name'])
+        if startup.name is not None:
+            startup.name = self._normalize_name(startup.name)
         
         # Normaliser l'email
-        if 'email' in normalized:
-            normalized['email'] = self._normalize_email(normalized['email'])
+        if startup.email is not None:
+            startup.email = self._normalize_email(startup.email)
         
-        # Normaliser le secteur
-        if 'sector' in normalized:
-            normalized['sector'] = self._normalize_sector(normalized['sector'])
+        # Normaliser le secteur (absent: classifié plus tard par le pipeline ML)
+        if startup.sector is not None:
+            startup.sector = self._normalize_sector(startup.sector)
         
         # Normaliser la localisation
-        if 'location' in normalized:
-            normalized['location'] = self._normalize_location(normalized['location'])
+        if startup.location is not None:
+            startup.location = self._normalize_location(startup.location)
+        
+        # Stage et source: instance partagée du registre de catégories
+        if startup.stage is not None:
+            startup.stage = self.categories['stage'].intern(startup.stage)
+        if startup.source is not None:
+            startup.source = self.categories['source'].intern(startup.source)
         
         # Normaliser les montants
-        for field in ['funding_raised', 'revenue']:
-            if field in normalized:
-                normalized[field] = self._normalize_amount(normalized[field])
+        if startup.funding_raised is not None:
+            startup.funding_raised = self._normalize_amount(startup.funding_raised)
+        if startup.revenue is not None:
+            startup.revenue = self._normalize_amount(startup.revenue)
         
         # Normaliser les URLs
-        if 'website' in normalized:
-            normalized['website'] = self._normalize_url(normalized['website'])
+        if startup.website is not None:
+            startup.website = self._normalize_url(startup.website)
         
-        return normalized
+        return startup
     
     def _normalize_name(self, name: str) -> str:
         """Normalise le nom de la startup"""
@@ -121,7 +146,7 @@ class DataCleaner:
     def _normalize_sector(self, sector: str) -> str:
         """Normalise le secteur"""
         if not sector:
-            return 'other'
+            return self.categories['sector'].intern('other')
         
         sector = sector.lower().strip()
         
@@ -146,12 +171,12 @@ class DataCleaner:
             'software as a service': 'saas',
         }
         
-        return sector_mapping.get(sector, sector)
+        return self.categories['sector'].intern(sector_mapping.get(sector, sector))
     
     def _normalize_location(self, location: str) -> str:
         """Normalise la localisation"""
         if not location:
-            return 'Morocco'
+            return self.categories['location'].intern('Morocco')
         
         location = location.strip()
         
@@ -172,10 +197,10 @@ class DataCleaner:
         
         for key, value in city_mapping.items():
             if key in location_lower:
-                return value
+                return self.categories['location'].intern(value)
         
         # Capitaliser si pas trouvé
-        return location.title()
+        return self.categories['location'].intern(location.title())
     
     def _normalize_amount(self, amount) -> int:
         """Normalise un montant financier"""
@@ -232,56 +257,50 @@ class DataCleaner:
         
         return url
     
-    def _is_valid(self, startup: Dict) -> bool:
+    def _is_valid(self, startup: StartupRecord) -> bool:
         """Valide qu'une startup a les données minimales requises"""
         
         # Nom obligatoire
-        if not startup.get('name') or len(startup['name']) < 2:
+        if not startup.name or len(startup.name) < 2:
             return False
         
         # Au moins un des champs suivants
-        required_one_of = ['description', 'website', 'sector', 'email']
-        if not any(startup.get(field) for field in required_one_of):
+        if not (startup.description or startup.website or startup.sector or startup.email):
             return False
         
         return True
     
-    async def _deduplicate(self, startups: List[Dict]) -> List[Dict]:
+    def _deduplicate(self, startups: List[StartupRecord]) -> List[StartupRecord]:
         """Déduplique les startups"""
         
         unique_startups = []
-        seen_names = set()
-        duplicates_merged = {}
+        seen_names = {}
         
         for startup in startups:
-            name = startup.get('name', '').lower()
+            name = startup.name.lower()
             
             # Vérifier si exactement le même nom
             if name in seen_names:
                 # C'est un doublon exact, fusionner les données
-                existing = next(s for s in unique_startups if s.get('name', '').lower() == name)
-                self._merge_startup_data(existing, startup)
+                self._merge_startup_data(seen_names[name], startup)
                 continue
             
             # Vérifier similarité avec startups existantes
             is_duplicate = False
             
             for existing_startup in unique_startups:
-                similarity = self._calculate_similarity(
-                    startup.get('name', ''),
-                    existing_startup.get('name', '')
-                )
+                similarity = self._calculate_similarity(startup.name, existing_startup.name)
                 
                 if similarity >= self.similarity_threshold:
                     # C'est probablement un doublon
-                    logger.debug(f"Doublon détecté: {startup.get('name')} ~ {existing_startup.get('name')} ({similarity:.2%})")
+                    logger.debug(f"Doublon détecté: {startup.name} ~ {existing_startup.name} ({similarity:.2%})")
                     self._merge_startup_data(existing_startup, startup)
                     is_duplicate = True
                     break
             
             if not is_duplicate:
                 unique_startups.append(startup)
-                seen_names.add(name)
+                seen_names[name] = startup
         
         return unique_startups
     
@@ -297,66 +316,66 @@ class DataCleaner:
         # Utiliser SequenceMatcher
         return SequenceMatcher(None, s1, s2).ratio()
     
-    def _merge_startup_data(self, target: Dict, source: Dict):
+    def _merge_startup_data(self, target: StartupRecord, source: StartupRecord):
         """Fusionne les données de source dans target"""
         
         # Stratégie: garder les données les plus complètes
         
         for key, value in source.items():
-            if key not in target or not target[key]:
+            current = target.get(key)
+            if key == 'news' and isinstance(value, list) and isinstance(current, list):
+                # Les actualités s'accumulent (dédupliquées à l'insertion par URL)
+                target.news = current + value
+            elif not current:
                 # Target n'a pas cette donnée, l'ajouter
                 target[key] = value
-            elif isinstance(value, (int, float)) and value > target.get(key, 0):
+            elif isinstance(value, (int, float)) and isinstance(current, (int, float)) and value > current:
                 # Pour les nombres, garder le plus grand (souvent plus récent/précis)
                 target[key] = value
-            elif isinstance(value, str) and len(value) > len(str(target.get(key, ''))):
+            elif isinstance(value, str) and len(value) > len(str(current)):
                 # Pour les strings, garder le plus long (plus d'info)
                 target[key] = value
         
         # Merger les sources
-        if 'sources' not in target:
-            target['sources'] = []
+        if target.sources is None:
+            target.sources = []
         
-        if source.get('source'):
-            if source['source'] not in target['sources']:
-                target['sources'].append(source['source'])
+        if source.source and source.source not in target.sources:
+            target.sources.append(source.source)
     
-    async def _enrich_merged_data(self, startups: List[Dict]) -> List[Dict]:
+    def _enrich_merged_data(self, startups: List[StartupRecord]) -> List[StartupRecord]:
         """Enrichit les données après merge"""
         
         enriched = []
         
         for startup in startups:
             # Calculer un score de qualité des données
-            startup['data_quality_score'] = self._calculate_data_quality(startup)
+            startup.data_quality_score = self._calculate_data_quality(startup)
             
             # Ajouter un flag de confiance
-            startup['confidence'] = 'high' if startup['data_quality_score'] > 70 else 'medium' if startup['data_quality_score'] > 40 else 'low'
+            startup.confidence = 'high' if startup.data_quality_score > 70 else 'medium' if startup.data_quality_score > 40 else 'low'
             
             enriched.append(startup)
         
         return enriched
     
-    def _calculate_data_quality(self, startup: Dict) -> int:
+    def _calculate_data_quality(self, startup: StartupRecord) -> int:
         """Calcule un score de qualité des données (0-100)"""
         score = 0
         
         # Présence de champs importants (50 points max)
-        important_fields = ['name', 'description', 'sector', 'location', 'website', 'email']
-        for field in important_fields:
-            if startup.get(field):
-                score += 8
+        important_fields = (startup.name, startup.description, startup.sector,
+                            startup.location, startup.website, startup.email)
+        score += 8 * sum(1 for value in important_fields if value)
         
         # Présence de champs financiers (30 points max)
-        financial_fields = ['funding_raised', 'revenue', 'employees']
-        for field in financial_fields:
-            if startup.get(field):
-                score += 10
+        financial_fields = (startup.funding_raised, startup.revenue, startup.employees)
+        score += 10 * sum(1 for value in financial_fields if value)
         
         # Présence de données riches (20 points max)
-        if startup.get('founders'):
+        if startup.founders:
             score += 10
-        if startup.get('metrics'):
+        if startup.metrics:
             score += 10
         
         return min(100, score)
@@ -380,6 +399,6 @@ if __name__ == "__main__":
         print(f"Après: {len(cleaned)} startups")
         
         for s in cleaned:
-            print(f"- {s['name']} ({s['sector']}) - Quality: {s['data_quality_score']}")
+            print(f"- {s.name} ({s.sector}) - Quality: {s.data_quality_score}")
     
     asyncio.run(test())
@@ -0,0 +1,254 @@
+# utils/event_loop.py
+"""
+Event Loop Guard
+================
+Garde-fous de la boucle asyncio (orchestrateur, scheduler APScheduler):
+
+- LoopLagMonitor: une tâche "battement" mesure le retard de réveil de la
+  boucle (lag) toutes les LOOP_LAG_INTERVAL_MS; un thread de surveillance
+  échantillonne la pile du thread de la boucle quand le battement est en
+  retard, pour attribuer chaque blocage (> LOOP_STALL_MS) à un site d'appel
+  du projet (fichier:ligne, fonction). Coût: un réveil par intervalle, aucun
+  patch de l'event loop (contrairement au mode --profile).
+- OffloadPolicy: le travail CPU synchrone (nettoyage/déduplication,
+  enrichissement ML, sentiment par lot, parsing HTML) passe par offload(),
+  qui l'exécute dans un pool de threads dédié quand la taille du lot dépasse
+  le seuil de l'étape (OFFLOAD_THRESHOLDS), en ligne sinon.
+
+Le pool est distinct de l'executor par défaut de la boucle, utilisé par
+aiohttp pour la résolution DNS: un dédoublonnage long ne retarde pas les
+requêtes HTTP concurrentes. Le code déporté garde le GIL mais le rend toutes
+les sys.getswitchinterval() (5 ms): la boucle reste réactive.
+
+Lag, blocages par site et appels déportés sont exportés par l'instrumentation
+(rapport de run, /metrics).
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, Dict, Optional
+
+# Ajouter le parent directory au path (exécution standalone)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.instrumentation import get_instrumentation
+
+logger = logging.getLogger(__name__)
+
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Taille de lot au-delà de laquelle une étape est déportée (startups, textes, caractères HTML)
+DEFAULT_OFFLOAD_THRESHOLDS = {
+    'clean': 200,
+    'ml.enrich': 200,
+    'ml.sentiment': 500,
+    'scraper.parse': 100000,
+}
+
+
+def _env_flag(name: str, default: str = 'true') -> bool:
+    return os.getenv(name, default).lower() in ('1', 'true', 'yes')
+
+
+def call_site(frame) -> str:
+    """Frame du projet la plus profonde d'une pile: 'fichier:ligne (fonction)'"""
+    innermost = frame
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(BASE_DIR) and filename != __file__ and 'site-packages' not in filename:
+            return f"{os.path.relpath(filename, BASE_DIR)}:{frame.f_lineno} ({frame.f_code.co_name})"
+        frame = frame.f_back
+    if innermost is None:
+        return 'inconnu'
+    return f"{os.path.basename(innermost.f_code.co_filename)}:{innermost.f_lineno} ({innermost.f_code.co_name})"
+
+
+class LoopLagMonitor:
+    """Retard de la boucle asyncio et blocages attribués à un site d'appel"""
+    
+    def __init__(self, interval: float = None, threshold: float = None):
+        self.interval = interval or float(os.getenv('LOOP_LAG_INTERVAL_MS', 100)) / 1000
+        self.threshold = threshold or float(os.getenv('LOOP_STALL_MS', 250)) / 1000
+        self.instrumentation = get_instrumentation()
+        self.stalls = 0
+        self.max_lag = 0.0
+        self._loop_thread_id = None
+        self._last_beat = None
+        # Sites échantillonnés pendant le blocage en cours (lus et remis à zéro par le battement)
+        self._sites: Counter = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._task = None
+        self._thread = None
+    
+    def start(self):
+        """À appeler depuis la boucle surveillée"""
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.perf_counter()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name='loop-watchdog', daemon=True)
+        self._thread.start()
+        logger.info(f"🩺 Surveillance de la boucle asyncio (battement {self.interval * 1000:g} ms, "
+                    f"blocage > {self.threshold * 1000:g} ms)")
+    
+    def stop(self):
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+    
+    async def _heartbeat(self):
+        while True:
+            self._last_beat = started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - started - self.interval)
+            self.max_lag = max(self.max_lag, lag)
+            if self.instrumentation.enabled:
+                self.instrumentation.observe_loop_lag(lag)
+            
+            with self._lock:
+                sites, self._sites = self._sites, Counter()
+            if lag >= self.threshold:
+                self._record_stall(lag, sites)
+    
+    def _watch(self):
+        # Échantillonnage dès la moitié du seuil de retard: un blocage de threshold est vu au moins une fois
+        period = self.threshold / 4
+        while not self._stop.wait(period):
+            overdue = time.perf_counter() - self._last_beat - self.interval
+            if overdue < self.threshold / 2:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            site = call_site(frame)
+            with self._lock:
+                self._sites[site] += 1
+    
+    def _record_stall(self, lag: float, sites: Counter):
+        self.stalls += 1
+        site = sites.most_common(1)[0][0] if sites else 'inconnu (non échantillonné)'
+        if self.instrumentation.enabled:
+            self.instrumentation.record_loop_stall(site, lag)
+        logger.warning(f"🐢 Boucle asyncio bloquée {lag * 1000:.0f} ms: {site}")
+
+
+class OffloadPolicy:
+    """Exécution du travail CPU dans un pool de threads au-delà d'une taille de lot"""
+    
+    def __init__(self, enabled: bool = None, workers: int = None, thresholds: Dict[str, int] = None):
+        self.enabled = _env_flag('OFFLOAD_ENABLED') if enabled is None else enabled
+        self.workers = workers or int(os.getenv('OFFLOAD_WORKERS', 2))
+        self.thresholds = dict(DEFAULT_OFFLOAD_THRESHOLDS)
+        self.thresholds.update(thresholds if thresholds is not None else self._parse(os.getenv('OFFLOAD_THRESHOLDS', '')))
+        self.instrumentation = get_instrumentation()
+        self._executor = None
+    
+    @staticmethod
+    def _parse(spec: str) -> Dict[str, int]:
+        """'clean=200,ml.enrich=100' -> {'clean': 200, 'ml.enrich': 100}"""
+        thresholds = {}
+        for item in spec.split(','):
+            name, _, value = item.partition('=')
+            if name.strip() and value.strip():
+                try:
+                    thresholds[name.strip()] = int(value)
+                except ValueError:
+                    logger.warning(f"⚠️  OFFLOAD_THRESHOLDS: seuil invalide pour {name.strip()}: {value}")
+        return thresholds
+    
+    def should_offload(self, name: str, size: int) -> bool:
+        if not self.enabled:
+            return False
+        threshold = self.thresholds.get(name)
+        return threshold is not None and size >= threshold
+    
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='offload')
+        return self._executor
+    
+    async def run(self, name: str, size: int, func: Callable, *args, **kwargs):
+        """func(*args, **kwargs), dans le pool si size atteint le seuil de l'étape name"""
+        if not self.should_offload(name, size):
+            return func(*args, **kwargs)
+        
+        if self.instrumentation.enabled:
+            self.instrumentation.count_offload(name)
+        logger.debug(f"🧵 {name}: lot de {size} exécuté hors de la boucle")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+    
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+@lru_cache(maxsize=1)
+def get_offload_policy() -> OffloadPolicy:
+    """Politique de déport du processus (OFFLOAD_ENABLED, OFFLOAD_WORKERS, OFFLOAD_THRESHOLDS)"""
+    return OffloadPolicy()
+
+
+async def offload(name: str, size: int, func: Callable, *args, **kwargs):
+    """Raccourci: get_offload_policy().run(...)"""
+    return await get_offload_policy().run(name, size, func, *args, **kwargs)
+
+
+def start_loop_monitor() -> Optional[LoopLagMonitor]:
+    """Démarre la surveillance de la boucle courante (None si LOOP_MONITOR_ENABLED=false)"""
+    if not _env_flag('LOOP_MONITOR_ENABLED'):
+        return None
+    monitor = LoopLagMonitor()
+    monitor.start()
+    return monitor
+
+
+# Test
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    
+    def busy(seconds: float) -> int:
+        deadline = time.perf_counter() + seconds
+        count = 0
+        while time.perf_counter() < deadline:
+            count += 1
+        return count
+    
+    async def test():
+        monitor = LoopLagMonitor(interval=0.05, threshold=0.1)
+        monitor.start()
+        policy = OffloadPolicy(enabled=True, thresholds={'test.busy': 10})
+        await asyncio.sleep(0.1)
+        
+        # En ligne (lot trop petit): bloque la boucle, blocage attribué à busy()
+        await policy.run('test.busy', 1, busy, 0.4)
+        await asyncio.sleep(0.1)
+        inline_stalls = monitor.stalls
+        
+        # Déporté: la boucle continue de battre
+        await policy.run('test.busy', 100, busy, 0.4)
+        await asyncio.sleep(0.1)
+        
+        monitor.stop()
+        policy.shutdown()
+        print(f"Blocages en ligne: {inline_stalls}, après déport: {monitor.stalls - inline_stalls}")
+        print(f"Lag max: {monitor.max_lag * 1000:.0f} ms")
+        print(get_instrumentation().report()['event_loop'])
+    
+    asyncio.run(test())
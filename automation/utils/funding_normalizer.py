@@ -0,0 +1,191 @@
+# utils/funding_normalizer.py
+"""
+Funding Round Normalizer
+========================
+Transforme les informations de financement éparses (Crunchbase, entités
+extraites par le pipeline ML) en rounds normalisés pour funding_rounds
+"""
+
+import re
+from datetime import date, datetime
+from typing import Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class FundingRoundNormalizer:
+    """Normaliseur des rounds de financement"""
+    
+    # Variantes rencontrées -> type canonique
+    ROUND_TYPES = {
+        'pre-seed': 'pre_seed',
+        'pre_seed': 'pre_seed',
+        'preseed': 'pre_seed',
+        'seed': 'seed',
+        'amorçage': 'seed',
+        'amorcage': 'seed',
+        'angel': 'angel',
+        'series a': 'series_a',
+        'series_a': 'series_a',
+        'série a': 'series_a',
+        'series b': 'series_b',
+        'series_b': 'series_b',
+        'série b': 'series_b',
+        'series c': 'series_c',
+        'series_c': 'series_c',
+        'série c': 'series_c',
+        'grant': 'grant',
+        'debt_financing': 'debt',
+        'convertible_note': 'convertible_note',
+        'corporate_round': 'corporate',
+        'private_equity': 'private_equity',
+    }
+    
+    CURRENCIES = {
+        'mad': 'MAD', 'dh': 'MAD', 'dhs': 'MAD', 'dirhams': 'MAD',
+        'eur': 'EUR', '€': 'EUR', 'euros': 'EUR',
+        'usd': 'USD', '$': 'USD', 'dollars': 'USD',
+    }
+    
+    AMOUNT_PATTERN = re.compile(
+        r'(\d+(?:[.,]\d+)?)\s*(millions?|milliards?|M|K|k)?\s*(MAD|DH|Dhs?|dirhams|EUR|€|euros|USD|\$|dollars)',
+        re.IGNORECASE
+    )
+    
+    def normalize(self, startup: Dict) -> List[Dict]:
+        """Retourne les rounds normalisés d'une startup (sans startup_id)"""
+        rounds = []
+        
+        # Crunchbase: dernier round (funding_total est un cumul, pas le montant du round)
+        if startup.get('last_funding_type'):
+            rounds.append(self._make_round(
+                round_type=startup['last_funding_type'],
+                amount=None,
+                currency=None,
+                announced_date=startup.get('last_funding_at'),
+                source=startup.get('source')
+            ))
+        
+        # Entités extraites de la description
+        funding_info = (startup.get('extracted_entities') or {}).get('funding_info') or {}
+        if funding_info.get('round_type') or funding_info.get('amount'):
+            amount, currency = self.parse_amount(funding_info.get('amount'))
+            rounds.append(self._make_round(
+                round_type=funding_info.get('round_type'),
+                amount=amount,
+                currency=currency,
+                announced_date=None,
+                source=startup.get('source'),
+                investors=funding_info.get('investors')
+            ))
+        
+        return self._merge_same_round(rounds)
+    
+    def normalize_round_type(self, round_type: Optional[str]) -> str:
+        if not round_type:
+            return 'unknown'
+        key = round_type.strip().lower()
+        return self.ROUND_TYPES.get(key, key.replace(' ', '_'))
+    
+    def parse_amount(self, text: Optional[str]):
+        """'1,5 millions MAD' -> (1500000, 'MAD')"""
+        if not text:
+            return None, None
+        
+        match = self.AMOUNT_PATTERN.search(str(text))
+        if not match:
+            return None, None
+        
+        value = float(match.group(1).replace(',', '.'))
+        multiplier = (match.group(2) or '').lower()
+        if multiplier.startswith('milliard'):
+            value *= 1_000_000_000
+        elif multiplier.startswith('m'):
+            value *= 1_000_000
+        elif multiplier == 'k':
+            value *= 1_000
+        
+        currency = self.CURRENCIES.get(match.group(3).lower(), match.group(3).upper())
+        return int(value), currency
+    
+    def _make_round(self, round_type, amount, currency, announced_date, source, investors=None) -> Dict:
+        return {
+            'round_type': self.normalize_round_type(round_type),
+            'amount': amount,
+            'currency': currency,
+            'announced_date': self._parse_date(announced_date),
+            'investors': investors or [],
+            'source': source
+        }
+    
+    def _merge_same_round(self, rounds: List[Dict]) -> List[Dict]:
+        """Fusionne les rounds de même type (la date de Crunchbase + le montant extrait)"""
+        merged = {}
+        for round_data in rounds:
+            existing = merged.get(round_data['round_type'])
+            if existing is None:
+                merged[round_data['round_type']] = round_data
+                continue
+            if existing['amount'] is None and round_data['amount'] is not None:
+                # Montant et devise voyagent ensemble
+                existing['amount'] = round_data['amount']
+                existing['currency'] = round_data['currency']
+            for key in ('announced_date', 'investors', 'source'):
+                if not existing.get(key) and round_data.get(key):
+                    existing[key] = round_data[key]
+        return list(merged.values())
+    
+    @staticmethod
+    def undated_key(round_data: Dict) -> tuple:
+        """
+        Clé d'un round dont la date peut manquer: (startup, type, montant, devise)
+        
+        Un round extrait d'une description n'a pas de date; le même round issu
+        d'une source datée (Crunchbase) en a une: sans date d'un côté, ils sont
+        considérés comme identiques s'ils partagent cette clé.
+        """
+        return (round_data.get('startup_id'), round_data.get('round_type') or 'unknown',
+                round_data.get('amount'), round_data.get('currency'))
+    
+    def dedupe_rounds(self, rounds: List[Dict]) -> List[Dict]:
+        """Dédoublonne un lot de rounds: la version datée l'emporte sur la version sans date"""
+        dated_keys = {self.undated_key(r) for r in rounds if r.get('announced_date')}
+        kept, undated_seen = [], set()
+        for round_data in rounds:
+            if round_data.get('announced_date'):
+                kept.append(round_data)
+                continue
+            key = self.undated_key(round_data)
+            if key in dated_keys or key in undated_seen:
+                continue
+            undated_seen.add(key)
+            kept.append(round_data)
+        return kept
+    
+    def _parse_date(self, value) -> Optional[date]:
+        if not value:
+            return None
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
+        try:
+            return datetime.strptime(str(value)[:10], '%Y-%m-%d').date()
+        except ValueError:
+            return None
+
+
+# Test
+if __name__ == "__main__":
+    normalizer = FundingRoundNormalizer()
+    
+    print(normalizer.normalize({
+        'source': 'crunchbase',
+        'last_funding_type': 'seed',
+        'last_funding_at': '2024-03-12',
+        'funding_currency': 'USD',
+        'extracted_entities': {
+            'funding_info': {'amount': '1,5 millions MAD', 'round_type': 'amorçage', 'investors': []}
+        }
+    }))
@@ -0,0 +1,68 @@
+# utils/fx_rates.py
+"""
+FX Rates
+========
+Table de taux de change locale et versionnée, chargée une seule fois
+et gardée en mémoire pour convertir les montants en USD
+"""
+
+import json
+import os
+import logging
+from functools import lru_cache
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# Taux de référence (1 unité de devise = X USD)
+# Pour mettre à jour: fournir un fichier JSON {"version": ..., "rates": {...}} via FX_RATES_FILE
+DEFAULT_FX_VERSION = '2025-01'
+DEFAULT_FX_RATES = {
+    'USD': 1.0,
+    'MAD': 0.0995,
+    'EUR': 1.04,
+    'GBP': 1.24,
+    'CHF': 1.10,
+    'CAD': 0.70,
+    'XOF': 0.0016,
+    'TND': 0.31,
+    'EGP': 0.020,
+    'NGN': 0.00065,
+}
+
+
+class FXRateTable:
+    """Taux de change vers l'USD pour une version donnée"""
+    
+    def __init__(self, version: str, rates: Dict[str, float]):
+        self.version = version
+        self.rates = {currency.upper(): float(rate) for currency, rate in rates.items()}
+    
+    def rate(self, currency: Optional[str]) -> Optional[float]:
+        return self.rates.get((currency or 'MAD').upper())
+    
+    def to_usd(self, amount, currency: Optional[str]) -> Optional[int]:
+        """Convertit un montant en USD (None si montant ou devise inconnus)"""
+        if amount is None:
+            return None
+        rate = self.rate(currency)
+        if rate is None:
+            logger.debug(f"Devise sans taux de change: {currency}")
+            return None
+        return int(round(float(amount) * rate))
+
+
+@lru_cache(maxsize=1)
+def get_fx_table() -> FXRateTable:
+    """Table FX du processus (fichier FX_RATES_FILE si défini, sinon taux par défaut)"""
+    path = os.getenv('FX_RATES_FILE')
+    if path and os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        table = FXRateTable(data['version'], data['rates'])
+    else:
+        table = FXRateTable(DEFAULT_FX_VERSION, DEFAULT_FX_RATES)
+    
+    logger.info(f"💱 Table FX v{table.version} chargée ({len(table.rates)} devises)")
+    return table
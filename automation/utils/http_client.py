@@ -0,0 +1,199 @@
+# utils/http_client.py
+"""
+HTTP Client
+===========
+Session aiohttp partagée par les collecteurs (create_session), avec un mode
+d'enregistrement / rejeu des réponses choisi par HTTP_MODE:
+
+- live (défaut): aiohttp.ClientSession standard (instrumentée)
+- record: requêtes réelles, chaque réponse (statut, content-type, corps) est
+  écrite dans HTTP_FIXTURES_DIR/<collecteur>/<clé>.json
+- replay: les requêtes sont envoyées au serveur local HTTP_REPLAY_URL
+  (utils/http_replay.py) qui rejoue les fixtures, avec latence et erreurs
+  configurables: aucun accès réseau externe
+
+La clé d'une fixture dépend de la méthode, de l'URL, des paramètres et du
+corps JSON; les en-têtes (clés API) ne sont jamais enregistrés.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import sys
+from datetime import datetime
+from typing import Dict, Optional
+
+import aiohttp
+
+# Ajouter le parent directory au path (exécution standalone)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.instrumentation import get_instrumentation
+
+logger = logging.getLogger(__name__)
+
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HTTP_MODES = ('live', 'record', 'replay')
+
+
+def fixture_key(method: str, url: str, params=None, json_body=None, data=None) -> str:
+    """Identifiant stable d'une requête (sha1 tronqué)"""
+    if isinstance(data, bytes):
+        data = data.decode('utf-8', errors='replace')
+    canonical = json.dumps(
+        [method.upper(), url, params, json_body, data],
+        sort_keys=True, default=str, ensure_ascii=False
+    )
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+class FixtureStore:
+    """Réponses enregistrées: un fichier JSON par requête, rangé par collecteur"""
+    
+    def __init__(self, directory: str = None):
+        self.directory = directory or os.getenv(
+            'HTTP_FIXTURES_DIR', os.path.join(BASE_DIR, 'data', 'http_fixtures')
+        )
+    
+    def path(self, collector: str, key: str) -> str:
+        return os.path.join(self.directory, collector, f"{key}.json")
+    
+    def save(self, collector: str, key: str, method: str, url: str, status: int,
+             content_type: Optional[str], body: bytes, request_json=None):
+        try:
+            text, encoded = body.decode('utf-8'), None
+        except UnicodeDecodeError:
+            text, encoded = None, base64.b64encode(body).decode('ascii')
+        
+        fixture = {
+            'method': method.upper(),
+            'url': url,
+            'request_json': request_json,
+            'status': status,
+            'content_type': content_type,
+            'body': text,
+            'body_base64': encoded,
+            'recorded_at': datetime.now().isoformat(timespec='seconds'),
+        }
+        
+        path = self.path(collector, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Écriture atomique: un rejeu concurrent ne lit jamais un fichier partiel
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(fixture, f, ensure_ascii=False, indent=1, default=str)
+        os.replace(tmp_path, path)
+    
+    def load(self, collector: str, key: str) -> Optional[Dict]:
+        try:
+            with open(self.path(collector, key), encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+    
+    @staticmethod
+    def body_of(fixture: Dict) -> bytes:
+        if fixture.get('body_base64'):
+            return base64.b64decode(fixture['body_base64'])
+        return (fixture.get('body') or '').encode('utf-8')
+    
+    def count(self) -> Dict[str, int]:
+        """Nombre de fixtures par collecteur"""
+        if not os.path.isdir(self.directory):
+            return {}
+        return {
+            collector: len([f for f in os.listdir(os.path.join(self.directory, collector)) if f.endswith('.json')])
+            for collector in sorted(os.listdir(self.directory))
+            if os.path.isdir(os.path.join(self.directory, collector))
+        }
+
+
+class _RecordingRequest:
+    """Contexte async with: requête réelle, puis enregistrement de la réponse"""
+    
+    def __init__(self, client: 'FixtureSession', method: str, url: str, kwargs: Dict):
+        self.client = client
+        self.method = method
+        self.url = url
+        self.kwargs = kwargs
+        self._context = None
+    
+    async def __aenter__(self) -> aiohttp.ClientResponse:
+        self._context = self.client.session.request(self.method, self.url, **self.kwargs)
+        response = await self._context.__aenter__()
+        # read() met le corps en cache: json()/text() du collecteur le réutilisent
+        body = await response.read()
+        key = fixture_key(self.method, self.url, self.kwargs.get('params'),
+                          self.kwargs.get('json'), self.kwargs.get('data'))
+        self.client.store.save(
+            self.client.collector, key, self.method, self.url, response.status,
+            response.headers.get('Content-Type'), body, self.kwargs.get('json')
+        )
+        logger.debug(f"💾 Fixture {self.client.collector}/{key}: {self.method} {self.url} ({response.status})")
+        return response
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        return await self._context.__aexit__(exc_type, exc, tb)
+
+
+class FixtureSession:
+    """Session des modes record et replay (même interface que ClientSession pour les collecteurs)"""
+    
+    def __init__(self, collector: str, mode: str, store: FixtureStore = None,
+                 replay_url: str = None, **session_kwargs):
+        self.collector = collector
+        self.mode = mode
+        self.store = store or FixtureStore()
+        self.replay_url = (replay_url or os.getenv('HTTP_REPLAY_URL', 'http://127.0.0.1:8765')).rstrip('/')
+        self.session = aiohttp.ClientSession(**session_kwargs)
+    
+    async def __aenter__(self) -> 'FixtureSession':
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+    
+    @property
+    def closed(self) -> bool:
+        return self.session.closed
+    
+    async def close(self):
+        await self.session.close()
+    
+    def request(self, method: str, url: str, **kwargs):
+        if self.mode == 'record':
+            return _RecordingRequest(self, method, url, kwargs)
+        
+        # Rejeu: même méthode et même corps, adressés au serveur local
+        key = fixture_key(method, url, kwargs.get('params'), kwargs.get('json'), kwargs.get('data'))
+        headers = {**(kwargs.pop('headers', None) or {}), 'X-Replay-Url': url}
+        return self.session.request(
+            method, f"{self.replay_url}/replay/{self.collector}/{key}", headers=headers, **kwargs
+        )
+    
+    def get(self, url: str, **kwargs):
+        return self.request('GET', url, **kwargs)
+    
+    def post(self, url: str, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+
+def http_mode() -> str:
+    mode = os.getenv('HTTP_MODE', 'live').lower()
+    if mode not in HTTP_MODES:
+        logger.warning(f"⚠️  HTTP_MODE inconnu: {mode} (attendu: {', '.join(HTTP_MODES)}) - mode live")
+        return 'live'
+    return mode
+
+
+def create_session(collector: str, **session_kwargs):
+    """Session HTTP d'un collecteur (instrumentée; record/replay selon HTTP_MODE)"""
+    session_kwargs.setdefault('trace_configs', get_instrumentation().http_trace_configs(collector))
+    
+    mode = http_mode()
+    if mode == 'live':
+        return aiohttp.ClientSession(**session_kwargs)
+    return FixtureSession(collector, mode, **session_kwargs)
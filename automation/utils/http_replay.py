@@ -0,0 +1,164 @@
+# utils/http_replay.py
+"""
+HTTP Replay Server
+==================
+Serveur local qui rejoue les fixtures enregistrées par utils/http_client.py
+(HTTP_MODE=record), pour exercer les collecteurs sans réseau:
+
+- latence simulée par requête (moyenne + écart-type, en ms)
+- taux d'erreurs injectées (503 par défaut, 429 avec Retry-After pour tester
+  le rate limiting)
+- graine fixe: même séquence de latences et d'erreurs d'une exécution à l'autre
+- fallback optionnel: réponse générée (puis enregistrée) pour une requête
+  sans fixture, ex. corpus synthétique de benchmarks/replay_collectors.py
+
+Route: /replay/<collecteur>/<clé> (construite par FixtureSession en mode replay);
+/stats renvoie les compteurs du serveur.
+
+Usage:
+    python utils/http_replay.py --port 8765 --latency 80 --jitter 30 --error-rate 0.05
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+from typing import Callable, Dict, Optional
+
+from aiohttp import web
+
+# Ajouter le parent directory au path (exécution standalone)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.http_client import FixtureStore
+
+logger = logging.getLogger(__name__)
+
+
+class ReplayServer:
+    """Rejeu des fixtures avec latence et erreurs configurables"""
+    
+    def __init__(self, store: FixtureStore = None, latency_ms: float = 0, jitter_ms: float = 0,
+                 error_rate: float = 0.0, error_status: int = 503, seed: int = 42,
+                 fallback: Optional[Callable] = None):
+        self.store = store or FixtureStore()
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        # fallback(collector, method, url, request_json) -> (status, content_type, body) ou None
+        self.fallback = fallback
+        self.rng = random.Random(seed)
+        # Fixtures gardées en mémoire: le débit mesuré est celui des collecteurs, pas du disque
+        self.cache: Dict[tuple, Dict] = {}
+        self.stats = {'requests': 0, 'served': 0, 'injected_errors': 0, 'missing': 0, 'generated': 0}
+        self.runner = None
+        self.url = None
+    
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_route('*', '/replay/{collector}/{key}', self.handle)
+        app.router.add_get('/stats', self.handle_stats)
+        return app
+    
+    async def handle(self, request: web.Request) -> web.Response:
+        self.stats['requests'] += 1
+        collector, key = request.match_info['collector'], request.match_info['key']
+        
+        delay = self.rng.gauss(self.latency_ms, self.jitter_ms) if self.jitter_ms else self.latency_ms
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        
+        if self.error_rate and self.rng.random() < self.error_rate:
+            self.stats['injected_errors'] += 1
+            headers = {'Retry-After': '1'} if self.error_status == 429 else None
+            return web.Response(status=self.error_status, text='injected error', headers=headers)
+        
+        fixture = self.cache.get((collector, key))
+        if fixture is None:
+            fixture = self.store.load(collector, key)
+            if fixture is None and self.fallback:
+                fixture = await self._generate(request, collector, key)
+            if fixture is None:
+                self.stats['missing'] += 1
+                original_url = request.headers.get('X-Replay-Url', '?')
+                logger.warning(f"⚠️  Fixture absente {collector}/{key}: {request.method} {original_url}")
+                return web.Response(status=404, text=f"no fixture for {request.method} {original_url}")
+            self.cache[(collector, key)] = fixture
+        
+        self.stats['served'] += 1
+        content_type = fixture.get('content_type') or 'application/octet-stream'
+        return web.Response(
+            status=fixture['status'],
+            body=FixtureStore.body_of(fixture),
+            headers={'Content-Type': content_type},
+        )
+    
+    async def _generate(self, request: web.Request, collector: str, key: str) -> Optional[Dict]:
+        """Fixture produite par le fallback, enregistrée pour les rejeux suivants"""
+        url = request.headers.get('X-Replay-Url')
+        if not url:
+            return None
+        request_json = await request.json() if request.can_read_body else None
+        
+        response = self.fallback(collector, request.method, url, request_json)
+        if response is None:
+            return None
+        
+        status, content_type, body = response
+        self.store.save(collector, key, request.method, url, status, content_type, body, request_json)
+        self.stats['generated'] += 1
+        return self.store.load(collector, key)
+    
+    async def handle_stats(self, request: web.Request) -> web.Response:
+        return web.json_response({**self.stats, 'fixtures': self.store.count()})
+    
+    async def start(self, host: str = '127.0.0.1', port: int = 8765) -> str:
+        """Démarre le serveur (port 0 = port libre); retourne son URL"""
+        self.runner = web.AppRunner(self.app(), access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, host, port).start()
+        port = self.runner.addresses[0][1]
+        self.url = f"http://{host}:{port}"
+        logger.info(f"🔁 Rejeu HTTP sur {self.url} ({sum(self.store.count().values())} fixtures, "
+                    f"latence {self.latency_ms:g}±{self.jitter_ms:g} ms, erreurs {self.error_rate:.0%})")
+        return self.url
+    
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+            self.runner = None
+
+
+async def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serveur de rejeu des fixtures HTTP")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--fixtures', default=None, help="Dossier des fixtures (HTTP_FIXTURES_DIR)")
+    parser.add_argument('--latency', type=float, default=0, help="Latence moyenne (ms)")
+    parser.add_argument('--jitter', type=float, default=0, help="Écart-type de la latence (ms)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Part de requêtes en erreur (0-1)")
+    parser.add_argument('--error-status', type=int, default=503, help="Statut des erreurs injectées")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+    
+    server = ReplayServer(FixtureStore(args.fixtures), args.latency, args.jitter,
+                          args.error_rate, args.error_status, args.seed)
+    await server.start(args.host, args.port)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,413 @@
+# utils/instrumentation.py
+"""
+Instrumentation
+===============
+Mesures légères du pipeline de collecte:
+
+- spans par étape (collecteurs, nettoyage, déduplication, ML, sauvegarde)
+  avec nombre d'enregistrements traités -> débit (records/s)
+- latence HTTP par collecteur (histogrammes, via TraceConfig aiohttp)
+- allers-retours base de données et temps d'attente du pool de connexions
+- retard de la boucle asyncio, blocages par site d'appel et appels déportés
+  dans le pool de threads (utils/event_loop.py)
+
+Désactivée (METRICS_ENABLED=false), chaque point de mesure se réduit à un test
+de booléen: span() retourne un context manager partagé qui ne fait rien.
+
+Exports:
+- rapport JSON par run (logs/run_report_*.json), résumé dans collection_logs.details
+- format texte Prometheus (prometheus_text), servi sur /metrics si METRICS_PORT est défini
+"""
+
+import json
+import logging
+import os
+import time
+from bisect import bisect_left
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# Bornes des histogrammes de latence (secondes)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 4)
+
+
+class Histogram:
+    """Histogramme cumulatif à bornes fixes (compatible Prometheus)"""
+    
+    __slots__ = ('count', 'sum', 'max', 'buckets')
+    
+    def __init__(self):
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+    
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+        self.buckets[bisect_left(LATENCY_BUCKETS, value)] += 1
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimation d'un quantile (borne supérieure du bucket qui le contient)"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+    
+    def to_dict(self) -> Dict:
+        return {
+            'count': self.count,
+            'seconds_total': round(self.sum, 4),
+            'seconds_max': round(self.max, 4),
+            'p50': _round(self.quantile(0.5)),
+            'p95': _round(self.quantile(0.95)),
+        }
+
+
+class _Span:
+    """Mesure d'une étape (with instrumentation.span('clean') as span: ...)"""
+    
+    __slots__ = ('instrumentation', 'name', 'records', 'started')
+    
+    def __init__(self, instrumentation: 'Instrumentation', name: str, records: int = None):
+        self.instrumentation = instrumentation
+        self.name = name
+        self.records = records
+        self.started = None
+    
+    def __enter__(self):
+        for hook in self.instrumentation.stage_hooks:
+            hook('start', self.name)
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.instrumentation.record_stage(self.name, time.perf_counter() - self.started, self.records)
+        for hook in self.instrumentation.stage_hooks:
+            hook('end', self.name)
+        return False
+
+
+class _NoopSpan:
+    """Span partagé quand l'instrumentation est désactivée"""
+    
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        return False
+    
+    def __setattr__(self, name, value):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Instrumentation:
+    """Métriques du processus, remises à zéro au début de chaque run"""
+    
+    def __init__(self, enabled: bool = None):
+        if enabled is None:
+            enabled = os.getenv('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+        self.enabled = enabled
+        # hook(event, stage) appelé en début ('start') et fin ('end') de span (ex. profiler)
+        self.stage_hooks: List = []
+        self.reset()
+    
+    def reset(self, run_name: str = None):
+        """Début d'un run: les métriques précédentes sont abandonnées"""
+        self.run_name = run_name
+        self.started_at = datetime.now()
+        self._started = time.perf_counter()
+        
+        self.stages: Dict[str, Histogram] = {}
+        self.stage_records: Dict[str, int] = {}
+        
+        self.http: Dict[str, Histogram] = {}
+        self.http_status: Dict[tuple, int] = {}
+        self.http_errors: Dict[str, int] = {}
+        
+        self.db_queries = Histogram()
+        self.db_pool_wait = Histogram()
+        
+        self.loop_lag = Histogram()
+        self.loop_stalls: Dict[str, Histogram] = {}
+        self.offloads: Dict[str, int] = {}
+    
+    # --- Points de mesure ---
+    
+    def span(self, name: str, records: int = None):
+        if not self.enabled:
+            return _NOOP_SPAN
+        return _Span(self, name, records)
+    
+    def record_stage(self, name: str, seconds: float, records: int = None):
+        histogram = self.stages.get(name)
+        if histogram is None:
+            histogram = self.stages[name] = Histogram()
+        histogram.observe(seconds)
+        if records:
+            self.stage_records[name] = self.stage_records.get(name, 0) + records
+    
+    def observe_http(self, collector: str, seconds: float, status: int = None):
+        histogram = self.http.get(collector)
+        if histogram is None:
+            histogram = self.http[collector] = Histogram()
+        histogram.observe(seconds)
+        key = (collector, status)
+        self.http_status[key] = self.http_status.get(key, 0) + 1
+    
+    def count_http_error(self, collector: str):
+        self.http_errors[collector] = self.http_errors.get(collector, 0) + 1
+    
+    def observe_db_query(self, seconds: float):
+        self.db_queries.observe(seconds)
+    
+    def observe_pool_wait(self, seconds: float):
+        self.db_pool_wait.observe(seconds)
+    
+    def observe_loop_lag(self, seconds: float):
+        self.loop_lag.observe(seconds)
+    
+    def record_loop_stall(self, site: str, seconds: float):
+        histogram = self.loop_stalls.get(site)
+        if histogram is None:
+            histogram = self.loop_stalls[site] = Histogram()
+        histogram.observe(seconds)
+    
+    def count_offload(self, name: str):
+        self.offloads[name] = self.offloads.get(name, 0) + 1
+    
+    # --- Intégrations ---
+    
+    def http_trace_configs(self, collector: str) -> List:
+        """trace_configs pour aiohttp.ClientSession (liste vide si désactivée)"""
+        if not self.enabled:
+            return []
+        
+        import aiohttp
+        
+        async def on_request_start(session, ctx, params):
+            ctx.started = time.perf_counter()
+        
+        async def on_request_end(session, ctx, params):
+            self.observe_http(collector, time.perf_counter() - ctx.started, params.response.status)
+        
+        async def on_request_exception(session, ctx, params):
+            self.count_http_error(collector)
+        
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_request_end.append(on_request_end)
+        trace_config.on_request_exception.append(on_request_exception)
+        return [trace_config]
+    
+    def db_query_logger(self, record):
+        """Query logger asyncpg (Connection.add_query_logger): un appel par aller-retour"""
+        self.observe_db_query(record.elapsed)
+    
+    def instrument_pool(self, pool):
+        """Pool asyncpg dont acquire() mesure l'attente d'une connexion"""
+        return InstrumentedPool(pool, self) if self.enabled else pool
+    
+    # --- Exports ---
+    
+    def report(self) -> Dict:
+        """Rapport du run courant (JSON-sérialisable)"""
+        duration = time.perf_counter() - self._started
+        
+        stages = {}
+        for name, histogram in self.stages.items():
+            stage = histogram.to_dict()
+            records = self.stage_records.get(name)
+            if records:
+                stage['records'] = records
+                stage['records_per_second'] = round(records / histogram.sum, 1) if histogram.sum else None
+            stages[name] = stage
+        
+        http = {}
+        for collector, histogram in self.http.items():
+            http[collector] = {
+                **histogram.to_dict(),
+                'errors': self.http_errors.get(collector, 0),
+                'status': {
+                    str(status): count for (name, status), count in self.http_status.items()
+                    if name == collector
+                },
+            }
+        for collector, errors in self.http_errors.items():
+            http.setdefault(collector, {'count': 0, 'errors': errors})
+        
+        return {
+            'run': self.run_name,
+            'started_at': self.started_at.isoformat(),
+            'duration_seconds': round(duration, 3),
+            'stages': stages,
+            'http': http,
+            'db': {
+                'round_trips': self.db_queries.count,
+                'query_seconds_total': round(self.db_queries.sum, 4),
+                'query_p95': _round(self.db_queries.quantile(0.95)),
+                'pool_acquisitions': self.db_pool_wait.count,
+                'pool_wait_seconds_total': round(self.db_pool_wait.sum, 4),
+                'pool_wait_seconds_max': round(self.db_pool_wait.max, 4),
+            },
+            'event_loop': {
+                'lag_samples': self.loop_lag.count,
+                'lag_p95': _round(self.loop_lag.quantile(0.95)),
+                'lag_max': round(self.loop_lag.max, 4),
+                'stalls': {
+                    site: histogram.to_dict() for site, histogram in
+                    sorted(self.loop_stalls.items(), key=lambda item: item[1].sum, reverse=True)
+                },
+                'offloaded': dict(self.offloads),
+            },
+        }
+    
+    def write_report(self, directory: str) -> str:
+        """Écrit le rapport JSON du run dans directory et retourne son chemin"""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"run_report_{self.started_at:%Y%m%d_%H%M%S}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2, ensure_ascii=False)
+        return path
+    
+    def prometheus_text(self) -> str:
+        """Métriques au format d'exposition texte Prometheus"""
+        lines = []
+        
+        def histogram(metric: str, help_text: str, series: Dict[str, Histogram], label: str):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} histogram")
+            for value, hist in series.items():
+                labels = f'{label}="{value}",' if label else ''
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, hist.buckets):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{{labels}le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{{labels}le="+Inf"}} {hist.count}')
+                suffix = f'{{{labels.rstrip(",")}}}' if labels else ''
+                lines.append(f"{metric}_sum{suffix} {hist.sum:.6f}")
+                lines.append(f"{metric}_count{suffix} {hist.count}")
+        
+        histogram('vcds_stage_duration_seconds', "Durée des étapes du pipeline", self.stages, 'stage')
+        
+        lines.append("# HELP vcds_stage_records_total Enregistrements traités par étape")
+        lines.append("# TYPE vcds_stage_records_total counter")
+        for name, records in self.stage_records.items():
+            lines.append(f'vcds_stage_records_total{{stage="{name}"}} {records}')
+        
+        histogram('vcds_http_request_duration_seconds', "Latence HTTP par collecteur", self.http, 'collector')
+        
+        lines.append("# HELP vcds_http_requests_total Requêtes HTTP par collecteur et statut")
+        lines.append("# TYPE vcds_http_requests_total counter")
+        for (collector, status), count in self.http_status.items():
+            lines.append(f'vcds_http_requests_total{{collector="{collector}",status="{status}"}} {count}')
+        
+        lines.append("# HELP vcds_http_errors_total Erreurs réseau par collecteur")
+        lines.append("# TYPE vcds_http_errors_total counter")
+        for collector, count in self.http_errors.items():
+            lines.append(f'vcds_http_errors_total{{collector="{collector}"}} {count}')
+        
+        histogram('vcds_db_query_duration_seconds', "Allers-retours base de données", {'': self.db_queries}, None)
+        histogram('vcds_db_pool_wait_seconds', "Attente d'une connexion du pool", {'': self.db_pool_wait}, None)
+        
+        histogram('vcds_event_loop_lag_seconds', "Retard de réveil de la boucle asyncio", {'': self.loop_lag}, None)
+        histogram('vcds_event_loop_stall_seconds', "Blocages de la boucle asyncio par site d'appel", self.loop_stalls, 'site')
+        
+        lines.append("# HELP vcds_offloaded_calls_total Appels CPU déportés dans le pool de threads")
+        lines.append("# TYPE vcds_offloaded_calls_total counter")
+        for name, count in self.offloads.items():
+            lines.append(f'vcds_offloaded_calls_total{{name="{name}"}} {count}')
+        
+        return '\n'.join(lines) + '\n'
+
+
+class _TimedAcquire:
+    """acquire() mesuré: utilisable avec async with ou await"""
+    
+    __slots__ = ('pool', 'instrumentation', 'timeout', 'conn')
+    
+    def __init__(self, pool, instrumentation: Instrumentation, timeout):
+        self.pool = pool
+        self.instrumentation = instrumentation
+        self.timeout = timeout
+        self.conn = None
+    
+    async def _acquire(self):
+        started = time.perf_counter()
+        conn = await self.pool.acquire(timeout=self.timeout)
+        self.instrumentation.observe_pool_wait(time.perf_counter() - started)
+        return conn
+    
+    async def __aenter__(self):
+        self.conn = await self._acquire()
+        return self.conn
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        conn, self.conn = self.conn, None
+        await self.pool.release(conn)
+    
+    def __await__(self):
+        return self._acquire().__await__()
+
+
+class InstrumentedPool:
+    """Enveloppe d'un pool asyncpg: acquire() mesuré, le reste délégué"""
+    
+    def __init__(self, pool, instrumentation: Instrumentation):
+        self._pool = pool
+        self._instrumentation = instrumentation
+    
+    def acquire(self, *, timeout=None):
+        return _TimedAcquire(self._pool, self._instrumentation, timeout)
+    
+    def __getattr__(self, name):
+        return getattr(self._pool, name)
+
+
+async def start_metrics_server(port: int, host: str = '0.0.0.0'):
+    """Sert /metrics (format Prometheus) et /report (JSON) sur host:port; retourne le runner"""
+    from aiohttp import web
+    
+    instrumentation = get_instrumentation()
+    
+    async def metrics(request):
+        return web.Response(text=instrumentation.prometheus_text(), content_type='text/plain', charset='utf-8')
+    
+    async def report(request):
+        return web.json_response(instrumentation.report())
+    
+    app = web.Application()
+    app.router.add_get('/metrics', metrics)
+    app.router.add_get('/report', report)
+    
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info(f"📈 Métriques exposées sur http://{host}:{port}/metrics")
+    return runner
+
+
+@lru_cache(maxsize=1)
+def get_instrumentation() -> Instrumentation:
+    """Instrumentation du processus (METRICS_ENABLED, activée par défaut)"""
+    return Instrumentation()
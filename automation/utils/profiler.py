@@ -0,0 +1,424 @@
+# utils/profiler.py
+"""
+Profiler
+========
+Mode --profile de main_orchestrator.py et scheduler/auto_collector.py:
+
+- échantillonnage de la pile du thread principal (thread dédié, toutes les
+  PROFILE_INTERVAL_MS) -> piles repliées "a;b;c N", prêtes pour flamegraph.pl
+  ou speedscope
+- callbacks asyncio qui bloquent la boucle plus de PROFILE_SLOW_CALLBACK_MS,
+  avec la tâche et la coroutine en cause; pic du nombre de tâches
+- snapshots tracemalloc en début et fin des spans d'instrumentation de premier niveau:
+  allocations nettes par étape et top des allocations en fin de run
+
+Fichiers écrits dans logs/: profile_<date>.folded, profile_<date>_allocations.txt
+et profile_<date>.json (callbacks lents, mémoire par étape, échantillons).
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# Ajouter le parent directory au path (exécution standalone)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.instrumentation import get_instrumentation
+
+logger = logging.getLogger(__name__)
+
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ASYNCIO_DIR = os.path.dirname(asyncio.__file__)
+
+
+def _short_path(filename: str) -> str:
+    """Chemin relatif au projet ou au site-packages (nom seul pour la stdlib)"""
+    if filename.startswith(BASE_DIR):
+        return os.path.relpath(filename, BASE_DIR)
+    if 'site-packages' in filename:
+        return filename.split('site-packages' + os.sep, 1)[-1]
+    return os.path.basename(filename)
+
+
+def _frame_label(code) -> str:
+    """'fonction (fichier:ligne)' d'une frame de pile repliée"""
+    return f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})".replace(';', ',')
+
+
+class StackSampler:
+    """Échantillonneur de pile d'un thread (par défaut: le thread courant)"""
+    
+    def __init__(self, interval: float = 0.005, thread_id: int = None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+    
+    def write_folded(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+    
+    def top_functions(self, limit: int = 15) -> List[Dict]:
+        """Fonctions les plus souvent en haut de pile (temps propre)"""
+        leaves = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(';', 1)[-1]] += count
+        return [
+            {'function': function, 'samples': count, 'share': round(count / self.samples, 3)}
+            for function, count in leaves.most_common(limit)
+        ]
+
+
+class SlowCallbackMonitor:
+    """Durée de chaque callback de la boucle asyncio (Handle._run instrumenté)"""
+    
+    def __init__(self, threshold: float = 0.1, limit: int = 200, overhead=None):
+        self.threshold = threshold
+        self.limit = limit
+        # Objet exposant .seconds (temps des snapshots tracemalloc), déduit des durées mesurées
+        self.overhead = overhead
+        self.events: List[Dict] = []
+        self.by_segment: Dict[str, Dict] = {}
+        self.max_tasks = 0
+        self._original_run = None
+        self._watcher = None
+    
+    def install(self):
+        monitor = self
+        overhead = self.overhead
+        original_run = self._original_run = asyncio.events.Handle._run
+        
+        def _run(handle):
+            # Point de reprise relevé avant le callback: le code bloquant est entre lui et la suspension suivante
+            resumed_at = monitor.innermost_location(handle)
+            overhead_before = overhead.seconds if overhead else 0.0
+            started = time.perf_counter()
+            original_run(handle)
+            elapsed = time.perf_counter() - started
+            if overhead:
+                elapsed -= overhead.seconds - overhead_before
+            # _original_run à None: moniteur retiré pendant ce callback (fin de profilage)
+            if elapsed >= monitor.threshold and monitor._original_run is not None:
+                monitor.record(handle, elapsed, resumed_at)
+        
+        asyncio.events.Handle._run = _run
+        self._watcher = asyncio.get_running_loop().create_task(self._watch_tasks())
+    
+    def uninstall(self):
+        if self._original_run:
+            asyncio.events.Handle._run = self._original_run
+            self._original_run = None
+        if self._watcher:
+            self._watcher.cancel()
+            self._watcher = None
+    
+    async def _watch_tasks(self, interval: float = 0.1):
+        while True:
+            self.max_tasks = max(self.max_tasks, len(asyncio.all_tasks()))
+            await asyncio.sleep(interval)
+    
+    @staticmethod
+    def _task_of(handle) -> Optional[asyncio.Task]:
+        task = getattr(handle._callback, '__self__', None)
+        return task if isinstance(task, asyncio.Task) else None
+    
+    @classmethod
+    def innermost_location(cls, handle) -> Optional[tuple]:
+        """(fichier, ligne) de la coroutine la plus profonde hors asyncio, pour un pas de tâche"""
+        task = cls._task_of(handle)
+        if task is None:
+            return None
+        location = None
+        coroutine = task.get_coro()
+        while coroutine is not None:
+            frame = getattr(coroutine, 'cr_frame', None)
+            if frame is None:
+                break
+            # asyncio.sleep, wait_for... ne sont pas en cause
+            if ASYNCIO_DIR not in frame.f_code.co_filename:
+                location = (frame.f_code.co_filename, frame.f_lineno)
+            coroutine = getattr(coroutine, 'cr_await', None)
+        return location
+    
+    @classmethod
+    def describe(cls, handle) -> Dict:
+        """Tâche et chaîne de coroutines (après le callback) d'un handle"""
+        task = cls._task_of(handle)
+        if task is None:
+            callback = handle._callback
+            return {'callback': getattr(callback, '__qualname__', repr(callback))}
+        
+        chain = []
+        coroutine = task.get_coro()
+        while coroutine is not None and getattr(coroutine, 'cr_frame', None) is not None:
+            chain.append(coroutine.__qualname__)
+            coroutine = getattr(coroutine, 'cr_await', None)
+        
+        return {
+            'task': task.get_name(),
+            'coroutine': ' -> '.join(chain) or getattr(task.get_coro(), '__qualname__', repr(task.get_coro())),
+        }
+    
+    @staticmethod
+    def _format_location(location: Optional[tuple]) -> Optional[str]:
+        return None if location is None else f"{_short_path(location[0])}:{location[1]}"
+    
+    def record(self, handle, elapsed: float, resumed_at: Optional[tuple] = None):
+        description = self.describe(handle)
+        description['resumed_at'] = self._format_location(resumed_at)
+        description['suspended_at'] = self._format_location(self.innermost_location(handle))
+        # Regroupement par segment de code exécuté (reprise -> suspension)
+        key = f"{description['resumed_at']} -> {description['suspended_at']}" \
+            if 'task' in description else description['callback']
+        
+        entry = self.by_segment.setdefault(key, {'count': 0, 'seconds_total': 0.0, 'seconds_max': 0.0})
+        entry['count'] += 1
+        entry['seconds_total'] += elapsed
+        entry['seconds_max'] = max(entry['seconds_max'], elapsed)
+        
+        if len(self.events) < self.limit:
+            self.events.append({'seconds': round(elapsed, 4), 'at': datetime.now().isoformat(), **description})
+        logger.warning(f"🐢 Boucle bloquée {elapsed * 1000:.0f} ms: {key} "
+                       f"({description.get('task', '')} {description.get('coroutine', '')})")
+    
+    def summary(self) -> Dict:
+        worst = sorted(self.by_segment.items(), key=lambda item: item[1]['seconds_total'], reverse=True)
+        return {
+            'threshold_ms': round(self.threshold * 1000, 1),
+            'slow_callbacks': sum(entry['count'] for entry in self.by_segment.values()),
+            'max_tasks': self.max_tasks,
+            'by_segment': [
+                {'segment': key, **{k: round(v, 4) if isinstance(v, float) else v for k, v in entry.items()}}
+                for key, entry in worst
+            ],
+            'events': self.events,
+        }
+
+
+class AllocationTracker:
+    """Snapshots tracemalloc aux frontières d'étapes (hook d'instrumentation)"""
+    
+    FILTERS = (
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+        tracemalloc.Filter(False, '<unknown>'),
+    )
+    
+    def __init__(self, top: int = 20, frames: int = 1):
+        self.top = top
+        self.frames = frames
+        self.stages: List[Dict] = []
+        self.seconds = 0.0  # temps passé dans les snapshots (surcoût du profilage)
+        self._open: Dict[str, tracemalloc.Snapshot] = {}
+        self._depth = 0
+        self._started_tracing = False
+    
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+    
+    def stop(self):
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+    
+    def snapshot(self) -> tracemalloc.Snapshot:
+        # Sans filtre: filter_traces (fnmatch par trace) coûte plus cher que le snapshot
+        return tracemalloc.take_snapshot()
+    
+    def on_stage(self, event: str, stage: str):
+        if not tracemalloc.is_tracing():
+            return
+        started = time.perf_counter()
+        try:
+            self._on_stage(event, stage)
+        finally:
+            self.seconds += time.perf_counter() - started
+    
+    def _on_stage(self, event: str, stage: str):
+        # Spans de premier niveau seulement (collect.*, clean, save...): un snapshot coûte
+        # de l'ordre de la seconde, les sous-étapes restent visibles dans les piles échantillonnées
+        if event == 'start':
+            self._depth += 1
+            if self._depth == 1:
+                self._open[stage] = self.snapshot()
+            return
+        
+        self._depth -= 1
+        before = self._open.pop(stage, None)
+        if before is None:
+            return
+        after = self.snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        diff = after.compare_to(before, 'lineno')
+        self.stages.append({
+            'stage': stage,
+            'net_kb': round(sum(stat.size_diff for stat in diff) / 1024, 1),
+            'traced_mb': round(current / 1024 / 1024, 2),
+            'peak_mb': round(peak / 1024 / 1024, 2),
+            'top': [
+                {'location': str(stat.traceback), 'size_diff_kb': round(stat.size_diff / 1024, 1), 'count_diff': stat.count_diff}
+                for stat in diff[:self.top] if stat.size_diff
+            ],
+        })
+    
+    def write_report(self, path: str):
+        """Top des allocations vivantes en fin de run, puis allocations nettes par étape"""
+        lines = [f"# Allocations vivantes ({datetime.now():%Y-%m-%d %H:%M:%S})", ""]
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            lines.append(f"Mémoire tracée: {current / 1024 / 1024:.2f} MB (pic {peak / 1024 / 1024:.2f} MB)")
+            lines.append("")
+            for stat in self.snapshot().filter_traces(self.FILTERS).statistics('lineno')[:self.top]:
+                lines.append(f"{stat.size / 1024:10.1f} KB  {stat.count:8d} blocs  {stat.traceback}")
+        
+        for stage in self.stages:
+            lines += ["", f"# {stage['stage']}: {stage['net_kb']:+.1f} KB nets "
+                          f"(tracé {stage['traced_mb']} MB, pic {stage['peak_mb']} MB)"]
+            for entry in stage['top']:
+                lines.append(f"{entry['size_diff_kb']:+10.1f} KB  {entry['count_diff']:+8d} blocs  {entry['location']}")
+        
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+
+
+class Profiler:
+    """Session de profilage (async with Profiler(log_dir): ...)"""
+    
+    def __init__(self, output_dir: str, interval_ms: float = None, slow_callback_ms: float = None,
+                 top: int = None):
+        self.output_dir = output_dir
+        interval_ms = interval_ms or float(os.getenv('PROFILE_INTERVAL_MS', 5))
+        slow_callback_ms = slow_callback_ms or float(os.getenv('PROFILE_SLOW_CALLBACK_MS', 100))
+        top = top or int(os.getenv('PROFILE_TOP_ALLOCATIONS', 25))
+        # tracemalloc ralentit les allocations et chaque snapshot coûte ~1 s pour 20 MB tracés
+        self.trace_allocations = os.getenv('PROFILE_TRACEMALLOC', 'true').lower() in ('1', 'true', 'yes')
+        
+        self.sampler = StackSampler(interval_ms / 1000)
+        self.allocations = AllocationTracker(top)
+        self.monitor = SlowCallbackMonitor(slow_callback_ms / 1000, overhead=self.allocations)
+        self.instrumentation = get_instrumentation()
+        self.started_at = None
+        self._started = None
+    
+    async def __aenter__(self) -> 'Profiler':
+        await self.start()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+    
+    async def start(self):
+        self.started_at = datetime.now()
+        self._started = time.perf_counter()
+        
+        # Les frontières d'étapes sont les spans: instrumentation forcée en mode profil
+        self.instrumentation.enabled = True
+        if self.trace_allocations:
+            self.instrumentation.stage_hooks.append(self.allocations.on_stage)
+            self.allocations.start()
+        
+        self.monitor.install()
+        self.sampler.start()
+        logger.info(f"🔬 Profilage actif (échantillon {self.sampler.interval * 1000:g} ms, "
+                    f"callbacks lents > {self.monitor.threshold * 1000:g} ms, "
+                    f"tracemalloc {'actif' if self.trace_allocations else 'désactivé'})")
+    
+    def stop(self) -> Dict[str, str]:
+        """Arrête les mesures et écrit les fichiers; retourne leurs chemins"""
+        self.sampler.stop()
+        self.monitor.uninstall()
+        if self.allocations.on_stage in self.instrumentation.stage_hooks:
+            self.instrumentation.stage_hooks.remove(self.allocations.on_stage)
+        
+        os.makedirs(self.output_dir, exist_ok=True)
+        prefix = os.path.join(self.output_dir, f"profile_{self.started_at:%Y%m%d_%H%M%S}")
+        paths = {'folded': f"{prefix}.folded", 'summary': f"{prefix}.json"}
+        
+        self.sampler.write_folded(paths['folded'])
+        if self.trace_allocations:
+            paths['allocations'] = f"{prefix}_allocations.txt"
+            self.allocations.write_report(paths['allocations'])
+            self.allocations.stop()
+        
+        summary = {
+            'started_at': self.started_at.isoformat(),
+            'duration_seconds': round(time.perf_counter() - self._started, 3),
+            'samples': self.sampler.samples,
+            'interval_ms': self.sampler.interval * 1000,
+            'top_functions': self.sampler.top_functions(),
+            'event_loop': self.monitor.summary(),
+            'snapshot_seconds': round(self.allocations.seconds, 3),
+            'stages_memory': [
+                {key: value for key, value in stage.items() if key != 'top'}
+                for stage in self.allocations.stages
+            ],
+            'files': paths,
+        }
+        with open(paths['summary'], 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+        
+        logger.info(f"🔬 Profil: {self.sampler.samples} échantillons, "
+                    f"{summary['event_loop']['slow_callbacks']} callbacks lents -> {paths['folded']}")
+        return paths
+
+
+def profiling_requested(argv: List[str] = None) -> bool:
+    return '--profile' in (sys.argv if argv is None else argv)
+
+
+# Test
+if __name__ == "__main__":
+    async def test():
+        async def blocking():
+            await asyncio.sleep(0.01)
+            time.sleep(0.15)  # bloque la boucle
+            await asyncio.sleep(0.01)
+        
+        profiler = Profiler(os.path.join(BASE_DIR, 'logs'))
+        async with profiler:
+            with get_instrumentation().span('test.allocate'):
+                data = [str(i) * 10 for i in range(100000)]
+            await blocking()
+        
+        print(json.dumps(profiler.monitor.summary()['by_segment'], indent=2))
+        print(f"Échantillons: {profiler.sampler.samples}, étapes: {[s['stage'] for s in profiler.allocations.stages]}")
+        del data
+    
+    asyncio.run(test())
@@ -0,0 +1,169 @@
+# utils/startup_record.py
+"""
+Startup Record
+==============
+Enregistrement typé et compact (__slots__) qui remplace les dicts libres
+entre les collecteurs, le nettoyage, le scoring et l'écriture en base.
+
+- résolution des alias en une seule étape, à l'ingestion (from_dict):
+  fundingRaised -> funding_raised, foundedYear -> founded_year,
+  linkedin_url -> linkedin, team_size -> employees...
+- champs catégoriels (sector, stage, location, source, devise) internés:
+  une seule chaîne en mémoire par valeur distincte
+- champs rares (téléphone, signaux, partenariats...) et champs propres à un
+  collecteur (rank, incubator, title...) conservés dans extra: seuls les champs
+  renseignés pour presque toutes les startups occupent un slot
+
+Les modules encore écrits pour des dicts (normaliseur de rounds, ingestion
+des actualités) utilisent get()/[]: même résolution des alias.
+"""
+
+import sys
+from typing import Dict, Iterator, Tuple
+
+
+class StartupRecord:
+    """Startup collectée (un attribut par champ connu, extra pour le reste)"""
+    
+    # Champs stockés en slot (renseignés pour la plupart des startups)
+    SLOT_FIELDS = (
+        # Identité
+        'name', 'description', 'sector', 'stage', 'location',
+        # Finances et équipe
+        'funding_raised', 'funding_currency', 'revenue', 'employees', 'founded_year',
+        # Contact
+        'website', 'email', 'linkedin',
+        # Scores
+        'score', 'predicted_score', 'data_quality_score', 'confidence',
+        # Provenance
+        'source', 'source_url', 'sources', 'collected_at',
+        # Données riches
+        'founders', 'metrics', 'news', 'news_stats', 'extracted_entities',
+    )
+    
+    # Champs rares: attributs comme les autres, stockés dans extra
+    OPTIONAL_FIELDS = (
+        'funding_raised_usd', 'last_funding_type', 'last_funding_at', 'phone',
+        'verified', 'news_mention', 'signals', 'media_mentions', 'partnerships',
+        'government_support', 'officially_registered',
+    )
+    
+    FIELDS = SLOT_FIELDS + OPTIONAL_FIELDS
+    _FIELD_SET = frozenset(FIELDS)
+    
+    __slots__ = SLOT_FIELDS + ('extra',)
+    
+    CATEGORICAL_FIELDS = frozenset(('sector', 'stage', 'location', 'source', 'funding_currency'))
+    
+    # Variantes de clés rencontrées selon les sources -> champ canonique
+    ALIASES = {
+        'fundingRaised': 'funding_raised',
+        'funding_total': 'funding_raised',
+        'fundingCurrency': 'funding_currency',
+        'foundedYear': 'founded_year',
+        'founded': 'founded_year',
+        'linkedin_url': 'linkedin',
+        'linkedinUrl': 'linkedin',
+        'team_size': 'employees',
+        'teamSize': 'employees',
+        'num_employees': 'employees',
+        'sourceUrl': 'source_url',
+        'website_url': 'website',
+        'predictedScore': 'predicted_score',
+    }
+    
+    def __init__(self, **fields):
+        for field in self.SLOT_FIELDS:
+            object.__setattr__(self, field, None)
+        object.__setattr__(self, 'extra', None)
+        
+        for key, value in fields.items():
+            self[key] = value
+    
+    def __setattr__(self, name: str, value):
+        if name in self.CATEGORICAL_FIELDS and isinstance(value, str):
+            value = sys.intern(value)
+        object.__setattr__(self, name, value)
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'StartupRecord':
+        """Étape d'ingestion unique: dict de collecteur -> StartupRecord (alias résolus)"""
+        record = cls()
+        for key, value in data.items():
+            field = cls.ALIASES.get(key, key)
+            # Le nom canonique l'emporte sur un alias présent dans le même dict
+            if field != key and field in data:
+                continue
+            record[field] = value
+        return record
+    
+    @classmethod
+    def coerce(cls, data) -> 'StartupRecord':
+        """StartupRecord tel quel, ou conversion d'un dict"""
+        return data if isinstance(data, cls) else cls.from_dict(data)
+    
+    def to_dict(self) -> Dict:
+        """Champs renseignés (non None) et extra, dans un dict"""
+        return dict(self.items())
+    
+    def items(self) -> Iterator[Tuple[str, object]]:
+        for field in self.SLOT_FIELDS:
+            value = getattr(self, field)
+            if value is not None:
+                yield field, value
+        if self.extra:
+            yield from self.extra.items()
+    
+    # Accès par clé (modules encore écrits pour des dicts)
+    
+    def _field(self, key: str) -> str:
+        key = self.ALIASES.get(key, key)
+        return key if key in self._FIELD_SET else None
+    
+    def get(self, key: str, default=None):
+        field = self._field(key)
+        if field:
+            value = getattr(self, field)
+        else:
+            value = (self.extra or {}).get(key)
+        return default if value is None else value
+    
+    def __getitem__(self, key: str):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+    
+    def __setitem__(self, key: str, value):
+        field = self._field(key)
+        if field:
+            setattr(self, field, value)
+        else:
+            self._set_extra(key, value)
+    
+    def _set_extra(self, key: str, value):
+        if value is None:
+            if self.extra:
+                self.extra.pop(key, None)
+            return
+        if self.extra is None:
+            object.__setattr__(self, 'extra', {})
+        self.extra[key] = value
+    
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+    
+    def __repr__(self) -> str:
+        return f"StartupRecord(name={self.name!r}, sector={self.sector!r}, location={self.location!r})"
+
+
+def _optional_field(name: str) -> property:
+    """Attribut d'un champ rare, lu et écrit dans extra"""
+    return property(
+        lambda self: self.extra.get(name) if self.extra else None,
+        lambda self, value: self._set_extra(name, value)
+    )
+
+
+for _name in StartupRecord.OPTIONAL_FIELDS:
+    setattr(StartupRecord, _name, _optional_field(_name))